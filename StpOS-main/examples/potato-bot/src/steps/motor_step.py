@@ -60,7 +60,7 @@ class PotatoMotorStep(Step):
     up_time: ``float``
         How long to hold the motor during the *initial* and *final* lifts.
     sample_period: ``float``
-        Sensor polling interval while shaking.
+        Sensor polling interval while shaking, polled on the shared tick scheduler.
     max_phase_time: ``float``
         Timeout for phase 1 AND phase 2 (seconds).
     max_retries: ``int``
@@ -102,20 +102,19 @@ class PotatoMotorStep(Step):
 
     async def _shake_until(self, motor: Motor, sensor: Servo, target_state: bool):
         """Shake *motor* until ``sensor.is_on_white() == target_state``."""
-        while True:
-            # Down half‑cycle
-            motor.set_velocity(self.down_speed)
-            for _ in self._poll_loop():
-                if sensor.is_on_white() == target_state:
-                    return
-                await asyncio.sleep(self.sample_period)
-
-            # Up half‑cycle
-            motor.set_velocity(self.up_speed)
-            for _ in self._poll_loop():
-                if sensor.is_on_white() == target_state:
-                    return
-                await asyncio.sleep(self.sample_period)
+        half_cycle = len(self._poll_loop())
+        motor.set_velocity(self.down_speed)
+        if sensor.is_on_white() == target_state:
+            return
+
+        # One ticks() loop for the whole shake, down and up half‑cycles alternate every half_cycle ticks
+        polls = 0
+        async for _ in self.ticks(1.0 / self.sample_period):
+            polls += 1
+            if polls % half_cycle == 0:
+                motor.set_velocity(self.up_speed if (polls // half_cycle) % 2 else self.down_speed)
+            if sensor.is_on_white() == target_state:
+                return
 
     def _poll_loop(self):
         """Generator that yields ``None`` *shake_interval / sample_period* times."""
@@ -223,20 +222,19 @@ class PotatoMotorPrepStep(Step):
         return asyncio.wait_for(coro_factory(), t)
 
     async def _shake_until(self, motor: Motor, sensor: Servo, target_state: bool):
-        while True:
-            # down half-cycle
-            motor.set_velocity(self.down_speed)
-            for _ in self._poll_loop():
-                if sensor.is_on_white() == target_state:
-                    return
-                await asyncio.sleep(self.sample_period)
-
-            # up half-cycle
-            motor.set_velocity(self.up_speed)
-            for _ in self._poll_loop():
-                if sensor.is_on_white() == target_state:
-                    return
-                await asyncio.sleep(self.sample_period)
+        half_cycle = len(self._poll_loop())
+        motor.set_velocity(self.down_speed)
+        if sensor.is_on_white() == target_state:
+            return
+
+        # one ticks() loop for the whole shake, down and up half-cycles alternate every half_cycle ticks
+        polls = 0
+        async for _ in self.ticks(1.0 / self.sample_period):
+            polls += 1
+            if polls % half_cycle == 0:
+                motor.set_velocity(self.up_speed if (polls // half_cycle) % 2 else self.down_speed)
+            if sensor.is_on_white() == target_state:
+                return
 
     # ---------- main ----------
 
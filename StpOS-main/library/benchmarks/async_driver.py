@@ -0,0 +1,97 @@
+"""
+Compares the native algorithm driver against the former asyncio polling loop of to_task.
+
+Runs 1, 4 and 16 concurrent no-op algorithms and reports the achieved tick rate and the
+jitter (standard deviation of the tick period) for both implementations, once on an idle
+event loop and once while another task keeps the event loop busy in chunks of --busy ms,
+like a step processing sensor data in Python. Each configuration is repeated, the jitter of
+single runs varies a lot with the load of the machine, so the median and the worst run are
+shown.
+
+Usage: python benchmarks/async_driver.py [--frequency 100] [--ticks 200] [--repeat 5] [--busy 4]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from libstp.asynchronous import drive, driver_statistics, idle_algorithm, reset_driver_statistics
+
+
+class _RecordingAlgorithm:
+    def __init__(self, algorithm):
+        self.algorithm = algorithm
+        self.ticks = []
+
+    def advance(self):
+        self.ticks.append(time.perf_counter())
+        return self.algorithm.advance()
+
+
+async def _polling_to_task(algorithm, frequency=100):
+    # The Python implementation of to_task before the native driver existed
+    period = 1 / frequency
+    while True:
+        start_time = time.time()
+        more = algorithm.advance()
+        if not more:
+            break
+        elapsed_time = time.time() - start_time
+        sleep_time = max(0.0, period - elapsed_time)
+        await asyncio.sleep(sleep_time)
+
+
+async def _keep_busy(chunk, stop):
+    while not stop.is_set():
+        end = time.perf_counter() + chunk
+        while time.perf_counter() < end:
+            pass
+        await asyncio.sleep(0)
+
+
+async def _with_load(bench, chunk, *args):
+    if chunk <= 0:
+        return await bench(*args)
+    stop = asyncio.Event()
+    busy = asyncio.create_task(_keep_busy(chunk, stop))
+    try:
+        return await bench(*args)
+    finally:
+        stop.set()
+        await busy
+
+
+async def _bench_polling(concurrency, frequency, ticks):
+    algorithms = [_RecordingAlgorithm(idle_algorithm(ticks)) for _ in range(concurrency)]
+    await asyncio.gather(*(_polling_to_task(algorithm, frequency) for algorithm in algorithms))
+    periods = [b - a for algorithm in algorithms for a, b in zip(algorithm.ticks, algorithm.ticks[1:])]
+    return statistics.mean(periods), statistics.stdev(periods)
+
+
+async def _bench_native(concurrency, frequency, ticks):
+    reset_driver_statistics()
+    await asyncio.gather(*(drive(idle_algorithm(ticks), frequency) for _ in range(concurrency)))
+    stats = driver_statistics()
+    return stats.mean_period, stats.period_std_dev
+
+
+async def main(frequency, ticks, repeat, busy):
+    print(f"{'impl':<8} {'n':>3} {'busy [ms]':>9} {'rate [Hz]':>10} {'jitter median [ms]':>19} {'jitter max [ms]':>16}")
+    for chunk in (0.0, busy):
+        for concurrency in (1, 4, 16):
+            for name, bench in (("polling", _bench_polling), ("native", _bench_native)):
+                runs = [await _with_load(bench, chunk / 1000, concurrency, frequency, ticks) for _ in range(repeat)]
+                rate = statistics.median(1 / mean_period for mean_period, _ in runs)
+                jitters = [std_dev * 1000 for _, std_dev in runs]
+                print(f"{name:<8} {concurrency:>3} {chunk:>9.0f} {rate:>10.1f} {statistics.median(jitters):>19.3f}"
+                      f" {max(jitters):>16.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frequency", type=int, default=100)
+    parser.add_argument("--ticks", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--busy", type=float, default=4.0, help="Length of the chunks of other work in ms")
+    args = parser.parse_args()
+    asyncio.run(main(args.frequency, args.ticks, args.repeat, args.busy))
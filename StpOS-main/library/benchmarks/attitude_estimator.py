@@ -0,0 +1,66 @@
+"""
+Measures the period jitter of the attitude estimator thread and the cost of reading its estimate.
+
+Runs on the robot (or any libkipr device), the robot has to stand still for the calibration. The estimates
+are polled from Python for the given duration, the spacing of their timestamps shows how evenly the
+estimator runs with and without real-time priority.
+
+Usage: python benchmarks/attitude_estimator.py [--duration 5] [--frequency 100] [--priority 20] [--reads 100000]
+"""
+import argparse
+import statistics
+import time
+
+from libstp.ahrs import AttitudeEstimatorConfig
+from libstp.datatypes import Axis, Direction
+from libstp.device.two_wheeled import TwoWheeledNativeDevice
+from libstp.motor import Motor
+
+
+def _periods(estimator, duration):
+    timestamps = []
+    last_sequence = 0
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        attitude = estimator.get_attitude()
+        if attitude.sequence != last_sequence:
+            timestamps.append(attitude.timestamp)
+            last_sequence = attitude.sequence
+    return [(b - a) * 1000 for a, b in zip(timestamps, timestamps[1:])]
+
+
+def _read_cost(estimator, reads):
+    start = time.perf_counter()
+    for _ in range(reads):
+        estimator.get_attitude()
+    return (time.perf_counter() - start) / reads * 1e6
+
+
+def main(duration, frequency, priority, reads):
+    device = TwoWheeledNativeDevice(Axis.Z, Direction.Normal, Motor(0), Motor(3, True))
+    estimator = device.attitude_estimator
+    try:
+        print(f"{'priority':<10} {'mean [ms]':>10} {'stdev [ms]':>11} {'max [ms]':>9} {'overruns':>9} {'read [us]':>10}")
+        for realtime_priority in sorted({0, priority}):
+            config = AttitudeEstimatorConfig()
+            config.frequency = frequency
+            config.realtime_priority = realtime_priority
+            estimator.set_config(config)
+            estimator.start()
+            periods = _periods(estimator, duration)
+            read = _read_cost(estimator, reads)
+            estimator.stop()
+            print(f"{realtime_priority:<10} {statistics.mean(periods):>10.3f} {statistics.pstdev(periods):>11.3f} "
+                  f"{max(periods):>9.3f} {estimator.overruns:>9} {read:>10.2f}")
+    finally:
+        device.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds to poll the estimates for")
+    parser.add_argument("--frequency", type=int, default=100, help="Estimator rate in Hz")
+    parser.add_argument("--priority", type=int, default=20, help="SCHED_FIFO priority to compare against 0")
+    parser.add_argument("--reads", type=int, default=100000)
+    args = parser.parse_args()
+    main(args.duration, args.frequency, args.priority, args.reads)
@@ -0,0 +1,114 @@
+"""
+Compares the streaming SOS collision detector against the former filtfilt over a sample buffer.
+
+Replays impact traces through both detectors and reports the CPU time per sample, the missed
+impacts, the detection latency (time between the impact and the detection) and the false alarms
+before the impact or on a trace without one. Without --trace a set of
+synthetic traces is generated: gravity plus sensor noise with a damped impact spike.
+
+A recorded trace is a CSV file with the columns ax, ay, az and an optional impact column that
+marks the impact sample with 1.
+
+Usage: python benchmarks/collision_detection.py [--trace impact.csv] [--sample-rate 100] [--runs 20]
+"""
+import argparse
+import csv
+import math
+import random
+import time
+
+from libstp_helpers.collision_detection import CollisionDetector
+
+
+def _synthetic_trace(sample_rate, impact_axis, amplitude, seed, length=300, impact_at=200):
+    rng = random.Random(seed)
+    samples = []
+    for i in range(length):
+        sample = [rng.gauss(0, 0.3), 9.81 + rng.gauss(0, 0.3), rng.gauss(0, 0.3)]
+        if i >= impact_at:
+            t = (i - impact_at) / sample_rate
+            sample[impact_axis] += amplitude * math.exp(-t * 15) * math.cos(2 * math.pi * 4 * t)
+        samples.append(tuple(sample))
+    return samples, impact_at
+
+
+def _load_trace(path):
+    samples, impact_at = [], None
+    with open(path, newline="") as file:
+        for i, row in enumerate(csv.DictReader(file)):
+            samples.append((float(row["ax"]), float(row["ay"]), float(row["az"])))
+            if impact_at is None and float(row.get("impact") or 0):
+                impact_at = i
+    return samples, impact_at
+
+
+def _replay(detector, samples, impact_at):
+    detected_at = None
+    false_alarms = 0
+    start = time.perf_counter()
+    for i, sample in enumerate(samples):
+        collision, _ = detector.process(*sample)
+        if not collision:
+            continue
+        if impact_at is None or i < impact_at:
+            false_alarms += 1
+        elif detected_at is None:
+            detected_at = i
+    elapsed = time.perf_counter() - start
+    latency = None if detected_at is None or impact_at is None else detected_at - impact_at
+    return elapsed / len(samples), latency, false_alarms
+
+
+def _has_scipy():
+    try:
+        import scipy.signal  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def main(traces, sample_rate):
+    implementations = [("streaming", True)]
+    if _has_scipy():
+        implementations.append(("filtfilt", False))
+    else:
+        print("scipy is not installed, only the streaming detector runs")
+
+    print(f"{'trace':<18} {'impl':<10} {'cpu/sample [us]':>16} {'missed':>8} {'latency mean/max [ms]':>22} "
+          f"{'false alarms':>13}")
+    for name, runs in traces:
+        for impl, streaming in implementations:
+            per_sample, latencies, missed, false_alarms = [], [], 0, 0
+            for samples, impact_at in runs:
+                detector = CollisionDetector(None, sample_rate=sample_rate, streaming=streaming)
+                cpu, latency, alarms = _replay(detector, samples, impact_at)
+                per_sample.append(cpu)
+                false_alarms += alarms
+                if latency is not None:
+                    latencies.append(latency * 1000 / sample_rate)
+                elif impact_at is not None:
+                    missed += 1
+            latency_text = f"{sum(latencies) / len(latencies):.1f}/{max(latencies):.1f}" if latencies else "-"
+            print(f"{name:<18} {impl:<10} {sum(per_sample) / len(per_sample) * 1e6:>16.1f} "
+                  f"{missed:>4}/{len(runs):<3} {latency_text:>22} {false_alarms:>13}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trace", action="append", default=[])
+    parser.add_argument("--sample-rate", type=float, default=100.0)
+    parser.add_argument("--runs", type=int, default=20, help="Noise seeds per synthetic trace")
+    args = parser.parse_args()
+
+    if args.trace:
+        traces = [(path, [_load_trace(path)]) for path in args.trace]
+    else:
+        traces = [(f"{axis}-axis {amplitude:g} m/s2",
+                   [_synthetic_trace(args.sample_rate, index, amplitude, seed=index + 2 * run)
+                    for run in range(args.runs)])
+                  for index, axis in ((0, "x"), (2, "z"))
+                  for amplitude in (4.0, 6.0, 15.0)]
+        # Noise only, every detection is a false alarm
+        traces.append(("no impact", [(_synthetic_trace(args.sample_rate, 0, 0.0, seed=1000 + run, length=3000)[0],
+                                      None) for run in range(args.runs)]))
+    main(traces, args.sample_rate)
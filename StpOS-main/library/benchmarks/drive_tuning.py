@@ -0,0 +1,54 @@
+"""
+Tunes the drive controllers of a simulated robot with libstp_helpers.drive_tuning and prints the fitted motor
+model, the gains and the step response of every axis before and after.
+
+The robot starts with the default gains of Robot.start. A larger motor time constant models a loaded robot,
+which the default gains track worse.
+
+Usage: python benchmarks/drive_tuning.py [--time-constant 0.05]
+"""
+import argparse
+
+from libstp.datatypes import Axis, Direction
+from libstp.device.two_wheeled import TwoWheeledNativeDevice
+from libstp.motor import Motor
+from libstp.sim import MotorModel, Simulation
+from libstp_helpers import sim
+from libstp_helpers.drive_tuning import tune_drive
+
+
+def _seconds(value):
+    return "never" if value is None else f"{value:.2f}"
+
+
+def main(args):
+    device = TwoWheeledNativeDevice(Axis.Z, Direction.Normal, Motor(0), Motor(3, True))
+    device.set_vx_pid(1.0, 0.0, 0.0)
+    device.set_w_pid(0.5, 0.0, 0.0)
+    device.set_heading_pid(5.0, 0.1, 0.0)
+    device.set_max_accel(5, 5, 10)
+
+    world = sim.world_for(device)
+    motors = MotorModel()
+    motors.time_constant = args.time_constant
+    world.set_motor_model(motors)
+    simulation = Simulation(world, 0.001)
+    try:
+        reports = sim.run(simulation, tune_drive(device))
+    finally:
+        device.stop()
+
+    print(f"{'axis':<6} {'K':>6} {'tau ms':>7} {'static':>7} {'rms before':>11} {'rms after':>10} "
+          f"{'settle before s':>16} {'settle after s':>15}")
+    for report in reports:
+        print(f"{report.axis:<6} {report.model.gain:>6.3f} {report.model.time_constant * 1000:>7.1f} "
+              f"{report.model.static:>7.3f} {report.before.rms_error:>11.4f} {report.after.rms_error:>10.4f} "
+              f"{_seconds(report.before.settling_time):>16} {_seconds(report.after.settling_time):>15}")
+    for report in reports:
+        print(f"{report.axis}: {report.parameters}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--time-constant", type=float, default=0.05, help="Motor lag in seconds")
+    main(parser.parse_args())
@@ -0,0 +1,57 @@
+"""
+Compares filtering N channels through a FilterBank against one scalar filter per channel.
+
+The scalar path is what AdvancedLightSensor and the IMU helpers do today: one Python-to-C++
+call per channel and sample. The bank filters a whole frame (or a block of frames) per call.
+
+Usage: python benchmarks/filter_bank.py [--frames 10000]
+"""
+import argparse
+import time
+
+import numpy as np
+from libstp.filter import MedianFilterBank, SosFilter, SosFilterBank, butterworth
+
+
+def _time(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def _scalar(filters, data):
+    for frame in data:
+        for f, value in zip(filters, frame.tolist()):
+            f.filter(value)
+
+
+def _per_frame(bank, data):
+    out = np.empty(data.shape[1])
+    for frame in data:
+        bank(frame, out)
+
+
+def _cases(channels, sos, data):
+    # Built per channel count, so every closure binds its own channels and data
+    return [
+        ("butterworth", "scalar", lambda: _scalar([SosFilter(sos) for _ in range(channels)], data)),
+        ("butterworth", "frame", lambda: _per_frame(SosFilterBank(channels, sos), data)),
+        ("butterworth", "block", lambda: SosFilterBank(channels, sos)(data)),
+        ("median(5)", "frame", lambda: _per_frame(MedianFilterBank(channels, 5), data)),
+        ("median(5)", "block", lambda: MedianFilterBank(channels, 5)(data)),
+    ]
+
+
+def main(frames):
+    print(f"{'filter':<12} {'n':>3} {'path':<10} {'per frame [us]':>15}")
+    sos = butterworth(4, 5.0, 100.0)
+    for channels in (3, 8, 16):
+        data = np.random.default_rng(channels).normal(size=(frames, channels))
+        for name, path, run in _cases(channels, sos, data):
+            print(f"{name:<12} {channels:>3} {path:<10} {_time(run) / frames * 1e6:>15.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=10000)
+    args = parser.parse_args()
+    main(args.frames)
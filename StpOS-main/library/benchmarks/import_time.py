@@ -0,0 +1,69 @@
+"""
+Measures the cold import time of the libstp_helpers entry points with python -X importtime.
+
+Every module is imported in a fresh interpreter, the fastest of the repeats is reported together with the
+modules that took the longest themselves. Optional heavy dependencies (plotting, scipy, ahrs) must not be
+imported by any of them, they are only loaded by the features using them. Exits with 1 if a module exceeds
+the budget or pulls in a heavy dependency, so it can guard the robot's cold start.
+
+Usage: python benchmarks/import_time.py [--budget 400] [--repeat 5] [--top 8] [module ...]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+DEFAULT_MODULES = ["libstp", "libstp_helpers", "libstp_helpers.api.steps", "libstp_helpers.api.robot"]
+HEAVY_MODULES = ["pandas", "seaborn", "matplotlib", "scipy", "ahrs", "imufusion"]
+
+
+def _profile(module):
+    """
+    Returns:
+        dict: Self and cumulative import time in microseconds of every module the import loaded.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, env=os.environ)
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(own), int(cumulative))
+    return times
+
+
+def main(modules, budget, repeat, top):
+    failed = False
+    for module in modules:
+        try:
+            runs = [_profile(module) for _ in range(repeat)]
+        except RuntimeError as e:
+            print(f"{module}: {e}")
+            failed = True
+            continue
+
+        times = min(runs, key=lambda run: run[module][1])
+        total = times[module][1] / 1000
+        heavy = sorted({name.split(".")[0] for name in times} & set(HEAVY_MODULES))
+        over = total > budget
+        failed |= over or bool(heavy)
+        print(f"{module}: {total:.1f} ms{' (over budget)' if over else ''}, {len(times)} modules"
+              f"{', heavy: ' + ', '.join(heavy) if heavy else ''}")
+        for name, (own, _) in sorted(times.items(), key=lambda item: -item[1][0])[:top]:
+            print(f"    {own / 1000:>8.1f} ms  {name}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--budget", type=float, default=400.0, help="Largest cold import time per module in ms")
+    parser.add_argument("--repeat", type=int, default=5, help="Imports per module, the fastest one counts")
+    parser.add_argument("--top", type=int, default=8, help="Slowest modules listed per import")
+    args = parser.parse_args()
+    sys.exit(main(args.modules, args.budget, args.repeat, args.top))
@@ -0,0 +1,115 @@
+"""
+Compares the update cost per IMU sample of the Python fusion (ahrs.filters) with the native filters of
+libstp.ahrs, which ImuFusionService runs on its own thread.
+
+Both run over the same synthetic recording of a robot turning on the spot with a noisy gyro and
+accelerometer. Without a magnetometer nothing but the gyro observes the heading, so the final yaw of
+every filter is compared with integrating the gyro alone. The benchmark fails if the native and the
+Python filter differ by more than --tolerance rad. Needs numpy, the Python filters need ahrs.
+
+Usage: python benchmarks/imu_fusion.py [--samples 5000] [--frequency 100] [--rate 1.0] [--tolerance 0.02]
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from libstp.ahrs import AttitudeEstimator, AttitudeEstimatorConfig, AttitudeFilter
+
+
+def _recording(samples, rate, dt, seed=0):
+    rng = np.random.default_rng(seed)
+    gyro = np.zeros((samples, 3))
+    gyro[:, 2] = rate
+    gyro += rng.normal(0.0, 0.01, gyro.shape)
+    accel = np.tile([0.0, 0.0, 9.81], (samples, 1)) + rng.normal(0.0, 0.05, (samples, 3))
+    return gyro, accel
+
+
+def _yaw(q):
+    w, x, y, z = q
+    return np.arctan2(2.0 * (w * z + x * y), 1.0 - 2.0 * (y * y + z * z))
+
+
+def _wrap(angle):
+    return np.arctan2(np.sin(angle), np.cos(angle))
+
+
+def _integrated_gyro(gyro, frequency):
+    q = np.array([1.0, 0.0, 0.0, 0.0])
+    for g in gyro:
+        angle = np.linalg.norm(g) / frequency
+        dw, dx, dy, dz = np.r_[np.cos(angle / 2.0), np.sin(angle / 2.0) * g / np.linalg.norm(g)]
+        w, x, y, z = q
+        q = np.array([w * dw - x * dx - y * dy - z * dz,
+                      w * dx + x * dw + y * dz - z * dy,
+                      w * dy - x * dz + y * dw + z * dx,
+                      w * dz + x * dy - y * dx + z * dw])
+    return _yaw(q)
+
+
+def _python(filter_name, gyro, accel, frequency):
+    from ahrs.filters import EKF, Madgwick
+
+    if filter_name == "ekf":
+        fusion = EKF(frequency=frequency, frame="NED")
+        q = np.array([1.0, 0.0, 0.0, 0.0])
+        start = time.perf_counter()
+        for g, a in zip(gyro, accel):
+            q = fusion.update(q, gyr=g, acc=a, dt=1.0 / frequency)
+    else:
+        fusion = Madgwick(frequency=frequency, gain=0.1)
+        q = np.array([1.0, 0.0, 0.0, 0.0])
+        start = time.perf_counter()
+        for g, a in zip(gyro, accel):
+            q = fusion.updateIMU(q, gyr=g, acc=a, dt=1.0 / frequency)
+    return time.perf_counter() - start, q
+
+
+def _native(filter_name, gyro, accel, frequency):
+    config = AttitudeEstimatorConfig()
+    config.filter = AttitudeFilter.Ekf if filter_name == "ekf" else AttitudeFilter.Madgwick
+    config.frequency = frequency
+    estimator = AttitudeEstimator()
+    estimator.set_config(config)
+    start = time.perf_counter()
+    attitudes = estimator.replay(gyro, accel, np.zeros((0, 3)), 1.0 / frequency)
+    return time.perf_counter() - start, attitudes[-1]
+
+
+def main(samples, frequency, rate, tolerance):
+    gyro, accel = _recording(samples, rate, 1.0 / frequency)
+    expected = _integrated_gyro(gyro, frequency)
+    print(f"{samples} samples at {frequency} Hz, integrated gyro final yaw {expected:+.3f} rad")
+    print(f"{'implementation':<18} {'us/sample':>10} {'final yaw':>10} {'yaw error':>10}")
+    disagreements = []
+    for filter_name in ("ekf", "madgwick"):
+        implementations = [("native", _native)]
+        try:
+            import ahrs  # noqa: F401
+            implementations.insert(0, ("python", _python))
+        except ImportError:
+            print(f"{'python ' + filter_name:<18} {'ahrs is not installed':>21}")
+        errors = {}
+        for name, run in implementations:
+            elapsed, q = run(filter_name, gyro, accel, frequency)
+            errors[name] = _wrap(_yaw(q) - expected)
+            print(f"{name + ' ' + filter_name:<18} {elapsed / samples * 1e6:>10.2f} {_yaw(q):>+10.3f}"
+                  f" {errors[name]:>+10.4f}")
+        if "python" in errors and abs(_wrap(errors["native"] - errors["python"])) > tolerance:
+            disagreements.append(filter_name)
+
+    if disagreements:
+        sys.exit(f"native and python {', '.join(disagreements)} differ by more than {tolerance} rad")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--samples", type=int, default=5000)
+    parser.add_argument("--frequency", type=int, default=100, help="Sample rate in Hz")
+    parser.add_argument("--rate", type=float, default=1.0, help="Turn rate of the recording in rad/s")
+    parser.add_argument("--tolerance", type=float, default=0.02,
+                        help="Largest allowed difference of the native and python final yaw in rad")
+    args = parser.parse_args()
+    main(args.samples, args.frequency, args.rate, args.tolerance)
@@ -0,0 +1,96 @@
+"""
+Compares drive steps at a constant speed with planned moves over the same distance or angle in the simulation.
+
+    constant   for_distance / for_cw_rotation, ramped to a constant speed until the target is crossed
+    profiled   for_profiled_distance / for_profiled_rotation, follows a trapezoidal profile to the target
+
+Each step is followed by a second of standstill, the robot coasts after the motors stop. The table shows how
+long the step took, the furthest the robot got past the target and where it came to rest. Both variants share
+the acceleration limits of set_max_accel, only the turn at a constant speed ignores them, its heading
+controller sets the turn rate. Planned moves therefore take longer the lower the limits are, with limits close
+to what the motors manage (e.g. --accel 2 --angular-accel 8) they are about as fast. A larger motor time
+constant models a loaded robot.
+
+Usage: python benchmarks/motion_profile.py [--frequency 100] [--speed 0.8] [--accel 0.5] [--angular-accel 1.0]
+                                           [--time-constant 0.05]
+"""
+import argparse
+import math
+
+from libstp.datatypes import (Axis, Direction, Speed, for_cw_rotation, for_distance, for_profiled_distance,
+                              for_profiled_rotation)
+from libstp.device.two_wheeled import TwoWheeledNativeDevice
+from libstp.motor import Motor
+from libstp.sim import MotorModel, Simulation
+from libstp_helpers import sim
+
+DISTANCES = (10.0, 30.0, 100.0)  # cm
+ANGLES = (45.0, 90.0, 180.0)  # deg
+
+
+def _device(accel, angular_accel):
+    device = TwoWheeledNativeDevice(Axis.Z, Direction.Normal, Motor(0), Motor(3, True))
+    device.set_vx_pid(1.0, 0.0, 0.0)
+    device.set_w_pid(0.5, 0.0, 0.0)
+    device.set_heading_pid(5.0, 0.1, 0.0)
+    device.set_max_accel(accel, accel, angular_accel)
+    return device
+
+
+def _run(condition, speed, travelled, args):
+    """Runs one step on a fresh world and returns its duration, overshoot and final position."""
+    device = _device(args.accel, args.angular_accel)
+    world = sim.world_for(device)
+    motors = MotorModel()
+    motors.time_constant = args.time_constant
+    world.set_motor_model(motors)
+    simulation = Simulation(world, 0.001)
+    simulation.start()
+    period = 1.0 / args.frequency
+    try:
+        algorithm = device.set_speed_while(condition, speed)
+        peak = 0.0
+        while algorithm.advance():
+            simulation.advance(period)
+            peak = max(peak, travelled(simulation.world.pose))
+        duration = simulation.time
+        for _ in range(args.frequency):
+            simulation.advance(period)
+            peak = max(peak, travelled(simulation.world.pose))
+        return duration, peak, travelled(simulation.world.pose)
+    finally:
+        device.stop()
+        simulation.stop()
+
+
+def main(args):
+    speed = args.speed
+    forward = lambda pose: pose.x * 100.0
+    turned = lambda pose: abs(math.degrees(pose.heading))
+    cases = []
+    for distance in DISTANCES:
+        cases.append((f"{distance:.0f} cm", distance, forward,
+                      lambda d=distance: for_distance(d), Speed(speed, 0.0, 0.0),
+                      lambda d=distance: for_profiled_distance(d, speed)))
+    for angle in ANGLES:
+        cases.append((f"{angle:.0f} deg", angle, turned,
+                      lambda a=angle: for_cw_rotation(a), Speed(0.0, 0.0, speed),
+                      lambda a=angle: for_profiled_rotation(a, speed)))
+
+    print(f"{'move':<9} {'variant':<9} {'duration s':>11} {'overshoot':>10} {'final error':>12}")
+    for name, target, travelled, constant, constant_speed, profiled in cases:
+        for variant, condition, step_speed in (("constant", constant, constant_speed),
+                                               ("profiled", profiled, Speed(0.0, 0.0, 0.0))):
+            duration, peak, final = _run(condition(), step_speed, travelled, args)
+            print(f"{name:<9} {variant:<9} {duration:>11.2f} {max(peak - target, 0.0):>10.2f} "
+                  f"{final - target:>12.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frequency", type=int, default=100, help="Control loop rate in Hz")
+    parser.add_argument("--speed", type=float, default=0.8, help="Fraction of the maximum speed")
+    parser.add_argument("--accel", type=float, default=0.5, help="Forward and strafe acceleration in m/s^2")
+    parser.add_argument("--angular-accel", type=float, default=1.0, help="Angular acceleration in rad/s^2")
+    parser.add_argument("--time-constant", type=float, default=0.05, help="Motor lag in seconds")
+    main(parser.parse_args())
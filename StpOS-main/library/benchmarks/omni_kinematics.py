@@ -0,0 +1,68 @@
+"""
+Measures one control tick of set_speed_while on an omni wheeled device: the time the native loop takes and
+the register accesses it makes. On the wombat every register access is a separate SPI transfer, so they
+dominate the tick there while the simulated ones are almost free.
+
+    time       for_seconds(), the wheel velocities are measured from their own encoder read
+    distance   for_distance(), the condition and the velocity measurement share one encoder read
+
+The robot drives diagonally while turning, so all four wheels get different goals each tick.
+
+Usage: python benchmarks/omni_kinematics.py [--iterations 20000] [--frequency 100]
+"""
+import argparse
+import time
+
+from libstp.datatypes import Axis, Direction, Speed, for_distance, for_seconds
+from libstp.device.omni_wheeled import OmniWheeledNativeDevice
+from libstp.motor import Motor
+from libstp.sim import Simulation
+from libstp_helpers import sim
+
+SPEED = Speed(0.3, 0.3, 0.2)
+
+
+def _variants():
+    return {
+        "time": lambda: for_seconds(1e6),
+        "distance": lambda: for_distance(1e6),
+    }
+
+
+def _measure(simulation, device, condition, iterations, period):
+    algorithm = device.set_speed_while(condition, SPEED, auto_stop_device=False)
+    elapsed = 0.0
+    accesses = 0
+    for _ in range(iterations):
+        simulation.advance(period)
+        before = simulation.register_accesses
+        start = time.perf_counter()
+        algorithm.advance()
+        elapsed += time.perf_counter() - start
+        accesses += simulation.register_accesses - before
+    return elapsed / iterations, accesses / iterations
+
+
+def main(iterations, frequency):
+    device = OmniWheeledNativeDevice(Axis.Z, Direction.Normal, Motor(0), Motor(1), Motor(2), Motor(3))
+    device.set_vx_pid(1, 0, 0)
+    device.set_vy_pid(1, 0, 0)
+    device.set_w_pid(0.5, 0, 0)
+    simulation = Simulation(sim.world_for(device), 0.001)
+    simulation.start()
+    try:
+        print(f"{'variant':<10} {'us/tick':>10} {'registers/tick':>15}")
+        for name, condition in _variants().items():
+            seconds, accesses = _measure(simulation, device, condition(), iterations, 1.0 / frequency)
+            print(f"{name:<10} {seconds * 1e6:>10.2f} {accesses:>15.1f}")
+    finally:
+        device.stop()
+        simulation.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--frequency", type=int, default=100, help="Control loop rate in Hz")
+    args = parser.parse_args()
+    main(args.iterations, args.frequency)
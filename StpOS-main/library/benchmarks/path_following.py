@@ -0,0 +1,84 @@
+"""
+Drives the same route twice in the simulation: as a sequence of straight drives and turns that stop in between,
+and as one for_path step through the corners of the route. Prints how long each took and how far the robot
+ended up from the last corner.
+
+The route is given as corners in cm relative to the start, e.g. --route 60,0 60,60 0,60 for a U-turn. The
+stop-and-go variant drives to every corner and turns on the spot towards the next one.
+
+Usage: python benchmarks/path_following.py [--route 60,0 60,60] [--speed 0.8] [--frequency 100]
+"""
+import argparse
+import math
+
+from libstp.datatypes import Axis, Direction, Speed, for_cw_rotation, for_distance, for_path
+from libstp.device.two_wheeled import TwoWheeledNativeDevice
+from libstp.motor import Motor
+from libstp.sim import Simulation
+from libstp_helpers import sim
+
+
+def _device():
+    device = TwoWheeledNativeDevice(Axis.Z, Direction.Normal, Motor(0), Motor(3, True))
+    device.set_vx_pid(1.0, 0.0, 0.0)
+    device.set_w_pid(0.5, 0.0, 0.0)
+    device.set_heading_pid(5.0, 0.1, 0.0)
+    return device
+
+
+def _stop_and_go(route, speed):
+    """Straight drives to every corner with turns on the spot in between."""
+    steps = []
+    x, y, heading = 0.0, 0.0, 0.0
+    for corner_x, corner_y in route:
+        direction = math.atan2(corner_y - y, corner_x - x)
+        turn = math.degrees(math.atan2(math.sin(direction - heading), math.cos(direction - heading)))
+        if abs(turn) > 0.5:
+            # A positive heading change of the pose is a positive rotation of the device
+            steps.append((for_cw_rotation(turn), Speed(0.0, 0.0, speed)))
+        steps.append((for_distance(math.hypot(corner_x - x, corner_y - y)), Speed(speed, 0.0, 0.0)))
+        x, y, heading = corner_x, corner_y, direction
+    return steps
+
+
+def _run(steps, frequency):
+    device = _device()
+    simulation = Simulation(sim.world_for(device), 0.001)
+    simulation.start()
+    try:
+        for condition, speed in steps:
+            algorithm = device.set_speed_while(condition, speed)
+            while algorithm.advance():
+                simulation.advance(1.0 / frequency)
+        pose = simulation.world.pose
+        return simulation.time, pose.x * 100.0, pose.y * 100.0
+    finally:
+        device.stop()
+        simulation.stop()
+
+
+def main(route, speed, frequency):
+    end_x, end_y = route[-1]
+    variants = {
+        "stop-and-go": _stop_and_go(route, speed),
+        "path": [(for_path(route, speed), Speed(0.0, 0.0, 0.0))],
+    }
+    print(f"{'variant':<12} {'duration s':>11} {'end error cm':>13}")
+    for name, steps in variants.items():
+        duration, x, y = _run(steps, frequency)
+        print(f"{name:<12} {duration:>11.2f} {math.hypot(x - end_x, y - end_y):>13.2f}")
+
+
+def _corner(text):
+    x, y = text.split(",")
+    return float(x), float(y)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--route", type=_corner, nargs="+", default=[(60.0, 0.0), (60.0, 60.0)],
+                        help="Corners as x,y in cm")
+    parser.add_argument("--speed", type=float, default=0.8, help="Fraction of the maximum speed")
+    parser.add_argument("--frequency", type=int, default=100, help="Control loop rate in Hz")
+    args = parser.parse_args()
+    main(args.route, args.speed, args.frequency)
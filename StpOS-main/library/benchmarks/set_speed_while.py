@@ -0,0 +1,64 @@
+"""
+Measures how many control loop iterations of set_speed_while run per second with different conditions and speeds.
+
+The loop runs against the simulated robot, so no wombat is needed. Each iteration advances the world by one
+control period outside of the measurement and then times a single advance() of the algorithm.
+
+    callback   a Python function returning a new ConditionalResult per tick and a Python speed function,
+               which is what every built-in condition cost before they were evaluated in place
+    builtin    for_seconds() with a Python speed function
+    constant   for_seconds() with a constant Speed, the loop never calls into Python
+
+Usage: python benchmarks/set_speed_while.py [--iterations 20000] [--frequency 100]
+"""
+import argparse
+import time
+
+from libstp.datatypes import Axis, Direction, Speed, UndefinedConditionalResult, for_seconds
+from libstp.device.two_wheeled import TwoWheeledNativeDevice
+from libstp.motor import Motor
+from libstp.sim import Simulation
+from libstp_helpers import sim
+
+SPEED = Speed(0.5, 0.0, 0.0)
+
+
+def _variants():
+    return {
+        "callback": (lambda: (lambda type_check_only: UndefinedConditionalResult(True)), lambda: lambda result: SPEED),
+        "builtin": (lambda: for_seconds(1e6), lambda: lambda result: SPEED),
+        "constant": (lambda: for_seconds(1e6), lambda: SPEED),
+    }
+
+
+def _measure(simulation, device, condition, speed, iterations, period):
+    algorithm = device.set_speed_while(condition, speed, auto_stop_device=False)
+    elapsed = 0.0
+    for _ in range(iterations):
+        simulation.advance(period)
+        start = time.perf_counter()
+        algorithm.advance()
+        elapsed += time.perf_counter() - start
+    return iterations / elapsed
+
+
+def main(iterations, frequency):
+    device = TwoWheeledNativeDevice(Axis.Z, Direction.Normal, Motor(0), Motor(3, True))
+    simulation = Simulation(sim.world_for(device), 0.001)
+    simulation.start()
+    try:
+        print(f"{'variant':<10} {'iterations/s':>14} {'us/iteration':>14}")
+        for name, (condition, speed) in _variants().items():
+            rate = _measure(simulation, device, condition(), speed(), iterations, 1.0 / frequency)
+            print(f"{name:<10} {rate:>14.0f} {1e6 / rate:>14.2f}")
+    finally:
+        device.stop()
+        simulation.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--frequency", type=int, default=100, help="Control loop rate in Hz")
+    args = parser.parse_args()
+    main(args.iterations, args.frequency)
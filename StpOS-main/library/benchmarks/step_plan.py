@@ -0,0 +1,108 @@
+"""
+Compares running a mission tree recursively (Sequential/Parallel.run_step) against its compiled plan.
+
+Builds missions out of no-op steps nested in seq() and parallel() like real missions, then reports
+the compile time, the dispatch overhead per step and the number of tasks each executor creates.
+
+Usage: python benchmarks/step_plan.py [--missions 10] [--steps 20] [--repeat 20]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from libstp_helpers.api.steps import Step
+from libstp_helpers.api.steps.parallel import parallel
+from libstp_helpers.api.steps.plan import compile_plan
+from libstp_helpers.api.steps.sequential import seq
+
+
+class _NoOp(Step):
+    async def run_step(self, device, definitions):
+        pass
+
+
+def _build(missions, steps):
+    # Every mission mixes plain steps, a nested sequence and a parallel block with a step list in one branch
+    sequences = []
+    for _ in range(missions):
+        body = []
+        for index in range(steps):
+            if index % 5 == 3:
+                body.append(parallel(_NoOp(), [_NoOp(), _NoOp()]))
+            elif index % 5 == 4:
+                body.append(seq([_NoOp(), seq([_NoOp()])]))
+            else:
+                body.append(_NoOp())
+        sequences.append(seq(body))
+    return seq(sequences)
+
+
+def _count_leaves(step):
+    children = getattr(step, "steps", None)
+    if children is None:
+        return 1
+    return sum(_count_leaves(child) for child in children)
+
+
+async def _measure(prepare, repeat):
+    """
+    Runs prepare() outside and the coroutine it returns inside of the measurement.
+    """
+    loop = asyncio.get_event_loop()
+    tasks = 0
+    default_factory = loop.get_task_factory()
+
+    def counting_factory(loop, coro):
+        nonlocal tasks
+        tasks += 1
+        if default_factory is not None:
+            return default_factory(loop, coro)
+        return asyncio.Task(coro, loop=loop)
+
+    durations = []
+    for _ in range(repeat):
+        run = prepare()
+        loop.set_task_factory(counting_factory)
+        try:
+            start = time.perf_counter()
+            await run
+            durations.append(time.perf_counter() - start)
+        finally:
+            loop.set_task_factory(default_factory)
+    return statistics.median(durations), tasks // repeat
+
+
+async def _run_tree(tree):
+    await tree.run_step(None, None)
+    tree.call_on_exit(None)
+
+
+async def main(missions, steps, repeat):
+    leaves = _count_leaves(_build(missions, steps))
+
+    compile_times = []
+    for _ in range(repeat):
+        tree = _build(missions, steps)
+        start = time.perf_counter()
+        plan = compile_plan(tree, None)
+        compile_times.append(time.perf_counter() - start)
+    compile_time = statistics.median(compile_times)
+
+    tree_time, tree_tasks = await _measure(lambda: _run_tree(_build(missions, steps)), repeat)
+    plan_time, plan_tasks = await _measure(lambda: compile_plan(_build(missions, steps), None).run(None), repeat)
+
+    print(f"{leaves} steps in {missions} missions, {len(plan)} plan nodes")
+    print(f"compile   {compile_time * 1000:10.3f} ms ({compile_time / leaves * 1e6:.2f} us per step, once at startup)")
+    print(f"{'executor':<10} {'run [ms]':>10} {'per step [us]':>14} {'tasks':>6}")
+    for name, duration, tasks in (("tree", tree_time, tree_tasks), ("plan", plan_time, plan_tasks)):
+        print(f"{name:<10} {duration * 1000:>10.3f} {duration / leaves * 1e6:>14.2f} {tasks:>6}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--missions", type=int, default=10)
+    parser.add_argument("--steps", type=int, default=20, help="Top level steps per mission")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.missions, args.steps, args.repeat))
@@ -0,0 +1,104 @@
+"""
+Compares the speed measurement of the drive controller by tick differences and by wheel velocity estimators.
+
+The simulated robot drives straight at a constant speed while the control loop runs with a jittered period,
+as it does when Python is busy. Without estimators the controller differentiates the encoder ticks over each
+loop period. With estimators, a sampler stand-in updates one VelocityEstimator per wheel every millisecond
+of simulated time, independent of the loop. The table shows how far each measurement is off the true speed
+of the robot, and how well the robot holds the commanded speed.
+
+Usage: python benchmarks/velocity_estimation.py [--seconds 5] [--frequency 100] [--jitter 0.5] [--bandwidth 50]
+"""
+import argparse
+import math
+import random
+
+from libstp.datatypes import Axis, Direction, Speed, for_seconds
+from libstp.device.two_wheeled import TwoWheeledNativeDevice
+from libstp.motor import Motor, VelocityEstimator
+from libstp.sim import Simulation
+from libstp_helpers import sim
+
+SAMPLE_PERIOD = 0.001
+SETTLE_SECONDS = 1.0
+SPEED = 0.6
+
+
+def _rms(values):
+    return math.sqrt(sum(v * v for v in values) / len(values)) if values else float("nan")
+
+
+def _run(seconds, frequency, jitter, bandwidth, estimate, seed):
+    device = TwoWheeledNativeDevice(Axis.Z, Direction.Normal, Motor(0), Motor(3, True))
+    device.set_vx_pid(1.0, 0.0, 0.0)
+    device.set_w_pid(0.5, 0.0, 0.0)
+    simulation = Simulation(sim.world_for(device), SAMPLE_PERIOD)
+    motors = device.wheel_motors
+    estimators = [VelocityEstimator(bandwidth) for _ in motors]
+    if estimate:
+        device.wheel_velocity_estimators = estimators
+
+    meters_per_tick = 2.0 * math.pi * device.wheel_radius / device.ticks_per_revolution
+    # set_speed_while corrects with the gyro by default and then drives at most 95% of the top speed
+    target = SPEED * 0.95 * device.get_max_speeds()[0]
+    rng = random.Random(seed)
+    measurement_errors = []
+    tracking_errors = []
+
+    simulation.start()
+    try:
+        algorithm = device.set_speed_while(for_seconds(seconds), Speed(SPEED, 0.0, 0.0))
+        algorithm.advance()
+        last_ticks = [m.get_current_position_estimate() for m in motors]
+        last_time = simulation.time
+        while True:
+            period = 1.0 / frequency * (1.0 + rng.uniform(-jitter, jitter))
+            elapsed = 0.0
+            true_speed = 0.0
+            while elapsed < period:
+                pose = simulation.world.pose
+                simulation.advance(SAMPLE_PERIOD)
+                after = simulation.world.pose
+                true_speed = ((after.x - pose.x) * math.cos(pose.heading)
+                              + (after.y - pose.y) * math.sin(pose.heading)) / SAMPLE_PERIOD
+                for motor, estimator in zip(motors, estimators):
+                    estimator.update(motor.get_current_position_estimate())
+                elapsed += SAMPLE_PERIOD
+
+            ticks = [m.get_current_position_estimate() for m in motors]
+            dt = simulation.time - last_time
+            by_ticks = sum(t - l for t, l in zip(ticks, last_ticks)) / len(ticks) * meters_per_tick / dt
+            by_estimators = sum(e.velocity for e in estimators) / len(estimators) * meters_per_tick
+            last_ticks, last_time = ticks, simulation.time
+
+            if simulation.time > SETTLE_SECONDS:
+                measured = by_estimators if estimate else by_ticks
+                measurement_errors.append(measured - true_speed)
+                tracking_errors.append(true_speed - target)
+            if not algorithm.advance():
+                break
+        device.stop()
+    finally:
+        simulation.stop()
+    return _rms(measurement_errors), _rms(tracking_errors), max(map(abs, tracking_errors), default=float("nan"))
+
+
+def main(seconds, frequency, jitter, bandwidth, seed):
+    print(f"{'measurement':<14}{'jitter':>8}{'meas rms':>12}{'speed rms':>12}{'speed max':>12}")
+    for loop_jitter in sorted({0.0, jitter}):
+        for estimate in (False, True):
+            measurement, tracking, worst = _run(seconds, frequency, loop_jitter, bandwidth, estimate, seed)
+            name = "estimators" if estimate else "tick diff"
+            print(f"{name:<14}{loop_jitter:>7.0%} {measurement * 1000:>9.1f} mm/s"
+                  f"{tracking * 1000:>7.1f} mm/s{worst * 1000:>7.1f} mm/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=5.0, help="Duration of the drive")
+    parser.add_argument("--frequency", type=int, default=100, help="Nominal control loop rate in Hz")
+    parser.add_argument("--jitter", type=float, default=0.5, help="Loop period varies by up to this fraction")
+    parser.add_argument("--bandwidth", type=float, default=50.0, help="Of the velocity estimators in rad/s")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the loop jitter")
+    args = parser.parse_args()
+    main(args.seconds, args.frequency, args.jitter, args.bandwidth, args.seed)
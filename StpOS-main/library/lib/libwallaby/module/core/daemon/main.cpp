@@ -0,0 +1,283 @@
+// kipr_iod: owns the SPI bus and publishes the register frame for all
+// processes, see readme.md and kipr/core/shared_frame.hpp.
+
+#include "kipr/core/platform.hpp"
+#include "kipr/core/registers.hpp"
+#include "kipr/core/shared_frame.hpp"
+#include "kipr/log/log.hpp"
+
+#include <linux/futex.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <sys/syscall.h>
+#include <unistd.h>
+
+#include <atomic>
+#include <cerrno>
+#include <climits>
+#include <csignal>
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <ctime>
+#include <fcntl.h>
+#include <new>
+
+using namespace kipr::core;
+
+// A slot claimed but not filled for this long is skipped if its client died
+#define STUCK_SLOT_MS 100
+
+namespace
+{
+  kipr::log::Log logger("core/iod");
+
+  volatile std::sig_atomic_t running = 1;
+
+  // Since when the slot at write_tail is claimed but not filled, 0 if it is not
+  std::int64_t stuck_since_ns = 0;
+
+  void stop(int)
+  {
+    running = 0;
+  }
+
+  std::int64_t monotonic_ns()
+  {
+    struct timespec now;
+    clock_gettime(CLOCK_MONOTONIC, &now);
+    return static_cast<std::int64_t>(now.tv_sec) * 1000000000LL + now.tv_nsec;
+  }
+
+  bool process_alive(const std::int32_t pid)
+  {
+    return pid > 0 && (kill(pid, 0) == 0 || errno == EPERM);
+  }
+
+  bool another_daemon_runs()
+  {
+    const int fd = shm_open(KIPR_SHARED_FRAME_NAME, O_RDONLY, 0);
+    if (fd < 0)
+    {
+      return false;
+    }
+
+    struct stat status;
+    bool runs = false;
+    if (fstat(fd, &status) == 0 && static_cast<std::size_t>(status.st_size) >= sizeof(SharedFrame))
+    {
+      void *const memory = mmap(nullptr, sizeof(SharedFrame), PROT_READ, MAP_SHARED, fd, 0);
+      if (memory != MAP_FAILED)
+      {
+        const SharedFrame *const frame = static_cast<const SharedFrame *>(memory);
+        const std::int32_t pid = frame->daemon_pid.load(std::memory_order_acquire);
+        runs = frame->magic == KIPR_SHARED_FRAME_MAGIC && pid != getpid() && process_alive(pid);
+        munmap(memory, sizeof(SharedFrame));
+      }
+    }
+    close(fd);
+    return runs;
+  }
+
+  SharedFrame *create_segment()
+  {
+    // A segment of a daemon that crashed, clients do not attach to it anymore
+    shm_unlink(KIPR_SHARED_FRAME_NAME);
+
+    const int fd = shm_open(KIPR_SHARED_FRAME_NAME, O_RDWR | O_CREAT | O_EXCL, 0666);
+    if (fd < 0)
+    {
+      logger.error() << "shm_open " << KIPR_SHARED_FRAME_NAME << ": " << strerror(errno);
+      return nullptr;
+    }
+
+    // Every user may read the sensors and write the motors, as with the bus
+    fchmod(fd, 0666);
+    void *memory = MAP_FAILED;
+    if (ftruncate(fd, sizeof(SharedFrame)) == 0)
+    {
+      memory = mmap(nullptr, sizeof(SharedFrame), PROT_READ | PROT_WRITE, MAP_SHARED, fd, 0);
+    }
+    close(fd);
+    if (memory == MAP_FAILED)
+    {
+      logger.error() << "Mapping " << KIPR_SHARED_FRAME_NAME << ": " << strerror(errno);
+      shm_unlink(KIPR_SHARED_FRAME_NAME);
+      return nullptr;
+    }
+
+    SharedFrame *const frame = new (memory) SharedFrame();
+    frame->magic = KIPR_SHARED_FRAME_MAGIC;
+    frame->version = KIPR_SHARED_FRAME_VERSION;
+    for (std::uint32_t i = 0; i < KIPR_SHARED_FRAME_WRITE_SLOTS; ++i)
+    {
+      frame->slots[i].sequence.store(i, std::memory_order_relaxed);
+    }
+    return frame;
+  }
+
+  // Whether a slot claimed but not filled is left behind by a client that died
+  // in between, e.g. killed by a signal. The slot cannot be told apart from one
+  // a live client is about to fill until its owner is set, so that case waits
+  // for the timeout as well.
+  bool abandoned(const SharedWriteSlot &slot)
+  {
+    if (!stuck_since_ns)
+    {
+      stuck_since_ns = monotonic_ns();
+      return false;
+    }
+    if (monotonic_ns() - stuck_since_ns < STUCK_SLOT_MS * 1000000LL)
+    {
+      return false;
+    }
+    return !process_alive(slot.owner.load(std::memory_order_relaxed));
+  }
+
+  // Hands the queued writes of the clients to the device, they go out with the
+  // next frame. Slots a client is still filling wait for the next call, unless
+  // the client died, then they are skipped.
+  void take_writes(SharedFrame *const frame, Platform *const platform)
+  {
+    for (;;)
+    {
+      SharedWriteSlot &slot = frame->slots[frame->write_tail & (KIPR_SHARED_FRAME_WRITE_SLOTS - 1)];
+      if (slot.sequence.load(std::memory_order_acquire) != frame->write_tail + 1)
+      {
+        if (frame->write_head.load(std::memory_order_acquire) == frame->write_tail || !abandoned(slot))
+        {
+          return;
+        }
+
+        // Fails if the client filled the slot after all
+        std::uint32_t expected = frame->write_tail;
+        if (slot.sequence.compare_exchange_strong(expected, frame->write_tail + KIPR_SHARED_FRAME_WRITE_SLOTS,
+                                                  std::memory_order_acq_rel))
+        {
+          logger.warning() << "Skipped a write request of a client that exited while sending it";
+          slot.owner.store(0, std::memory_order_relaxed);
+          stuck_since_ns = 0;
+          ++frame->write_tail;
+        }
+        continue;
+      }
+      stuck_since_ns = 0;
+
+      const std::uint32_t count = slot.count < KIPR_SHARED_FRAME_WRITES_PER_SLOT
+          ? slot.count : KIPR_SHARED_FRAME_WRITES_PER_SLOT;
+      for (std::uint32_t i = 0; i < count; ++i)
+      {
+        platform->writeRegister8b(slot.writes[i].address, slot.writes[i].value);
+      }
+      slot.owner.store(0, std::memory_order_relaxed);
+      slot.sequence.store(frame->write_tail + KIPR_SHARED_FRAME_WRITE_SLOTS, std::memory_order_release);
+      ++frame->write_tail;
+    }
+  }
+
+  void publish(SharedFrame *const frame, Platform *const platform)
+  {
+    std::uint8_t registers[REG_READABLE_COUNT];
+    {
+      // The writes show up in the registers right away, like in the device
+      RegisterFrame register_frame;
+      take_writes(frame, platform);
+      for (std::uint32_t address = 0; address < REG_READABLE_COUNT; ++address)
+      {
+        registers[address] = platform->readRegister8b(address);
+      }
+    }
+    const TransferStats stats = platform->transferStats();
+
+    const std::uint32_t sequence = frame->sequence.load(std::memory_order_relaxed);
+    frame->sequence.store(sequence + 1, std::memory_order_relaxed);
+    std::atomic_thread_fence(std::memory_order_release);
+
+    ++frame->frames;
+    frame->timestamp_ns = monotonic_ns();
+    frame->applied = frame->write_tail;
+    frame->stats = stats;
+    memcpy(frame->registers, registers, sizeof registers);
+
+    frame->sequence.store(sequence + 2, std::memory_order_release);
+    if (frame->waiters.load(std::memory_order_acquire) > 0)
+    {
+      syscall(SYS_futex, reinterpret_cast<std::uint32_t *>(&frame->sequence), FUTEX_WAKE, INT_MAX, nullptr,
+              nullptr, 0);
+    }
+  }
+}
+
+int main(int argc, char **argv)
+{
+  unsigned rate = 1000;
+  for (int i = 1; i < argc; ++i)
+  {
+    if (strcmp(argv[i], "--rate") == 0 && i + 1 < argc)
+    {
+      rate = static_cast<unsigned>(atoi(argv[++i]));
+    }
+    else
+    {
+      fprintf(stderr, "Usage: %s [--rate HZ]\n", argv[0]);
+      return 2;
+    }
+  }
+  if (rate == 0)
+  {
+    fprintf(stderr, "The rate must be at least 1 Hz\n");
+    return 2;
+  }
+
+  if (another_daemon_runs())
+  {
+    logger.error() << "Another kipr_iod runs already";
+    return 1;
+  }
+
+  SharedFrame *const frame = create_segment();
+  if (!frame)
+  {
+    return 1;
+  }
+
+  Platform *const platform = Platform::instance();
+
+  // Replaces the handlers of the platform, which abort, the segment has to go
+  struct sigaction action;
+  memset(&action, 0, sizeof action);
+  action.sa_handler = stop;
+  sigaction(SIGINT, &action, nullptr);
+  sigaction(SIGTERM, &action, nullptr);
+  platform->setFrameRate(rate);
+
+  // Clients attach once the pid is set, there is a frame to read by then
+  platform->waitForFrame(100000);
+  publish(frame, platform);
+  frame->daemon_pid.store(getpid(), std::memory_order_release);
+  logger.info() << "Publishing the register frame at " << rate << " Hz";
+
+  std::uint64_t missed = 0;
+  while (running)
+  {
+    if (!platform->waitForFrame(100000))
+    {
+      if (missed++ == 0)
+      {
+        logger.error() << "No register frame for 100 ms";
+      }
+      continue;
+    }
+    missed = 0;
+    publish(frame, platform);
+  }
+
+  frame->daemon_pid.store(0, std::memory_order_release);
+  platform->setFrameRate(0);
+  // Wakes waiting clients, they see the daemon is gone
+  frame->sequence.fetch_add(2, std::memory_order_acq_rel);
+  syscall(SYS_futex, reinterpret_cast<std::uint32_t *>(&frame->sequence), FUTEX_WAKE, INT_MAX, nullptr, nullptr, 0);
+  munmap(frame, sizeof(SharedFrame));
+  shm_unlink(KIPR_SHARED_FRAME_NAME);
+  return 0;
+}
@@ -5,8 +5,10 @@
 #include <vector>
 #include <iostream>
 #include <memory>
+#include <cstdint>
 
 #include "command.hpp"
+#include "device.hpp"
 
 namespace kipr
 {
@@ -35,6 +37,24 @@ namespace kipr
       void writeRegister32b(unsigned char address, unsigned int value);
 
       float readRegisterFloat(unsigned char address);
+
+      void beginFrame();
+      void endFrame();
+      void setFrameFreshness(std::uint32_t microseconds);
+      std::uint64_t transferCount() const;
+
+      TransferStats transferStats() const;
+      void resetTransferStats();
+      bool setReadyLine(const std::string &chip, std::uint32_t line);
+      void setTransferGap(std::uint32_t microseconds);
+      void setFrameRate(std::uint32_t hz);
+      bool waitForFrame(std::uint32_t timeoutMicroseconds);
+
+      // Routes all register access through the given device instead of the one
+      // compiled into the library, e.g. a simulation. nullptr restores the
+      // compiled in device. The caller keeps ownership of the device.
+      // Must not be called while other threads access registers.
+      static void setDevice(Device *device);
       
       template <typename... Args>
       void submit(Args &&...args)
@@ -102,6 +122,19 @@ namespace kipr
       static std::unique_ptr<Platform> instance_;
       static kipr::core::Device *device_; // to stop DEVICE's deconstructor from being called until Platform's deconstructor is called
     };
+
+    // Serves all register reads of the current thread from one transfer while
+    // it is alive and sends the writes in the same transfer, see
+    // begin_register_frame() in kipr/core/core.h.
+    class RegisterFrame
+    {
+    public:
+      RegisterFrame();
+      ~RegisterFrame();
+
+      RegisterFrame(const RegisterFrame &) = delete;
+      RegisterFrame &operator=(const RegisterFrame &) = delete;
+    };
   }
 }
 
@@ -115,4 +148,9 @@ namespace kipr
 #define KIPR_CORE_PLATFORM_DEVICE_REGISTER(descriptor) \
   kipr::core::Device *kipr::core::DEVICE(new descriptor::DeviceType());
 
+// Like KIPR_CORE_PLATFORM_DEVICE_REGISTER, for descriptors that pick the
+// device at runtime with a static create().
+#define KIPR_CORE_PLATFORM_DEVICE_REGISTER_FACTORY(descriptor) \
+  kipr::core::Device *kipr::core::DEVICE(descriptor::create());
+
 #endif
@@ -0,0 +1,86 @@
+#ifndef _KIPR_CORE_SHARED_FRAME_HPP_
+#define _KIPR_CORE_SHARED_FRAME_HPP_
+
+#include <atomic>
+#include <cstdint>
+
+#include "device.hpp"
+#include "registers.hpp"
+
+// The register frame kipr_iod publishes for all processes of the controller.
+//
+// The daemon owns the SPI bus, exchanges the registers with the co-processor at
+// a fixed rate and copies every frame into a POSIX shared memory segment under a
+// sequence lock. Processes started while it runs read from the segment instead
+// of opening the bus and send their writes through a ring of write requests,
+// which the daemon sends with its next frame. See module/core/daemon.
+#define KIPR_SHARED_FRAME_NAME "/kipr-register-frame"
+#define KIPR_SHARED_FRAME_MAGIC 0x4B524631 // "KRF1"
+#define KIPR_SHARED_FRAME_VERSION 2
+
+// Must be a power of two
+#define KIPR_SHARED_FRAME_WRITE_SLOTS 256
+#define KIPR_SHARED_FRAME_WRITES_PER_SLOT 16
+
+namespace kipr
+{
+  namespace core
+  {
+    static_assert(ATOMIC_INT_LOCK_FREE == 2, "The shared frame needs lock-free atomics across processes");
+
+    struct SharedWrite
+    {
+      std::uint8_t address;
+      std::uint8_t value;
+    };
+
+    // Writes in one slot reach the co-processor in the same transfer
+    struct SharedWriteSlot
+    {
+      // The position the slot is free for, one more once it is filled
+      std::atomic<std::uint32_t> sequence;
+      // The pid of the client filling the slot, 0 once the daemon took it. The
+      // daemon skips slots whose client died before filling them.
+      std::atomic<std::int32_t> owner;
+      std::uint32_t count;
+      SharedWrite writes[KIPR_SHARED_FRAME_WRITES_PER_SLOT];
+    };
+
+    struct SharedFrame
+    {
+      std::uint32_t magic;
+      std::uint32_t version;
+      std::atomic<std::int32_t> daemon_pid;
+
+      // Number of processes blocked in Device::waitForFrame(), the daemon only
+      // wakes them if there are any
+      std::atomic<std::uint32_t> waiters;
+
+      // Odd while the daemon publishes a frame. Everything up to registers is
+      // only consistent between two equal even values.
+      std::atomic<std::uint32_t> sequence;
+      std::uint64_t frames;
+      std::int64_t timestamp_ns; // CLOCK_MONOTONIC
+      std::uint32_t applied; // write position up to which the writes are in registers
+      TransferStats stats;
+      std::uint8_t registers[REG_READABLE_COUNT];
+
+      // Multi-producer single-consumer ring of write requests: clients claim a
+      // position with write_head, the daemon takes them in order
+      std::atomic<std::uint32_t> write_head;
+      std::uint32_t write_tail; // only touched by the daemon
+      SharedWriteSlot slots[KIPR_SHARED_FRAME_WRITE_SLOTS];
+    };
+
+    // Maps the segment of a running kipr_iod and returns a device that reads
+    // and writes through it, nullptr if no daemon runs. Must not log, it runs
+    // during static initialization.
+    //
+    // Should the daemon exit while the process runs, the device creates the
+    // device that opens the bus with direct and sends the writes the daemon
+    // did not apply through it, e.g. the last motor stop.
+    Device *attachSharedFrameDevice(Device *(*direct)());
+  }
+}
+
+#endif
@@ -21,6 +21,81 @@ const char* kipr_build_datetime();
 
 void add_cleanup_function(void (*func)());
 
+/*!
+ * Starts a register frame of the calling thread
+ * \description The first register read of the frame transfers the whole register image from the
+ * \description co-processor, all further reads until end_register_frame() are served from it.
+ * \description Register writes inside the frame are collected and sent together with the next transfer,
+ * \description at the latest by end_register_frame(). Frames nest, only the outermost one counts.
+ */
+void begin_register_frame();
+
+/*!
+ * Ends the register frame of the calling thread and sends its pending writes
+ */
+void end_register_frame();
+
+/*!
+ * Serves register reads outside of frames from the last transfer while it is younger than the given age
+ * \param microseconds Maximum age of the register image, 0 transfers on every read (the default)
+ */
+void set_register_frame_freshness(unsigned int microseconds);
+
+/*!
+ * \return The number of SPI transfers to the co-processor since the start, 0 without one
+ */
+unsigned long long register_transfer_count();
+
+typedef struct register_transfer_stats
+{
+    unsigned long long transfers;
+    unsigned long long errors;
+    unsigned long long desyncs;
+    unsigned long long ready_timeouts;
+    unsigned long long overruns;
+    double mean_latency_us;
+    double max_latency_us;
+} register_transfer_stats;
+
+/*!
+ * \return Transfers, failed transfers, de-synchronizations, ready line timeouts, late frames and the SPI
+ * \return latency since the start or the last reset_register_transfer_stats()
+ */
+register_transfer_stats get_register_transfer_stats();
+
+void reset_register_transfer_stats();
+
+/*!
+ * Paces transfers with the ready line of the co-processor instead of a fixed gap
+ * \param chip The GPIO chip, e.g. "gpiochip0", NULL or "" to use the transfer gap again
+ * \param line The line offset on the chip
+ * \return 0 on success, -1 if the line cannot be requested
+ * \description Can also be set with the KIPR_SPI_READY_LINE=chip:line environment variable
+ */
+int set_register_ready_line(const char *chip, unsigned int line);
+
+/*!
+ * Sets the least time between two transfers without a ready line
+ * \param microseconds The gap, 50 by default
+ */
+void set_register_transfer_gap(unsigned int microseconds);
+
+/*!
+ * Exchanges the register frame with the co-processor at a fixed rate in the background
+ * \param hz Frames per second, 0 to transfer on demand (the default)
+ * \description Reads are served from the latest frame, writes are sent with the next one.
+ * \description Can also be set with the KIPR_SPI_FRAME_RATE environment variable
+ */
+void set_register_frame_rate(unsigned int hz);
+
+/*!
+ * Blocks until the next frame of set_register_frame_rate() was exchanged, e.g. to run a control
+ * loop in step with the hardware
+ * \param timeout_ms Longest wait
+ * \return 1 if a frame arrived, 0 on timeout. Returns 1 at once without a frame rate.
+ */
+int wait_for_register_frame(unsigned int timeout_ms);
+
 #ifdef __cplusplus
 }
 #endif
@@ -1,6 +1,7 @@
 #include "kipr/core/core.h"
 
 #include <kipr/core/cleanup.hpp>
+#include <kipr/core/platform.hpp>
 
 #include "kipr/config.h"
 
@@ -43,3 +44,62 @@ void add_cleanup_function(void (*func)())
 {
     kipr::core::cleanup_add(func);
 }
+
+void begin_register_frame()
+{
+    kipr::core::Platform::instance()->beginFrame();
+}
+
+void end_register_frame()
+{
+    kipr::core::Platform::instance()->endFrame();
+}
+
+void set_register_frame_freshness(unsigned int microseconds)
+{
+    kipr::core::Platform::instance()->setFrameFreshness(microseconds);
+}
+
+unsigned long long register_transfer_count()
+{
+    return kipr::core::Platform::instance()->transferCount();
+}
+
+register_transfer_stats get_register_transfer_stats()
+{
+    const kipr::core::TransferStats stats = kipr::core::Platform::instance()->transferStats();
+    register_transfer_stats result;
+    result.transfers = stats.transfers;
+    result.errors = stats.errors;
+    result.desyncs = stats.desyncs;
+    result.ready_timeouts = stats.readyTimeouts;
+    result.overruns = stats.overruns;
+    result.mean_latency_us = stats.meanLatencyUs;
+    result.max_latency_us = stats.maxLatencyUs;
+    return result;
+}
+
+void reset_register_transfer_stats()
+{
+    kipr::core::Platform::instance()->resetTransferStats();
+}
+
+int set_register_ready_line(const char *chip, unsigned int line)
+{
+    return kipr::core::Platform::instance()->setReadyLine(chip ? chip : "", line) ? 0 : -1;
+}
+
+void set_register_transfer_gap(unsigned int microseconds)
+{
+    kipr::core::Platform::instance()->setTransferGap(microseconds);
+}
+
+void set_register_frame_rate(unsigned int hz)
+{
+    kipr::core::Platform::instance()->setFrameRate(hz);
+}
+
+int wait_for_register_frame(unsigned int timeout_ms)
+{
+    return kipr::core::Platform::instance()->waitForFrame(timeout_ms * 1000) ? 1 : 0;
+}
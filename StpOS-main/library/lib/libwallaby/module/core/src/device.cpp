@@ -1,4 +1,4 @@
-#include "device.hpp"
+#include "kipr/core/device.hpp"
 
 #include "kipr/core/command.hpp"
 
@@ -109,4 +109,50 @@ void Device::submit(const Command *const buffer, const std::size_t size)
       }
     }
   }
-}
\ No newline at end of file
+}
+
+void Device::beginFrame()
+{
+}
+
+void Device::endFrame()
+{
+}
+
+void Device::setFrameFreshness(const std::uint32_t microseconds)
+{
+}
+
+std::uint64_t Device::transferCount() const
+{
+  return 0;
+}
+
+TransferStats Device::transferStats() const
+{
+  TransferStats stats;
+  stats.transfers = transferCount();
+  return stats;
+}
+
+void Device::resetTransferStats()
+{
+}
+
+bool Device::setReadyLine(const std::string &chip, const std::uint32_t line)
+{
+  return chip.empty();
+}
+
+void Device::setTransferGap(const std::uint32_t microseconds)
+{
+}
+
+void Device::setFrameRate(const std::uint32_t hz)
+{
+}
+
+bool Device::waitForFrame(const std::uint32_t timeoutMicroseconds)
+{
+  return true;
+}
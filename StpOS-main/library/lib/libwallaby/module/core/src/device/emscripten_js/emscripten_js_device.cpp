@@ -1,4 +1,4 @@
-#include "../../device.hpp"
+#include "kipr/core/device.hpp"
 #include "kipr/core/platform.hpp"
 
 #include "emscripten.h"
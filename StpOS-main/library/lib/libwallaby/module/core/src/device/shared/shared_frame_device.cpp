@@ -0,0 +1,542 @@
+#include "kipr/core/device.hpp"
+#include "kipr/core/registers.hpp"
+#include "kipr/core/shared_frame.hpp"
+
+#include "kipr/log/log.hpp"
+
+#include <linux/futex.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <sys/syscall.h>
+#include <unistd.h>
+
+#include <algorithm>
+#include <atomic>
+#include <cerrno>
+#include <chrono>
+#include <climits>
+#include <csignal>
+#include <cstring>
+#include <ctime>
+#include <fcntl.h>
+#include <mutex>
+#include <thread>
+#include <vector>
+
+// Longest wait for a free slot of the write ring before a write is dropped. A
+// daemon that does not empty the ring is only waited for once.
+#define WRITE_TIMEOUT_MS 100
+// Frames older than this count as a stopped daemon
+#define STALE_FRAME_MS 500
+
+namespace
+{
+  const std::string NAME = "shared";
+  kipr::log::Log logger("core/shared");
+
+  std::int64_t monotonic_ns()
+  {
+    struct timespec now;
+    clock_gettime(CLOCK_MONOTONIC, &now);
+    return static_cast<std::int64_t>(now.tv_sec) * 1000000000LL + now.tv_nsec;
+  }
+
+  bool daemon_alive(const kipr::core::SharedFrame *const frame)
+  {
+    const std::int32_t pid = frame->daemon_pid.load(std::memory_order_acquire);
+    return pid > 0 && (kill(pid, 0) == 0 || errno == EPERM);
+  }
+
+}
+
+// Reads the frames kipr_iod publishes and queues writes for it, see
+// kipr/core/shared_frame.hpp. No process but the daemon touches the bus until
+// the daemon is gone, then the device opens the bus itself.
+class SharedFrameDevice : public kipr::core::Device
+{
+public:
+  SharedFrameDevice(kipr::core::SharedFrame *const frame, kipr::core::Device *(*const create_direct)())
+      : frame_(frame),
+        stale_reported_(false),
+        ring_stuck_(false),
+        dropped_(0),
+        create_direct_(create_direct),
+        direct_(nullptr)
+  {
+  }
+
+  virtual ~SharedFrameDevice()
+  {
+    delete direct_.load(std::memory_order_acquire);
+    munmap(frame_, sizeof(kipr::core::SharedFrame));
+  }
+
+  virtual const std::string &getName() const override
+  {
+    return NAME;
+  }
+
+  virtual std::uint8_t r8(const std::uint8_t address) override
+  {
+    if (kipr::core::Device *const device = direct())
+    {
+      return device->r8(address);
+    }
+    const std::uint8_t *const image = load();
+    return image[address];
+  }
+
+  virtual std::uint16_t r16(const std::uint8_t address) override
+  {
+    if (kipr::core::Device *const device = direct())
+    {
+      return device->r16(address);
+    }
+    const std::uint8_t *const image = load();
+    return (
+        image[address] << 8 |
+        image[address + 1] << 0);
+  }
+
+  virtual std::uint32_t r32(const std::uint8_t address) override
+  {
+    if (kipr::core::Device *const device = direct())
+    {
+      return device->r32(address);
+    }
+    const std::uint8_t *const image = load();
+    return (
+        image[address] << 24 |
+        image[address + 1] << 16 |
+        image[address + 2] << 8 |
+        image[address + 3] << 0);
+  }
+
+  virtual void w8(const std::uint8_t address, const std::uint8_t value) override
+  {
+    batch_.push_back({address, value});
+    write();
+  }
+
+  virtual void w16(const std::uint8_t address, const std::uint16_t value) override
+  {
+    batch_.push_back({address, static_cast<std::uint8_t>((value & 0xFF00) >> 8)});
+    batch_.push_back({static_cast<std::uint8_t>(address + 1), static_cast<std::uint8_t>((value & 0x00FF) >> 0)});
+    write();
+  }
+
+  virtual void w32(const std::uint8_t address, const std::uint32_t value) override
+  {
+    batch_.push_back({address, static_cast<std::uint8_t>((value & 0xFF000000) >> 24)});
+    batch_.push_back({static_cast<std::uint8_t>(address + 1), static_cast<std::uint8_t>((value & 0x00FF0000) >> 16)});
+    batch_.push_back({static_cast<std::uint8_t>(address + 2), static_cast<std::uint8_t>((value & 0x0000FF00) >> 8)});
+    batch_.push_back({static_cast<std::uint8_t>(address + 3), static_cast<std::uint8_t>((value & 0x000000FF) >> 0)});
+    write();
+  }
+
+  virtual void beginFrame() override
+  {
+    if (frame_depth_++ == 0)
+    {
+      frame_loaded_ = false;
+    }
+  }
+
+  virtual void endFrame() override
+  {
+    if (frame_depth_ == 0 || --frame_depth_ > 0)
+    {
+      return;
+    }
+    send();
+  }
+
+  virtual std::uint64_t transferCount() const override
+  {
+    return transferStats().transfers;
+  }
+
+  virtual kipr::core::TransferStats transferStats() const override
+  {
+    if (kipr::core::Device *const device = direct())
+    {
+      return device->transferStats();
+    }
+    Snapshot snapshot;
+    read(snapshot);
+    return snapshot.stats;
+  }
+
+  virtual void resetTransferStats() override
+  {
+    if (kipr::core::Device *const device = direct())
+    {
+      device->resetTransferStats();
+      return;
+    }
+    logger.warning() << "The transfer statistics belong to kipr_iod";
+  }
+
+  virtual bool setReadyLine(const std::string &chip, const std::uint32_t line) override
+  {
+    if (kipr::core::Device *const device = direct())
+    {
+      return device->setReadyLine(chip, line);
+    }
+    logger.warning() << "kipr_iod owns the bus, set the ready line for it instead";
+    return false;
+  }
+
+  virtual void setTransferGap(const std::uint32_t microseconds) override
+  {
+    if (kipr::core::Device *const device = direct())
+    {
+      device->setTransferGap(microseconds);
+      return;
+    }
+    logger.warning() << "kipr_iod owns the bus, set the transfer gap for it instead";
+  }
+
+  virtual void setFrameRate(const std::uint32_t hz) override
+  {
+    if (kipr::core::Device *const device = direct())
+    {
+      device->setFrameRate(hz);
+      return;
+    }
+    logger.warning() << "kipr_iod owns the bus, set the frame rate for it instead";
+  }
+
+  virtual bool waitForFrame(const std::uint32_t timeout_us) override
+  {
+    if (kipr::core::Device *const device = direct())
+    {
+      return device->waitForFrame(timeout_us);
+    }
+    std::atomic<std::uint32_t> &sequence = frame_->sequence;
+    const std::uint32_t current = sequence.load(std::memory_order_acquire);
+    const std::int64_t deadline = monotonic_ns() + static_cast<std::int64_t>(timeout_us) * 1000;
+
+    frame_->waiters.fetch_add(1, std::memory_order_acq_rel);
+    bool arrived = false;
+    for (;;)
+    {
+      if (sequence.load(std::memory_order_acquire) != current)
+      {
+        arrived = true;
+        break;
+      }
+      const std::int64_t remaining = deadline - monotonic_ns();
+      if (remaining <= 0)
+      {
+        break;
+      }
+      struct timespec timeout = {static_cast<time_t>(remaining / 1000000000LL),
+                                 static_cast<long>(remaining % 1000000000LL)};
+      // The segment is shared between processes, so no FUTEX_PRIVATE_FLAG
+      syscall(SYS_futex, reinterpret_cast<std::uint32_t *>(&sequence), FUTEX_WAIT, current, &timeout, nullptr, 0);
+    }
+    frame_->waiters.fetch_sub(1, std::memory_order_acq_rel);
+    return arrived;
+  }
+
+private:
+  struct Snapshot
+  {
+    std::uint64_t frames;
+    std::int64_t timestamp_ns;
+    std::uint32_t applied;
+    kipr::core::TransferStats stats;
+    std::uint8_t registers[REG_READABLE_COUNT];
+  };
+
+  // A write the daemon has not published yet, ticket is its ring position
+  struct Unapplied
+  {
+    std::uint32_t ticket;
+    std::uint8_t address;
+    std::uint8_t value;
+  };
+
+  // Copies the latest frame, the sequence lock retries while the daemon publishes
+  void read(Snapshot &snapshot) const
+  {
+    for (;;)
+    {
+      const std::uint32_t before = frame_->sequence.load(std::memory_order_acquire);
+      if (before & 1)
+      {
+        std::this_thread::yield();
+        continue;
+      }
+
+      snapshot.frames = frame_->frames;
+      snapshot.timestamp_ns = frame_->timestamp_ns;
+      snapshot.applied = frame_->applied;
+      snapshot.stats = frame_->stats;
+      memcpy(snapshot.registers, frame_->registers, sizeof snapshot.registers);
+
+      std::atomic_thread_fence(std::memory_order_acquire);
+      if (frame_->sequence.load(std::memory_order_relaxed) == before)
+      {
+        return;
+      }
+    }
+  }
+
+  // The registers as this thread should see them: one frame for the whole
+  // register frame of the thread, with the writes of this process on top that
+  // the daemon did not publish yet, so read-modify-writes do not lose them
+  const std::uint8_t *load()
+  {
+    if (frame_depth_ == 0 || !frame_loaded_)
+    {
+      read(image_);
+      frame_loaded_ = frame_depth_ > 0;
+      check_stale(image_);
+
+      std::lock_guard<std::mutex> lock(mut_);
+      unapplied_.erase(std::remove_if(unapplied_.begin(), unapplied_.end(), [](const Unapplied &write) {
+        return static_cast<std::int32_t>(image_.applied - write.ticket) > 0;
+      }), unapplied_.end());
+      for (const Unapplied &write : unapplied_)
+      {
+        overlay(write.address, write.value);
+      }
+    }
+
+    for (const kipr::core::SharedWrite &write : batch_)
+    {
+      overlay(write.address, write.value);
+    }
+    return image_.registers;
+  }
+
+  static void overlay(const std::uint8_t address, const std::uint8_t value)
+  {
+    if (address < REG_READABLE_COUNT)
+    {
+      image_.registers[address] = value;
+    }
+  }
+
+  void check_stale(const Snapshot &snapshot)
+  {
+    const bool stale = monotonic_ns() - snapshot.timestamp_ns > STALE_FRAME_MS * 1000000LL;
+    if (stale && !daemon_alive(frame_))
+    {
+      take_over();
+    }
+    else if (stale && !stale_reported_.exchange(true))
+    {
+      logger.error() << "kipr_iod stopped publishing, the registers are stale";
+    }
+    else if (!stale)
+    {
+      stale_reported_ = false;
+    }
+  }
+
+  kipr::core::Device *direct() const
+  {
+    return direct_.load(std::memory_order_acquire);
+  }
+
+  // Opens the bus once the daemon is gone. The writes of this process the
+  // daemon never applied go out first, so e.g. a motor stop is not lost.
+  void take_over()
+  {
+    std::lock_guard<std::mutex> lock(mut_);
+    if (direct_.load(std::memory_order_relaxed))
+    {
+      return;
+    }
+    if (!create_direct_)
+    {
+      if (!stale_reported_.exchange(true))
+      {
+        logger.error() << "kipr_iod is not running anymore, the registers are stale";
+      }
+      return;
+    }
+
+    logger.error() << "kipr_iod is not running anymore, opening the bus directly";
+    Snapshot snapshot;
+    read(snapshot);
+    kipr::core::Device *const device = create_direct_();
+    device->beginFrame();
+    for (const Unapplied &write : unapplied_)
+    {
+      if (static_cast<std::int32_t>(snapshot.applied - write.ticket) <= 0)
+      {
+        device->w8(write.address, write.value);
+      }
+    }
+    device->endFrame();
+    unapplied_.clear();
+    direct_.store(device, std::memory_order_release);
+  }
+
+  void write()
+  {
+    // Inside a frame the writes wait for its end to reach the daemon together
+    if (frame_depth_ == 0)
+    {
+      send();
+    }
+  }
+
+  void send()
+  {
+    if (batch_.empty())
+    {
+      return;
+    }
+    if (!direct() && !daemon_alive(frame_))
+    {
+      take_over();
+    }
+
+    std::size_t sent = 0;
+    while (sent < batch_.size() && !direct())
+    {
+      const std::size_t count = std::min<std::size_t>(batch_.size() - sent, KIPR_SHARED_FRAME_WRITES_PER_SLOT);
+      if (!enqueue(&batch_[sent], count))
+      {
+        if (daemon_alive(frame_))
+        {
+          if (dropped_.fetch_add(batch_.size() - sent) == 0)
+          {
+            logger.error() << "kipr_iod does not take writes, dropping them until it does";
+          }
+          break;
+        }
+        take_over();
+        continue;
+      }
+      sent += count;
+    }
+
+    // The rest reaches the co-processor in one transfer, as through the daemon
+    if (kipr::core::Device *const device = direct())
+    {
+      device->beginFrame();
+      for (; sent < batch_.size(); ++sent)
+      {
+        device->w8(batch_[sent].address, batch_[sent].value);
+      }
+      device->endFrame();
+    }
+    batch_.clear();
+  }
+
+  // Claims the next free slot of the ring, fills it and hands it to the daemon
+  bool enqueue(const kipr::core::SharedWrite *const writes, const std::size_t count)
+  {
+    const std::int64_t deadline = monotonic_ns() + (ring_stuck_ ? 0 : WRITE_TIMEOUT_MS * 1000000LL);
+    std::uint32_t position = frame_->write_head.load(std::memory_order_relaxed);
+    kipr::core::SharedWriteSlot *slot;
+    for (;;)
+    {
+      slot = &frame_->slots[position & (KIPR_SHARED_FRAME_WRITE_SLOTS - 1)];
+      const std::uint32_t sequence = slot->sequence.load(std::memory_order_acquire);
+      const std::int32_t difference = static_cast<std::int32_t>(sequence - position);
+      if (difference == 0)
+      {
+        if (frame_->write_head.compare_exchange_weak(position, position + 1, std::memory_order_relaxed))
+        {
+          break;
+        }
+      }
+      else if (difference < 0)
+      {
+        // Full, the daemon empties the ring with every frame
+        if (monotonic_ns() >= deadline || !daemon_alive(frame_))
+        {
+          ring_stuck_ = true;
+          return false;
+        }
+        std::this_thread::sleep_for(std::chrono::microseconds(100));
+        position = frame_->write_head.load(std::memory_order_relaxed);
+      }
+      else
+      {
+        position = frame_->write_head.load(std::memory_order_relaxed);
+      }
+    }
+
+    if (ring_stuck_.exchange(false))
+    {
+      logger.error() << "kipr_iod takes writes again, " << dropped_.exchange(0) << " were dropped";
+    }
+    slot->owner.store(getpid(), std::memory_order_relaxed);
+    slot->count = static_cast<std::uint32_t>(count);
+    memcpy(slot->writes, writes, count * sizeof *writes);
+
+    // Fails if the daemon skipped the slot because filling it took too long
+    std::uint32_t expected = position;
+    if (!slot->sequence.compare_exchange_strong(expected, position + 1, std::memory_order_release,
+                                                std::memory_order_relaxed))
+    {
+      return false;
+    }
+
+    std::lock_guard<std::mutex> lock(mut_);
+    for (std::size_t i = 0; i < count; ++i)
+    {
+      unapplied_.push_back({position, writes[i].address, writes[i].value});
+    }
+    return true;
+  }
+
+  kipr::core::SharedFrame *frame_;
+  std::atomic<bool> stale_reported_;
+  std::atomic<bool> ring_stuck_;
+  std::atomic<std::size_t> dropped_;
+
+  kipr::core::Device *(*const create_direct_)();
+  std::atomic<kipr::core::Device *> direct_;
+
+  std::mutex mut_;
+  std::vector<Unapplied> unapplied_;
+
+  static thread_local Snapshot image_;
+  static thread_local std::vector<kipr::core::SharedWrite> batch_;
+  static thread_local unsigned frame_depth_;
+  static thread_local bool frame_loaded_;
+};
+
+thread_local SharedFrameDevice::Snapshot SharedFrameDevice::image_;
+thread_local std::vector<kipr::core::SharedWrite> SharedFrameDevice::batch_;
+thread_local unsigned SharedFrameDevice::frame_depth_ = 0;
+thread_local bool SharedFrameDevice::frame_loaded_ = false;
+
+kipr::core::Device *kipr::core::attachSharedFrameDevice(Device *(*const direct)())
+{
+  const int fd = shm_open(KIPR_SHARED_FRAME_NAME, O_RDWR, 0);
+  if (fd < 0)
+  {
+    return nullptr;
+  }
+
+  struct stat status;
+  void *const memory = fstat(fd, &status) == 0 && static_cast<std::size_t>(status.st_size) >= sizeof(SharedFrame)
+      ? mmap(nullptr, sizeof(SharedFrame), PROT_READ | PROT_WRITE, MAP_SHARED, fd, 0)
+      : MAP_FAILED;
+  close(fd);
+  if (memory == MAP_FAILED)
+  {
+    return nullptr;
+  }
+
+  // A segment left behind by a daemon that crashed or of another version
+  SharedFrame *const frame = static_cast<SharedFrame *>(memory);
+  if (frame->magic != KIPR_SHARED_FRAME_MAGIC || frame->version != KIPR_SHARED_FRAME_VERSION ||
+      !daemon_alive(frame))
+  {
+    munmap(memory, sizeof(SharedFrame));
+    return nullptr;
+  }
+
+  return new SharedFrameDevice(frame, direct);
+}
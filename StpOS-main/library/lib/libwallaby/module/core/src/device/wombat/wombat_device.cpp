@@ -1,14 +1,21 @@
-#include "../../device.hpp"
+#include "kipr/core/device.hpp"
 #include "kipr/core/platform.hpp"
 #include "kipr/core/registers.hpp"
+#include "kipr/core/shared_frame.hpp"
 
 #include "kipr/log/log.hpp"
 
+#include <linux/gpio.h>
 #include <linux/spi/spidev.h>
+#include <poll.h>
 #include <sys/ioctl.h>
 #include <unistd.h>
 #include <mutex>
 
+#include <algorithm>
+#include <atomic>
+#include <chrono>
+#include <condition_variable>
 #include <cstdlib>
 #include <cstring>
 #include <fcntl.h>
@@ -16,9 +23,16 @@
 #include <sys/types.h>
 #include <sys/stat.h>
 #include "mutex"
+#include <thread>
+#include <vector>
 
 #define SPI_FILE_SYSTEM ("/dev/spidev0.0")
 
+// Time the co-processor needs to re-arm its DMA after a transfer, without a ready line
+#define DEFAULT_TRANSFER_GAP_US 50
+// Longest wait for the ready line before transferring anyway
+#define READY_TIMEOUT_MS 2
+
 namespace
 {
   const std::string NAME = "wombat";
@@ -32,7 +46,17 @@ public:
       : spi_fd_(-1),
         count(0),
         read_buf(new std::uint8_t[REG_READABLE_COUNT]),
-        write_buf(new std::uint8_t[REG_READABLE_COUNT])
+        write_buf(new std::uint8_t[REG_READABLE_COUNT]),
+        image_(new std::uint8_t[REG_READABLE_COUNT]()),
+        image_valid_(false),
+        freshness_(0),
+        transfers_(0),
+        ready_fd_(-1),
+        awaiting_ready_(false),
+        transfer_gap_(DEFAULT_TRANSFER_GAP_US),
+        frame_rate_(0),
+        frame_sequence_(0),
+        stopping_(false)
   {
     spi_fd_ = open(SPI_FILE_SYSTEM, O_RDWR);
     if (spi_fd_ <= 0)
@@ -40,14 +64,21 @@ public:
       logger.fatal() << "Not found: " << SPI_FILE_SYSTEM;
     }
     clear_buffers();
+    configure_from_environment();
   }
 
   virtual ~WombatDevice()
   {
     std::cout << "~Wombat()" << std::endl;
+    setFrameRate(0);
+    if (ready_fd_ >= 0)
+    {
+      close(ready_fd_);
+    }
     close(spi_fd_);
     delete[] read_buf;
     delete[] write_buf;
+    delete[] image_;
   }
 
   virtual const std::string &getName() const override
@@ -57,88 +88,326 @@ public:
 
   virtual std::uint8_t r8(const std::uint8_t address) override
   {
-    std::lock_guard<std::mutex> lock(mut_);
-    clear_buffers();
-    transfer();
+    std::unique_lock<std::mutex> lock(mut_);
+    const std::uint8_t *const registers = refresh(lock);
 
-    return read_buf[address];
+    return registers[address];
   }
 
   virtual std::uint16_t r16(const std::uint8_t address) override
   {
-    std::lock_guard<std::mutex> lock(mut_);
-    clear_buffers();
-    transfer();
+    std::unique_lock<std::mutex> lock(mut_);
+    const std::uint8_t *const registers = refresh(lock);
 
     return (
-        read_buf[address] << 8 |
-        read_buf[address + 1] << 0);
+        registers[address] << 8 |
+        registers[address + 1] << 0);
   }
 
   virtual std::uint32_t r32(const std::uint8_t address) override
   {
-    std::lock_guard<std::mutex> lock(mut_);
-    clear_buffers();
-    transfer();
+    std::unique_lock<std::mutex> lock(mut_);
+    const std::uint8_t *const registers = refresh(lock);
 
     return (
-        read_buf[address] << 24 |
-        read_buf[address + 1] << 16 |
-        read_buf[address + 2] << 8 |
-        read_buf[address + 3] << 0);
+        registers[address] << 24 |
+        registers[address + 1] << 16 |
+        registers[address + 2] << 8 |
+        registers[address + 3] << 0);
   }
 
   virtual void w8(const std::uint8_t address, const std::uint8_t value) override
   {
     std::lock_guard<std::mutex> lock(mut_);
-    clear_buffers();
-    write_buf[3] = 1,
-    write_buf[4] = address,
-    write_buf[5] = value;
+    queue(address, value);
 
-    transfer();
+    write();
   }
 
   virtual void w16(const std::uint8_t address, const std::uint16_t value) override
   {
     std::lock_guard<std::mutex> lock(mut_);
-    clear_buffers();
-    write_buf[3] = 2,
-    write_buf[4] = address,
-    write_buf[5] = (value & 0xFF00) >> 8,
-    write_buf[6] = address + 1,
-    write_buf[7] = (value & 0x00FF) >> 0,
+    queue(address, (value & 0xFF00) >> 8);
+    queue(address + 1, (value & 0x00FF) >> 0);
 
-    transfer();
+    write();
   }
 
   virtual void w32(const std::uint8_t address, const std::uint32_t value) override
   {
     std::lock_guard<std::mutex> lock(mut_);
-    clear_buffers();
-    write_buf[3] = 4;
-    write_buf[4] = address,
-    write_buf[5] = (value & 0xFF000000) >> 24,
-    write_buf[6] = address + 1,
-    write_buf[7] = (value & 0x00FF0000) >> 16,
-    write_buf[8] = address + 2,
-    write_buf[9] = (value & 0x0000FF00) >> 8,
-    write_buf[10] = address + 3,
-    write_buf[11] = (value & 0x000000FF) >> 0,
+    queue(address, (value & 0xFF000000) >> 24);
+    queue(address + 1, (value & 0x00FF0000) >> 16);
+    queue(address + 2, (value & 0x0000FF00) >> 8);
+    queue(address + 3, (value & 0x000000FF) >> 0);
+
+    write();
+  }
+
+  virtual void beginFrame() override
+  {
+    if (frame_depth_++ == 0)
+    {
+      frame_loaded_ = false;
+    }
+  }
 
-    transfer();
+  virtual void endFrame() override
+  {
+    if (frame_depth_ == 0 || --frame_depth_ > 0)
+    {
+      return;
+    }
+
+    std::lock_guard<std::mutex> lock(mut_);
+    if (!pending_.empty() && frame_rate_ == 0)
+    {
+      flush();
+    }
+  }
+
+  virtual void setFrameFreshness(const std::uint32_t microseconds) override
+  {
+    std::lock_guard<std::mutex> lock(mut_);
+    freshness_ = std::chrono::microseconds(microseconds);
+  }
+
+  virtual std::uint64_t transferCount() const override
+  {
+    return transfers_;
+  }
+
+  virtual kipr::core::TransferStats transferStats() const override
+  {
+    std::lock_guard<std::mutex> lock(stats_mut_);
+    kipr::core::TransferStats stats = stats_;
+    stats.transfers = transfers_;
+    return stats;
+  }
+
+  virtual void resetTransferStats() override
+  {
+    std::lock_guard<std::mutex> lock(stats_mut_);
+    stats_ = kipr::core::TransferStats();
+    latency_sum_us_ = 0.0;
+    latency_count_ = 0;
+  }
+
+  virtual bool setReadyLine(const std::string &chip, const std::uint32_t line) override
+  {
+    std::lock_guard<std::mutex> lock(mut_);
+    if (ready_fd_ >= 0)
+    {
+      close(ready_fd_);
+      ready_fd_ = -1;
+      awaiting_ready_ = false;
+    }
+    if (chip.empty())
+    {
+      return true;
+    }
+
+    const std::string path = chip.front() == '/' ? chip : "/dev/" + chip;
+    const int chip_fd = open(path.c_str(), O_RDONLY);
+    if (chip_fd < 0)
+    {
+      logger.error() << "Ready line " << path << ": " << strerror(errno);
+      return false;
+    }
+
+    // The co-processor raises the line once it re-armed its DMA for the next transfer
+    struct gpioevent_request request;
+    memset(&request, 0, sizeof request);
+    request.lineoffset = line;
+    request.handleflags = GPIOHANDLE_REQUEST_INPUT;
+    request.eventflags = GPIOEVENT_REQUEST_RISING_EDGE;
+    strncpy(request.consumer_label, "wombat-spi-ready", sizeof request.consumer_label - 1);
+    const int status = ioctl(chip_fd, GPIO_GET_LINEEVENT_IOCTL, &request);
+    close(chip_fd);
+    if (status < 0)
+    {
+      logger.error() << "Ready line " << path << ":" << line << ": " << strerror(errno);
+      return false;
+    }
+
+    ready_fd_ = request.fd;
+    return true;
+  }
+
+  virtual void setTransferGap(const std::uint32_t microseconds) override
+  {
+    std::lock_guard<std::mutex> lock(mut_);
+    transfer_gap_ = std::chrono::microseconds(microseconds);
+  }
+
+  virtual void setFrameRate(const std::uint32_t hz) override
+  {
+    {
+      std::lock_guard<std::mutex> lock(mut_);
+      if (hz == frame_rate_ && (hz == 0) == !exchange_thread_.joinable())
+      {
+        return;
+      }
+      stopping_ = true;
+    }
+    exchange_cv_.notify_all();
+    if (exchange_thread_.joinable())
+    {
+      exchange_thread_.join();
+    }
+
+    std::lock_guard<std::mutex> lock(mut_);
+    stopping_ = false;
+    frame_rate_ = hz;
+    frame_cv_.notify_all();
+    if (hz > 0)
+    {
+      exchange_thread_ = std::thread(&WombatDevice::exchange, this);
+    }
+  }
+
+  virtual bool waitForFrame(const std::uint32_t timeout_us) override
+  {
+    std::unique_lock<std::mutex> lock(mut_);
+    if (frame_rate_ == 0)
+    {
+      return true;
+    }
+
+    const std::uint64_t sequence = frame_sequence_;
+    return frame_cv_.wait_for(lock, std::chrono::microseconds(timeout_us), [this, sequence] {
+      return frame_sequence_ != sequence || frame_rate_ == 0;
+    });
   }
 
 private:
+  struct PendingWrite
+  {
+    std::uint8_t address;
+    std::uint8_t value;
+  };
+
+  // Address and value pairs after the header, the last byte is the 'S' trailer
+  static constexpr std::size_t MAX_WRITES_PER_TRANSFER = (REG_READABLE_COUNT - 5) / 2;
+
   void clear_buffers()
   {
     memset(write_buf, 0, REG_READABLE_COUNT);
     memset(read_buf, 0, REG_READABLE_COUNT);
   }
 
+  // Returns the registers a read of this thread sees. Inside a frame that is
+  // the copy taken at its first read, other threads keep transferring into
+  // image_ meanwhile, e.g. the sensor sampler. Outside of one it is image_,
+  // transferred unless it is fresh enough. At a fixed frame rate only the
+  // exchange thread transfers.
+  const std::uint8_t *refresh(std::unique_lock<std::mutex> &lock)
+  {
+    if (frame_depth_ > 0 && frame_loaded_)
+    {
+      return frame_image_;
+    }
+
+    if (frame_rate_ > 0)
+    {
+      frame_cv_.wait(lock, [this] { return image_valid_ || frame_rate_ == 0; });
+    }
+
+    const bool fresh = image_valid_ &&
+        (frame_rate_ > 0 || (frame_depth_ == 0 && freshness_.count() > 0 &&
+                             std::chrono::steady_clock::now() - image_time_ < freshness_));
+    if (!fresh)
+    {
+      flush();
+    }
+
+    if (frame_depth_ == 0)
+    {
+      return image_;
+    }
+    memcpy(frame_image_, image_, REG_READABLE_COUNT);
+    frame_loaded_ = image_valid_;
+    return frame_image_;
+  }
+
+  void write()
+  {
+    // Inside a frame the writes wait for the next transfer of the frame or its
+    // end, at a fixed frame rate for the next frame of the exchange thread
+    if (frame_depth_ == 0 && frame_rate_ == 0)
+    {
+      flush();
+    }
+  }
+
+  void queue(const std::uint8_t address, const std::uint8_t value)
+  {
+    // Reads of the frame see the write before it is sent, e.g. the other bits
+    // of a shared mode register written by the next read-modify-write
+    if (address < REG_READABLE_COUNT)
+    {
+      image_[address] = value;
+      if (frame_depth_ > 0 && frame_loaded_)
+      {
+        frame_image_[address] = value;
+      }
+    }
+
+    for (PendingWrite &write : pending_)
+    {
+      if (write.address == address)
+      {
+        write.value = value;
+        return;
+      }
+    }
+    pending_.push_back({address, value});
+  }
+
+  // Sends all pending writes and refreshes the register image, one transfer per
+  // MAX_WRITES_PER_TRANSFER writes but at least one.
+  void flush()
+  {
+    std::size_t sent = 0;
+    do
+    {
+      clear_buffers();
+      const std::size_t n = std::min(pending_.size() - sent, MAX_WRITES_PER_TRANSFER);
+      write_buf[3] = n;
+      for (std::size_t i = 0; i < n; ++i)
+      {
+        write_buf[4 + 2 * i] = pending_[sent + i].address;
+        write_buf[5 + 2 * i] = pending_[sent + i].value;
+      }
+      sent += n;
+
+      if (!transfer())
+      {
+        // The image stays as it was, the next read transfers again
+        image_valid_ = false;
+        continue;
+      }
+
+      memcpy(image_, read_buf, REG_READABLE_COUNT);
+      image_time_ = std::chrono::steady_clock::now();
+      image_valid_ = true;
+    } while (sent < pending_.size());
+
+    // The co-processor answers with the registers from before the writes of the transfer
+    for (const PendingWrite &write : pending_)
+    {
+      if (write.address < REG_READABLE_COUNT)
+      {
+        image_[write.address] = write.value;
+      }
+    }
+    pending_.clear();
+  }
+
   bool transfer()
   {
     ++count;
+    ++transfers_;
     write_buf[0] = 'J';
     write_buf[1] = WALLABY_SPI_VERSION;
     write_buf[2] = count;
@@ -152,18 +421,29 @@ private:
     xfer[0].len = REG_READABLE_COUNT;
     xfer[0].speed_hz = 16000000;
 
+    wait_until_ready();
+    const auto start = std::chrono::steady_clock::now();
     const int status = ioctl(spi_fd_, SPI_IOC_MESSAGE(1), xfer);
+    last_transfer_ = std::chrono::steady_clock::now();
+    awaiting_ready_ = true;
 
-    usleep(50); // FIXME: this  makes sure we don't outrun the co-processor until interrupts are in place for DMA
+    std::lock_guard<std::mutex> lock(stats_mut_);
+    const double latency_us = std::chrono::duration<double, std::micro>(last_transfer_ - start).count();
+    latency_sum_us_ += latency_us;
+    ++latency_count_;
+    stats_.meanLatencyUs = latency_sum_us_ / latency_count_;
+    stats_.maxLatencyUs = std::max(stats_.maxLatencyUs, latency_us);
 
     if (status < 0)
     {
+      ++stats_.errors;
       logger.error() << "SPI_IOC_MESSAGE: " << strerror(errno);
       return false;
     }
 
     if (read_buf[0] != static_cast<unsigned char>('J'))
     {
+      ++stats_.desyncs;
       logger.error() << "DMA de-synchronized";
       return false;
     }
@@ -171,13 +451,141 @@ private:
     return true;
   }
 
+  // Keeps the next transfer from outrunning the co-processor: waits for its
+  // ready line if one is configured, otherwise until the transfer gap passed
+  // since the last transfer. Unlike a sleep after every transfer this costs
+  // nothing when the transfers are further apart anyway.
+  void wait_until_ready()
+  {
+    if (!awaiting_ready_)
+    {
+      return;
+    }
+
+    if (ready_fd_ >= 0)
+    {
+      struct pollfd ready = {ready_fd_, POLLIN | POLLPRI, 0};
+      if (poll(&ready, 1, READY_TIMEOUT_MS) > 0)
+      {
+        struct gpioevent_data event;
+        if (read(ready_fd_, &event, sizeof event) < 0)
+        {
+          logger.error() << "Ready line: " << strerror(errno);
+        }
+      }
+      else
+      {
+        std::lock_guard<std::mutex> lock(stats_mut_);
+        ++stats_.readyTimeouts;
+      }
+      return;
+    }
+
+    const auto ready_at = last_transfer_ + transfer_gap_;
+    if (std::chrono::steady_clock::now() < ready_at)
+    {
+      std::this_thread::sleep_until(ready_at);
+    }
+  }
+
+  // Exchanges one frame per period while a frame rate is set, reads are served
+  // from the latest frame and writes wait for the next one.
+  void exchange()
+  {
+    const auto period = std::chrono::duration_cast<std::chrono::steady_clock::duration>(
+        std::chrono::seconds(1)) / frame_rate_;
+    auto deadline = std::chrono::steady_clock::now();
+
+    std::unique_lock<std::mutex> lock(mut_);
+    while (!stopping_)
+    {
+      flush();
+      ++frame_sequence_;
+      frame_cv_.notify_all();
+
+      deadline += period;
+      const auto now = std::chrono::steady_clock::now();
+      if (deadline < now)
+      {
+        // Skip the missed frames instead of bursting
+        const auto missed = (now - deadline) / period + 1;
+        {
+          std::lock_guard<std::mutex> stats_lock(stats_mut_);
+          stats_.overruns += missed;
+        }
+        deadline += missed * period;
+      }
+      exchange_cv_.wait_until(lock, deadline, [this] { return stopping_; });
+    }
+  }
+
+  void configure_from_environment()
+  {
+    // e.g. KIPR_SPI_READY_LINE=gpiochip0:24 KIPR_SPI_FRAME_RATE=1000, lines 17 and 23 are BOOT0 and
+    // RST of the co-processor, see wallaby_init_gpio
+    if (const char *ready_line = getenv("KIPR_SPI_READY_LINE"))
+    {
+      const std::string value(ready_line);
+      const std::size_t colon = value.rfind(':');
+      if (colon == std::string::npos)
+      {
+        logger.error() << "KIPR_SPI_READY_LINE must be chip:line, got " << value;
+      }
+      else
+      {
+        setReadyLine(value.substr(0, colon), std::atoi(value.c_str() + colon + 1));
+      }
+    }
+    if (const char *frame_rate = getenv("KIPR_SPI_FRAME_RATE"))
+    {
+      setFrameRate(std::atoi(frame_rate));
+    }
+  }
+
   int spi_fd_;
   std::mutex mut_;
   std::uint8_t count;
   std::uint8_t *write_buf;
   std::uint8_t *read_buf;
+
+  // Registers of the last successful transfer with the pending writes applied
+  std::uint8_t *image_;
+  bool image_valid_;
+  std::chrono::steady_clock::time_point image_time_;
+  std::chrono::microseconds freshness_;
+  std::vector<PendingWrite> pending_;
+  std::atomic<std::uint64_t> transfers_;
+
+  // Pacing, see wait_until_ready()
+  int ready_fd_;
+  bool awaiting_ready_;
+  std::chrono::microseconds transfer_gap_;
+  std::chrono::steady_clock::time_point last_transfer_;
+
+  // Exchange thread of a fixed frame rate, 0 transfers on demand
+  std::uint32_t frame_rate_;
+  std::uint64_t frame_sequence_;
+  bool stopping_;
+  std::thread exchange_thread_;
+  std::condition_variable frame_cv_;
+  std::condition_variable exchange_cv_;
+
+  mutable std::mutex stats_mut_;
+  kipr::core::TransferStats stats_;
+  double latency_sum_us_ = 0.0;
+  std::uint64_t latency_count_ = 0;
+
+  // Frame of the calling thread, its registers are copied from image_ at the
+  // first read and stay the same until the frame ends
+  static thread_local unsigned frame_depth_;
+  static thread_local bool frame_loaded_;
+  static thread_local std::uint8_t frame_image_[REG_READABLE_COUNT];
 };
 
+thread_local unsigned WombatDevice::frame_depth_ = 0;
+thread_local bool WombatDevice::frame_loaded_ = false;
+thread_local std::uint8_t WombatDevice::frame_image_[REG_READABLE_COUNT];
+
 struct WombatDeviceDescriptor
 {
   typedef WombatDevice DeviceType;
@@ -186,6 +594,25 @@ struct WombatDeviceDescriptor
   {
     return access(SPI_FILE_SYSTEM, F_OK) == 0;
   }
+
+  // Shares the bus through kipr_iod while it runs, see kipr/core/shared_frame.hpp.
+  // KIPR_DIRECT_SPI=1 opens the bus anyway.
+  static kipr::core::Device *create()
+  {
+    if (!getenv("KIPR_DIRECT_SPI"))
+    {
+      if (kipr::core::Device *const shared = kipr::core::attachSharedFrameDevice(createDirect))
+      {
+        return shared;
+      }
+    }
+    return createDirect();
+  }
+
+  static kipr::core::Device *createDirect()
+  {
+    return new DeviceType();
+  }
 };
 
-KIPR_CORE_PLATFORM_DEVICE_REGISTER(WombatDeviceDescriptor);
+KIPR_CORE_PLATFORM_DEVICE_REGISTER_FACTORY(WombatDeviceDescriptor);
@@ -4,7 +4,7 @@
 
 #include "kipr/log/log.hpp"
 
-#include "device.hpp"
+#include "kipr/core/device.hpp"
 
 #include <csignal>
 #include <cstring>
@@ -60,6 +60,13 @@ Platform *Platform::instance()
   return instance_.get();
 }
 
+void Platform::setDevice(Device *const device)
+{
+  // Makes sure device_ holds the compiled in device before it is replaced
+  instance();
+  DEVICE = device != nullptr ? device : device_;
+}
+
 unsigned char Platform::readRegister8b(unsigned char address)
 {
   if (address >= REG_ALL_COUNT)
@@ -145,6 +152,66 @@ float Platform::readRegisterFloat(const unsigned char address)
 }
 
 
+void Platform::beginFrame()
+{
+  DEVICE->beginFrame();
+}
+
+void Platform::endFrame()
+{
+  DEVICE->endFrame();
+}
+
+void Platform::setFrameFreshness(const std::uint32_t microseconds)
+{
+  DEVICE->setFrameFreshness(microseconds);
+}
+
+std::uint64_t Platform::transferCount() const
+{
+  return DEVICE->transferCount();
+}
+
+TransferStats Platform::transferStats() const
+{
+  return DEVICE->transferStats();
+}
+
+void Platform::resetTransferStats()
+{
+  DEVICE->resetTransferStats();
+}
+
+bool Platform::setReadyLine(const std::string &chip, const std::uint32_t line)
+{
+  return DEVICE->setReadyLine(chip, line);
+}
+
+void Platform::setTransferGap(const std::uint32_t microseconds)
+{
+  DEVICE->setTransferGap(microseconds);
+}
+
+void Platform::setFrameRate(const std::uint32_t hz)
+{
+  DEVICE->setFrameRate(hz);
+}
+
+bool Platform::waitForFrame(const std::uint32_t timeoutMicroseconds)
+{
+  return DEVICE->waitForFrame(timeoutMicroseconds);
+}
+
+RegisterFrame::RegisterFrame()
+{
+  Platform::instance()->beginFrame();
+}
+
+RegisterFrame::~RegisterFrame()
+{
+  Platform::instance()->endFrame();
+}
+
 void Platform::submit_(const Command *const buffer, const std::size_t size)
 {
   DEVICE->submit(buffer, size);
@@ -0,0 +1,58 @@
+#include <stdio.h>
+#include <stdlib.h>
+
+#include "kipr/analog/analog.h"
+#include "kipr/core/core.h"
+#include "kipr/gyro/gyro.h"
+#include "kipr/motor/motor.h"
+#include "kipr/time/time.h"
+
+// The reads of one control tick: gyro x/y/z, four motor counters and two analog ports
+static void tick()
+{
+  int port;
+
+  gyro_x();
+  gyro_y();
+  gyro_z();
+  for (port = 0; port < 4; ++port)
+    gmpc(port);
+  analog(0);
+  analog(1);
+}
+
+static void measure(const char *name, int frames, unsigned int freshness, double duration)
+{
+  unsigned long long transfers;
+  unsigned long ticks = 0;
+  double start;
+
+  set_register_frame_freshness(freshness);
+  transfers = register_transfer_count();
+  start = seconds();
+  while (seconds() - start < duration)
+  {
+    if (frames)
+      begin_register_frame();
+    tick();
+    if (frames)
+      end_register_frame();
+    ++ticks;
+  }
+
+  printf("%-22s %10.2f transfers/tick %10.0f ticks/s\n", name,
+         (double)(register_transfer_count() - transfers) / ticks, ticks / duration);
+  set_register_frame_freshness(0);
+}
+
+int main(int argc, char **argv)
+{
+  const double duration = argc > 1 ? atof(argv[1]) : 2.0;
+
+  printf("reading 9 registers per tick for %.1f s per variant...\n", duration);
+  measure("transfer per read", 0, 0, duration);
+  measure("frame per tick", 1, 0, duration);
+  measure("1 ms freshness", 0, 1000, duration);
+
+  return 0;
+}
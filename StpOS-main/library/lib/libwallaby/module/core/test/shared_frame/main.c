@@ -0,0 +1,80 @@
+#include <signal.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <sys/wait.h>
+#include <unistd.h>
+
+#include "kipr/analog/analog.h"
+#include "kipr/core/core.h"
+#include "kipr/digital/digital.h"
+#include "kipr/gyro/gyro.h"
+#include "kipr/motor/motor.h"
+#include "kipr/time/time.h"
+
+// Polls all analog and digital ports like a sensor dashboard
+static void dashboard()
+{
+  int port;
+
+  for (;;)
+  {
+    for (port = 0; port < 6; ++port)
+      analog(port);
+    for (port = 0; port < 10; ++port)
+      digital(port);
+  }
+}
+
+// Runs a control tick at 100 Hz next to the given number of dashboard processes
+// and reports how long its reads take. Run it once with and once without
+// kipr_iod: without it every process transfers on the bus by itself. The
+// transfers counted with kipr_iod are those of the daemon.
+int main(int argc, char **argv)
+{
+  const int dashboards = argc > 1 ? atoi(argv[1]) : 2;
+  const double duration = argc > 2 ? atof(argv[2]) : 2.0;
+  pid_t children[16];
+  unsigned long ticks = 0;
+  unsigned long long transfers;
+  double start, worst = 0.0, sum = 0.0;
+  int i, port;
+
+  for (i = 0; i < dashboards && i < 16; ++i)
+  {
+    children[i] = fork();
+    if (children[i] == 0)
+      dashboard();
+  }
+
+  transfers = register_transfer_count();
+  start = seconds();
+  while (seconds() - start < duration)
+  {
+    const double tick = seconds();
+    double elapsed;
+
+    begin_register_frame();
+    gyro_z();
+    for (port = 0; port < 4; ++port)
+      gmpc(port);
+    motor(0, 0);
+    end_register_frame();
+
+    elapsed = seconds() - tick;
+    sum += elapsed;
+    if (elapsed > worst)
+      worst = elapsed;
+    ++ticks;
+    msleep(10);
+  }
+
+  for (i = 0; i < dashboards && i < 16; ++i)
+  {
+    kill(children[i], SIGKILL);
+    waitpid(children[i], NULL, 0);
+  }
+
+  printf("%d dashboards: tick mean %.3f ms, worst %.3f ms, %.0f bus transfers/s\n", dashboards,
+         sum / ticks * 1000.0, worst * 1000.0, (register_transfer_count() - transfers) / duration);
+  return 0;
+}
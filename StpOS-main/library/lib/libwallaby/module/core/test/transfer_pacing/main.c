@@ -0,0 +1,67 @@
+#include <math.h>
+#include <stdio.h>
+#include <stdlib.h>
+
+#include "kipr/core/core.h"
+#include "kipr/gyro/gyro.h"
+#include "kipr/motor/motor.h"
+#include "kipr/time/time.h"
+
+// A control tick: read the gyro and the motor counters, command two motors
+static void tick()
+{
+  int port;
+
+  begin_register_frame();
+  gyro_z();
+  for (port = 0; port < 4; ++port)
+    gmpc(port);
+  motor(0, 0);
+  motor(3, 0);
+  end_register_frame();
+}
+
+// Runs the tick for duration seconds, paced by the register frames at hz or as fast as possible with 0
+static void measure(const char *name, unsigned int hz, double duration)
+{
+  register_transfer_stats stats;
+  unsigned long ticks = 0;
+  double start, last, period, sum = 0.0, sum_squares = 0.0;
+
+  set_register_frame_rate(hz);
+  reset_register_transfer_stats();
+  start = last = seconds();
+  while (last - start < duration)
+  {
+    double now;
+
+    wait_for_register_frame(100);
+    tick();
+    now = seconds();
+    period = now - last;
+    last = now;
+    sum += period;
+    sum_squares += period * period;
+    ++ticks;
+  }
+  set_register_frame_rate(0);
+
+  stats = get_register_transfer_stats();
+  printf("%-14s %9.0f %12.3f %10.1f %10.1f %7llu %7llu %9llu\n", name, ticks / duration,
+         sqrt(sum_squares / ticks - (sum / ticks) * (sum / ticks)) * 1000.0, stats.mean_latency_us,
+         stats.max_latency_us, stats.errors, stats.desyncs, stats.overruns);
+}
+
+int main(int argc, char **argv)
+{
+  const double duration = argc > 1 ? atof(argv[1]) : 2.0;
+
+  printf("%-14s %9s %12s %10s %10s %7s %7s %9s\n", "rate", "ticks/s", "jitter ms", "mean us", "max us",
+         "errors", "desyncs", "overruns");
+  measure("on demand", 0, duration);
+  measure("200 Hz", 200, duration);
+  measure("500 Hz", 500, duration);
+  measure("1000 Hz", 1000, duration);
+
+  return 0;
+}
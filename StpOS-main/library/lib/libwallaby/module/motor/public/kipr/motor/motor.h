@@ -66,6 +66,20 @@ int move_at_velocity(int motor, int velocity);
  */
 int mav(int motor, int velocity);
 
+/*!
+ * \brief Set the goal velocities of several motors at once, in ticks per second.
+ * \detailed Same as calling move_at_velocity for every motor, but the motor modes are read and
+ *   written once for all of them and all goals are sent in one transfer. Use it to command all wheels
+ *   of a drive in the same control cycle.
+ * \param[in] motors The motor ports.
+ * \param[in] velocities The goal velocity of each motor in -1500 to 1500 ticks / second
+ * \param[in] count Number of motors in motors and velocities.
+ * \return 0 on success, -1 if a port is invalid, then no motor is changed
+ * \ingroup motor
+ * \see move_at_velocity
+ */
+int move_at_velocities(const int * motors, const int * velocities, int count);
+
 
 /*!
  * \brief Set a goal position (in ticks) for the motor to move to.
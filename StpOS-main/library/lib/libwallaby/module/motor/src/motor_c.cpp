@@ -46,6 +46,12 @@ int mav(int motor, int velocity)
   return move_at_velocity(motor, velocity);
 }
 
+int move_at_velocities(const int * motors, const int * velocities, int count)
+{
+  if (count < 0) return -1;
+  return set_motor_goal_velocities(motors, velocities, static_cast<unsigned int>(count)) ? 0 : -1;
+}
+
 int move_to_position(int motor, int speed, int goal_pos)
 {
   // FIXME: handle velocity scaling?
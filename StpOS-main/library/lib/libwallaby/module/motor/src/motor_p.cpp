@@ -206,6 +206,42 @@ bool kipr::motor::set_motor_goal_velocity(unsigned int port, int goal_velocity)
   return true;
 }
 
+bool kipr::motor::set_motor_goal_velocities(const int * ports, const int * goal_velocities, unsigned int count)
+{
+  for (unsigned int i = 0; i < count; ++i)
+  {
+    if (ports[i] < 0 || static_cast<unsigned int>(ports[i]) >= NUM_MOTORS) return false;
+  }
+
+  std::lock_guard<std::mutex> lock(cleanup_mutex);
+  // all writes go out in one transfer, the wheels change speed at the same time
+  kipr::core::RegisterFrame frame;
+
+  // one read of the shared mode register, written back only if a motor was not in speed mode yet
+  const unsigned char old_modes = Platform::instance()->readRegister8b(REG_RW_MOT_MODES);
+  unsigned char modes = old_modes;
+  for (unsigned int i = 0; i < count; ++i)
+  {
+    const unsigned short offset = 2 * fix_port(ports[i]);
+    modes &= ~(0x3 << offset);
+    modes |= (static_cast<int>(ControlMode::Speed) << offset);
+  }
+  if (modes != old_modes) Platform::instance()->writeRegister8b(REG_RW_MOT_MODES, modes);
+
+  for (unsigned int i = 0; i < count; ++i)
+  {
+    int goal_velocity = goal_velocities[i];
+    if (goal_velocity > 1500) goal_velocity = 1500;
+    if (goal_velocity < -1500) goal_velocity = -1500;
+
+    Platform::instance()->writeRegister16b(REG_RW_MOT_0_SP_H + 2 * fix_port(ports[i]),
+                                           static_cast<signed short>(goal_velocity));
+    goal_vel_array[ports[i]] = goal_velocity;
+  }
+
+  return true;
+}
+
 int kipr::motor::get_motor_goal_position(unsigned int port)
 {
   if (port >= NUM_MOTORS) return 0; // TODO
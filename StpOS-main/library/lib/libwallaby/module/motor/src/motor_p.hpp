@@ -45,6 +45,9 @@ namespace kipr
 
     bool set_motor_goal_velocity(unsigned int port, int goal_velocity);
 
+    // puts all given motors into speed mode with a single read and write of the mode register
+    bool set_motor_goal_velocities(const int * ports, const int * goal_velocities, unsigned int count);
+
     int get_motor_goal_position(unsigned int port);
 
     bool set_motor_goal_position(unsigned int port, int goal_position);
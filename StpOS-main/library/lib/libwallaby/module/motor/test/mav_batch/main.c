@@ -0,0 +1,50 @@
+#include <stdio.h>
+#include <stdlib.h>
+
+#include "kipr/core/core.h"
+#include "kipr/motor/motor.h"
+#include "kipr/time/time.h"
+
+static const int ports[4] = {0, 1, 2, 3};
+
+static void measure(const char *name, int batched, double duration)
+{
+  int velocities[4];
+  unsigned long long transfers = register_transfer_count();
+  unsigned long ticks = 0;
+  double start = seconds();
+  int i;
+
+  while (seconds() - start < duration)
+  {
+    // alternate the goals so every tick really writes
+    for (i = 0; i < 4; ++i)
+      velocities[i] = (ticks % 2 ? 100 : -100) * (i + 1);
+
+    if (batched)
+    {
+      move_at_velocities(ports, velocities, 4);
+    }
+    else
+    {
+      for (i = 0; i < 4; ++i)
+        mav(ports[i], velocities[i]);
+    }
+    ++ticks;
+  }
+
+  printf("%-20s %8.2f transfers/tick %8.0f ticks/s\n", name,
+         (double)(register_transfer_count() - transfers) / ticks, ticks / duration);
+}
+
+int main(int argc, char **argv)
+{
+  const double duration = argc > 1 ? atof(argv[1]) : 2.0;
+
+  printf("setting four wheel velocities per tick for %.1f s per variant, wheels spin!\n", duration);
+  measure("mav per motor", 0, duration);
+  measure("move_at_velocities", 1, duration);
+  ao();
+
+  return 0;
+}
@@ -10,6 +10,7 @@
 #include "../devices/omni_wheeled/include/libstp/device/omni_wheeled/omni_wheeled_device.h"
 #include "../devices/omni_wheeled/include/libstp/device/omni_wheeled/datatype/bindings.h"
 #include "libstp/_config.h"
+#include "libstp/ahrs/bindings.h"
 #include "libstp/async/bindings.h"
 #include "libstp/datatype/bindings.h"
 #include "libstp/device/bindings.h"
@@ -20,6 +21,8 @@
 #include "libstp/thread/bindings.h"
 #include "libstp/sensor/bindings.h"
 #include "libstp/servo/bindings.h"
+#include "libstp/sim/bindings.h"
+#include "libstp/trace/bindings.h"
 #include "libstp/utility/bindings.h"
 
 #include <filesystem>
@@ -128,6 +131,10 @@ PYBIND11_MODULE(libstp, m)
     py::module_ logModule = m.def_submodule("logging");
     py::module_ motorModule = m.def_submodule("motor");
     py::module_ asynchronousModule = m.def_submodule("asynchronous");
+    py::module_ traceModule = m.def_submodule("trace");
+    py::module_ simModule = m.def_submodule("sim");
+    py::module_ ahrsModule = m.def_submodule("ahrs");
+    py::module_ motionModule = m.def_submodule("motion");
 
     m.def("initialize_timer", &initialize_timer, "Initialize the timer for elapsed time logging");
 
@@ -137,6 +144,8 @@ PYBIND11_MODULE(libstp, m)
     libstp::datatype::createConditionsBindings(datatypes);
     libstp::datatype::createFunctionsBindings(datatypes);
     libstp::datatype::createSpeedBindings(datatypes);
+    libstp::ahrs::createAttitudeBindings(ahrsModule);
+    libstp::motion::createOdometryBindings(motionModule);
 
     libstp::device::createDeviceBindings(deviceModule);
     libstp::device::two_wheeled::createTwoWheeledBindings(twoWheeledModule);
@@ -147,13 +156,21 @@ PYBIND11_MODULE(libstp, m)
     libstp::math::createMathBindings(mathModule);
     libstp::motor::createMotorBindings(motorModule);
     libstp::motor::createServoLikeMotorBindings(motorModule);
+    libstp::motor::createVelocityEstimatorBindings(motorModule);
     libstp::threads::createManagedThreadBindings(threadModule);
     libstp::threads::createIntervalBindings(schedulerModule);
     libstp::sensor::createSensorBindings(sensorModule);
     libstp::sensor::createImuSensorBindings(sensorModule);
+    libstp::sensor::createSnapshotBindings(sensorModule);
+    libstp::sensor::createSamplerBindings(sensorModule);
     libstp::servo::createServoBindings(servoModule);
+    // One batch covers motors and servos alike
+    servoModule.attr("WriteBatch") = motorModule.attr("WriteBatch");
     libstp::utility::createPidBindings(m);
+    libstp::utility::createSplineBindings(m);
     libstp::utility::createLoggingBindings(logModule);
+    libstp::trace::createTraceBindings(traceModule);
+    libstp::sim::createSimBindings(simModule);
 
 #ifdef BUILD_CREATE3
     libstp::device::create3::createCreate3Bindings(create3Module);
@@ -0,0 +1,59 @@
+#ifndef _KIPR_CORE_DEVICE_HPP_
+#define _KIPR_CORE_DEVICE_HPP_
+
+#include <cstdint>
+#include <string>
+
+namespace kipr
+{
+  namespace core
+  {
+    struct Command;
+
+    struct TransferStats
+    {
+      std::uint64_t transfers = 0;
+      std::uint64_t errors = 0; // failed transfers
+      std::uint64_t desyncs = 0; // answers without the start byte, the co-processor was not ready
+      std::uint64_t readyTimeouts = 0; // transfers started without the ready line
+      std::uint64_t overruns = 0; // frames of a fixed frame rate started late
+      double meanLatencyUs = 0.0;
+      double maxLatencyUs = 0.0;
+    };
+
+    class Device
+    {
+    public:
+      virtual ~Device();
+
+      virtual const std::string &getName() const = 0;
+      
+      virtual std::uint8_t r8(const std::uint8_t address) = 0;
+      virtual std::uint16_t r16(const std::uint8_t address) = 0;
+      virtual std::uint32_t r32(const std::uint8_t address) = 0;
+
+      virtual void w8(const std::uint8_t address, const std::uint8_t value) = 0;
+      virtual void w16(const std::uint8_t address, const std::uint16_t value) = 0;
+      virtual void w32(const std::uint8_t address, const std::uint32_t value) = 0;
+
+      virtual void submit(const Command *const buffer, const std::size_t size);
+
+      // Register frames, see begin_register_frame() in kipr/core/core.h.
+      // Devices without a register image ignore them and always count 0 transfers.
+      virtual void beginFrame();
+      virtual void endFrame();
+      virtual void setFrameFreshness(const std::uint32_t microseconds);
+      virtual std::uint64_t transferCount() const;
+
+      // Transport, see set_register_frame_rate() in kipr/core/core.h.
+      virtual TransferStats transferStats() const;
+      virtual void resetTransferStats();
+      virtual bool setReadyLine(const std::string &chip, const std::uint32_t line);
+      virtual void setTransferGap(const std::uint32_t microseconds);
+      virtual void setFrameRate(const std::uint32_t hz);
+      virtual bool waitForFrame(const std::uint32_t timeoutMicroseconds);
+    };
+  }
+}
+
+#endif
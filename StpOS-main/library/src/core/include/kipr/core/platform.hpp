@@ -0,0 +1,156 @@
+#ifndef _KIPR_CORE_PLATFORM_HPP_
+#define _KIPR_CORE_PLATFORM_HPP_
+
+#include <mutex>
+#include <vector>
+#include <iostream>
+#include <memory>
+#include <cstdint>
+
+#include "command.hpp"
+#include "device.hpp"
+
+namespace kipr
+{
+  namespace core
+  {
+    class Device;
+
+    // See comment for KIPR_CORE_PLATFORM_DEVICE_REGISTER for information
+    // on why this exists.
+    extern kipr::core::Device *DEVICE;
+
+    class Platform
+    {
+    public:
+      ~Platform();
+
+      static Platform *instance();
+
+      unsigned char readRegister8b(unsigned char address);
+      void writeRegister8b(unsigned char address, unsigned char value);
+
+      unsigned short readRegister16b(unsigned char address);
+      void writeRegister16b(unsigned char address, unsigned short value);
+
+      unsigned int readRegister32b(unsigned char address);
+      void writeRegister32b(unsigned char address, unsigned int value);
+
+      float readRegisterFloat(unsigned char address);
+
+      void beginFrame();
+      void endFrame();
+      void setFrameFreshness(std::uint32_t microseconds);
+      std::uint64_t transferCount() const;
+
+      TransferStats transferStats() const;
+      void resetTransferStats();
+      bool setReadyLine(const std::string &chip, std::uint32_t line);
+      void setTransferGap(std::uint32_t microseconds);
+      void setFrameRate(std::uint32_t hz);
+      bool waitForFrame(std::uint32_t timeoutMicroseconds);
+
+      // Routes all register access through the given device instead of the one
+      // compiled into the library, e.g. a simulation. nullptr restores the
+      // compiled in device. The caller keeps ownership of the device.
+      // Must not be called while other threads access registers.
+      static void setDevice(Device *device);
+      
+      template <typename... Args>
+      void submit(Args &&...args)
+      {
+        std::vector<Command> commands;
+        commands.reserve(submitSize(args...));
+        buildSubmit(commands, args...);
+        submit_(commands.data(), commands.size());
+      }
+
+    private:
+      Platform();
+
+      void submit_(const Command *const buffer, const std::size_t size);
+
+      template <typename... Args>
+      void buildSubmit(std::vector<Command> &commands, Command &&first, Args &&...args)
+      {
+        commands.emplace_back(first);
+        buildSubmit(commands, args...);
+      }
+
+      template <typename T, typename... Args>
+      void buildSubmit(std::vector<Command> &commands, T &&first, Args &&...args)
+      {
+        commands.insert(commands.end(), first.cbegin(), first.cend());
+        buildSubmit(commands, args...);
+      }
+
+      void buildSubmit(std::vector<Command> &commands, Command &&first)
+      {
+        commands.emplace_back(first);
+      }
+
+      template <typename T>
+      void buildSubmit(std::vector<Command> &commands, T &&first)
+      {
+        commands.insert(commands.end(), first.cbegin(), first.cend());
+      }
+
+      template <typename... Args>
+      size_t submitSize(const Command &first, const Args &...args)
+      {
+        return 1 + submitSize(args...);
+      }
+
+      size_t submitSize(const Command &first)
+      {
+        return 1;
+      }
+
+      template <typename T, typename... Args>
+      size_t submitSize(const T &first, const Args &...args)
+      {
+        return submitSize(first.size());
+      }
+
+      template <typename T>
+      size_t submitSize(const T &first)
+      {
+        return first.size();
+      }
+
+      static std::mutex instance_mut_;
+      static std::unique_ptr<Platform> instance_;
+      static kipr::core::Device *device_; // to stop DEVICE's deconstructor from being called until Platform's deconstructor is called
+    };
+
+    // Serves all register reads of the current thread from one transfer while
+    // it is alive and sends the writes in the same transfer, see
+    // begin_register_frame() in kipr/core/core.h.
+    class RegisterFrame
+    {
+    public:
+      RegisterFrame();
+      ~RegisterFrame();
+
+      RegisterFrame(const RegisterFrame &) = delete;
+      RegisterFrame &operator=(const RegisterFrame &) = delete;
+    };
+  }
+}
+
+// Typically we would create __attribute__((constructor))s
+// and register each available Device with the Platform. There's
+// a bug in emscripten's WASM dynamic linking, though, where
+// __attribute__((constructor))s run before global data initialization,
+// causing all sorts of bizarre bugs. Instead we'll set a global to
+// the appropriate Device, since we know we'll only have one compiled
+// into the executable for now. Sigh.
+#define KIPR_CORE_PLATFORM_DEVICE_REGISTER(descriptor) \
+  kipr::core::Device *kipr::core::DEVICE(new descriptor::DeviceType());
+
+// Like KIPR_CORE_PLATFORM_DEVICE_REGISTER, for descriptors that pick the
+// device at runtime with a static create().
+#define KIPR_CORE_PLATFORM_DEVICE_REGISTER_FACTORY(descriptor) \
+  kipr::core::Device *kipr::core::DEVICE(descriptor::create());
+
+#endif
@@ -4,7 +4,7 @@
 
 #pragma once
 #include <atomic>
-#include <thread>
+#include <cstdint>
 
 #include "attitude_task.h"
 #include "../datatype/axis.h"
@@ -19,11 +19,36 @@ namespace libstp::ahrs
         void setQuaternion(float w, float x, float y, float z);
 
         explicit AttitudeEstimator(datatype::Axis axis);
-        
+
+        /**
+         * The smoothed fused heading while the estimator runs, otherwise the last heading passed to setQuaternion.
+         */
         [[nodiscard]] float getCurrentHeading() const;
 
         [[nodiscard]] float getGyroReading(const sensor::IMU& imu) const;
 
+        /**
+         * The latest estimate, a sequence of 0 means there is none yet. Never blocks.
+         */
+        [[nodiscard]] Attitude getAttitude() const;
+
+        [[nodiscard]] bool isEstimating() const;
+
+        void setConfig(const AttitudeEstimatorConfig& config);
+
+        [[nodiscard]] const AttitudeEstimatorConfig& getConfig() const;
+
+        [[nodiscard]] std::uint64_t getOverruns() const;
+
+        void calibrate();
+
+        void resetHeading(double angle = 0.0);
+
+        [[nodiscard]] Eigen::MatrixX4d replay(const Eigen::MatrixX3d& gyro,
+                                              const Eigen::MatrixX3d& accel,
+                                              const Eigen::MatrixX3d& mag,
+                                              double dt) const;
+
         void startEstimation();
 
         void stopEstimation();
@@ -31,7 +56,6 @@ namespace libstp::ahrs
         datatype::Axis orientation;
         AttitudeEstimatorTask task;
 
-        std::thread estimationThread;
-        Eigen::Quaternion<float> quaternion;
+        std::atomic<float> externalHeading{0.0f};
     };
 }
@@ -4,28 +4,143 @@
 
 #pragma once
 #include <atomic>
+#include <cstdint>
+#include <thread>
+
+#include <vector>
+
 #include "ekf.h"
+#include "madgwick.h"
+#include "libstp/datatype/axis.h"
+#include "libstp/thread/seqlock.h"
 
 namespace libstp::ahrs
 {
+    /**
+     * One estimate published by the attitude estimator.
+     */
+    struct Attitude
+    {
+        // Relative to the attitude at the start or the last resetHeading
+        double w = 1.0, x = 0.0, y = 0.0, z = 0.0;
+        double roll = 0.0, pitch = 0.0, yaw = 0.0; // absolute, rad
+        // Unwrapped rotation around the heading axis since the estimator started, rad. Same sign as the gyro.
+        double heading = 0.0;
+        // Moving average of the heading over AttitudeEstimatorConfig::headingWindow estimates
+        double smoothedHeading = 0.0;
+        double timestamp = 0.0; // utility::Clock, s
+        std::uint64_t sequence = 0; // 0 until the first estimate after the calibration
+    };
+
+    enum class AttitudeFilter
+    {
+        Ekf,
+        Madgwick
+    };
+
+    struct AttitudeEstimatorConfig
+    {
+        AttitudeFilter filter = AttitudeFilter::Ekf;
+        int frequency = 100; // Hz
+        int calibrationSamples = 100; // taken at the frequency above while the robot stands still
+        int realtimePriority = 20; // SCHED_FIFO priority of the estimator thread, 0 keeps the default scheduler
+        bool useMagnetometer = false;
+        // Calibrated magnetometer reading = softIronMatrix * (raw - hardIronOffset), like sensor::MagnetoSensor
+        Eigen::Vector3d hardIronOffset = Eigen::Vector3d::Zero();
+        Eigen::Matrix3d softIronMatrix = Eigen::Matrix3d::Identity();
+        double gyroVariance = 0.3 * 0.3; // (rad/s)^2
+        double accelVariance = 0.5 * 0.5; // of the normalized accelerometer reading
+        double magVariance = 0.8 * 0.8; // of the normalized magnetometer reading
+        // The three variances above scale the ones measured during the calibration instead
+        bool measureVariances = false;
+        double madgwickGain = 0.1; // rad/s
+        int headingWindow = 1; // estimates averaged into the smoothed heading
+    };
+
+    /**
+     * Fuses gyroscope, accelerometer and optionally magnetometer readings with an EKF or a Madgwick filter at a
+     * fixed rate on its own real-time thread. The latest estimate is published through a sequence lock, reading
+     * it never blocks and never waits for the estimator thread.
+     */
     class AttitudeEstimatorTask
     {
     public:
-        std::atomic<bool> running{false};
+        explicit AttitudeEstimatorTask(datatype::Axis headingAxis);
 
-        void calibrateBiases();
-        void estimationLoop();
+        ~AttitudeEstimatorTask();
+
+        AttitudeEstimatorTask(const AttitudeEstimatorTask&) = delete;
+        AttitudeEstimatorTask& operator=(const AttitudeEstimatorTask&) = delete;
+
+        void setConfig(const AttitudeEstimatorConfig& config);
+
+        [[nodiscard]] const AttitudeEstimatorConfig& getConfig() const;
+
+        /**
+         * Calibrates the gyro bias, the noise and the initial attitude.
+         * Blocks for calibrationSamples / frequency seconds, the robot has to stand still.
+         */
+        void calibrate();
+
+        /**
+         * Starts the estimator thread, calibrating first unless calibrate() was called since the last start.
+         */
         void startEstimation();
+
         void stopEstimation();
-        
-    private:
-        Eigen::Vector3d gyroOffset = Eigen::Vector3d::Zero();
-        Eigen::Vector3d accelOffset = Eigen::Vector3d::Zero();
-        Eigen::Vector3d magnetoOffset = Eigen::Vector3d::Zero();
 
-        [[nodiscard]] Eigen::Vector3d applyMagnetoCalibration(const Eigen::Vector3d& mag) const;
-        [[nodiscard]] Eigen::MatrixXd applyMagnetoCalibrationMatrix(const Eigen::MatrixXd& magMatrix) const;
+        [[nodiscard]] bool isRunning() const;
+
+        [[nodiscard]] Attitude getAttitude() const;
+
+        [[nodiscard]] std::uint64_t getOverruns() const;
+
+        /**
+         * Makes the current attitude the reference of the published quaternion and sets the heading to angle.
+         * Applied by the estimator thread with its next estimate.
+         */
+        void resetHeading(double angle = 0.0);
+
+        /**
+         * Runs the configured filter over recorded samples, e.g. to tune it or to measure it. Independent of the
+         * estimator thread and its state, the first sample defines the initial attitude.
+         *
+         * @param gyro Bias corrected gyroscope samples in rad/s (N x 3).
+         * @param accel Accelerometer samples (N x 3).
+         * @param mag Calibrated magnetometer samples (N x 3), or no rows to fuse without the magnetometer.
+         * @param dt Time between two samples in seconds.
+         * @return The absolute attitude after every sample as (w, x, y, z) rows (N x 4).
+         */
+        [[nodiscard]] Eigen::MatrixX4d replay(const Eigen::MatrixX3d& gyro,
+                                              const Eigen::MatrixX3d& accel,
+                                              const Eigen::MatrixX3d& mag,
+                                              double dt) const;
+
+    private:
+        void estimationLoop();
+        void publish(const Eigen::Quaterniond& q, double heading, std::uint64_t sequence);
         void getSensorReadings(Eigen::Vector3d& gyro, Eigen::Vector3d& accel, Eigen::Vector3d& mag) const;
+        void applyRealtimePriority();
+
+        datatype::Axis headingAxis;
+        AttitudeEstimatorConfig config;
+        Eigen::Vector3d gyroOffset = Eigen::Vector3d::Zero();
         ExtendedKalmanFilter ekf;
+        MadgwickFilter madgwick;
+        Eigen::Quaterniond reference = Eigen::Quaterniond::Identity();
+        bool calibrated = false;
+
+        // Ring of the last headingWindow headings, only touched by the estimator thread
+        std::vector<double> headingHistory;
+        double headingSum = 0.0;
+        std::size_t headingCount = 0;
+
+        std::atomic<bool> resetRequested{false};
+        std::atomic<double> resetAngle{0.0};
+
+        threads::SeqLock<Attitude> attitude;
+        std::thread thread;
+        std::atomic<bool> running{false};
+        std::atomic<std::uint64_t> overruns{0};
     };
 }
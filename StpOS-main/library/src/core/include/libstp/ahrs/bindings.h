@@ -0,0 +1,135 @@
+//
+// Created by tobias on 10/18/26.
+//
+
+#pragma once
+
+#include <pybind11/pybind11.h>
+#include <pybind11/eigen.h>
+#include <string>
+
+#include "attitude.h"
+
+namespace py = pybind11;
+
+namespace libstp::ahrs
+{
+    inline void createAttitudeBindings(const py::module_& m)
+    {
+        py::enum_<AttitudeFilter>(m, "AttitudeFilter")
+            .value("Ekf", AttitudeFilter::Ekf)
+            .value("Madgwick", AttitudeFilter::Madgwick);
+
+        py::class_<Attitude>(m, "Attitude", R"pbdoc(
+            One estimate of the attitude estimator.
+        )pbdoc")
+            .def_readonly("w", &Attitude::w, "float: The quaternion is relative to the attitude at the last reset.")
+            .def_readonly("x", &Attitude::x)
+            .def_readonly("y", &Attitude::y)
+            .def_readonly("z", &Attitude::z)
+            .def_readonly("roll", &Attitude::roll, "float: Roll in rad.")
+            .def_readonly("pitch", &Attitude::pitch, "float: Pitch in rad.")
+            .def_readonly("yaw", &Attitude::yaw, "float: Yaw in rad, wrapped to [-pi, pi].")
+            .def_readonly("heading", &Attitude::heading, R"pbdoc(
+                float: Unwrapped rotation around the heading axis of the device since the estimator started, in rad.
+            )pbdoc")
+            .def_readonly("smoothed_heading", &Attitude::smoothedHeading, R"pbdoc(
+                float: Moving average of the heading over the heading_window of the config, in rad.
+            )pbdoc")
+            .def_readonly("timestamp", &Attitude::timestamp, "float: Monotonic time of the estimate in seconds.")
+            .def_readonly("sequence", &Attitude::sequence, R"pbdoc(
+                int: Number of the estimate, 0 if the estimator did not publish one yet.
+            )pbdoc")
+            .def("__repr__", [](const Attitude& self)
+            {
+                return "<Attitude roll=" + std::to_string(self.roll) + " pitch=" + std::to_string(self.pitch)
+                    + " yaw=" + std::to_string(self.yaw) + " heading=" + std::to_string(self.heading) + ">";
+            });
+
+        py::class_<AttitudeEstimatorConfig>(m, "AttitudeEstimatorConfig", R"pbdoc(
+            Settings of the attitude estimator, applied with AttitudeEstimator.set_config while it is stopped.
+        )pbdoc")
+            .def(py::init<>())
+            .def_readwrite("filter", &AttitudeEstimatorConfig::filter)
+            .def_readwrite("frequency", &AttitudeEstimatorConfig::frequency, "int: Estimates per second.")
+            .def_readwrite("calibration_samples", &AttitudeEstimatorConfig::calibrationSamples, R"pbdoc(
+                int: Samples taken at the frequency while the robot stands still before the estimator starts.
+            )pbdoc")
+            .def_readwrite("realtime_priority", &AttitudeEstimatorConfig::realtimePriority, R"pbdoc(
+                int: SCHED_FIFO priority of the estimator thread, 0 keeps the default scheduler.
+            )pbdoc")
+            .def_readwrite("use_magnetometer", &AttitudeEstimatorConfig::useMagnetometer, R"pbdoc(
+                bool: Correct the heading with the magnetometer. Requires the hard and soft iron calibration.
+            )pbdoc")
+            .def_readwrite("hard_iron_offset", &AttitudeEstimatorConfig::hardIronOffset, R"pbdoc(
+                numpy.ndarray: Subtracted from the raw magnetometer reading.
+            )pbdoc")
+            .def_readwrite("soft_iron_matrix", &AttitudeEstimatorConfig::softIronMatrix, R"pbdoc(
+                numpy.ndarray: 3x3 matrix applied after the hard iron offset.
+            )pbdoc")
+            .def_readwrite("gyro_variance", &AttitudeEstimatorConfig::gyroVariance)
+            .def_readwrite("accel_variance", &AttitudeEstimatorConfig::accelVariance)
+            .def_readwrite("mag_variance", &AttitudeEstimatorConfig::magVariance)
+            .def_readwrite("measure_variances", &AttitudeEstimatorConfig::measureVariances, R"pbdoc(
+                bool: Use the variances as factors for the ones measured during the calibration.
+            )pbdoc")
+            .def_readwrite("madgwick_gain", &AttitudeEstimatorConfig::madgwickGain)
+            .def_readwrite("heading_window", &AttitudeEstimatorConfig::headingWindow, R"pbdoc(
+                int: Number of estimates averaged into the smoothed heading.
+            )pbdoc");
+
+        py::class_<AttitudeEstimator>(m, "AttitudeEstimator", R"pbdoc(
+            Background EKF or Madgwick filter fusing the IMU into the attitude of the device, see
+            NativeDevice.attitude_estimator.
+
+            While it runs, set_speed_while corrects the heading with its estimate instead of integrating the gyro.
+
+            Example:
+                >>> device.attitude_estimator.start()
+                >>> device.attitude_estimator.get_attitude().heading
+        )pbdoc")
+            .def(py::init<datatype::Axis>(), py::arg("heading_axis") = datatype::Axis::Z, R"pbdoc(
+                Creates an estimator which is not attached to a device.
+
+                Args:
+                    heading_axis (Axis): The IMU axis the heading is measured around.
+            )pbdoc")
+            .def("calibrate", &AttitudeEstimator::calibrate, py::call_guard<py::gil_scoped_release>(), R"pbdoc(
+                Measures the gyro bias, the noise and the initial attitude ahead of start(). The robot has to
+                stand still.
+            )pbdoc")
+            .def("start", &AttitudeEstimator::startEstimation, py::call_guard<py::gil_scoped_release>(), R"pbdoc(
+                Starts the estimator thread. Calibrates first unless calibrate() was called since the last
+                start, then it blocks for the calibration and the robot has to stand still.
+            )pbdoc")
+            .def("stop", &AttitudeEstimator::stopEstimation, py::call_guard<py::gil_scoped_release>(),
+                 "Stop the estimator and join its thread")
+            .def("is_running", &AttitudeEstimator::isEstimating)
+            .def("get_attitude", &AttitudeEstimator::getAttitude, R"pbdoc(
+                Returns:
+                    Attitude: The latest estimate. Never blocks.
+            )pbdoc")
+            .def("get_current_heading", &AttitudeEstimator::getCurrentHeading)
+            .def("reset_heading", &AttitudeEstimator::resetHeading, py::arg("angle") = 0.0, R"pbdoc(
+                Makes the current attitude the reference of the quaternion and sets the heading to angle.
+            )pbdoc")
+            .def("replay", &AttitudeEstimator::replay, py::arg("gyro"), py::arg("accel"), py::arg("mag"),
+                 py::arg("dt"), py::call_guard<py::gil_scoped_release>(), R"pbdoc(
+                Runs the configured filter over recorded samples, independent of the estimator thread.
+
+                Args:
+                    gyro (numpy.ndarray): Bias corrected gyroscope samples in rad/s, N x 3.
+                    accel (numpy.ndarray): Accelerometer samples, N x 3.
+                    mag (numpy.ndarray): Calibrated magnetometer samples, N x 3 or 0 x 3 to leave it out.
+                    dt (float): Seconds between two samples.
+
+                Returns:
+                    numpy.ndarray: The attitude after every sample as (w, x, y, z) rows, N x 4.
+            )pbdoc")
+            .def("set_config", &AttitudeEstimator::setConfig, py::arg("config"))
+            .def("get_config", &AttitudeEstimator::getConfig)
+            .def_property_readonly("overruns", &AttitudeEstimator::getOverruns, R"pbdoc(
+                int: Number of periods skipped because the estimator fell behind.
+            )pbdoc");
+    }
+}
@@ -22,6 +22,9 @@
  *      q(t)  = q_hat(t) + K(t)*v(t)
  *      P(t)  = [I - K(t)*H] P_hat(t)
  *
+ *      Without a magnetometer the rotation around the gravity reference is removed from K(t)*v(t),
+ *      the accelerometer cannot observe the heading.
+ *
  * @note All rotations are handled as quaternions. The user must ensure the
  *       input data are consistent with the chosen reference frame (NED or ENU).
  */
@@ -51,18 +54,16 @@ namespace libstp::ahrs
         ~ExtendedKalmanFilter() = default;
 
         /**
-         * Computes the initial attitude (orientation) of a system using sensor data from 
-         * a gyroscope, accelerometer, and magnetometer, all provided in the NED (North-East-Down) reference frame.
+         * Computes the initial attitude (orientation) of a system from samples taken while it stands still.
+         * The attitude is the tilt measured by the accelerometer, the heading is the magnetic north if magnetometer
+         * samples are given and zero otherwise. The magnetic reference of the filter is taken from the same samples.
          *
-         * @param gyroSamples A matrix of size (N × 3), where each row represents a gyroscope 
-         *                    measurement in radians per second (rad/s). The columns correspond 
-         *                    to angular velocity components along the (x, y, z) axes in the NED frame.
-         * @param accelSamples A 3D vector representing the measured acceleration in meters per 
-         *                     second squared (m/s²) along the (x, y, z) axes in the NED frame. 
-         *                     This is typically used to determine the pitch and roll angles.
-         * @param magSamples A 3D vector representing the measured magnetic field strength in 
-         *                   nanoteslas (nT) along the (x, y, z) axes in the NED frame. 
-         *                   This is primarily used to determine the heading (yaw angle).
+         * @param gyroSamples A matrix of size (N × 3), where each row represents a bias corrected gyroscope
+         *                    measurement in radians per second (rad/s).
+         * @param accelSamples A matrix of size (N × 3) of accelerometer measurements in m/s². Only the direction
+         *                     is used.
+         * @param magSamples A matrix of size (N × 3) of calibrated magnetometer measurements, or an empty matrix
+         *                   to estimate the attitude from the gyroscope and accelerometer only.
          */
         void computeInitialAttitude(
             const Eigen::MatrixXd& gyroSamples,
@@ -73,9 +74,8 @@ namespace libstp::ahrs
         [[nodiscard]] Eigen::Matrix<double, 6, 6> computeMeasurementNoiseCovariance() const;
 
         /*
-         * Gyro Var in rad / s
-         * Accel Var in m / s^2
-         * Mag Var in nT
+         * Gyro Var in (rad / s)^2
+         * Accel Var and Mag Var of the normalized measurements
          */
         void setMeasurementNoiseCovariance(double gyroVariance, double accelVariance, double magVariance);
 
@@ -83,10 +83,13 @@ namespace libstp::ahrs
         /**
          * @brief Update method for the EKF using one sample of data.
          *
+         * Does not allocate, it is called from the real-time loop of the attitude estimator.
+         *
          * @param[in] q_prev  A-priori quaternion estimate (4D, normalized).
          * @param[in] gyr     Angular velocity in rad/s (3D).
-         * @param[in] acc     Accelerometer measurement in m/s^2 (3D).
-         * @param[in] mag     Magnetometer measurement (3D) - optional.
+         * @param[in] acc     Accelerometer measurement in m/s^2 (3D). A zero vector skips the correction.
+         * @param[in] mag     Magnetometer measurement (3D) - optional. A zero vector corrects with the
+         *                    accelerometer only.
          * @param[in] dt      Time step in seconds. If negative, it uses internal dt_.
          *
          * @return The a-posteriori (corrected) quaternion estimate (4D, normalized).
@@ -100,14 +103,33 @@ namespace libstp::ahrs
         /**
          * @brief Set the reference magnetometer vector by explicit 3D vector.
          *
-         * If you have a known 3D reference, pass it here.
-         * This snippet shows just the 3D vector setter.
+         * If you have a known 3D reference, pass it here. Otherwise computeInitialAttitude takes it from
+         * the calibration samples.
          * The reference can be found at: https://www.ngdc.noaa.gov/geomag/calculators/magcalc.shtml#igrfwmm
          *
          * @param[in] magneticReference  3D reference of Earth magnetic field in chosen frame.
          */
         void setMagReference(const Eigen::Vector3d& magneticReference);
 
+        /**
+         * @brief Measurement model of one reference vector: h(q) = C(q)^T * reference,
+         *        the reference as it is seen in the sensor frame.
+         * @param[in] q         Predicted quaternion state (4D).
+         * @param[in] reference Normalized reference vector in the earth frame.
+         * @return              Expected normalized measurement.
+         */
+        [[nodiscard]] static Eigen::Vector3d h(const Eigen::Quaterniond& q,
+                                               const Eigen::Vector3d& reference);
+
+        /**
+         * @brief Jacobian of h w.r.t q, i.e. dh/dq.
+         * @param[in] q         Predicted quaternion state (4D).
+         * @param[in] reference Normalized reference vector in the earth frame.
+         * @return              Jacobian matrix (3x4).
+         */
+        [[nodiscard]] static Eigen::Matrix<double, 3, 4> dhdq(const Eigen::Quaterniond& q,
+                                                              const Eigen::Vector3d& reference);
+
     private:
         /**
          * @brief Internal method: Omega operator for a 3D vector x.
@@ -139,32 +161,23 @@ namespace libstp::ahrs
                                                   double dt);
 
         /**
-         * @brief Measurement model: h(q) => either 3D or 6D, depending on whether using acc or acc+mag.
-         * @param[in] q     Predicted quaternion state (4D).
-         * @param[in] z     Current measurement vector: either 3D (acc) or 6D (acc+mag).
-         * @return          Expected measurement from the predicted state.
-         */
-        [[nodiscard]] Eigen::VectorXd h(Eigen::Quaterniond q,
-                                        const Eigen::VectorXd& z) const;
-
-        /**
-         * @brief Jacobian of h w.r.t q, i.e. dh/dq. 
-         * @param[in] q Predicted quaternion state (4D).
-         * @param[in] z Current measurement vector: either 3D or 6D.
-         * @return      Jacobian matrix (3x4 or 6x4).
+         * @brief Applies the correction of a measurement of N / 3 reference vectors.
          */
-        [[nodiscard]] Eigen::MatrixXd dhdq(const Eigen::Quaterniond& q,
-                                           const Eigen::VectorXd& z) const;
+        template <int N>
+        Eigen::Quaterniond correct(const Eigen::Quaterniond& q_pred,
+                                   const Eigen::Matrix4d& P_pred,
+                                   const Eigen::Matrix<double, N, 1>& z,
+                                   const Eigen::Matrix<double, N, 1>& z_pred,
+                                   const Eigen::Matrix<double, N, 4>& H,
+                                   const Eigen::Matrix<double, N, N>& R_n);
 
         /**
-         * @brief (Optional) Helper function to compute orientation from one sample of accelerometer + magnetometer,
+         * @brief Helper function to compute orientation from one sample of accelerometer + magnetometer,
          *        often called ecompass or triad method.
          *
          * @param[in] acc  3D accelerometer data.
-         * @param[in] mag  3D magnetometer data.
-         * @return         A quaternion representing the orientation.
-         *
-         * @note Not implemented here. Provide your own version if needed.
+         * @param[in] mag  3D magnetometer data, any horizontal direction defines the zero heading.
+         * @return         A quaternion whose rotation matrix has the rows north, east and down.
          */
         static Eigen::Quaterniond ecompass(const Eigen::Vector3d& acc,
                                            const Eigen::Vector3d& mag);
@@ -179,7 +192,7 @@ namespace libstp::ahrs
         Eigen::Matrix4d P; ///< 4x4 State covariance
         Eigen::Matrix<double, 6, 6> R; ///< 6x6 Measurement noise covariance (for acc+mag)
 
-        Eigen::Vector3d aRef; ///< Gravity reference in chosen frame
-        Eigen::Vector3d mRef; ///< Magnetic reference in chosen frame
+        Eigen::Vector3d aRef = Eigen::Vector3d::UnitZ(); ///< Gravity reference in chosen frame
+        Eigen::Vector3d mRef = Eigen::Vector3d::UnitX(); ///< Magnetic reference in chosen frame
     };
 }
@@ -0,0 +1,50 @@
+//
+// Created by tobias on 10/18/26.
+//
+#pragma once
+
+#include <Eigen/Dense>
+
+namespace libstp::ahrs
+{
+    /**
+     * @brief Madgwick's gradient descent orientation filter.
+     *
+     * The gyroscope is integrated and every step is pulled towards the attitude in which gravity (and the
+     * horizontal magnetic field) would be measured as they are, with a step size of the gain:
+     *
+     *      q(t) = q(t-1) + (1/2 q(t-1) * omega - gain * grad / |grad|) * dt
+     *
+     * It uses the same frame and measurement model as the ExtendedKalmanFilter, so both can be swapped.
+     */
+    class MadgwickFilter
+    {
+    public:
+        /**
+         * @param[in] gain Step size of the correction in rad/s, larger values trust the accelerometer more.
+         */
+        explicit MadgwickFilter(double gain = 0.1);
+
+        /**
+         * @brief Update the orientation with one sample, does not allocate.
+         *
+         * @param[in] q    A-priori quaternion estimate (normalized).
+         * @param[in] gyr  Angular velocity in rad/s.
+         * @param[in] acc  Accelerometer measurement, a zero vector skips the correction.
+         * @param[in] mag  Magnetometer measurement, a zero vector corrects with the accelerometer only.
+         * @param[in] dt   Time step in seconds.
+         *
+         * @return The a-posteriori quaternion estimate (normalized).
+         */
+        [[nodiscard]] Eigen::Quaterniond update(const Eigen::Quaterniond& q,
+                                                const Eigen::Vector3d& gyr,
+                                                const Eigen::Vector3d& acc,
+                                                const Eigen::Vector3d& mag,
+                                                double dt) const;
+
+        [[nodiscard]] double getGain() const;
+
+    private:
+        double gain;
+    };
+}
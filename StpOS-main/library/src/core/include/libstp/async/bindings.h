@@ -4,24 +4,123 @@
 
 #pragma once
 #include "algorithm.h"
+#include "driver.h"
+#include <cstdint>
 #include <pybind11/pybind11.h>
 #include <pybind11/embed.h>
 #include <pybind11/iostream.h>
 #include <pybind11/chrono.h>
 
+#include "libstp/_config.h"
+
 namespace py = pybind11;
 
 namespace libstp::async
 {
-    template <typename T>
-    py::object start_async_algorithm(AsyncAlgorithm<T> algo,
-                                     int frequency)
+    /**
+     * Call guard for bindings which touch devices, holds the deviceMutex for the duration of the call.
+     * The GIL is only released while waiting for it, a step on the driver thread may need the GIL to finish,
+     * e.g. to evaluate a condition written in Python.
+     */
+    struct DeviceAccess
+    {
+        std::unique_lock<std::recursive_mutex> lock{deviceMutex(), std::try_to_lock};
+
+        DeviceAccess()
+        {
+            if (!lock.owns_lock())
+            {
+                py::gil_scoped_release release;
+                lock.lock();
+            }
+        }
+    };
+
+    /**
+     * Python objects belonging to one driven algorithm.
+     * They are released on the driver thread, so the GIL has to be acquired before deleting them.
+     */
+    struct DriveContext
+    {
+        py::object algorithm;
+        py::object loop;
+        py::object future;
+        py::object onTicks;
+        std::uint64_t ticks = 0; // only touched from the driver thread
+
+        static std::shared_ptr<DriveContext> create(py::object algorithm, py::object loop, py::object future,
+                                                    py::object onTicks)
+        {
+            return {
+                new DriveContext{std::move(algorithm), std::move(loop), std::move(future), std::move(onTicks)},
+                [](const DriveContext* context)
+                {
+                    py::gil_scoped_acquire acquire;
+                    delete context;
+                }
+            };
+        }
+    };
+
+    inline void resolveFuture(const py::object& future, const py::object& value, const bool cancelled,
+                              const std::uint64_t ticks, const py::object& onTicks)
+    {
+        if (!future.attr("done")().cast<bool>())
+        {
+            if (cancelled)
+                future.attr("cancel")();
+            else
+                future.attr("set_result")(value);
+        }
+
+        // Called after resolving, so a failing callback can never leave the future pending.
+        // The awaiting task only resumes on the next loop iteration and still sees the ticks.
+        if (!onTicks.is_none())
+            onTicks(ticks);
+    }
+
+    inline py::object drive(const py::object& algorithm, const int frequency, const py::object& onTicks)
     {
-        py::gil_scoped_acquire acquire;
-        auto sharedAlgo = std::make_shared<AsyncAlgorithm<T>>(std::move(algo));
+        auto* algo = algorithm.cast<AsyncAlgorithm<int>*>();
         const py::object asyncio = py::module_::import("asyncio");
-        py::object runner = py::module_::import("libstp.asynchronous").attr("_run_algorithm");
-        return asyncio.attr("create_task")(runner(sharedAlgo, frequency));
+        py::object loop = asyncio.attr("get_event_loop")();
+        py::object future = loop.attr("create_future")();
+        const auto context = DriveContext::create(algorithm, loop, future, onTicks);
+
+        const auto job = AlgorithmDriver::instance().schedule(
+            [algo, context]
+            {
+                context->ticks++;
+                return algo->advance();
+            },
+            [algo, context](const bool cancelled)
+            {
+                const int value = algo->current();
+                py::gil_scoped_acquire acquire;
+                try
+                {
+                    context->loop.attr("call_soon_threadsafe")(py::cpp_function(&resolveFuture),
+                                                               context->future, value, cancelled,
+                                                               context->ticks, context->onTicks);
+                }
+                catch (py::error_already_set& e)
+                {
+                    // The event loop is already closed, nobody is waiting for the result anymore
+                    SPDLOG_WARN("Could not resolve algorithm future: {}", e.what());
+                }
+            },
+            frequency);
+
+        // Capture the job weakly, the future must not keep its own driver job alive
+        const std::weak_ptr<DriverJob> weakJob = job;
+        future.attr("add_done_callback")(py::cpp_function([weakJob](const py::object& done)
+        {
+            if (!done.attr("cancelled")().cast<bool>())
+                return;
+            if (const auto cancelledJob = weakJob.lock())
+                cancelledJob->cancel();
+        }));
+        return future;
     }
 
     AsyncAlgorithm<int> sample_algorithm()
@@ -33,43 +132,86 @@ namespace libstp::async
         }
     }
 
-    inline void createAlgorithmBindings(py::module_& m)
+    inline AsyncAlgorithm<int> idle_algorithm(const int ticks)
     {
-        py::exec(R"(
-import asyncio
-import time
-
-async def run_algorithm(algo, frequency):
-    '''Repeatedly calls algo.advance() until completion with a fixed frequency.'''
-    period = 1 / frequency
-    print(f"Running algorithm with period {period}")
-    while True:
-        print("Advancing algorithm")
-        start_time = time.time()
-        print("Starting")
-        more = algo.advance()
-        print("Advanced")
-        if not more:
-            print("No more")
-            break
-        print("More")
-        elapsed_time = time.time() - start_time
-        print(f"Elapsed time: {elapsed_time}")
-        sleep_time = max(0, period - elapsed_time)
-        print(f"Sleeping for {sleep_time} seconds")
-        await asyncio.sleep(sleep_time)  # let other tasks run
-        print("Continuing")
-)");
-
-        m.attr("_run_algorithm") = py::globals()["run_algorithm"];
+        for (int i = 0; i < ticks; i++)
+        {
+            co_yield i;
+        }
+        co_return ticks;
+    }
 
+    inline void createAlgorithmBindings(py::module_& m)
+    {
         py::class_<AsyncAlgorithm<int>>(m, "AsyncAlgorithmInt")
-            .def("advance", &AsyncAlgorithm<int>::advance)
+            .def("advance", &AsyncAlgorithm<int>::advance, py::call_guard<DeviceAccess>())
             .def("current", &AsyncAlgorithm<int>::current);
 
+        py::class_<DriverStatistics>(m, "DriverStatistics", R"pbdoc(
+            Timing statistics of the native algorithm driver, aggregated over all driven algorithms.
+        )pbdoc")
+            .def_readonly("ticks", &DriverStatistics::ticks)
+            .def_readonly("overruns", &DriverStatistics::overruns)
+            .def_readonly("mean_period", &DriverStatistics::meanPeriod)
+            .def_readonly("period_std_dev", &DriverStatistics::periodStdDev)
+            .def_readonly("max_lateness", &DriverStatistics::maxLateness)
+            .def("__repr__", [](const DriverStatistics& s)
+            {
+                return fmt::format("DriverStatistics(ticks={}, overruns={}, mean_period={:.6f}, "
+                                   "period_std_dev={:.6f}, max_lateness={:.6f})",
+                                   s.ticks, s.overruns, s.meanPeriod, s.periodStdDev, s.maxLateness);
+            });
+
+        m.def("drive", &drive, py::arg("algorithm"), py::arg("frequency") = 100, py::arg("on_ticks") = py::none(),
+              R"pbdoc(
+            Steps an algorithm from the native driver thread at a fixed rate.
+
+            The returned future completes on the current event loop with the last value of the
+            algorithm. Cancelling the future stops the algorithm at its next tick.
+
+            Args:
+                algorithm (AsyncAlgorithmInt): The algorithm to run. It must not be advanced elsewhere.
+                frequency (int): How often the algorithm is advanced per second.
+                on_ticks (Callable[[int], None], optional): Called on the event loop with the number of ticks
+                    the algorithm ran, right before the future resolves.
+
+            Returns:
+                asyncio.Future: Resolves with the final value of the algorithm.
+        )pbdoc");
+
+        m.def("driver_statistics", []
+        {
+            return AlgorithmDriver::instance().statistics();
+        }, R"pbdoc(
+            Returns:
+                DriverStatistics: Tick rate and jitter measured by the native driver.
+        )pbdoc");
+
+        m.def("reset_driver_statistics", []
+        {
+            AlgorithmDriver::instance().resetStatistics();
+        }, R"pbdoc(
+            Resets the statistics returned by driver_statistics.
+        )pbdoc");
+
         m.def("sample_algorithm", []
         {
             return sample_algorithm();
         });
+
+        m.def("idle_algorithm", &idle_algorithm, py::arg("ticks"), R"pbdoc(
+            An algorithm which yields the given number of times without doing any work.
+            Useful to measure the overhead of the driver.
+
+            Args:
+                ticks (int): Number of ticks until the algorithm finishes.
+        )pbdoc");
+
+        // Stop the driver thread before the interpreter goes away, it needs the GIL to finish its jobs
+        py::module_::import("atexit").attr("register")(py::cpp_function([]
+        {
+            py::gil_scoped_release release;
+            AlgorithmDriver::instance().shutdown();
+        }));
     }
 }
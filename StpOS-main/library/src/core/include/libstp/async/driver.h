@@ -0,0 +1,122 @@
+//
+// Created by tobias on 10/18/26.
+//
+
+#pragma once
+#include <atomic>
+#include <chrono>
+#include <condition_variable>
+#include <cstdint>
+#include <functional>
+#include <memory>
+#include <mutex>
+#include <thread>
+#include <vector>
+
+#include "algorithm.h"
+
+namespace libstp::async
+{
+    struct DriverStatistics
+    {
+        std::uint64_t ticks = 0;
+        std::uint64_t overruns = 0;
+        double meanPeriod = 0.0; // seconds between two ticks of the same job
+        double periodStdDev = 0.0; // jitter of the tick period in seconds
+        double maxLateness = 0.0; // worst delay between deadline and tick in seconds
+    };
+
+    /**
+     * Serializes the access to libstp devices, e.g. motors, servos and drive state, between the driver thread and
+     * all other threads. The driver holds it while it steps an algorithm, the Python bindings of devices while they
+     * run. Recursive, as algorithms call into devices which may be guarded themselves.
+     */
+    std::recursive_mutex& deviceMutex();
+
+    /**
+     * A single algorithm scheduled on the AlgorithmDriver.
+     * The step function returns false once the algorithm is done.
+     * onFinished is invoked exactly once from the driver thread, with true if the job was cancelled.
+     */
+    class DriverJob
+    {
+    public:
+        DriverJob(std::function<bool()> step,
+                  std::function<void(bool)> onFinished,
+                  std::chrono::nanoseconds period);
+
+        void cancel() noexcept;
+
+        [[nodiscard]] bool isCancelled() const noexcept;
+
+    private:
+        friend class AlgorithmDriver;
+
+        std::function<bool()> step_;
+        std::function<void(bool)> onFinished_;
+        std::chrono::nanoseconds period_;
+        std::chrono::steady_clock::time_point deadline_;
+        std::chrono::steady_clock::time_point lastTick_;
+        bool hasTicked_ = false;
+        std::atomic<bool> cancelled_ = false;
+    };
+
+    /**
+     * Steps AsyncAlgorithms from a single native timer thread, each at its own fixed rate.
+     * If a job falls behind by more than one period, it is resynchronized instead of bursting.
+     * Every step runs with the deviceMutex held.
+     */
+    class AlgorithmDriver
+    {
+    public:
+        static AlgorithmDriver& instance();
+
+        AlgorithmDriver(const AlgorithmDriver&) = delete;
+        AlgorithmDriver& operator=(const AlgorithmDriver&) = delete;
+
+        std::shared_ptr<DriverJob> schedule(std::function<bool()> step,
+                                            std::function<void(bool)> onFinished,
+                                            int frequency);
+
+        template <typename T>
+        std::shared_ptr<DriverJob> drive(std::shared_ptr<AsyncAlgorithm<T>> algorithm,
+                                         const int frequency,
+                                         std::function<void(T, bool)> onFinished)
+        {
+            return schedule([algorithm] { return algorithm->advance(); },
+                            [algorithm, onFinished = std::move(onFinished)](const bool cancelled)
+                            {
+                                onFinished(algorithm->current(), cancelled);
+                            },
+                            frequency);
+        }
+
+        [[nodiscard]] DriverStatistics statistics() const;
+
+        void resetStatistics();
+
+        /**
+         * Stops the timer thread and finishes all pending jobs as cancelled.
+         * The driver restarts itself on the next schedule call.
+         */
+        void shutdown();
+
+    private:
+        AlgorithmDriver() = default;
+
+        void run_();
+
+        void recordTick_(DriverJob& job, std::chrono::steady_clock::time_point now);
+
+        mutable std::mutex mutex_;
+        std::condition_variable wakeUp_;
+        std::vector<std::shared_ptr<DriverJob>> jobs_;
+        std::thread thread_;
+        bool stop_ = false;
+
+        mutable std::mutex statisticsMutex_;
+        DriverStatistics statistics_;
+        double periodM2_ = 0.0;
+        std::uint64_t periodSamples_ = 0;
+    };
+}
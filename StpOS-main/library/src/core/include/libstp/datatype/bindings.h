@@ -12,6 +12,7 @@
 #include "axis.h"
 #include "conditions.h"
 #include "functions.h"
+#include "libstp/sensor/snapshot.h"
 
 namespace py = pybind11;
 
@@ -141,6 +142,71 @@ namespace libstp::datatype
                        ", current=" + std::to_string(self.current) + ")>";
             });
 
+        py::enum_<PoseAxis>(m, "PoseAxis")
+            .value("X", PoseAxis::X)
+            .value("Y", PoseAxis::Y)
+            .value("Heading", PoseAxis::Heading);
+
+        py::class_<PoseConditionalResult, DefinedConditionalResult, std::shared_ptr<PoseConditionalResult>>(
+                m, "PoseConditionalResult",
+                "Represents a condition on a coordinate of the odometry pose")
+            .def(py::init<const PoseAxis, const float>(), py::arg("axis"), py::arg("target"),
+                 "Initialize with the coordinate and its target in cm or degrees")
+            .def("__str__", &PoseConditionalResult::to_string)
+            .def("__repr__", [](const PoseConditionalResult& self) {
+                return "<PoseConditionalResult(target=" + std::to_string(self.target) +
+                       ", current=" + std::to_string(self.current) + ")>";
+            });
+
+        py::enum_<ProfileAxis>(m, "ProfileAxis")
+            .value("Forward", ProfileAxis::Forward)
+            .value("Strafe", ProfileAxis::Strafe)
+            .value("Turn", ProfileAxis::Turn);
+
+        py::class_<PlannedConditionalResult, DefinedConditionalResult, std::shared_ptr<PlannedConditionalResult>>(
+                m, "PlannedConditionalResult",
+                "Represents a condition that also sets the speed, set_speed_while ignores its speed argument")
+            .def_property_readonly("setpoint", [](const PlannedConditionalResult& self)
+            {
+                const auto setpoint = self.getSetpoint();
+                return py::make_tuple(setpoint.forwardMs, setpoint.strafeMs, setpoint.angularRad);
+            }, "The (forward, strafe, angular) setpoint of the last update in m/s and rad/s");
+
+        py::class_<ProfileConditionalResult, PlannedConditionalResult, std::shared_ptr<ProfileConditionalResult>>(
+                m, "ProfileConditionalResult",
+                "Represents a planned move over a distance or angle, set_speed_while follows its profile")
+            .def_readwrite("tolerance", &ProfileConditionalResult::tolerance,
+                           "Accepted error at the end of the profile in cm or degrees")
+            .def_readwrite("settle_seconds", &ProfileConditionalResult::settleSeconds,
+                           "Time after the profile to reach the tolerance")
+            .def_readwrite("position_gain", &ProfileConditionalResult::positionGain,
+                           "Velocity added per position error while settling a forward or strafe move, in 1/s")
+            .def_readonly("elapsed", &ProfileConditionalResult::elapsed, "Seconds since the first tick")
+            .def_property_readonly("duration", [](const ProfileConditionalResult& self)
+            {
+                return self.getProfile().getDuration();
+            }, "Planned duration in seconds, 0 until set_speed_while planned the move")
+            .def("__str__", &ProfileConditionalResult::to_string)
+            .def("__repr__", [](const ProfileConditionalResult& self) {
+                return "<ProfileConditionalResult(target=" + std::to_string(self.target) +
+                       ", current=" + std::to_string(self.current) + ")>";
+            });
+
+        py::class_<PathConditionalResult, PlannedConditionalResult, std::shared_ptr<PathConditionalResult>>(
+                m, "PathConditionalResult",
+                "Represents a path through waypoints, set_speed_while follows it with pure pursuit")
+            .def_readwrite("lookahead", &PathConditionalResult::lookahead,
+                           "Distance along the path to steer towards in cm")
+            .def_readwrite("tolerance", &PathConditionalResult::tolerance,
+                           "Distance to the last waypoint in cm at which the path is done")
+            .def_property_readonly("path", &PathConditionalResult::getPath, py::return_value_policy::reference_internal,
+                                   "The path in m, starting at the origin along +x")
+            .def("__str__", &PathConditionalResult::to_string)
+            .def("__repr__", [](const PathConditionalResult& self) {
+                return "<PathConditionalResult(target=" + std::to_string(self.target) +
+                       ", current=" + std::to_string(self.current) + ")>";
+            });
+
         py::class_<TimedConditionalResult, DefinedConditionalResult, std::shared_ptr<TimedConditionalResult>>(
                 m, "TimedConditionalResult",
                 "Represents a time-based condition")
@@ -155,6 +221,33 @@ namespace libstp::datatype
 
     inline void createFunctionsBindings(py::module_& m)
     {
+        py::class_<Condition, std::shared_ptr<Condition>>(m, "Condition", R"pbdoc(
+            A condition of set_speed_while, returned by for_seconds, for_distance, while_true, ...
+
+            The result is created once and updated in place on every tick, so the built-in conditions
+            are evaluated natively without calling back into Python. A plain function taking
+            type_check_only and returning a new ConditionalResult is accepted wherever a Condition is,
+            it is called on every tick as before.
+            )pbdoc")
+            .def(py::init(&fromCallback), py::arg("callback"), R"pbdoc(
+            Wrap a function returning a new ConditionalResult on every call.
+
+            Args:
+                callback (Callable[[bool], ConditionalResult]): Called with type_check_only on every tick.
+            )pbdoc")
+            .def("reset", &Condition::reset, "Restart the condition, set_speed_while does this before the first tick")
+            .def("evaluate", &Condition::evaluate, "Update the result for the current time")
+            .def_property_readonly("result", &Condition::result, "The result, updated in place by evaluate")
+            .def("__call__", &Condition::operator(), py::arg("type_check_only") = false, R"pbdoc(
+            Evaluate the condition and return its result, like a plain condition function.
+
+            Args:
+                type_check_only (bool): Return the result without evaluating the condition.
+            )pbdoc");
+
+        // Plain functions are still accepted as conditions
+        py::implicitly_convertible<py::function, Condition>();
+
         m.def("for_time", forTime, R"pbdoc(Execute a function for a certain amount of time.
         Args:
             time (float): The duration in time units.
@@ -198,6 +291,74 @@ namespace libstp::datatype
             None
         )pbdoc", py::arg("rotation_degrees"));
 
+        m.def("until_x", untilX, R"pbdoc(Execute a function until the x coordinate of the odometry pose reaches a value.
+        The pose carries over from step to step, e.g. until_x(50) ends as soon as the robot is 50 cm ahead of
+        where the odometry was last reset, from whichever side it starts on.
+        Args:
+            x (float): The x coordinate in cm.
+        Returns:
+            ConditionalFunction: A function that returns a PoseConditionalResult.
+        )pbdoc", py::arg("x"));
+
+        m.def("until_y", untilY, R"pbdoc(Execute a function until the y coordinate of the odometry pose reaches a value.
+        Args:
+            y (float): The y coordinate in cm.
+        Returns:
+            ConditionalFunction: A function that returns a PoseConditionalResult.
+        )pbdoc", py::arg("y"));
+
+        m.def("until_heading", untilHeading, R"pbdoc(Execute a function until the heading of the odometry pose reaches a value.
+        Args:
+            heading (float): The heading in degrees, unwrapped.
+        Returns:
+            ConditionalFunction: A function that returns a PoseConditionalResult.
+        )pbdoc", py::arg("heading"));
+
+        m.def("for_profiled_distance", forProfiledDistance, R"pbdoc(Drive a distance along a planned motion profile.
+        The move accelerates and brakes within the limits of set_max_speeds and set_max_accel and follows the
+        plan as a feed-forward, so it ends at the target instead of coasting past it. The speed passed to
+        set_speed_while is ignored.
+        Args:
+            distance (float): The distance in cm, negative drives backwards.
+            speed (float): Fraction of the maximum speed to cruise at.
+            max_jerk (float): Jerk limit in m/s^3 for an S-curve, 0 for a trapezoidal profile.
+        Returns:
+            ConditionalFunction: A function that returns a ProfileConditionalResult.
+        )pbdoc", py::arg("distance"), py::arg("speed") = 1.0f, py::arg("max_jerk") = 0.0f);
+
+        m.def("for_profiled_strafe", forProfiledStrafe, R"pbdoc(Strafe a distance along a planned motion profile.
+        Args:
+            distance (float): The distance in cm, the sign follows the strafe speed.
+            speed (float): Fraction of the maximum strafe speed to cruise at.
+            max_jerk (float): Jerk limit in m/s^3 for an S-curve, 0 for a trapezoidal profile.
+        Returns:
+            ConditionalFunction: A function that returns a ProfileConditionalResult.
+        )pbdoc", py::arg("distance"), py::arg("speed") = 1.0f, py::arg("max_jerk") = 0.0f);
+
+        m.def("for_profiled_rotation", forProfiledRotation, R"pbdoc(Turn an angle along a planned motion profile.
+        The heading controller tracks the planned heading with the profile velocity as feed-forward.
+        Args:
+            rotation_degrees (float): The rotation in degrees, positive is clockwise like for_cw_rotation.
+            speed (float): Fraction of the maximum angular speed to cruise at.
+            max_jerk (float): Jerk limit in rad/s^3 for an S-curve, 0 for a trapezoidal profile.
+        Returns:
+            ConditionalFunction: A function that returns a ProfileConditionalResult.
+        )pbdoc", py::arg("rotation_degrees"), py::arg("speed") = 1.0f, py::arg("max_jerk") = 0.0f);
+
+        m.def("for_path", forPath, R"pbdoc(Follow a path through waypoints without stopping at them.
+        A cubic spline leaves the robot along its heading and passes every waypoint, pure pursuit steers along
+        it. The speed blends through the waypoints, slows down for sharp bends and brakes to stop on the last
+        one. Started right after another drive step the robot keeps its speed. The speed passed to
+        set_speed_while is ignored.
+        Args:
+            waypoints (list[tuple[float, float]]): Waypoints (x, y) in cm relative to where the robot starts,
+                x ahead and y to the side a positive strafe speed moves to.
+            speed (float): Fraction of the maximum forward speed.
+            lookahead (float): Distance along the path to steer towards in cm.
+        Returns:
+            ConditionalFunction: A function that returns a PathConditionalResult.
+        )pbdoc", py::arg("waypoints"), py::arg("speed") = 1.0f, py::arg("lookahead") = 15.0f);
+
         m.def("while_true", whileTrue, R"pbdoc(Execute a function while a condition is true.
         Args:
             condition (function): The condition to evaluate.
@@ -212,6 +373,15 @@ namespace libstp::datatype
             None
         )pbdoc", py::arg("condition"));
 
+        m.def("while_snapshot", whileSnapshot, R"pbdoc(Execute a function while a condition on a sensor snapshot is true.
+        The snapshot is refreshed with one native call before every evaluation.
+        Args:
+            snapshot (Snapshot): The snapshot to refresh.
+            condition (function): The condition, receiving the refreshed snapshot.
+        Returns:
+            None
+        )pbdoc", py::arg("snapshot"), py::arg("condition"));
+
         m.def("generator", generator, R"pbdoc(Return a speed generator function.
         Args:
             generator (function): The generator function.
@@ -5,7 +5,12 @@
 #pragma once
 
 #include "libstp/motion/differential_drive_state.h"
+#include "libstp/motion/motion_profile.h"
+#include "libstp/utility/spline.h"
+#include "speed.h"
+#include <array>
 #include <string>
+#include <vector>
 
 namespace libstp::datatype
 {
@@ -96,6 +101,159 @@ namespace libstp::datatype
         [[nodiscard]] std::string to_string() const override;
     };
 
+    enum class PoseAxis
+    {
+        X,
+        Y,
+        Heading
+    };
+
+    /**
+     * Runs until one coordinate of the odometry pose reaches the target, from whichever side it starts on.
+     * Target and current are in cm for X and Y and in degrees for the heading.
+     */
+    class PoseConditionalResult final : public DefinedConditionalResult
+    {
+        PoseAxis axis;
+        float start = 0.0f;
+        bool started = false;
+
+    public:
+        PoseConditionalResult(PoseAxis axis, float target);
+
+        /**
+         * Takes the side the coordinate starts on again at the next update.
+         */
+        void restart();
+
+        void update(motion::DifferentialDriveState& state) override;
+
+        [[nodiscard]] float progress() const override;
+
+        [[nodiscard]] std::string to_string() const override;
+    };
+
+    enum class ProfileAxis
+    {
+        Forward,
+        Strafe,
+        Turn
+    };
+
+    /**
+     * A result that brings its own speed setpoints, setSpeedWhile uses them instead of the speed function and
+     * skips its acceleration ramp. The setpoints have to respect the limits passed to plan themselves.
+     */
+    class PlannedConditionalResult : public DefinedConditionalResult
+    {
+    public:
+        using DefinedConditionalResult::DefinedConditionalResult;
+
+        /**
+         * Called by setSpeedWhile before the first tick.
+         *
+         * @param limits Maximum speed and acceleration of the device per ProfileAxis, in m or rad.
+         */
+        virtual void plan(const std::array<motion::ProfileLimits, 3>& limits) = 0;
+
+        /**
+         * @return The speed setpoint of the last update.
+         */
+        [[nodiscard]] virtual AbsoluteSpeed getSetpoint() const = 0;
+    };
+
+    /**
+     * Moves along a motion profile over a distance or angle instead of driving at a constant speed until it is
+     * crossed. setSpeedWhile plans the profile when the loop starts, from the maximum speeds and accelerations
+     * of the device, and uses its velocity as the setpoint of the speed controllers instead of ramping the speed
+     * function. Turns feed the planned heading to the heading controller with the profile velocity as its
+     * feed-forward, forward and strafe moves correct the remaining distance once the profile is done. The loop
+     * ends when the target is within the tolerance or the settle time ran out.
+     *
+     * Target, current and tolerance are in cm for forward and strafe moves and in degrees for turns, positive
+     * turns are clockwise like for_cw_rotation.
+     */
+    class ProfileConditionalResult final : public PlannedConditionalResult
+    {
+    public:
+        ProfileAxis axis;
+        float speedFactor; // Fraction of the maximum speed of the axis
+        float maxJerk; // m/s^3 or rad/s^3, 0 for a trapezoidal profile
+        float tolerance;
+        float settleSeconds;
+        float positionGain = 2.0f; // 1/s, velocity added per position error while settling a forward or strafe move
+        float elapsed = 0.0f; // Seconds since the first tick, set by the condition
+
+        ProfileConditionalResult(ProfileAxis axis, float target, float speedFactor, float maxJerk,
+                                 float tolerance, float settleSeconds);
+
+        void plan(const std::array<motion::ProfileLimits, 3>& limits) override;
+
+        [[nodiscard]] const motion::MotionProfile& getProfile() const;
+
+        /**
+         * @return The velocity setpoint of the last update, zero on the other axes.
+         */
+        [[nodiscard]] AbsoluteSpeed getSetpoint() const override;
+
+        void update(motion::DifferentialDriveState& state) override;
+
+        [[nodiscard]] float progress() const override;
+
+        [[nodiscard]] std::string to_string() const override;
+
+    private:
+        motion::MotionProfile profile;
+        float setpoint = 0.0f;
+    };
+
+    /**
+     * Follows a path through waypoints with pure pursuit, without stopping at them.
+     *
+     * The waypoints are in cm relative to the pose of the odometry when the loop starts, x ahead and y to the
+     * side the device strafes to with a positive speed. A cubic Hermite spline leaves the robot along its
+     * heading and passes every waypoint. Each tick the robot steers on the arc to the point a lookahead distance
+     * further along the path than its closest point. The speed ramps up with the forward acceleration, slows
+     * down where the arc would need more than the maximum turn rate and brakes to stop on the last waypoint.
+     *
+     * Target and current are the length of the path and the length covered, in cm.
+     */
+    class PathConditionalResult final : public PlannedConditionalResult
+    {
+    public:
+        float speedFactor; // Fraction of the maximum forward speed
+        float lookahead; // cm, longer cuts corners, shorter oscillates
+        float tolerance; // cm to the last waypoint at which the path is done
+
+        PathConditionalResult(const std::vector<utility::SplinePoint>& waypointsCm, float speedFactor,
+                              float lookaheadCm, float toleranceCm);
+
+        void plan(const std::array<motion::ProfileLimits, 3>& limits) override;
+
+        [[nodiscard]] AbsoluteSpeed getSetpoint() const override;
+
+        /**
+         * @return The path in m, starting at the origin along +x.
+         */
+        [[nodiscard]] const utility::CubicHermiteSpline& getPath() const;
+
+        void update(motion::DifferentialDriveState& state) override;
+
+        [[nodiscard]] std::string to_string() const override;
+
+    private:
+        utility::CubicHermiteSpline path;
+        motion::ProfileLimits forwardLimits;
+        double maxTurnRate = 0.0;
+
+        bool started = false;
+        motion::Pose start;
+        double along = 0.0; // m, arc length of the closest point
+        double lastTimestamp = 0.0;
+        float velocity = 0.0f;
+        float turnRate = 0.0f;
+    };
+
     class MotorTicksConditionalResult final : public DefinedConditionalResult
     {
     public:
@@ -7,14 +7,151 @@
 #include <chrono>
 #include <functional>
 #include <memory>
+#include <optional>
+#include <utility>
+#include <vector>
 
 #include "conditions.h"
 #include "speed.h"
+#include "libstp/utility/clock.h"
+
+namespace libstp::sensor
+{
+    class Snapshot;
+}
 
 namespace libstp::datatype
 {
-    typedef std::function<std::shared_ptr<ConditionalResult>(bool)> ConditionalFunction;
-    typedef std::function<Speed(std::shared_ptr<ConditionalResult>)> SpeedFunction;
+    /**
+     * A condition of a setSpeedWhile loop.
+     *
+     * The result is created once together with the condition and updated in place on every tick, the loop
+     * passes it on to the speed function by reference. Evaluating the built-in conditions therefore neither
+     * allocates nor changes a reference count, and a condition passed in from Python stays a native object
+     * instead of being called through the interpreter on every tick.
+     */
+    class Condition
+    {
+    public:
+        explicit Condition(std::shared_ptr<ConditionalResult> result);
+        virtual ~Condition() = default;
+
+        /**
+         * Called once before the first tick of a loop, so a condition can be run more than once.
+         */
+        virtual void reset();
+
+        /**
+         * Update the result for the current tick, the loop calls result()->update(state) afterwards.
+         */
+        virtual void evaluate() = 0;
+
+        [[nodiscard]] const std::shared_ptr<ConditionalResult>& result() const;
+
+        /**
+         * Evaluate the condition and return its result, the calling convention of a plain function condition.
+         * With typeCheckOnly the result is returned without evaluating the condition.
+         */
+        virtual std::shared_ptr<ConditionalResult> operator()(bool typeCheckOnly);
+
+    protected:
+        std::shared_ptr<ConditionalResult> result_;
+    };
+
+    typedef std::shared_ptr<Condition> ConditionalFunction;
+    typedef std::function<std::shared_ptr<ConditionalResult>(bool)> ConditionalCallback;
+    typedef std::function<Speed(const std::shared_ptr<ConditionalResult>&)> SpeedFunction;
+
+    /**
+     * A condition whose result updates itself from the drive state, e.g. forDistance or forCWRotation.
+     */
+    class ResultCondition final : public Condition
+    {
+    public:
+        explicit ResultCondition(std::shared_ptr<ConditionalResult> result);
+
+        void evaluate() override;
+    };
+
+    /**
+     * Runs until the given time has passed since the first tick.
+     */
+    class TimedCondition final : public Condition
+    {
+    public:
+        explicit TimedCondition(const std::chrono::milliseconds& duration);
+
+        void reset() override;
+        void evaluate() override;
+
+    private:
+        TimedConditionalResult* timedResult_;
+        std::optional<utility::Clock::time_point> start_;
+    };
+
+    /**
+     * Runs until a coordinate of the odometry pose reaches its target, see PoseConditionalResult.
+     */
+    class PoseCondition final : public Condition
+    {
+    public:
+        PoseCondition(PoseAxis axis, float target);
+
+        void reset() override;
+        void evaluate() override;
+
+    private:
+        PoseConditionalResult* poseResult_;
+    };
+
+    /**
+     * Moves along a motion profile, see ProfileConditionalResult. Keeps the time since the first tick for the
+     * result, setSpeedWhile plans the profile before it.
+     */
+    class ProfileCondition final : public Condition
+    {
+    public:
+        ProfileCondition(ProfileAxis axis, float target, float speedFactor, float maxJerk);
+
+        void reset() override;
+        void evaluate() override;
+
+    private:
+        ProfileConditionalResult* profileResult_;
+        std::optional<utility::Clock::time_point> start_;
+    };
+
+    /**
+     * Runs while a predicate holds, or while it does not hold if inverted.
+     */
+    class PredicateCondition final : public Condition
+    {
+    public:
+        PredicateCondition(std::function<bool()> predicate, bool inverted);
+
+        void evaluate() override;
+
+    private:
+        UndefinedConditionalResult* undefinedResult_;
+        std::function<bool()> predicate_;
+        bool inverted_;
+    };
+
+    /**
+     * Adapts a function returning a new result on every call, e.g. a Python callable.
+     * This is the slow path: the function is called and its result replaced on every tick.
+     */
+    class CallbackCondition final : public Condition
+    {
+    public:
+        explicit CallbackCondition(ConditionalCallback callback);
+
+        void evaluate() override;
+        std::shared_ptr<ConditionalResult> operator()(bool typeCheckOnly) override;
+
+    private:
+        ConditionalCallback callback_;
+    };
 
     // DefinedConditionals
     ConditionalFunction forTime(const std::chrono::milliseconds& timeInMs);
@@ -28,14 +165,42 @@ namespace libstp::datatype
     ConditionalFunction forCWRotation(const float& rotationInDegrees);
 
     ConditionalFunction forTicks(const int& ticks);
+
+    // Absolute coordinates of the odometry pose, so they hold over several steps
+    ConditionalFunction untilX(const float& xCm);
+
+    ConditionalFunction untilY(const float& yCm);
+
+    ConditionalFunction untilHeading(const float& headingDegrees);
     
     ConditionalFunction forAbsoluteTicks(const int& ticks);
 
+    // Planned moves, the condition also sets the speed, see ProfileConditionalResult
+    ConditionalFunction forProfiledDistance(const float& distanceCm, const float& speedFactor = 1.0f,
+                                            const float& maxJerk = 0.0f);
+
+    ConditionalFunction forProfiledStrafe(const float& distanceCm, const float& speedFactor = 1.0f,
+                                          const float& maxJerk = 0.0f);
+
+    ConditionalFunction forProfiledRotation(const float& rotationInDegrees, const float& speedFactor = 1.0f,
+                                            const float& maxJerk = 0.0f);
+
+    // Waypoints in cm relative to the start, see PathConditionalResult
+    ConditionalFunction forPath(const std::vector<std::pair<float, float>>& waypointsCm, const float& speedFactor = 1.0f,
+                                const float& lookaheadCm = 15.0f);
+
     // UndefinedConditionals
     ConditionalFunction whileTrue(const std::function<bool()>& condition);
 
     ConditionalFunction whileFalse(const std::function<bool()>& condition);
 
+    // Refreshes the snapshot once per tick and evaluates the condition on it
+    ConditionalFunction whileSnapshot(const std::shared_ptr<sensor::Snapshot>& snapshot,
+                                      const std::function<bool(const sensor::Snapshot&)>& condition);
+
+    // Wraps a function returning a new ConditionalResult per call
+    ConditionalFunction fromCallback(ConditionalCallback callback);
+
     // SpeedFunctions
     SpeedFunction generator(const std::function<Speed()>& generator);
     
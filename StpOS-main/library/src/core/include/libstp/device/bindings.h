@@ -4,8 +4,12 @@
 
 #pragma once
 
+#include <fmt/format.h>
 #include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
 #include "device.h"
+#include "kipr/core/platform.hpp"
+#include "libstp/async/bindings.h"
 #include "libstp/motion/bindings.h"
 
 namespace py = pybind11;
@@ -38,11 +42,11 @@ namespace libstp::device
                 Example:
                     >>> device = NativeDevice(Axis.Z, Direction.Forward)
                 )pbdoc")
-                      .def("reset_ramps", &Device::resetRamps, R"pbdoc("
+                      .def("reset_ramps", &Device::resetRamps, py::call_guard<async::DeviceAccess>(), R"pbdoc("
                 Resets the speed ramps)pbdoc")
 
                       // Lifecycle methods
-                      .def("shutdown", &Device::shutdown,
+                      .def("shutdown", &Device::shutdown, py::call_guard<async::DeviceAccess>(),
                            R"pbdoc(
                 Gracefully shuts down the device and performs necessary cleanup.
 
@@ -78,15 +82,59 @@ namespace libstp::device
                 )pbdoc")
                       .def_readonly("imu", &Device::imu, R"pbdoc(
                 The IMU sensor attached to the device.)pbdoc")
+                      .def_property_readonly("attitude_estimator", &Device::getAttitudeEstimator,
+                                             py::return_value_policy::reference_internal, R"pbdoc(
+                The background attitude estimator of the device. Not running until start() is called.)pbdoc")
+                      .def_property_readonly("odometry", &Device::getOdometry,
+                                             py::return_value_policy::reference_internal, R"pbdoc(
+                The pose of the device, updated on every tick of set_speed_while.)pbdoc")
+                      .def("forget_wheel_ticks", &Device::forgetWheelTicks, py::call_guard<async::DeviceAccess>(),
+                           R"pbdoc(
+                Call after resetting the position estimate of a drive motor, so the odometry does not count the
+                reset as motion.)pbdoc")
+                      .def("estimate_wheel_velocities", &Device::estimateWheelVelocities,
+                           py::call_guard<async::DeviceAccess>(), py::arg("sampler"),
+                           py::arg("bandwidth") = 50.0, R"pbdoc(
+                Feeds a velocity estimator per wheel from the sampler. While the sampler runs, the speed controllers
+                act on the estimates instead of the tick differences over one control loop period, so they do not
+                depend on how regularly the loop runs. The odometry keeps counting the ticks. Estimates older than
+                50 ms are ignored, e.g. once the sampler stopped.
+
+                Args:
+                    sampler (Sampler): The sampler to add the channels to, before it is started.
+                    bandwidth (float): Of the estimators in rad/s.
+
+                Returns:
+                    List[VelocityEstimator]: The estimators in the order of wheel_motors.
+
+                Example:
+                    >>> sampler = Sampler(frequency=500)
+                    >>> device.estimate_wheel_velocities(sampler)
+                    >>> sampler.start()
+                )pbdoc")
+                      .def_property("wheel_velocity_estimators", &Device::getWheelVelocityEstimators,
+                                    py::cpp_function(&Device::setWheelVelocityEstimators,
+                                                     py::call_guard<async::DeviceAccess>()),
+                                    R"pbdoc(
+                The velocity estimators of the wheels in the order of wheel_motors, empty to measure the speed by
+                tick differences.)pbdoc")
+                      .def_property_readonly("wheel_motors", &Device::getWheelMotors, R"pbdoc(
+                Copies of the drive motors in the order the estimators follow.)pbdoc")
                       .def("set_speed_while",
-                           py::overload_cast<datatype::ConditionalFunction, datatype::Speed>(&Device::setSpeedWhile),
+                           py::overload_cast<datatype::ConditionalFunction, datatype::Speed, bool, bool, bool>(
+                               &Device::setSpeedWhile),
                            py::arg("condition"), py::arg("constant_speed"),
+                           py::arg("do_correction") = true,
+                           py::arg("auto_stop_device") = true,
+                           py::arg("reset_ramps") = true,
                            R"pbdoc(
                  Sets the device speed to a constant value while a condition is met.
+                 Unlike a speed function, the constant speed never calls back into Python.
 
                  Args:
                      condition (ConditionalFunction): Function returning a ConditionalResult.
                      constant_speed (Speed): Fixed speed to apply while condition holds.
+                     do_correction (bool): Whether to apply correction to the speed based on the gyroscope
 
                  Returns:
                      AsyncAlgorithm[int]: An async object handling speed adjustments.
@@ -118,6 +166,7 @@ namespace libstp::device
 
                       // Kinematics & PID control
                       .def("__apply_kinematics_model__", &Device::debugApplyKinematicsModel,
+                           py::call_guard<async::DeviceAccess>(),
                            py::arg("forward"), py::arg("strafe"), py::arg("angular"),
                            R"pbdoc(
                 Applies the kinematic model to adjust the device movement.
@@ -134,7 +183,8 @@ namespace libstp::device
                     >>> device.__apply_kinematics_model__(1.0, 0.5, 0.2)
                 )pbdoc")
 
-                      .def("set_vx_pid", &Device::setVxPid, py::arg("kp"), py::arg("ki"), py::arg("kd"),
+                      .def("set_vx_pid", &Device::setVxPid, py::call_guard<async::DeviceAccess>(),
+                           py::arg("kp"), py::arg("ki"), py::arg("kd"),
                            R"pbdoc(
                 Sets PID gains for the forward speed controller.
 
@@ -150,7 +200,8 @@ namespace libstp::device
                     >>> device.set_vx_pid(1.2, 0.01, 0.05)
                 )pbdoc")
 
-                      .def("set_vy_pid", &Device::setVyPid, py::arg("kp"), py::arg("ki"), py::arg("kd"),
+                      .def("set_vy_pid", &Device::setVyPid, py::call_guard<async::DeviceAccess>(),
+                           py::arg("kp"), py::arg("ki"), py::arg("kd"),
                            R"pbdoc(
                 Sets PID gains for the strafing speed controller.
 
@@ -166,7 +217,8 @@ namespace libstp::device
                     >>> device.set_vy_pid(1.0, 0.02, 0.03)
                 )pbdoc")
 
-                      .def("set_w_pid", &Device::setWPid, py::arg("kp"), py::arg("ki"), py::arg("kd"),
+                      .def("set_w_pid", &Device::setWPid, py::call_guard<async::DeviceAccess>(),
+                           py::arg("kp"), py::arg("ki"), py::arg("kd"),
                            R"pbdoc(
                 Sets PID gains for the angular speed controller.
 
@@ -182,7 +234,8 @@ namespace libstp::device
                     >>> device.set_w_pid(1.5, 0.05, 0.02)
                 )pbdoc")
 
-                      .def("set_heading_pid", &Device::setHeadingPid, py::arg("kp"), py::arg("ki"), py::arg("kd"),
+                      .def("set_heading_pid", &Device::setHeadingPid, py::call_guard<async::DeviceAccess>(),
+                           py::arg("kp"), py::arg("ki"), py::arg("kd"),
                            R"pbdoc(
                 Sets PID gains for the heading control system.
 
@@ -198,7 +251,28 @@ namespace libstp::device
                     >>> device.set_heading_pid(2.0, 0.03, 0.01)
                 )pbdoc")
 
-                      .def("set_max_accel", &Device::setMaxAccel, py::arg("max_forward_accel"),
+                      .def_property("vx_pid_parameters",
+                                    [](const Device& self) { return self.getVxPidParameters(); },
+                                    py::cpp_function(&Device::setVxPidParameters,
+                                                     py::call_guard<async::DeviceAccess>()),
+                                    "A copy of all parameters of the forward speed controller, assign it to change them")
+                      .def_property("vy_pid_parameters",
+                                    [](const Device& self) { return self.getVyPidParameters(); },
+                                    py::cpp_function(&Device::setVyPidParameters,
+                                                     py::call_guard<async::DeviceAccess>()),
+                                    "A copy of all parameters of the strafing speed controller, assign it to change them")
+                      .def_property("w_pid_parameters",
+                                    [](const Device& self) { return self.getWPidParameters(); },
+                                    py::cpp_function(&Device::setWPidParameters, py::call_guard<async::DeviceAccess>()),
+                                    "A copy of all parameters of the angular speed controller, assign it to change them")
+                      .def_property("heading_pid_parameters",
+                                    [](const Device& self) { return self.getHeadingPidParameters(); },
+                                    py::cpp_function(&Device::setHeadingPidParameters,
+                                                     py::call_guard<async::DeviceAccess>()),
+                                    "A copy of all parameters of the heading controller, assign it to change them")
+
+                      .def("set_max_accel", &Device::setMaxAccel, py::call_guard<async::DeviceAccess>(),
+                           py::arg("max_forward_accel"),
                            py::arg("max_strafe_accel"), py::arg("max_angular_accel"),
                            R"pbdoc(
                 Sets the maximum acceleration values for the device.
@@ -215,7 +289,7 @@ namespace libstp::device
                     >>> device.set_max_accel(0.5, 0.5, 1.0)
                 )pbdoc")
 
-                      .def("reset_state", &Device::resetState,
+                      .def("reset_state", &Device::resetState, py::call_guard<async::DeviceAccess>(),
                            R"pbdoc(
                 Resets the device state to its initial values.
 
@@ -227,7 +301,8 @@ namespace libstp::device
                 )pbdoc")
 
                       // Sensor readings
-                      .def("set_quaternion", &Device::setQuaternion, py::arg("w"), py::arg("x"), py::arg("y"),
+                      .def("set_quaternion", &Device::setQuaternion, py::call_guard<async::DeviceAccess>(),
+                           py::arg("w"), py::arg("x"), py::arg("y"),
                            py::arg("z"),
                            R"pbdoc(
                 Sets the quaternion values for the device orientation.
@@ -244,7 +319,7 @@ namespace libstp::device
                 Example:
                     >>> device.set_quaternion(0.5, 0.5, 0.5, 0.5)
                 )pbdoc")
-                      .def("stop", &Device::stopDevice,
+                      .def("stop", &Device::stopDevice, py::call_guard<async::DeviceAccess>(),
                            R"pbdoc(
                 Stops the device and halts all movement.
 
@@ -258,7 +333,9 @@ namespace libstp::device
                            R"pbdoc(
                 Gets the maximum speeds for the device.
                 )pbdoc")
-                      .def("get_current_heading", &Device::getCurrentHeading,
+                      .def_property_readonly("orientation", &Device::getOrientation, R"pbdoc(
+                The axis of the IMU the heading is measured around.)pbdoc")
+                      .def("get_current_heading", &Device::getCurrentHeading, py::call_guard<async::DeviceAccess>(),
                            R"pbdoc(
                              Gets the current heading of the device.
                              )pbdoc")
@@ -266,15 +343,85 @@ namespace libstp::device
                            R"pdoc(
                 Converts a Speed object to an AbsoluteSpeed object.
                 )pdoc")
-                      .def("set_max_speeds", &Device::setMaxSpeeds)
+                      .def("set_max_speeds", &Device::setMaxSpeeds, py::call_guard<async::DeviceAccess>())
                       // Context manager support in Python
                       .def("__enter__", [](Device& device) -> Device& { return device; })
                       .def("__exit__", [](Device& device, const py::object&, const py::object&, const py::object&)
                       {
                           device.shutdown();
-                      });
+                      }, py::call_guard<async::DeviceAccess>());
 
         // Register motion bindings
         motion::createMotionBindings(device);
+
+        py::class_<kipr::core::TransferStats>(m, "TransferStats", R"pbdoc(
+            Statistics of the register transfers between the controller and its co-processor.
+        )pbdoc")
+            .def_readonly("transfers", &kipr::core::TransferStats::transfers)
+            .def_readonly("errors", &kipr::core::TransferStats::errors)
+            .def_readonly("desyncs", &kipr::core::TransferStats::desyncs)
+            .def_readonly("ready_timeouts", &kipr::core::TransferStats::readyTimeouts)
+            .def_readonly("overruns", &kipr::core::TransferStats::overruns)
+            .def_readonly("mean_latency_us", &kipr::core::TransferStats::meanLatencyUs)
+            .def_readonly("max_latency_us", &kipr::core::TransferStats::maxLatencyUs)
+            .def("__repr__", [](const kipr::core::TransferStats& s)
+            {
+                return fmt::format("TransferStats(transfers={}, errors={}, desyncs={}, ready_timeouts={}, "
+                                   "overruns={}, mean_latency_us={:.1f}, max_latency_us={:.1f})",
+                                   s.transfers, s.errors, s.desyncs, s.readyTimeouts, s.overruns,
+                                   s.meanLatencyUs, s.maxLatencyUs);
+            });
+
+        m.def("register_transfer_stats", []
+        {
+            return kipr::core::Platform::instance()->transferStats();
+        }, R"pbdoc(
+            Returns:
+                TransferStats: Transfers, errors and SPI latency since the start or the last reset.
+        )pbdoc");
+
+        m.def("reset_register_transfer_stats", []
+        {
+            kipr::core::Platform::instance()->resetTransferStats();
+        });
+
+        m.def("set_register_frame_rate", [](const std::uint32_t hz)
+        {
+            kipr::core::Platform::instance()->setFrameRate(hz);
+        }, py::arg("hz"), R"pbdoc(
+            Exchanges the registers with the co-processor at a fixed rate in the background. Sensor reads are
+            served from the latest frame and motor commands go out with the next one.
+
+            Args:
+                hz (int): Frames per second, 0 to transfer on demand.
+        )pbdoc");
+
+        m.def("wait_for_register_frame", [](const double timeout)
+        {
+            py::gil_scoped_release release;
+            return kipr::core::Platform::instance()->waitForFrame(static_cast<std::uint32_t>(timeout * 1e6));
+        }, py::arg("timeout") = 0.1, R"pbdoc(
+            Blocks until the next register frame was exchanged, to run a loop in step with the hardware.
+
+            Args:
+                timeout (float): Longest wait in seconds.
+
+            Returns:
+                bool: False on timeout, True at once without a frame rate.
+        )pbdoc");
+
+        m.def("set_register_ready_line", [](const std::string& chip, const std::uint32_t line)
+        {
+            return kipr::core::Platform::instance()->setReadyLine(chip, line);
+        }, py::arg("chip"), py::arg("line"), R"pbdoc(
+            Paces the transfers with the ready line of the co-processor instead of a fixed gap.
+
+            Args:
+                chip (str): GPIO chip, e.g. "gpiochip0", empty to use the gap again.
+                line (int): Line offset on the chip.
+
+            Returns:
+                bool: False if the line cannot be requested.
+        )pbdoc");
     }
 }
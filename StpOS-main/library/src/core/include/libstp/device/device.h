@@ -8,8 +8,17 @@
 #include "libstp/datatype/axis.h"
 #include "libstp/datatype/speed.h"
 #include "libstp/datatype/functions.h"
+#include "libstp/motion/odometry.h"
+#include "libstp/motor/velocity_estimator.h"
+#include "libstp/sensor/sampler.h"
 #include "libstp/utility/pid.h"
 
+#include <array>
+#include <memory>
+#include <optional>
+#include <span>
+#include <vector>
+
 namespace libstp::device
 {
     class Device
@@ -25,6 +34,21 @@ namespace libstp::device
         float angularMaxAccel = 1.0f; // rad/s^2
 
         float maxVx = 0.0, maxVy = 0.0, maxW = 0.0; // m/s, m/s, rad/s
+
+        motion::Odometry odometry;
+
+        std::vector<std::shared_ptr<motor::VelocityEstimator>> wheelVelocityEstimators;
+
+    protected:
+        // Estimates older than this count as stopped, the drive falls back to the tick differences
+        static constexpr double ESTIMATE_MAX_AGE = 0.05;
+
+        // Upper bound of getWheelMotors().size(), the control loop keeps the wheel speeds in a fixed-size buffer
+        static constexpr std::size_t MAX_WHEELS = 4;
+
+        // False until the first drive step baselines the encoders, see forgetWheelTicks
+        mutable bool wheelTicksTracked = false;
+
     public:
         sensor::IMU imu;
         datatype::Direction direction;
@@ -38,16 +62,93 @@ namespace libstp::device
         void setVyPid(float kp, float ki, float kd);
         void setWPid(float kp, float ki, float kd);
         void setHeadingPid(float kp, float ki, float kd);
+
+        // All parameters of the controllers including feed-forward and anti-windup, the setters above only change the gains
+        [[nodiscard]] const utility::PidParameters& getVxPidParameters() const;
+        [[nodiscard]] const utility::PidParameters& getVyPidParameters() const;
+        [[nodiscard]] const utility::PidParameters& getWPidParameters() const;
+        [[nodiscard]] const utility::PidParameters& getHeadingPidParameters() const;
+        void setVxPidParameters(const utility::PidParameters& parameters);
+        void setVyPidParameters(const utility::PidParameters& parameters);
+        void setWPidParameters(const utility::PidParameters& parameters);
+        void setHeadingPidParameters(const utility::PidParameters& parameters);
         void setMaxAccel(float maxForwardAccel, float maxStrafeAccel, float maxAngularAccel);
         void setMaxSpeeds(float maxForwardSpeed, float maxStrafeSpeed, float maxAngularSpeed);
         void resetState() const;
         float getCurrentHeading();
 
+        [[nodiscard]] datatype::Axis getOrientation() const
+        {
+            return orientation;
+        }
+
         void setQuaternion(float w, float x, float y, float z)
         {
             attitudeEstimator.setQuaternion(w, x, y, z);
         }
 
+        [[nodiscard]] ahrs::AttitudeEstimator& getAttitudeEstimator()
+        {
+            return attitudeEstimator;
+        }
+
+        [[nodiscard]] motion::Odometry& getOdometry()
+        {
+            return odometry;
+        }
+
+        /**
+         * The wheel ticks are tracked from one drive step to the next so the odometry keeps what happens in
+         * between. Call this after the encoders were reset outside of the drive, the next step then starts
+         * tracking them from their current value instead of counting the reset as motion.
+         */
+        void forgetWheelTicks() const
+        {
+            wheelTicksTracked = false;
+            for (const auto& estimator : wheelVelocityEstimators)
+                estimator->reset();
+        }
+
+        /**
+         * Feeds a velocity estimator per wheel from the sampler. While they are updated, the speed controllers act
+         * on their estimates instead of the tick differences over one control loop period, which are quantized to
+         * whole ticks and follow the timing of the loop. The odometry keeps counting the ticks.
+         * The sampler must be stopped, start it afterwards.
+         *
+         * @param bandwidth Of the estimators in rad/s, see motor::VelocityEstimator.
+         * @return The estimators in the order of getWheelMotors().
+         */
+        std::vector<std::shared_ptr<motor::VelocityEstimator>> estimateWheelVelocities(
+            sensor::Sampler& sampler, double bandwidth = 50.0);
+
+        /**
+         * Uses estimators the caller updates, one per wheel in the order of getWheelMotors().
+         * An empty list goes back to the tick differences.
+         */
+        void setWheelVelocityEstimators(std::vector<std::shared_ptr<motor::VelocityEstimator>> estimators);
+
+        [[nodiscard]] const std::vector<std::shared_ptr<motor::VelocityEstimator>>& getWheelVelocityEstimators() const
+        {
+            return wheelVelocityEstimators;
+        }
+
+        [[nodiscard]] virtual std::vector<motor::Motor> getWheelMotors() const
+        {
+            throw std::runtime_error("Not implemented");
+        }
+
+        /**
+         * @return Forward and strafe speed in m/s from the wheel velocity estimators, nothing without estimators
+         *         or if one was not updated within ESTIMATE_MAX_AGE.
+         */
+        [[nodiscard]] std::optional<std::pair<float, float>> getEstimatedVelocities() const;
+
+        // Forward and strafe speed in m/s of wheel speeds in ticks per second, in the order of getWheelMotors()
+        [[nodiscard]] virtual std::pair<float, float> toBodyVelocities(std::span<const double> wheelTicksPerSecond) const
+        {
+            throw std::runtime_error("Not implemented");
+        }
+
         virtual void initializeKinematicDriveController();
 
         virtual std::tuple<float, float, float> computeMaxSpeeds()
@@ -79,6 +180,11 @@ namespace libstp::device
         
         datatype::AbsoluteSpeed toAbsoluteSpeed(datatype::Speed speed, bool throttleMaxSpeed);
 
+        /**
+         * Limits of planned moves per datatype::ProfileAxis: the maximum speed and the acceleration of the ramp.
+         */
+        std::array<motion::ProfileLimits, 3> computeProfileLimits(bool throttleMaxSpeed);
+
         async::AsyncAlgorithm<int> driveArc(
             datatype::ConditionalFunction condition,
             float radiusCentiMeters,
@@ -92,7 +198,10 @@ namespace libstp::device
                                                          bool resetRamps = true);
 
         async::AsyncAlgorithm<int> setSpeedWhile(datatype::ConditionalFunction condition,
-                                                 datatype::Speed constantSpeed);
+                                                 datatype::Speed constantSpeed,
+                                                 bool doCorrection = true,
+                                                 bool autoStopDevice = true,
+                                                 bool resetRamps = true);
 
         void debugApplyKinematicsModel(float forward, float strafe, float angular)
         {
@@ -5,14 +5,71 @@
 #pragma once
 
 #include <pybind11/pybind11.h>
+#include <pybind11/numpy.h>
+#include <pybind11/stl.h>
 #include "libstp/filter/filters.h"
+#include "libstp/filter/filter_bank.h"
+#include "libstp/filter/iir.h"
+#include <array>
 #include <memory>
+#include <optional>
+#include <stdexcept>
 
 namespace py = pybind11;
 
 namespace libstp::filter
 {
-    inline void createFilterBindings(const py::module_& m)
+    // Second-order sections use the scipy layout [b0, b1, b2, a0, a1, a2] on the Python side
+    typedef std::array<double, 6> SosRow;
+
+    inline std::vector<SosSection> toSections(const std::vector<SosRow>& rows)
+    {
+        std::vector<SosSection> sections;
+        for (const auto& [b0, b1, b2, a0, a1, a2] : rows)
+        {
+            if (a0 == 0.0)
+                throw std::invalid_argument("a0 of a second-order section must not be zero");
+            sections.push_back({b0 / a0, b1 / a0, b2 / a0, a1 / a0, a2 / a0});
+        }
+        return sections;
+    }
+
+    inline std::vector<SosRow> toRows(const std::vector<SosSection>& sections)
+    {
+        std::vector<SosRow> rows;
+        for (const auto& [b0, b1, b2, a1, a2] : sections)
+        {
+            rows.push_back({b0, b1, b2, 1.0, a1, a2});
+        }
+        return rows;
+    }
+
+    typedef py::array_t<double, py::array::c_style | py::array::forcecast> FrameInput;
+    typedef py::array_t<double, py::array::c_style> FrameOutput;
+
+    // Filters a (channels,) frame or a (frames, channels) block. Float64 C-contiguous input is read without a copy.
+    inline FrameOutput filterFrames(FilterBank& bank, const FrameInput& data, std::optional<FrameOutput> out)
+    {
+        const auto channels = static_cast<py::ssize_t>(bank.getChannels());
+        if ((data.ndim() != 1 && data.ndim() != 2) || data.shape(data.ndim() - 1) != channels)
+            throw py::value_error("Expected an array of shape (" + std::to_string(channels) + ",) or (frames, "
+                + std::to_string(channels) + ")");
+
+        if (!out)
+        {
+            out = FrameOutput(std::vector<py::ssize_t>(data.shape(), data.shape() + data.ndim()));
+        }
+        else if (out->ndim() != data.ndim() || !std::equal(data.shape(), data.shape() + data.ndim(), out->shape()))
+        {
+            throw py::value_error("out must have the same shape as the input");
+        }
+
+        const auto frames = static_cast<std::size_t>(data.ndim() == 2 ? data.shape(0) : 1);
+        bank.process(data.data(), out->mutable_data(), frames);
+        return *out;
+    }
+
+    inline void createFilterBindings(py::module_& m)
     {
         py::class_<Filter, std::shared_ptr<Filter>>(m, "Filter", R"pbdoc(
             Represents a generic filter with warm-up capabilities.
@@ -58,7 +115,7 @@ namespace libstp::filter
 
             This filter allows custom filtering logic to be defined via a Python function.
         )pbdoc")
-            .def(py::init<const std::function<double(double)>&>(), py::arg("filter_function"), R"pbdoc(
+            .def(py::init<std::function<double(double)>>(), py::arg("filter_function"), R"pbdoc(
                 Initializes a new instance of the FunctionFilter class.
 
                 Args:
@@ -117,5 +174,122 @@ namespace libstp::filter
                     window_size (int): The number of data points for the moving average.
                     alpha (float): The smoothing factor for the low-pass filter (0 < alpha < 1).
             )pbdoc");
+    
+        m.def("butterworth", [](const int order, const double cutoff, const double sampleRate, const bool highPass)
+        {
+            return toRows(butterworth(order, cutoff, sampleRate, highPass));
+        }, py::arg("order"), py::arg("cutoff"), py::arg("sample_rate"), py::arg("high_pass") = false, R"pbdoc(
+            Designs a digital Butterworth filter as second-order sections.
+
+            Args:
+                order (int): The filter order.
+                cutoff (float): The cutoff frequency in Hz.
+                sample_rate (float): The sample rate in Hz.
+                high_pass (bool): Design a high-pass instead of a low-pass filter.
+
+            Returns:
+                List[List[float]]: Sections in the scipy layout [b0, b1, b2, a0, a1, a2].
+        )pbdoc");
+
+        py::class_<SosFilter, Filter, std::shared_ptr<SosFilter>>(m, "SosFilter", R"pbdoc(
+            A causal IIR filter over cascaded second-order sections with O(1) work per sample.
+
+            The state is initialized to the steady state of the first data point, so there is no start-up transient.
+        )pbdoc")
+            .def(py::init([](const std::vector<SosRow>& sos)
+            {
+                return std::make_shared<SosFilter>(toSections(sos));
+            }), py::arg("sos"), R"pbdoc(
+                Initializes a new instance of the SosFilter class.
+
+                Args:
+                    sos (List[List[float]]): Sections in the scipy layout [b0, b1, b2, a0, a1, a2], e.g. from butterworth().
+            )pbdoc")
+            .def("reset", &SosFilter::reset, py::arg("value") = 0.0, R"pbdoc(
+                Resets the state to the steady state of a constant input.
+
+                Args:
+                    value (float): The constant input.
+            )pbdoc")
+            .def_property_readonly("sos", [](const SosFilter& self)
+            {
+                return toRows(self.getSections());
+            }, R"pbdoc(
+                List[List[float]]: The sections in the scipy layout.
+            )pbdoc");
+    
+        py::class_<FilterBank, std::shared_ptr<FilterBank>>(m, "FilterBank", R"pbdoc(
+            Runs the same filter over several channels at once, e.g. all light sensors or the three IMU axes.
+
+            Calling the bank filters a frame of shape (channels,) or a block of shape (frames, channels).
+            Float64 C-contiguous arrays are read without a copy, other sequences are converted first.
+        )pbdoc")
+            .def("__call__", &filterFrames, py::arg("data"), py::arg("out").noconvert() = py::none(), R"pbdoc(
+                Filters the next frames of all channels.
+
+                Args:
+                    data (numpy.ndarray): Samples of shape (channels,) or (frames, channels).
+                    out (numpy.ndarray, optional): Float64 C-contiguous array of the same shape for the result.
+                        Pass data itself to filter in place.
+
+                Returns:
+                    numpy.ndarray: The filtered samples, out if it was given.
+            )pbdoc")
+            .def("reset", &FilterBank::reset, R"pbdoc(
+                Forgets the history of all channels.
+            )pbdoc")
+            .def_property_readonly("channels", &FilterBank::getChannels);
+
+        py::class_<SosFilterBank, FilterBank, std::shared_ptr<SosFilterBank>>(m, "SosFilterBank", R"pbdoc(
+            A bank of IIR filters over cascaded second-order sections, one per channel.
+
+            Every channel starts in the steady state of its first sample, like SosFilter.
+        )pbdoc")
+            .def(py::init([](const std::size_t channels, const std::vector<SosRow>& sos)
+            {
+                return std::make_shared<SosFilterBank>(channels, toSections(sos));
+            }), py::arg("channels"), py::arg("sos"), R"pbdoc(
+                Initializes a new instance of the SosFilterBank class.
+
+                Args:
+                    channels (int): The number of channels.
+                    sos (List[List[float]]): Sections in the scipy layout [b0, b1, b2, a0, a1, a2].
+            )pbdoc")
+            .def_static("butterworth", [](const std::size_t channels, const int order, const double cutoff,
+                                          const double sampleRate, const bool highPass)
+            {
+                return std::make_shared<SosFilterBank>(channels, butterworth(order, cutoff, sampleRate, highPass));
+            }, py::arg("channels"), py::arg("order"), py::arg("cutoff"), py::arg("sample_rate"),
+                        py::arg("high_pass") = false, R"pbdoc(
+                Creates a bank of Butterworth filters.
+
+                Args:
+                    channels (int): The number of channels.
+                    order (int): The filter order.
+                    cutoff (float): The cutoff frequency in Hz.
+                    sample_rate (float): The sample rate in Hz.
+                    high_pass (bool): Design a high-pass instead of a low-pass filter.
+
+                Returns:
+                    SosFilterBank: The filter bank.
+            )pbdoc")
+            .def_property_readonly("sos", [](const SosFilterBank& self)
+            {
+                return toRows(self.getSections());
+            }, R"pbdoc(
+                List[List[float]]: The sections in the scipy layout.
+            )pbdoc");
+
+        py::class_<MedianFilterBank, FilterBank, std::shared_ptr<MedianFilterBank>>(m, "MedianFilterBank", R"pbdoc(
+            A running median over the last samples of every channel, removes single-sample spikes.
+        )pbdoc")
+            .def(py::init<std::size_t, std::size_t>(), py::arg("channels"), py::arg("window_size"), R"pbdoc(
+                Initializes a new instance of the MedianFilterBank class.
+
+                Args:
+                    channels (int): The number of channels.
+                    window_size (int): The number of samples the median is taken over.
+            )pbdoc")
+            .def_property_readonly("window_size", &MedianFilterBank::getWindow);
     }
 }
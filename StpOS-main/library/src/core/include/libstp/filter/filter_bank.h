@@ -0,0 +1,87 @@
+//
+// Created by tobias on 10/18/26.
+//
+
+#pragma once
+#include <cstddef>
+#include <vector>
+
+#include "iir.h"
+
+namespace libstp::filter
+{
+    /**
+     * Runs the same filter over N independent channels.
+     * Samples are stored frame by frame: frame i of channel c is at data[i * channels + c].
+     * Input and output may point to the same buffer to filter in place.
+     */
+    class FilterBank
+    {
+    public:
+        explicit FilterBank(std::size_t channels);
+
+        virtual ~FilterBank() = default;
+
+        /**
+         * Filters `frames` consecutive frames of all channels.
+         */
+        virtual void process(const double* input, double* output, std::size_t frames) = 0;
+
+        // Forgets the history of all channels, the next frame starts the filter from scratch
+        virtual void reset() = 0;
+
+        [[nodiscard]] std::size_t getChannels() const;
+
+    protected:
+        std::size_t channels;
+    };
+
+    /**
+     * Cascaded second-order sections (direct form II transposed) for every channel.
+     * Like SosFilter, each channel starts in the steady state of its first sample.
+     */
+    class SosFilterBank final : public FilterBank
+    {
+    public:
+        SosFilterBank(std::size_t channels, std::vector<SosSection> sections);
+
+        void process(const double* input, double* output, std::size_t frames) override;
+
+        void reset() override;
+
+        [[nodiscard]] const std::vector<SosSection>& getSections() const;
+
+    private:
+        void initialize_(const double* frame);
+
+        std::vector<SosSection> sections;
+        // State of section s and channel c at [s * channels + c], channels are innermost so the loop vectorizes
+        std::vector<double> z1;
+        std::vector<double> z2;
+        bool initialized = false;
+    };
+
+    /**
+     * Running median over the last `window` samples of every channel.
+     * Until the window is filled, the median of the samples seen so far is returned.
+     */
+    class MedianFilterBank final : public FilterBank
+    {
+    public:
+        MedianFilterBank(std::size_t channels, std::size_t window);
+
+        void process(const double* input, double* output, std::size_t frames) override;
+
+        void reset() override;
+
+        [[nodiscard]] std::size_t getWindow() const;
+
+    private:
+        std::size_t window;
+        // History of channel c at [c * window, (c + 1) * window)
+        std::vector<double> history;
+        std::vector<double> scratch;
+        std::size_t index = 0;
+        std::size_t filled = 0;
+    };
+}
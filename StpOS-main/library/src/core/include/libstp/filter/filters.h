@@ -4,6 +4,7 @@
 
 #pragma once
 #include <functional>
+#include <vector>
 
 
 namespace libstp::filter
@@ -40,11 +41,12 @@ namespace libstp::filter
 
     class FunctionFilter final : public Filter
     {
-        const std::function<double(double)>& filterFunction;
+        // Owned by value, the function passed in is often a temporary (e.g. a converted Python callable)
+        std::function<double(double)> filterFunction;
 
     public:
-        explicit FunctionFilter(const std::function<double(double)>& filterFunction) : Filter(1),
-            filterFunction(filterFunction)
+        explicit FunctionFilter(std::function<double(double)> filterFunction) : Filter(1),
+            filterFunction(std::move(filterFunction))
         {
         }
 
@@ -0,0 +1,58 @@
+//
+// Created by tobias on 10/18/26.
+//
+
+#pragma once
+#include <vector>
+
+#include "filters.h"
+
+namespace libstp::filter
+{
+    /**
+     * One second-order section, normalized so that a0 == 1.
+     */
+    struct SosSection
+    {
+        double b0, b1, b2;
+        double a1, a2;
+    };
+
+    /**
+     * Designs a digital Butterworth filter (bilinear transform with pre-warping) as second-order sections.
+     *
+     * @param order Filter order, odd orders end with a first-order section
+     * @param cutoff Cutoff frequency in Hz, must be below sampleRate / 2
+     * @param sampleRate Sample rate in Hz
+     * @param highPass Design a high-pass instead of a low-pass filter
+     */
+    std::vector<SosSection> butterworth(int order, double cutoff, double sampleRate, bool highPass = false);
+
+    /**
+     * Causal IIR filter over cascaded second-order sections (direct form II transposed).
+     * Every sample costs O(sections), no history has to be kept.
+     */
+    class SosFilter final : public Filter
+    {
+    public:
+        explicit SosFilter(std::vector<SosSection> sections);
+
+        double filter(double dataPoint) override;
+
+        // Sets the state to the steady state for a constant input, which avoids the start-up transient
+        void reset(double value = 0.0);
+
+        [[nodiscard]] const std::vector<SosSection>& getSections() const;
+
+    private:
+        struct State
+        {
+            double z1 = 0.0;
+            double z2 = 0.0;
+        };
+
+        std::vector<SosSection> sections;
+        std::vector<State> state;
+        bool initialized = false;
+    };
+}
@@ -9,6 +9,7 @@
 #include "drive_straight.h"
 #include "line_follower.h"
 #include "line_up.h"
+#include "odometry.h"
 #include "rotate.h"
 #include "libstp/datatype/bindings.h"
 #include "libstp/utility/constants.h"
@@ -18,6 +19,48 @@ namespace py = pybind11;
 
 namespace libstp::motion
 {
+    inline void createOdometryBindings(const py::module_& m)
+    {
+        py::class_<Pose>(m, "Pose", R"pbdoc(
+            Pose of the device from its odometry. x points forward at the last reset, y and the heading follow
+            the strafe and turn convention of the device.
+        )pbdoc")
+            .def_readonly("x", &Pose::x, "float: In m.")
+            .def_readonly("y", &Pose::y, "float: In m.")
+            .def_readonly("heading", &Pose::heading, "float: Unwrapped, in rad.")
+            .def_readonly("distance", &Pose::distance, "float: Distance travelled since the reset in m.")
+            .def_readonly("timestamp", &Pose::timestamp, "float: Monotonic time of the last update in seconds.")
+            .def_readonly("sequence", &Pose::sequence, "int: Number of updates since the reset.")
+            .def("__repr__", [](const Pose& self)
+            {
+                return "<Pose x=" + std::to_string(self.x) + " y=" + std::to_string(self.y)
+                    + " heading=" + std::to_string(self.heading) + ">";
+            });
+
+        py::class_<Odometry>(m, "Odometry", R"pbdoc(
+            Pose of a device integrated from its wheels and gyro on every tick of set_speed_while, see
+            NativeDevice.odometry. It carries over from one step to the next.
+
+            Example:
+                >>> device.odometry.reset()
+                >>> await to_task(device.set_speed_while(until_x(50), Speed(0.5, 0, 0)))
+                >>> device.odometry.get_pose().x
+        )pbdoc")
+            .def("get_pose", &Odometry::getPose, R"pbdoc(
+                Returns:
+                    Pose: The pose after the last control tick. Never blocks.
+            )pbdoc")
+            .def("reset", &Odometry::reset, py::arg("x") = 0.0, py::arg("y") = 0.0, py::arg("heading") = 0.0,
+                 R"pbdoc(
+                Moves the pose to the given one, e.g. a known start position on the table.
+
+                Args:
+                    x (float): In m.
+                    y (float): In m.
+                    heading (float): In rad.
+            )pbdoc");
+    }
+
     template <typename PyClass>
     void createMotionBindings(PyClass& m)
     {
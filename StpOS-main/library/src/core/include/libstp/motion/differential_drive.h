@@ -42,6 +42,7 @@ namespace libstp::motion
               headingPid(utility::PIDController()),
               device(device)
         {
+            state.odometry = &device->getOdometry();
         }
 
         void setPIDParameters(
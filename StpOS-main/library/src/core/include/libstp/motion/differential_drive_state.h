@@ -5,12 +5,16 @@
 #pragma once
 #include <functional>
 
+#include "libstp/motion/odometry.h"
+
 namespace libstp::motion
 {
     struct DifferentialDriveState
     {
         float currentHeading, desiredHeading;
+        float headingFeedForward = 0.0f; // rad/s added to the heading correction while the desired heading moves
         std::function<std::pair<float, float>()> computeDrivenDistance;
+        const Odometry* odometry = nullptr; // The odometry of the device, read by the pose conditions
         
         // Speed ramp state variables
         float rampedForwardMs = 0.0f;
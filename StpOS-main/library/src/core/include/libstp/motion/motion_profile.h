@@ -0,0 +1,78 @@
+//
+// Created by tobias on 10/18/26.
+//
+
+#pragma once
+
+#include <array>
+
+namespace libstp::motion
+{
+    struct ProfileLimits
+    {
+        double maxVelocity = 0.0; // Units per second
+        double maxAcceleration = 0.0; // Units per second^2
+        double maxJerk = 0.0; // Units per second^3, 0 for a trapezoidal profile
+    };
+
+    struct ProfileState
+    {
+        double position = 0.0;
+        double velocity = 0.0;
+        double acceleration = 0.0;
+    };
+
+    /**
+     * Time optimal move over a distance or angle, starting and ending at rest.
+     *
+     * Without a jerk limit the velocity follows a trapezoid: full acceleration, cruise, full deceleration.
+     * With one it is an S-curve whose acceleration ramps with the jerk, which is gentler on the wheels.
+     * Short moves that cannot reach the velocity or acceleration limit use the largest reachable peak.
+     */
+    class MotionProfile
+    {
+    public:
+        MotionProfile() = default;
+
+        /**
+         * Plans the move.
+         *
+         * @param distance Signed distance of the move, the profile runs backwards for a negative one.
+         * @param limits Positive velocity and acceleration limits, a non-positive one results in an empty move.
+         */
+        MotionProfile(double distance, const ProfileLimits& limits);
+
+        /**
+         * @param t Seconds since the start of the move, clamped to the move.
+         */
+        [[nodiscard]] ProfileState sample(double t) const;
+
+        [[nodiscard]] double getDuration() const;
+
+        [[nodiscard]] double getDistance() const;
+
+        /**
+         * @return The highest velocity of the move, below the limit for short moves.
+         */
+        [[nodiscard]] double getPeakVelocity() const;
+
+    private:
+        // Constant jerk phases, a trapezoid has zero jerk and jumps in acceleration between them
+        struct Segment
+        {
+            double start = 0.0;
+            double duration = 0.0;
+            double jerk = 0.0;
+            ProfileState state;
+        };
+
+        double distance_ = 0.0;
+        double direction_ = 1.0;
+        double peakVelocity_ = 0.0;
+        double duration_ = 0.0;
+        std::array<Segment, 7> segments_{};
+        int segmentCount_ = 0;
+
+        void addSegment(double duration, double acceleration, double jerk);
+    };
+}
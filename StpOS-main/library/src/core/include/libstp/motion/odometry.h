@@ -0,0 +1,67 @@
+//
+// Created by tobias on 10/18/26.
+//
+
+#pragma once
+
+#include <cstdint>
+#include <mutex>
+
+#include "libstp/thread/seqlock.h"
+
+namespace libstp::motion
+{
+    /**
+     * Pose of the device in the frame it had when the odometry was last reset. x points forward, y and the
+     * heading follow the strafe and turn convention of the device, like its speeds and getCurrentHeading.
+     */
+    struct Pose
+    {
+        double x = 0.0; // m
+        double y = 0.0; // m
+        double heading = 0.0; // rad, unwrapped
+        double distance = 0.0; // m travelled since the reset, in any direction
+        double timestamp = 0.0; // Monotonic seconds of the last update
+        std::uint64_t sequence = 0; // Number of updates since the reset
+    };
+
+    /**
+     * Integrates the wheel displacements and the heading of every control tick into a pose.
+     *
+     * It lives as long as its device, so the pose carries over from one drive step to the next. The control
+     * loop is the only one integrating, the pose is published through a SeqLock and can be read from any thread
+     * without locking.
+     */
+    class Odometry
+    {
+    public:
+        Odometry() = default;
+
+        Odometry(const Odometry&) = delete;
+        Odometry& operator=(const Odometry&) = delete;
+
+        /**
+         * Adds one step of the device.
+         *
+         * @param forwardM Displacement along the heading at the start of the step.
+         * @param strafeM Displacement sideways to it.
+         * @param headingDeltaRad Rotation during the step, the displacement is applied at its midpoint.
+         */
+        void integrate(double forwardM, double strafeM, double headingDeltaRad);
+
+        /**
+         * Moves the pose to the given one, e.g. to a known position on the table.
+         */
+        void reset(double x = 0.0, double y = 0.0, double heading = 0.0);
+
+        /**
+         * @return The last published pose. Never blocks.
+         */
+        [[nodiscard]] Pose getPose() const;
+
+    private:
+        std::mutex writeMutex_; // Only between integrate and reset, readers go through the SeqLock
+        Pose pose_;
+        threads::SeqLock<Pose> published_;
+    };
+}
@@ -4,14 +4,26 @@
 
 #pragma once
 
+#include <optional>
+
 #include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
+#include "libstp/async/bindings.h"
 #include "motor.h"
 #include "servo_like_motor.h"
+#include "velocity_estimator.h"
 
 namespace py = pybind11;
 
 namespace libstp::motor
 {
+    // The WriteBatch a `with` block of this thread has open, Python blocks do not nest
+    inline const WriteBatch*& openPythonBatch()
+    {
+        thread_local const WriteBatch* batch = nullptr;
+        return batch;
+    }
+
     inline void createMotorBindings(const py::module_& m)
     {
         py::class_<Motor, std::shared_ptr<Motor>>(m, "Motor", R"pbdoc(
@@ -27,18 +39,33 @@ namespace libstp::motor
                     reverse_polarity (bool): Whether to reverse the motor polarity.
             )pbdoc")
 
-            .def("get_current_position_estimate", &Motor::getCurrentPositionEstimate, R"pbdoc(
+            .def("get_port", &Motor::getPort, R"pbdoc(
+                Gets the port number of the motor.
+
+                Returns:
+                    int: The port number.
+            )pbdoc")
+
+            .def("is_reversed", &Motor::isReversed, R"pbdoc(
+                Returns:
+                    bool: Whether the motor was created with a reversed polarity.
+            )pbdoc")
+
+            .def("get_current_position_estimate", &Motor::getCurrentPositionEstimate,
+                 py::call_guard<async::DeviceAccess>(), R"pbdoc(
                 Gets the current position estimate of the motor. The position will be positive for a forward drive, and negative for a reverse drive.
 
                 Returns:
                     int: The current position estimate in ticks.
             )pbdoc")
 
-            .def("reset_position_estimate", &Motor::resetPositionEstimate, R"pbdoc(
+            .def("reset_position_estimate", &Motor::resetPositionEstimate, py::call_guard<async::DeviceAccess>(),
+                 R"pbdoc(
                 Resets the position estimate of the motor to zero.
             )pbdoc")
 
-            .def("set_velocity", &Motor::setVelocity, py::arg("velocity"), R"pbdoc(
+            .def("set_velocity", &Motor::setVelocity, py::call_guard<async::DeviceAccess>(),
+                 py::arg("velocity"), R"pbdoc(
                 Sets the motor velocity.
 
                 Args:
@@ -65,13 +92,73 @@ namespace libstp::motor
                     ticks (int): The target position in ticks.
                     velocity (int): The velocity in ticks per second.)pbdoc")
 
-            .def("stop", &Motor::stop, R"pbdoc(
+            .def("stop", &Motor::stop, py::call_guard<async::DeviceAccess>(), R"pbdoc(
                 Stops the motor.
             )pbdoc")
 
+            .def_static("set_velocities", [](const std::vector<std::shared_ptr<Motor>>& motors,
+                                             const std::vector<int>& velocities)
+            {
+                if (motors.size() != velocities.size())
+                    throw py::value_error("Every motor needs exactly one velocity");
+                if (motors.size() > 4)
+                    throw py::value_error("At most four motors can be set at once");
+
+                std::vector<const Motor*> raw;
+                for (const auto& motor : motors)
+                {
+                    if (!motor)
+                        throw py::value_error("Motors must not be None");
+                    raw.push_back(motor.get());
+                }
+                Motor::setVelocities(raw, velocities);
+            }, py::arg("motors"), py::arg("velocities"), R"pbdoc(
+                Sets the velocities of several motors in one register transfer, so they all change speed at the
+                same time.
+
+                Args:
+                    motors (list[Motor]): Up to four motors.
+                    velocities (list[int]): The velocity of each motor in ticks per second.
+
+                Example:
+                    >>> Motor.set_velocities([left, right], [500, 500])
+            )pbdoc")
+
             .def_static("stop_all_motors", &Motor::stopAllMotors, R"pbdoc(
                 Stops all motors.
             )pbdoc");
+
+        py::class_<WriteBatch>(m, "WriteBatch", R"pbdoc(
+            Sends all register writes of a block, e.g. to motors and servos, in one transfer when the block ends.
+            Reads inside the block are served from one transfer as well.
+
+            The block must not await. The batch belongs to the thread, every other task of the event loop would
+            read the cached registers and have its writes deferred until the block ends. Entering a second
+            WriteBatch on a thread while one is open raises a RuntimeError, which catches two tasks interleaving
+            their blocks.
+
+            Example:
+                >>> with WriteBatch():
+                ...     arm.set_position(300)
+                ...     claw.set_position(1200)
+                ...     roller.set_velocity(800)
+        )pbdoc")
+            .def(py::init<>())
+            .def("__enter__", [](WriteBatch& self) -> WriteBatch&
+            {
+                if (openPythonBatch() != nullptr)
+                    throw std::runtime_error("A WriteBatch is already open on this thread, its block must not await");
+                self.begin();
+                openPythonBatch() = &self;
+                return self;
+            }, py::return_value_policy::reference)
+            .def("__exit__", [](WriteBatch& self, const py::object&, const py::object&, const py::object&)
+            {
+                if (openPythonBatch() == &self)
+                    openPythonBatch() = nullptr;
+                self.end();
+                return false;
+            });
     }
 
     inline void createServoLikeMotorBindings(const py::module_& m)
@@ -87,29 +174,31 @@ namespace libstp::motor
                     reverse_polarity (bool): Whether to reverse the motor polarity.
             )pbdoc")
 
-            .def("disable", &ServoLikeMotor::disable, R"pbdoc(
+            .def("disable", &ServoLikeMotor::disable, py::call_guard<async::DeviceAccess>(), R"pbdoc(
                 Disables the servo motor, cutting power to it.
             )pbdoc")
 
-            .def("enable", &ServoLikeMotor::enable, R"pbdoc(
+            .def("enable", &ServoLikeMotor::enable, py::call_guard<async::DeviceAccess>(), R"pbdoc(
                 Enables the servo motor, providing power to it.
             )pbdoc")
 
-            .def("get_position", &ServoLikeMotor::getPosition, R"pbdoc(
+            .def("get_position", &ServoLikeMotor::getPosition, py::call_guard<async::DeviceAccess>(), R"pbdoc(
                 Gets the current position of the servo motor.
 
                 Returns:
                     int: The current position in ticks.
             )pbdoc")
 
-            .def("set_position", &ServoLikeMotor::setPosition, py::arg("position"), R"pbdoc(
+            .def("set_position", &ServoLikeMotor::setPosition, py::call_guard<async::DeviceAccess>(),
+                 py::arg("position"), R"pbdoc(
                 Sets the position of the servo motor.
 
                 Args:
                     position (int): The target position in ticks.
             )pbdoc")
 
-            .def("set_position_velocity", &ServoLikeMotor::setPositionVelocity, py::arg("position"),
+            .def("set_position_velocity", &ServoLikeMotor::setPositionVelocity, py::call_guard<async::DeviceAccess>(),
+                 py::arg("position"),
                  py::arg("velocity"), R"pbdoc(
                 Sets the target position and velocity for the servo motor.
 
@@ -118,4 +207,60 @@ namespace libstp::motor
                     velocity (int): The velocity in ticks per second.
             )pbdoc");
     }
+
+    inline void createVelocityEstimatorBindings(const py::module_& m)
+    {
+        py::class_<VelocityEstimator, std::shared_ptr<VelocityEstimator>>(m, "VelocityEstimator", R"pbdoc(
+            Estimates the velocity and acceleration of a motor from its encoder with a tracking loop.
+
+            Feed it at a fixed, high rate, e.g. with Sampler.add_motor_velocity, and the estimate does not depend on
+            how regularly the Python loop runs.
+        )pbdoc")
+            .def(py::init<double>(), py::arg("bandwidth") = 50.0, R"pbdoc(
+                Initializes a new VelocityEstimator.
+
+                Args:
+                    bandwidth (float): How fast the estimate follows the encoder in rad/s. Higher values lag less
+                        and pass more quantization noise, the update rate should be at least ten times as high.
+            )pbdoc")
+            .def("update", [](VelocityEstimator& self, const double ticks, const std::optional<double> time)
+            {
+                if (time)
+                    self.update(ticks, *time);
+                else
+                    self.update(ticks);
+            }, py::arg("ticks"), py::arg("time") = py::none(), R"pbdoc(
+                Feeds an encoder reading.
+
+                Args:
+                    ticks (float): The position of the motor in ticks.
+                    time (float, optional): When the ticks were read in seconds of the libstp clock, now if None.
+            )pbdoc")
+            .def("reset", &VelocityEstimator::reset, R"pbdoc(
+                Starts over at the next update, e.g. after the position estimate of the motor was reset.
+            )pbdoc")
+            .def("is_fresh", &VelocityEstimator::isFresh, py::arg("max_age") = 0.05, R"pbdoc(
+                Returns:
+                    bool: Whether the last update is at most max_age seconds old.
+            )pbdoc")
+            .def_property_readonly("position", &VelocityEstimator::getPosition, R"pbdoc(
+                float: The filtered position in ticks.
+            )pbdoc")
+            .def_property_readonly("velocity", &VelocityEstimator::getVelocity, R"pbdoc(
+                float: The estimated velocity in ticks per second.
+            )pbdoc")
+            .def_property_readonly("acceleration", &VelocityEstimator::getAcceleration, R"pbdoc(
+                float: The estimated acceleration in ticks per second squared.
+            )pbdoc")
+            .def_property_readonly("last_update", &VelocityEstimator::getLastUpdate, R"pbdoc(
+                float: Time of the last update in seconds of the libstp clock, 0 before the first one.
+            )pbdoc")
+            .def_property("bandwidth", &VelocityEstimator::getBandwidth, &VelocityEstimator::setBandwidth, R"pbdoc(
+                float: The bandwidth of the tracking loop in rad/s.
+            )pbdoc")
+            .def_static("now", &VelocityEstimator::now, R"pbdoc(
+                Returns:
+                    float: The current time of the libstp clock in seconds.
+            )pbdoc");
+    }
 }
@@ -3,6 +3,7 @@
 //
 
 #pragma once
+#include <span>
 #include <spdlog/spdlog.h>
 
 #include "libstp/async/algorithm.h"
@@ -16,15 +17,28 @@ namespace libstp::motor
         int port;
         int reversePolarity;
 
+        // Clamps the velocity, logs out of range requests and applies the polarity
+        [[nodiscard]] int toMotorVelocity(int velocity) const;
+
     public:
         explicit Motor(const int port, const bool reversePolarity = false);
 
+        [[nodiscard]] int getPort() const;
+
+        [[nodiscard]] bool isReversed() const;
+
         [[nodiscard]] int getCurrentPositionEstimate() const;
 
         void resetPositionEstimate() const;
 
         void setVelocity(int velocity) const;
 
+        /**
+         * Sets the velocities of several motors in one write, e.g. all wheels of a drive in one control tick.
+         * Same checks as setVelocity, velocities[i] is the velocity of motors[i].
+         */
+        static void setVelocities(std::span<const Motor* const> motors, std::span<const int> velocities);
+
         async::AsyncAlgorithm<int> moveWhile(datatype::ConditionalFunction condition, int velocity) const;
 
         async::AsyncAlgorithm<int> moveByTicks(int ticks, int velocity = 500) const;
@@ -35,4 +49,24 @@ namespace libstp::motor
 
         static void stopAllMotors();
     };
+
+    /**
+     * Collects the register writes of the calling thread, e.g. motor velocities and servo positions, and sends
+     * them in one transfer at end(). Reads in between are served from one transfer as well. Batches nest and
+     * must not span a co_yield, the next tick of an algorithm may run on another thread.
+     */
+    class WriteBatch
+    {
+        bool active = false;
+
+    public:
+        WriteBatch() = default;
+        WriteBatch(const WriteBatch&) = delete;
+        WriteBatch& operator=(const WriteBatch&) = delete;
+        ~WriteBatch();
+
+        void begin();
+
+        void end();
+    };
 }
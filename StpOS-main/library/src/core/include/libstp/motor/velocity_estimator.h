@@ -0,0 +1,95 @@
+//
+// Created by tobias on 10/18/26.
+//
+
+#pragma once
+
+#include <atomic>
+
+namespace libstp::motor
+{
+    /**
+     * Estimates the speed and acceleration of a motor from its encoder with a third order tracking loop.
+     *
+     * Every update predicts the position from the last estimate and corrects position, velocity and
+     * acceleration by the prediction error, with all three poles of the loop at the bandwidth. Unlike the tick
+     * difference over one control loop period, the estimate is not quantized to whole ticks per period and does
+     * not depend on how regularly the control loop runs, as long as the updates come at a fixed, high rate, e.g.
+     * from a sensor::Sampler (see Sampler::addMotorVelocity).
+     *
+     * One thread updates, any thread may read.
+     */
+    class VelocityEstimator
+    {
+    public:
+        /**
+         * @param bandwidth How fast the estimate follows the encoder in rad/s. Higher values lag less and pass
+         *        more quantization noise, the update rate should be at least ten times as high.
+         */
+        explicit VelocityEstimator(double bandwidth = 50.0);
+
+        /**
+         * Feeds an encoder reading taken now, by libstp::utility::Clock.
+         */
+        void update(double ticks);
+
+        /**
+         * @param timeSeconds When the ticks were read, in seconds of libstp::utility::Clock.
+         */
+        void update(double ticks, double timeSeconds);
+
+        /**
+         * Starts over at the next update, e.g. after the position counter was reset.
+         */
+        void reset();
+
+        [[nodiscard]] double getPosition() const;
+
+        /**
+         * @return Ticks per second.
+         */
+        [[nodiscard]] double getVelocity() const;
+
+        /**
+         * @return Ticks per second squared.
+         */
+        [[nodiscard]] double getAcceleration() const;
+
+        /**
+         * @return Seconds of libstp::utility::Clock of the last update, 0 before the first one.
+         */
+        [[nodiscard]] double getLastUpdate() const;
+
+        /**
+         * @return Whether the last update is at most maxAge seconds old.
+         */
+        [[nodiscard]] bool isFresh(double maxAge) const;
+
+        [[nodiscard]] double getBandwidth() const;
+
+        void setBandwidth(double bandwidth);
+
+        /**
+         * @return Seconds of libstp::utility::Clock.
+         */
+        static double now();
+
+    private:
+        // Longer gaps between updates, e.g. a stopped sampler, start the estimate over
+        static constexpr double MAX_UPDATE_GAP = 0.1;
+
+        std::atomic<double> bandwidth_;
+        std::atomic<bool> resetRequested_ = true;
+
+        // Only touched by the updating thread
+        double position_ = 0.0;
+        double velocity_ = 0.0;
+        double acceleration_ = 0.0;
+        double lastTime_ = 0.0;
+
+        std::atomic<double> publishedPosition_ = 0.0;
+        std::atomic<double> publishedVelocity_ = 0.0;
+        std::atomic<double> publishedAcceleration_ = 0.0;
+        std::atomic<double> publishedTime_ = 0.0;
+    };
+}
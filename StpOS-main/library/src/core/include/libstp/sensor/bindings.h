@@ -7,8 +7,11 @@
 #include <pybind11/pybind11.h>
 #include <pybind11/eigen.h>
 #include <pybind11/stl.h>
+#include <pybind11/numpy.h>
 #include "imu.h"
 #include "sensor.h"
+#include "sampler.h"
+#include "snapshot.h"
 #include "ir_light_sensor.h"
 
 namespace py = pybind11;
@@ -230,7 +233,14 @@ namespace libstp::sensor
             .def("get_bias", [](GyroSensor& self) {
                 auto bias = self.getBias();
                 return std::make_tuple((*bias)[0], (*bias)[1], (*bias)[2]);
-            }, "Get the gyroscope bias as (x,y,z) tuple");
+            }, "Get the gyroscope bias as (x,y,z) tuple")
+            .def("set_bias", [](GyroSensor& self, const std::tuple<double, double, double>& bias) {
+                self.setBias(std::make_shared<Vector3d>(std::get<0>(bias), std::get<1>(bias), std::get<2>(bias)));
+            }, "Restore a gyroscope bias, e.g. from the calibration store")
+            .def("set_variance", [](GyroSensor& self, const std::tuple<double, double, double>& variance) {
+                self.setVariance(std::make_shared<Vector3d>(std::get<0>(variance), std::get<1>(variance),
+                                                            std::get<2>(variance)));
+            }, "Restore the variance of the gyroscope readings");
 
         py::class_<AccelSensor>(m, "AccelSensor")
             .def(py::init<>())
@@ -260,7 +270,18 @@ namespace libstp::sensor
             .def("get_gravity", [](AccelSensor& self) {
                 auto gravity = self.getGravity();
                 return std::make_tuple((*gravity)[0], (*gravity)[1], (*gravity)[2]);
-            }, "Get the measured gravity vector as (x,y,z) tuple");
+            }, "Get the measured gravity vector as (x,y,z) tuple")
+            .def("set_bias", [](AccelSensor& self, const std::tuple<double, double, double>& bias) {
+                self.setBias(std::make_shared<Vector3d>(std::get<0>(bias), std::get<1>(bias), std::get<2>(bias)));
+            }, "Restore an accelerometer bias, e.g. from the calibration store")
+            .def("set_variance", [](AccelSensor& self, const std::tuple<double, double, double>& variance) {
+                self.setVariance(std::make_shared<Vector3d>(std::get<0>(variance), std::get<1>(variance),
+                                                            std::get<2>(variance)));
+            }, "Restore the variance of the accelerometer readings")
+            .def("set_gravity", [](AccelSensor& self, const std::tuple<double, double, double>& gravity) {
+                self.setGravity(std::make_shared<Vector3d>(std::get<0>(gravity), std::get<1>(gravity),
+                                                           std::get<2>(gravity)));
+            }, "Restore the gravity vector detected by calibrate");
 
         py::class_<MagnetoSensor>(m, "MagnetoSensor")
             .def(py::init<>())
@@ -304,6 +325,20 @@ namespace libstp::sensor
             .def_readonly("accel", &IMU::accel)
             .def_readonly("magneto", &IMU::magneto)
             .def("calibrate", &IMU::calibrate, "Perform IMU calibration with a given sample count")
+            .def("validate_calibration", &IMU::validateCalibration, py::arg("sample_count") = 10,
+                 py::arg("gyro_tolerance") = 0.01, py::arg("accel_tolerance") = 0.3, R"pbdoc(
+                Checks a restored calibration against a few samples instead of calibrating again. The device
+                has to stand still.
+
+                Args:
+                    sample_count (int): Samples averaged, one per tick.
+                    gyro_tolerance (float): Largest mean gyro reading left after the bias correction in rad/s.
+                    accel_tolerance (float): Largest distance of the mean accel reading from the gravity vector
+                        in m/s^2.
+
+                Returns:
+                    AsyncAlgorithmInt: Finishes with 1 if the calibration still holds, 0 otherwise.
+            )pbdoc")
             .def("get_reading", [](const IMU& self) {
                 auto [gyro, accel, magneto] = self.getReading();
                 return std::make_tuple(
@@ -313,5 +348,226 @@ namespace libstp::sensor
                 );
             }, "Get sensor readings as a tuple of (gyro, accel, magneto) where each is a (x,y,z) tuple");
     }
-}
 
+    inline void createSnapshotBindings(const py::module_& m)
+    {
+        py::class_<Snapshot, std::shared_ptr<Snapshot>>(m, "Snapshot", R"pbdoc(
+            Reads analog ports, digital ports, the IMU and motor encoders in one native call.
+
+            The values are kept in one contiguous float64 buffer laid out as
+            [analog..., digital..., gyro xyz, accel xyz, magneto xyz, encoders...].
+        )pbdoc")
+            .def(py::init<std::vector<int>, std::vector<int>, std::vector<std::shared_ptr<motor::Motor>>, const IMU*>(),
+                 py::arg("analog_ports") = std::vector<int>{},
+                 py::arg("digital_ports") = std::vector<int>{},
+                 py::arg("motors") = std::vector<std::shared_ptr<motor::Motor>>{},
+                 py::arg("imu") = nullptr,
+                 py::keep_alive<1, 5>(), R"pbdoc(
+                Initializes a Snapshot for a fixed set of ports.
+
+                Args:
+                    analog_ports (List[int]): Analog ports to read.
+                    digital_ports (List[int]): Digital ports to read.
+                    motors (List[Motor]): Motors whose position estimates are read.
+                    imu (IMU, optional): The calibrated IMU to read, e.g. device.imu.
+            )pbdoc")
+            .def("update", &Snapshot::update, R"pbdoc(
+                Reads all configured ports and refreshes the buffer in place.
+            )pbdoc")
+            .def_property_readonly("timestamp", &Snapshot::getTimestamp, R"pbdoc(
+                float: Monotonic time of the last update in seconds.
+            )pbdoc")
+            .def_property_readonly("sequence", &Snapshot::getSequence, R"pbdoc(
+                int: Number of updates so far.
+            )pbdoc")
+            .def_property_readonly("values", [](const py::object& self)
+            {
+                const auto& snapshot = self.cast<const Snapshot&>();
+                // A read-only view on the snapshot buffer, it keeps the snapshot alive
+                py::array_t<double> view({snapshot.size()}, {sizeof(double)}, snapshot.data(), self);
+                py::detail::array_proxy(view.ptr())->flags &= ~py::detail::npy_api::NPY_ARRAY_WRITEABLE_;
+                return view;
+            }, R"pbdoc(
+                numpy.ndarray: A zero-copy view on the value buffer, refreshed in place by update().
+            )pbdoc")
+            .def_property_readonly("analog_offset", &Snapshot::analogOffset)
+            .def_property_readonly("digital_offset", &Snapshot::digitalOffset)
+            .def_property_readonly("imu_offset", &Snapshot::imuOffset)
+            .def_property_readonly("encoder_offset", &Snapshot::encoderOffset)
+            .def("analog", &Snapshot::getAnalog, py::arg("port"), R"pbdoc(
+                Args:
+                    port (int): A configured analog port.
+
+                Returns:
+                    int: The value read by the last update.
+            )pbdoc")
+            .def("digital", &Snapshot::getDigital, py::arg("port"), R"pbdoc(
+                Args:
+                    port (int): A configured digital port.
+
+                Returns:
+                    bool: The value read by the last update.
+            )pbdoc")
+            .def("encoder", &Snapshot::getEncoder, py::arg("port"), R"pbdoc(
+                Args:
+                    port (int): The port of a configured motor.
+
+                Returns:
+                    int: The position estimate read by the last update.
+            )pbdoc")
+            .def("gyro", [](const Snapshot& self)
+            {
+                const auto value = self.getGyro();
+                return std::make_tuple(value[0], value[1], value[2]);
+            }, "Get the calibrated gyroscope value of the last update as (x,y,z) tuple")
+            .def("accel", [](const Snapshot& self)
+            {
+                const auto value = self.getAccel();
+                return std::make_tuple(value[0], value[1], value[2]);
+            }, "Get the calibrated accelerometer value of the last update as (x,y,z) tuple")
+            .def("magneto", [](const Snapshot& self)
+            {
+                const auto value = self.getMagneto();
+                return std::make_tuple(value[0], value[1], value[2]);
+            }, "Get the calibrated magnetometer value of the last update as (x,y,z) tuple");
+    }
+
+    // Zero-copy, read-only view on the last n samples of a ring. The view keeps the owner alive.
+    inline py::array_t<double> ringWindow(const SampleRing& ring, std::size_t n, const py::object& owner)
+    {
+        const double* data = ring.window(n);
+        py::array_t<double> view({n}, {sizeof(double)}, data, owner);
+        py::detail::array_proxy(view.ptr())->flags &= ~py::detail::npy_api::NPY_ARRAY_WRITEABLE_;
+        return view;
+    }
+
+    inline void createSamplerBindings(const py::module_& m)
+    {
+        py::class_<Sampler, std::shared_ptr<Sampler>>(m, "Sampler", R"pbdoc(
+            Polls sensor channels at a fixed rate on a native thread, independent of the Python event loop.
+
+            Every channel is stored in its own lock-free ring buffer. Windows returned by window() are
+            zero-copy views into the ring. A window of n samples stays valid until capacity - n further
+            samples were written, then its oldest samples get overwritten. Copy a window to keep it longer.
+        )pbdoc")
+            .def(py::init<int, std::size_t>(), py::arg("frequency") = 100, py::arg("capacity") = 1024, R"pbdoc(
+                Initializes a Sampler.
+
+                Args:
+                    frequency (int): Samples per second.
+                    capacity (int): Number of samples kept per channel.
+            )pbdoc")
+            .def("add_analog", &Sampler::addAnalog, py::arg("port"), R"pbdoc(
+                Adds an analog port as channel "analog<port>".
+
+                Returns:
+                    int: The channel index.
+            )pbdoc")
+            .def("add_digital", &Sampler::addDigital, py::arg("port"), R"pbdoc(
+                Adds a digital port as channel "digital<port>".
+
+                Returns:
+                    int: The channel index.
+            )pbdoc")
+            .def("add_gyro", &Sampler::addGyro, py::arg("imu") = nullptr, py::keep_alive<1, 2>(), R"pbdoc(
+                Adds the gyro_x, gyro_y and gyro_z channels in rad/s.
+
+                Args:
+                    imu (IMU, optional): Subtract the calibrated bias of this IMU.
+
+                Returns:
+                    List[int]: The channel indices.
+            )pbdoc")
+            .def("add_accel", &Sampler::addAccel, py::arg("imu") = nullptr, py::keep_alive<1, 2>(), R"pbdoc(
+                Adds the accel_x, accel_y and accel_z channels.
+
+                Args:
+                    imu (IMU, optional): Subtract the calibrated bias of this IMU.
+
+                Returns:
+                    List[int]: The channel indices.
+            )pbdoc")
+            .def("add_magneto", &Sampler::addMagneto, py::arg("imu") = nullptr, py::keep_alive<1, 2>(), R"pbdoc(
+                Adds the magneto_x, magneto_y and magneto_z channels.
+
+                Args:
+                    imu (IMU, optional): Apply the hard and soft iron correction of this IMU.
+
+                Returns:
+                    List[int]: The channel indices.
+            )pbdoc")
+            .def("add_motor", &Sampler::addMotor, py::arg("motor"), R"pbdoc(
+                Adds the position estimate of a motor as channel "motor<port>".
+
+                Returns:
+                    int: The channel index.
+            )pbdoc")
+            .def("add_motor_velocity", &Sampler::addMotorVelocity, py::arg("motor"), py::arg("estimator"), R"pbdoc(
+                Feeds a velocity estimator with the position estimate of a motor at the sampler frequency and
+                records the estimated velocity as channel "motor<port>_velocity".
+
+                Args:
+                    motor (Motor): The motor to follow.
+                    estimator (VelocityEstimator): The estimator to update, e.g. to hand to a device.
+
+                Returns:
+                    int: The channel index.
+            )pbdoc")
+            .def("start", &Sampler::start, "Start sampling on the background thread")
+            .def("stop", &Sampler::stop, py::call_guard<py::gil_scoped_release>(), "Stop sampling and join the background thread")
+            .def("is_running", &Sampler::isRunning)
+            .def("channel_index", &Sampler::channelIndex, py::arg("name"))
+            .def_property_readonly("channel_names", &Sampler::channelNames)
+            .def_property_readonly("frequency", &Sampler::getFrequency)
+            .def_property_readonly("overruns", &Sampler::getOverruns, R"pbdoc(
+                int: Number of samples skipped because the sampler fell behind.
+            )pbdoc")
+            .def("latest", [](const Sampler& self, const int channel)
+            {
+                return self.channel(channel).latest();
+            }, py::arg("channel"), R"pbdoc(
+                Args:
+                    channel (int | str): Channel index or name.
+
+                Returns:
+                    float: The most recent sample of the channel.
+            )pbdoc")
+            .def("latest", [](const Sampler& self, const std::string& channel)
+            {
+                return self.channel(self.channelIndex(channel)).latest();
+            }, py::arg("channel"))
+            .def("window", [](const py::object& self, const int channel, const std::size_t n)
+            {
+                return ringWindow(self.cast<const Sampler&>().channel(channel), n, self);
+            }, py::arg("channel"), py::arg("n"), R"pbdoc(
+                Args:
+                    channel (int | str): Channel index or name.
+                    n (int): Number of samples, clamped to the number of samples available.
+
+                Returns:
+                    numpy.ndarray: The last n samples, oldest first, as a zero-copy read-only view. It is valid
+                    for capacity - n further samples.
+            )pbdoc")
+            .def("window", [](const py::object& self, const std::string& channel, const std::size_t n)
+            {
+                const auto& sampler = self.cast<const Sampler&>();
+                return ringWindow(sampler.channel(sampler.channelIndex(channel)), n, self);
+            }, py::arg("channel"), py::arg("n"))
+            .def("timestamps", [](const py::object& self, const std::size_t n)
+            {
+                return ringWindow(self.cast<const Sampler&>().timestamps(), n, self);
+            }, py::arg("n"), R"pbdoc(
+                Args:
+                    n (int): Number of samples.
+
+                Returns:
+                    numpy.ndarray: Monotonic timestamps in seconds of the last n samples.
+            )pbdoc")
+            .def_property_readonly("sample_count", [](const Sampler& self)
+            {
+                return self.timestamps().written();
+            }, R"pbdoc(
+                int: Total number of samples taken since the sampler was created.
+            )pbdoc");
+    }
+}
@@ -14,7 +14,9 @@ namespace libstp::sensor
         void calibrate(std::shared_ptr<MatrixX3d> calibrationMatrix);
         std::shared_ptr<Vector3d> getValue() const;
         std::shared_ptr<Vector3d> getVariance();
-        std::shared_ptr<Vector3d> getBias();
+        std::shared_ptr<Vector3d> getBias() const;
+        void setBias(const std::shared_ptr<Vector3d>& bias);
+        void setVariance(const std::shared_ptr<Vector3d>& newVariance);
         std::shared_ptr<Vector3d> applyCalibration(const std::shared_ptr<Vector3d>& sample) const;
 
     private:
@@ -28,8 +30,11 @@ namespace libstp::sensor
         void calibrate(std::shared_ptr<MatrixX3d> calibrationMatrix);
         std::shared_ptr<Vector3d> getValue() const;
         std::shared_ptr<Vector3d> getVariance();
-        std::shared_ptr<Vector3d> getBias();
+        std::shared_ptr<Vector3d> getBias() const;
         std::shared_ptr<Vector3d> getGravity();
+        void setBias(const std::shared_ptr<Vector3d>& bias);
+        void setVariance(const std::shared_ptr<Vector3d>& newVariance);
+        void setGravity(const std::shared_ptr<Vector3d>& newGravity);
         std::shared_ptr<Vector3d> applyCalibration(const std::shared_ptr<Vector3d>& sample) const;
 
     private:
@@ -59,6 +64,18 @@ namespace libstp::sensor
     public:
         IMU() = default;
         async::AsyncAlgorithm<int> calibrate(int sampleCount = 100);
+        /**
+         * Checks a restored calibration against a few samples instead of calibrating again. The device has to
+         * stand still, like for calibrate.
+         *
+         * @param sampleCount Number of samples averaged, one per tick.
+         * @param gyroTolerance Largest mean gyro reading left after the bias correction, rad/s.
+         * @param accelTolerance Largest distance of the mean corrected accel reading from the gravity vector, m/s^2.
+         * @return Finishes with 1 if the calibration still holds, 0 if calibrate has to run again.
+         */
+        async::AsyncAlgorithm<int> validateCalibration(int sampleCount = 10,
+                                                       double gyroTolerance = 0.01,
+                                                       double accelTolerance = 0.3);
         std::tuple<std::shared_ptr<Vector3d>, std::shared_ptr<Vector3d>, std::shared_ptr<Vector3d>> getReading() const;
 
         GyroSensor gyro;
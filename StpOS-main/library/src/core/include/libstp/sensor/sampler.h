@@ -0,0 +1,119 @@
+//
+// Created by tobias on 10/18/26.
+//
+
+#pragma once
+
+#include <atomic>
+#include <cstdint>
+#include <functional>
+#include <memory>
+#include <string>
+#include <thread>
+#include <vector>
+
+#include "imu.h"
+#include "libstp/motor/motor.h"
+#include "libstp/motor/velocity_estimator.h"
+
+namespace libstp::sensor
+{
+    /**
+     * Single producer, multiple reader ring buffer of doubles.
+     * Every sample is stored twice (at i and i + capacity), so the last n samples are always contiguous in memory.
+     */
+    class SampleRing
+    {
+    public:
+        explicit SampleRing(std::size_t capacity);
+
+        void push(double value) noexcept;
+
+        [[nodiscard]] double latest() const noexcept;
+
+        // Pointer to the last n samples, oldest first. n is clamped to size(). The samples stay unchanged until
+        // capacity() - n further pushes, the next one overwrites the oldest of them.
+        [[nodiscard]] const double* window(std::size_t& n) const noexcept;
+
+        [[nodiscard]] std::size_t size() const noexcept;
+
+        [[nodiscard]] std::size_t capacity() const noexcept;
+
+        [[nodiscard]] std::uint64_t written() const noexcept;
+
+    private:
+        std::size_t capacity_;
+        std::unique_ptr<double[]> buffer_;
+        std::atomic<std::uint64_t> written_ = 0;
+    };
+
+    /**
+     * Polls the registered channels at a fixed rate on its own thread and writes them into per-channel rings.
+     * Channels can only be added while the sampler is stopped.
+     */
+    class Sampler
+    {
+    public:
+        Sampler(int frequency, std::size_t capacity);
+
+        ~Sampler();
+
+        Sampler(const Sampler&) = delete;
+        Sampler& operator=(const Sampler&) = delete;
+
+        int addChannel(const std::string& name, std::function<double()> source);
+
+        int addAnalog(int port);
+
+        int addDigital(int port);
+
+        std::vector<int> addGyro(const IMU* imu = nullptr);
+
+        std::vector<int> addAccel(const IMU* imu = nullptr);
+
+        std::vector<int> addMagneto(const IMU* imu = nullptr);
+
+        int addMotor(const std::shared_ptr<motor::Motor>& motor);
+
+        /**
+         * Feeds the estimator with the position of the motor at the rate of the sampler. The channel records the
+         * estimated velocity in ticks per second.
+         */
+        int addMotorVelocity(const motor::Motor& motor, const std::shared_ptr<motor::VelocityEstimator>& estimator);
+
+        void start();
+
+        void stop();
+
+        [[nodiscard]] bool isRunning() const;
+
+        [[nodiscard]] const SampleRing& channel(int index) const;
+
+        [[nodiscard]] const SampleRing& timestamps() const;
+
+        [[nodiscard]] int channelIndex(const std::string& name) const;
+
+        [[nodiscard]] const std::vector<std::string>& channelNames() const;
+
+        [[nodiscard]] int getFrequency() const;
+
+        [[nodiscard]] std::uint64_t getOverruns() const;
+
+    private:
+        void run_();
+
+        void requireStopped_() const;
+
+        int frequency_;
+        std::size_t capacity_;
+        std::vector<std::string> names_;
+        std::vector<std::function<double()>> sources_;
+        std::vector<std::unique_ptr<SampleRing>> rings_;
+        std::unique_ptr<SampleRing> timestamps_;
+        std::vector<std::shared_ptr<motor::Motor>> motors_;
+
+        std::thread thread_;
+        std::atomic<bool> running_ = false;
+        std::atomic<std::uint64_t> overruns_ = 0;
+    };
+}
@@ -0,0 +1,69 @@
+//
+// Created by tobias on 10/18/26.
+//
+
+#pragma once
+
+#include <Eigen/Dense>
+#include <cstdint>
+#include <memory>
+#include <vector>
+
+#include "imu.h"
+#include "libstp/motor/motor.h"
+
+namespace libstp::sensor
+{
+    /**
+     * Reads a fixed set of analog ports, digital ports, the IMU and motor encoders in one native call.
+     *
+     * All values are stored in one contiguous buffer which never reallocates, laid out as
+     * [analog..., digital..., gyro xyz, accel xyz, magneto xyz, encoders...]. The IMU block is only
+     * present if an IMU was passed in, its values are calibrated the same way as IMU::getReading.
+     */
+    class Snapshot
+    {
+    public:
+        Snapshot(std::vector<int> analogPorts,
+                 std::vector<int> digitalPorts,
+                 std::vector<std::shared_ptr<motor::Motor>> motors = {},
+                 const IMU* imu = nullptr);
+
+        void update();
+
+        [[nodiscard]] double getTimestamp() const;
+        [[nodiscard]] std::uint64_t getSequence() const;
+
+        [[nodiscard]] int getAnalog(int port) const;
+        [[nodiscard]] bool getDigital(int port) const;
+        [[nodiscard]] int getEncoder(int port) const;
+        [[nodiscard]] Eigen::Vector3d getGyro() const;
+        [[nodiscard]] Eigen::Vector3d getAccel() const;
+        [[nodiscard]] Eigen::Vector3d getMagneto() const;
+
+        [[nodiscard]] const double* data() const;
+        [[nodiscard]] std::size_t size() const;
+
+        [[nodiscard]] std::size_t analogOffset() const;
+        [[nodiscard]] std::size_t digitalOffset() const;
+        [[nodiscard]] std::size_t imuOffset() const;
+        [[nodiscard]] std::size_t encoderOffset() const;
+
+        [[nodiscard]] const std::vector<int>& getAnalogPorts() const;
+        [[nodiscard]] const std::vector<int>& getDigitalPorts() const;
+        [[nodiscard]] const std::vector<int>& getMotorPorts() const;
+
+    private:
+        [[nodiscard]] static std::size_t indexOf(const std::vector<int>& ports, int port, const char* kind);
+
+        std::vector<int> analogPorts;
+        std::vector<int> digitalPorts;
+        std::vector<int> motorPorts;
+        std::vector<std::shared_ptr<motor::Motor>> motors;
+        const IMU* imu;
+
+        std::vector<double> values;
+        double timestamp = 0.0;
+        std::uint64_t sequence = 0;
+    };
+}
@@ -4,7 +4,11 @@
 
 #pragma once
 
+#include <algorithm>
 #include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
+
+#include "libstp/async/bindings.h"
 
 #include "servo.h"
 
@@ -29,7 +33,7 @@ namespace libstp::servo
                          port (int): The port number to which the servo is connected.
                  )pbdoc")
             .def("set_position",
-                 &Servo::setPosition,
+                 &Servo::setPosition, py::call_guard<async::DeviceAccess>(),
                  py::arg("position"),
                  R"pbdoc(
                      Set the servo position.
@@ -38,7 +42,7 @@ namespace libstp::servo
                          position (int): The target position for the servo.
                  )pbdoc")
             .def("get_position",
-                 &Servo::getPosition,
+                 &Servo::getPosition, py::call_guard<async::DeviceAccess>(),
                  R"pbdoc(
                      Get the current servo position.
 
@@ -74,19 +78,39 @@ namespace libstp::servo
                          conditional (ConditionalFunction): A condition to control the shaking behavior.
                  )pbdoc")
             .def("disable",
-                 &Servo::disable,
+                 &Servo::disable, py::call_guard<async::DeviceAccess>(),
                  R"pbdoc(
                      Disable the servo.
 
                      Disables the servo, preventing it from holding its position.
                  )pbdoc")
             .def("enable",
-                 &Servo::enable,
+                 &Servo::enable, py::call_guard<async::DeviceAccess>(),
                  R"pbdoc(
                      Enable the servo.
 
                      Enables the servo, allowing it to hold its position and respond to commands.
                  )pbdoc")
+            .def_static("set_positions", [](const std::vector<Servo*>& servos, const std::vector<int>& positions)
+                        {
+                            // Checked before Servo::setPositions opens its batch, a bad call never leaves one open
+                            if (servos.size() != positions.size())
+                                throw py::value_error("Every servo needs exactly one position");
+                            if (std::ranges::find(servos, nullptr) != servos.end())
+                                throw py::value_error("Servos must not be None");
+                            Servo::setPositions(servos, positions);
+                        },
+                        py::call_guard<async::DeviceAccess>(),
+                        py::arg("servos"),
+                        py::arg("positions"),
+                        R"pbdoc(
+                            Set the positions of several servos in one register transfer, so they all start
+                            moving at the same time.
+
+                            Args:
+                                servos (list[Servo]): The servos to move.
+                                positions (list[int]): The target position of each servo.
+                        )pbdoc")
             .def_static("disable_all_servos",
                         &Servo::disableAllServos,
                         R"pbdoc(
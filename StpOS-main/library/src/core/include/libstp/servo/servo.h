@@ -4,6 +4,7 @@
 
 #pragma once
 #include <chrono>
+#include <span>
 
 #include "libstp/async/algorithm.h"
 #include "libstp/datatype/functions.h"
@@ -39,5 +40,10 @@ namespace libstp::servo
         virtual void enable();
 
         static void disableAllServos();
+
+        /**
+         * Sets the positions of several servos in one register transfer, positions[i] is the position of servos[i].
+         */
+        static void setPositions(std::span<Servo* const> servos, std::span<const int> positions);
     };
 }
@@ -0,0 +1,199 @@
+//
+// Created by tobias on 10/18/26.
+//
+
+#pragma once
+#include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
+
+#include "libstp/sim/kinematics.h"
+#include "libstp/sim/simulation.h"
+#include "libstp/sim/table_map.h"
+#include "libstp/sim/world.h"
+#include "libstp/utility/clock.h"
+
+namespace py = pybind11;
+
+namespace libstp::sim
+{
+    inline void createSimBindings(py::module_& m)
+    {
+        py::class_<Pose>(m, "Pose", R"pbdoc(
+            Position of the robot center on the table in meters,
+            the heading is counter-clockwise from the x axis in radians.
+        )pbdoc")
+            .def(py::init([](const double x, const double y, const double heading)
+            {
+                return Pose{x, y, heading};
+            }), py::arg("x") = 0.0, py::arg("y") = 0.0, py::arg("heading") = 0.0)
+            .def_readwrite("x", &Pose::x)
+            .def_readwrite("y", &Pose::y)
+            .def_readwrite("heading", &Pose::heading)
+            .def("__repr__", [](const Pose& p)
+            {
+                return fmt::format("Pose(x={:.3f}, y={:.3f}, heading={:.3f})", p.x, p.y, p.heading);
+            });
+
+        py::class_<ImuModel>(m, "ImuModel", R"pbdoc(
+            Orientation and noise of the simulated IMU.
+        )pbdoc")
+            .def(py::init<>())
+            .def_readwrite("yaw_axis", &ImuModel::yawAxis, "The axis the device reads its heading from")
+            .def_readwrite("gyro_noise", &ImuModel::gyroNoise, "Standard deviation of the gyro in deg/s")
+            .def_readwrite("gyro_bias", &ImuModel::gyroBias, "Constant gyro offset on the yaw axis in deg/s")
+            .def_readwrite("accel_noise", &ImuModel::accelNoise, "Standard deviation of the accelerometer in m/s^2");
+
+        py::class_<MotorModel>(m, "MotorModel", R"pbdoc(
+            Response of the simulated motors.
+        )pbdoc")
+            .def(py::init<>())
+            .def_readwrite("max_ticks_per_second", &MotorModel::maxTicksPerSecond)
+            .def_readwrite("time_constant", &MotorModel::timeConstant,
+                           "Seconds until 63% of a speed change is reached")
+            .def_readwrite("position_tolerance", &MotorModel::positionTolerance,
+                           "Ticks around a position goal counted as done");
+
+        py::class_<TableMap>(m, "TableMap", R"pbdoc(
+            Grid of light sensor readings over the table. The origin is the lower left corner,
+            x runs along the width and y along the height, both in meters.
+        )pbdoc")
+            .def(py::init<int>(), py::arg("background") = TABLE_WHITE, R"pbdoc(
+                An endless table which reads background everywhere.
+            )pbdoc")
+            .def(py::init<double, double, double, int>(),
+                 py::arg("width"), py::arg("height"), py::arg("resolution") = 0.005,
+                 py::arg("background") = TABLE_WHITE)
+            .def("fill_rectangle", &TableMap::fillRectangle,
+                 py::arg("x"), py::arg("y"), py::arg("width"), py::arg("height"), py::arg("value"))
+            .def("draw_line", &TableMap::drawLine,
+                 py::arg("x0"), py::arg("y0"), py::arg("x1"), py::arg("y1"),
+                 py::arg("thickness") = 0.05, py::arg("value") = TABLE_BLACK, R"pbdoc(
+                Paints a straight strip, e.g. a tape line, centered on the segment between both points.
+            )pbdoc")
+            .def("set_values", &TableMap::setValues, py::arg("values"), R"pbdoc(
+                Replaces all cells, row by row starting at y = 0.
+
+                Args:
+                    values (list[int]): rows * columns readings.
+            )pbdoc")
+            .def("value_at", &TableMap::valueAt, py::arg("x"), py::arg("y"))
+            .def_property_readonly("width", &TableMap::getWidth)
+            .def_property_readonly("height", &TableMap::getHeight)
+            .def_property_readonly("resolution", &TableMap::getResolution)
+            .def_property_readonly("columns", &TableMap::getColumns)
+            .def_property_readonly("rows", &TableMap::getRows);
+
+        m.attr("WHITE") = TABLE_WHITE;
+        m.attr("BLACK") = TABLE_BLACK;
+
+        py::class_<Kinematics, std::shared_ptr<Kinematics>>(m, "Kinematics", R"pbdoc(
+            Forward kinematics of a simulated drive in the convention of the matching device.
+        )pbdoc")
+            .def_property_readonly("wheels", &Kinematics::getWheels)
+            .def("to_body_velocity", &Kinematics::toBodyVelocity, py::arg("wheel_ticks_per_second"));
+
+        py::class_<DifferentialKinematics, Kinematics, std::shared_ptr<DifferentialKinematics>>(
+                m, "DifferentialKinematics", R"pbdoc(
+            Matches TwoWheeledDevice, a positive angular velocity turns counter-clockwise.
+        )pbdoc")
+            .def(py::init<const motor::Motor&, const motor::Motor&, double, double, double>(),
+                 py::arg("left_motor"), py::arg("right_motor"), py::arg("wheel_radius"),
+                 py::arg("wheel_base"), py::arg("ticks_per_revolution"));
+
+        py::class_<MecanumKinematics, Kinematics, std::shared_ptr<MecanumKinematics>>(
+                m, "MecanumKinematics", R"pbdoc(
+            Matches OmniWheeledDevice, a positive angular velocity turns clockwise.
+        )pbdoc")
+            .def(py::init<const motor::Motor&, const motor::Motor&, const motor::Motor&, const motor::Motor&,
+                          double, double, double>(),
+                 py::arg("front_left_motor"), py::arg("front_right_motor"),
+                 py::arg("rear_left_motor"), py::arg("rear_right_motor"),
+                 py::arg("wheel_radius"), py::arg("wheel_distance_from_center"), py::arg("ticks_per_revolution"));
+
+        py::class_<World, std::shared_ptr<World>>(m, "World", R"pbdoc(
+            The simulated robot and table behind the register interface of the wombat.
+
+            Motors follow their goals with a first order lag and drive the robot through the kinematics,
+            the IMU reports the resulting motion, light sensors read the table below them and
+            servos move towards their goal with a limited rate.
+        )pbdoc")
+            .def(py::init<std::shared_ptr<Kinematics>, TableMap, std::uint32_t>(),
+                 py::arg("kinematics"), py::arg("table") = TableMap(), py::arg("seed") = 0)
+            .def("step", &World::step, py::arg("dt_seconds"))
+            .def_property_readonly("time", &World::getTime, "Simulated seconds since the world was created")
+            .def_property("pose", &World::getPose, &World::setPose)
+            .def_property_readonly("velocity", &World::getVelocity,
+                                   "The velocity of the robot in the convention of its device")
+            .def("add_light_sensor", &World::addLightSensor, py::arg("port"), py::arg("x"), py::arg("y"), R"pbdoc(
+                Mounts a light sensor on an analog port.
+
+                Args:
+                    port (int): The analog port.
+                    x (float): Meters in front of the robot center.
+                    y (float): Meters to the left of the robot center.
+            )pbdoc")
+            .def("set_analog_value", &World::setAnalogValue, py::arg("port"), py::arg("value"))
+            .def("set_digital_value", &World::setDigitalValue, py::arg("port"), py::arg("value"))
+            .def("set_imu_model", &World::setImuModel, py::arg("model"))
+            .def("set_motor_model", &World::setMotorModel, py::arg("model"))
+            .def("set_servo_speed", &World::setServoSpeed, py::arg("degrees_per_second"))
+            .def("get_servo_position", &World::getServoPosition, py::arg("port"),
+                 "The physical servo position in servo units, lagging behind the goal")
+            .def("get_motor_position", &World::getMotorPosition, py::arg("port"),
+                 "The encoder position of the motor in ticks")
+            .def("set_table", &World::setTable, py::arg("table"));
+
+        py::class_<Simulation, std::shared_ptr<Simulation>>(m, "Simulation", R"pbdoc(
+            Runs the library against a simulated world instead of the wombat.
+
+            While running, all register access goes to the world and the clock of the library is frozen,
+            time only passes in advance(). Use libstp_helpers.sim.run() to run missions on the simulated clock.
+        )pbdoc")
+            .def(py::init<std::shared_ptr<World>, double>(), py::arg("world"), py::arg("step_seconds") = 0.001)
+            .def("start", &Simulation::start, R"pbdoc(
+                Redirects the register access to the world and switches the clock to virtual time.
+
+                Raises:
+                    RuntimeError: If another simulation is already running.
+            )pbdoc")
+            .def("stop", &Simulation::stop, "Restores the hardware device and the real time")
+            .def_property_readonly("running", &Simulation::isRunning)
+            .def_property_readonly("register_accesses", &Simulation::getRegisterAccesses, R"pbdoc(
+                int: Register reads and writes since the simulation was created, each one is a separate SPI
+                transfer on the wombat.
+            )pbdoc")
+            .def("advance", &Simulation::advance, py::arg("seconds"), R"pbdoc(
+                Integrates the world and moves the virtual clock forward in lock step.
+
+                Args:
+                    seconds (float): Simulated time to pass.
+            )pbdoc")
+            .def_property_readonly("time", &Simulation::getTime)
+            .def_property_readonly("world", &Simulation::getWorld)
+            .def("__enter__", [](const std::shared_ptr<Simulation>& self)
+            {
+                self->start();
+                return self;
+            })
+            .def("__exit__", [](Simulation& self, const py::args&)
+            {
+                self.stop();
+            });
+
+        m.def("active", []
+        {
+            return Simulation::getActive();
+        }, py::return_value_policy::reference, R"pbdoc(
+            Returns:
+                Simulation | None: The running simulation.
+        )pbdoc");
+
+        m.def("now", []
+        {
+            return std::chrono::duration<double>(utility::Clock::now().time_since_epoch()).count();
+        }, R"pbdoc(
+            Returns:
+                float: Seconds on the clock of the library, the virtual time while a simulation runs.
+        )pbdoc");
+    }
+}
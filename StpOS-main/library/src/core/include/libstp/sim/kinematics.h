@@ -0,0 +1,84 @@
+//
+// Created by tobias on 10/18/26.
+//
+
+#pragma once
+
+#include <vector>
+
+#include "libstp/datatype/speed.h"
+#include "libstp/motor/motor.h"
+
+namespace libstp::sim
+{
+    /**
+     * Forward kinematics of a simulated drive, turns wheel speeds into the velocity of the robot.
+     * The velocity is in the convention of the matching libstp device, so the simulated gyro
+     * and encoders agree with the commands the device sends.
+     */
+    class Kinematics
+    {
+    public:
+        Kinematics(std::vector<motor::Motor> wheels, double wheelRadius, double ticksPerRevolution);
+
+        virtual ~Kinematics() = default;
+
+        [[nodiscard]] const std::vector<motor::Motor>& getWheels() const;
+
+        /**
+         * @param wheelTicksPerSecond Speed of each wheel in the order of getWheels, already corrected for the
+         *                            motor polarity, so positive speeds drive the robot forward.
+         */
+        [[nodiscard]] virtual datatype::AbsoluteSpeed toBodyVelocity(
+            const std::vector<double>& wheelTicksPerSecond) const = 0;
+
+        /**
+         * @return Whether a positive angular velocity of the device turns the robot clockwise.
+         */
+        [[nodiscard]] virtual bool isClockwise() const = 0;
+
+    protected:
+        [[nodiscard]] double wheelSpeed(double ticksPerSecond) const;
+
+        std::vector<motor::Motor> wheels;
+        double wheelRadius;
+        double ticksPerRevolution;
+    };
+
+    /**
+     * Matches TwoWheeledDevice, a positive angular velocity turns counter-clockwise.
+     */
+    class DifferentialKinematics final : public Kinematics
+    {
+    public:
+        DifferentialKinematics(const motor::Motor& leftMotor, const motor::Motor& rightMotor,
+                               double wheelRadius, double wheelBase, double ticksPerRevolution);
+
+        [[nodiscard]] datatype::AbsoluteSpeed toBodyVelocity(
+            const std::vector<double>& wheelTicksPerSecond) const override;
+
+        [[nodiscard]] bool isClockwise() const override;
+
+    private:
+        double wheelBase;
+    };
+
+    /**
+     * Matches OmniWheeledDevice (mecanum wheels), a positive angular velocity turns clockwise.
+     */
+    class MecanumKinematics final : public Kinematics
+    {
+    public:
+        MecanumKinematics(const motor::Motor& frontLeftMotor, const motor::Motor& frontRightMotor,
+                          const motor::Motor& rearLeftMotor, const motor::Motor& rearRightMotor,
+                          double wheelRadius, double wheelDistanceFromCenter, double ticksPerRevolution);
+
+        [[nodiscard]] datatype::AbsoluteSpeed toBodyVelocity(
+            const std::vector<double>& wheelTicksPerSecond) const override;
+
+        [[nodiscard]] bool isClockwise() const override;
+
+    private:
+        double wheelDistanceFromCenter;
+    };
+}
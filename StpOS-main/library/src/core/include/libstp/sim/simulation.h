@@ -0,0 +1,82 @@
+//
+// Created by tobias on 10/18/26.
+//
+
+#pragma once
+
+#include <cstdint>
+#include <memory>
+
+#include "libstp/sim/world.h"
+
+namespace kipr::core
+{
+    class Device;
+}
+
+namespace libstp::sim
+{
+    /**
+     * Runs the whole library against a simulated World instead of the wombat.
+     *
+     * While running, every register access of libwallaby goes to the world and libstp::utility::Clock
+     * is frozen, so time only passes in advance(). A mission of several minutes runs as fast as the
+     * control loops can be computed. Only one simulation can run at a time.
+     */
+    class Simulation
+    {
+    public:
+        /**
+         * @param world The simulated robot and table.
+         * @param stepSeconds The largest time step the world is integrated with.
+         */
+        explicit Simulation(std::shared_ptr<World> world, double stepSeconds = 0.001);
+
+        ~Simulation();
+
+        Simulation(const Simulation&) = delete;
+        Simulation& operator=(const Simulation&) = delete;
+
+        /**
+         * Redirects the register access to the world and switches the clock to virtual time.
+         *
+         * @throws std::logic_error If another simulation is already running.
+         */
+        void start();
+
+        /**
+         * Restores the hardware device and the real time.
+         */
+        void stop();
+
+        [[nodiscard]] bool isRunning() const;
+
+        /**
+         * @return Register reads and writes of libwallaby since the simulation was created, each one is
+         *         a separate SPI transfer on the wombat.
+         */
+        [[nodiscard]] std::uint64_t getRegisterAccesses() const;
+
+        /**
+         * Integrates the world and moves the virtual clock forward in lock step.
+         */
+        void advance(double seconds);
+
+        /**
+         * @return Simulated seconds since the world was created.
+         */
+        [[nodiscard]] double getTime() const;
+
+        [[nodiscard]] std::shared_ptr<World> getWorld() const;
+
+        /**
+         * @return The running simulation or nullptr.
+         */
+        static Simulation* getActive();
+
+    private:
+        std::shared_ptr<World> world_;
+        double stepSeconds_;
+        std::unique_ptr<kipr::core::Device> device_;
+    };
+}
@@ -0,0 +1,62 @@
+//
+// Created by tobias on 10/18/26.
+//
+
+#pragma once
+
+#include <cstdint>
+#include <vector>
+
+namespace libstp::sim
+{
+    // Typical readings of an IR light sensor, reflective surfaces read low
+    constexpr int TABLE_WHITE = 200;
+    constexpr int TABLE_BLACK = 3500;
+
+    /**
+     * Grid of light sensor readings over the table. The origin is the lower left corner,
+     * x runs along the width and y along the height, both in meters.
+     */
+    class TableMap
+    {
+    public:
+        /**
+         * An endless table which reads background everywhere.
+         */
+        explicit TableMap(int background = TABLE_WHITE);
+
+        TableMap(double width, double height, double resolution, int background = TABLE_WHITE);
+
+        void fillRectangle(double x, double y, double width, double height, int value);
+
+        /**
+         * Paints a straight strip, e.g. a tape line, centered on the segment between both points.
+         */
+        void drawLine(double x0, double y0, double x1, double y1, double thickness, int value = TABLE_BLACK);
+
+        /**
+         * Replaces all cells, row by row starting at y = 0.
+         *
+         * @throws std::invalid_argument If the number of values does not match the grid.
+         */
+        void setValues(const std::vector<std::uint16_t>& values);
+
+        /**
+         * @return The reading at the given point, the background outside of the table.
+         */
+        [[nodiscard]] int valueAt(double x, double y) const;
+
+        [[nodiscard]] double getWidth() const;
+        [[nodiscard]] double getHeight() const;
+        [[nodiscard]] double getResolution() const;
+        [[nodiscard]] int getColumns() const;
+        [[nodiscard]] int getRows() const;
+
+    private:
+        int background_;
+        double resolution_ = 1.0;
+        int columns_ = 0;
+        int rows_ = 0;
+        std::vector<std::uint16_t> cells_;
+    };
+}
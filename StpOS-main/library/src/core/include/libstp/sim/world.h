@@ -0,0 +1,156 @@
+//
+// Created by tobias on 10/18/26.
+//
+
+#pragma once
+
+#include <array>
+#include <cstdint>
+#include <map>
+#include <memory>
+#include <mutex>
+#include <random>
+#include <vector>
+
+#include "libstp/datatype/axis.h"
+#include "libstp/datatype/speed.h"
+#include "libstp/sim/kinematics.h"
+#include "libstp/sim/table_map.h"
+
+namespace libstp::sim
+{
+    /**
+     * Position of the robot center on the table in meters, the heading is counter-clockwise from the x axis in radians.
+     */
+    struct Pose
+    {
+        double x = 0.0;
+        double y = 0.0;
+        double heading = 0.0;
+    };
+
+    struct ImuModel
+    {
+        datatype::Axis yawAxis = datatype::Z; // the axis the device reads its heading from
+        double gyroNoise = 0.0; // standard deviation in deg/s
+        double gyroBias = 0.0; // deg/s on the yaw axis
+        double accelNoise = 0.0; // standard deviation in m/s^2
+    };
+
+    struct MotorModel
+    {
+        double maxTicksPerSecond = 1500.0;
+        double timeConstant = 0.05; // seconds until 63% of a speed change is reached
+        int positionTolerance = 5; // ticks around a position goal counted as done
+    };
+
+    /**
+     * The simulated robot and table behind the register interface of the wombat.
+     *
+     * Motors follow their speed and position goals with a first order lag and drive the robot through
+     * the kinematics. The gyro, accelerometer and magnetometer registers report the resulting motion, light
+     * sensors read the table map below their mounting point and servos move towards their goal with a limited rate.
+     * All methods are thread safe.
+     */
+    class World
+    {
+    public:
+        static constexpr int MOTOR_COUNT = 4;
+        static constexpr int SERVO_COUNT = 4;
+        static constexpr int ANALOG_COUNT = 6;
+
+        explicit World(std::shared_ptr<Kinematics> kinematics, TableMap table = TableMap(), std::uint32_t seed = 0);
+
+        void step(double dtSeconds);
+
+        /**
+         * @return Simulated seconds since the world was created.
+         */
+        [[nodiscard]] double getTime() const;
+
+        [[nodiscard]] Pose getPose() const;
+        void setPose(const Pose& pose);
+
+        /**
+         * @return The velocity of the robot in the convention of its device.
+         */
+        [[nodiscard]] datatype::AbsoluteSpeed getVelocity() const;
+
+        /**
+         * Mounts a light sensor on the analog port at (x, y) meters relative to the robot center,
+         * x points forward and y to the left.
+         */
+        void addLightSensor(int port, double x, double y);
+
+        /**
+         * Sets the reading of an analog port which has no light sensor mounted.
+         */
+        void setAnalogValue(int port, int value);
+
+        void setDigitalValue(int port, bool value);
+
+        void setImuModel(const ImuModel& model);
+        void setMotorModel(const MotorModel& model);
+
+        /**
+         * @param degreesPerSecond How fast a servo moves towards its goal.
+         */
+        void setServoSpeed(double degreesPerSecond);
+
+        /**
+         * @return The physical position of the servo in servo units (0 - 2047), lagging behind the goal.
+         */
+        [[nodiscard]] double getServoPosition(int port) const;
+
+        /**
+         * @return The encoder position of the motor in ticks.
+         */
+        [[nodiscard]] double getMotorPosition(int port) const;
+
+        void setTable(TableMap table);
+
+        std::uint32_t readRegister(std::uint8_t address, int size);
+        void writeRegister(std::uint8_t address, std::uint32_t value, int size);
+
+    private:
+        struct MotorState
+        {
+            double position = 0.0; // ticks
+            double velocity = 0.0; // ticks/s
+            double goalPosition = 0.0; // ticks
+        };
+
+        struct LightSensorMount
+        {
+            double x;
+            double y;
+        };
+
+        void stepMotors_(double dtSeconds);
+        void updateSensors_(const datatype::AbsoluteSpeed& previousVelocity, double dtSeconds);
+        void setImuRegister_(std::uint8_t base, int axis, float value);
+        void writeRegister_(std::uint8_t address, std::uint32_t value, int size);
+        [[nodiscard]] std::uint32_t readRegister_(std::uint8_t address, int size) const;
+        [[nodiscard]] double noise_(double standardDeviation);
+
+        mutable std::mutex mutex_;
+        std::shared_ptr<Kinematics> kinematics_;
+        TableMap table_;
+        std::mt19937 random_;
+
+        ImuModel imuModel_;
+        MotorModel motorModel_;
+        double servoSpeed_ = 400.0;
+
+        std::array<std::uint8_t, 256> registers_{};
+        std::array<MotorState, MOTOR_COUNT> motors_{};
+        std::array<double, SERVO_COUNT> servoPositions_{};
+        std::vector<double> wheelSpeeds_;
+        std::map<int, LightSensorMount> lightSensors_;
+        std::array<int, ANALOG_COUNT> analogValues_{};
+
+        Pose pose_;
+        datatype::AbsoluteSpeed velocity_{0.0f, 0.0f, 0.0f};
+        double time_ = 0.0;
+    };
+}
@@ -0,0 +1,96 @@
+//
+// Created by tobias on 10/18/26.
+//
+
+#pragma once
+
+#include <array>
+#include <atomic>
+#include <cstdint>
+#include <cstring>
+#include <type_traits>
+
+namespace libstp::threads
+{
+    /**
+     * Single writer, multiple reader sequence lock.
+     *
+     * The writer never waits and readers never block it, a reader that overlaps a write simply copies the
+     * value again. The value is kept in relaxed atomic words, so concurrent copies are well defined.
+     */
+    template <typename T>
+    class SeqLock
+    {
+        static_assert(std::is_trivially_copyable_v<T>, "SeqLock values are copied word by word");
+
+    public:
+        SeqLock()
+        {
+            store(T{});
+        }
+
+        explicit SeqLock(const T& value)
+        {
+            store(value);
+        }
+
+        SeqLock(const SeqLock&) = delete;
+        SeqLock& operator=(const SeqLock&) = delete;
+
+        /**
+         * Publishes a new value. Only one thread may write.
+         */
+        void store(const T& value) noexcept
+        {
+            std::array<std::uint64_t, Words> words{};
+            std::memcpy(words.data(), &value, sizeof(T));
+
+            const std::uint64_t sequence = sequence_.load(std::memory_order_relaxed);
+            sequence_.store(sequence + 1, std::memory_order_relaxed);
+            std::atomic_thread_fence(std::memory_order_release);
+            for (std::size_t i = 0; i < Words; ++i)
+            {
+                data_[i].store(words[i], std::memory_order_relaxed);
+            }
+            sequence_.store(sequence + 2, std::memory_order_release);
+        }
+
+        /**
+         * Copies the last published value, retrying while a write is in progress.
+         */
+        [[nodiscard]] T load() const noexcept
+        {
+            std::array<std::uint64_t, Words> words{};
+            std::uint64_t before, after;
+            do
+            {
+                before = sequence_.load(std::memory_order_acquire);
+                for (std::size_t i = 0; i < Words; ++i)
+                {
+                    words[i] = data_[i].load(std::memory_order_relaxed);
+                }
+                std::atomic_thread_fence(std::memory_order_acquire);
+                after = sequence_.load(std::memory_order_relaxed);
+            }
+            while (before != after || (before & 1) != 0);
+
+            T value;
+            std::memcpy(&value, words.data(), sizeof(T));
+            return value;
+        }
+
+        /**
+         * Number of values published so far, the one of the constructor included.
+         */
+        [[nodiscard]] std::uint64_t version() const noexcept
+        {
+            return sequence_.load(std::memory_order_acquire) / 2;
+        }
+
+    private:
+        static constexpr std::size_t Words = (sizeof(T) + sizeof(std::uint64_t) - 1) / sizeof(std::uint64_t);
+
+        std::atomic<std::uint64_t> sequence_ = 0;
+        std::array<std::atomic<std::uint64_t>, Words> data_{};
+    };
+}
@@ -0,0 +1,68 @@
+//
+// Created by tobias on 10/18/26.
+//
+
+#pragma once
+#include <pybind11/pybind11.h>
+#include <pybind11/chrono.h>
+
+#include "libstp/trace/trace.h"
+
+namespace py = pybind11;
+
+namespace libstp::trace
+{
+    inline void createTraceBindings(py::module_& m)
+    {
+        py::class_<TraceStatistics>(m, "TraceStatistics", R"pbdoc(
+            Counters of the control loop tracer.
+        )pbdoc")
+            .def_readonly("frames", &TraceStatistics::frames, "Frames written to the trace file")
+            .def_readonly("dropped", &TraceStatistics::dropped, "Frames lost because a thread ring was full")
+            .def_readonly("threads", &TraceStatistics::threads, "Number of threads that recorded frames")
+            .def("__repr__", [](const TraceStatistics& s)
+            {
+                return fmt::format("TraceStatistics(frames={}, dropped={}, threads={})", s.frames, s.dropped, s.threads);
+            });
+
+        m.def("start", [](const std::string& path, const std::size_t capacity,
+                          const std::chrono::milliseconds flushInterval)
+              {
+                  Tracer::instance().start(path, capacity, flushInterval);
+              }, py::arg("path"), py::arg("capacity") = 4096,
+              py::arg("flush_interval") = std::chrono::milliseconds(50), R"pbdoc(
+            Starts recording control loop frames into a binary trace file.
+
+            Every control loop iteration (e.g. of set_speed_while) is copied into a preallocated per-thread ring
+            without any formatting. A background thread appends the rings to the file.
+            Load the file with libstp_helpers.trace.load().
+
+            Args:
+                path (str): The trace file, an existing file is replaced.
+                capacity (int): Frames buffered per thread before frames are dropped.
+                flush_interval (datetime.timedelta | float): How often the rings are written to disk.
+        )pbdoc");
+
+        m.def("stop", []
+        {
+            Tracer::instance().stop();
+        }, py::call_guard<py::gil_scoped_release>(), R"pbdoc(
+            Stops recording and writes all pending frames.
+        )pbdoc");
+
+        m.def("is_running", []
+        {
+            return Tracer::instance().isRunning();
+        });
+
+        m.def("statistics", []
+        {
+            return Tracer::instance().statistics();
+        }, R"pbdoc(
+            Returns:
+                TraceStatistics: Written and dropped frames of the current trace.
+        )pbdoc");
+
+        m.attr("FRAME_SIZE") = sizeof(ControlFrame);
+    }
+}
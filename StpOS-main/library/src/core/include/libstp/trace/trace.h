@@ -0,0 +1,149 @@
+//
+// Created by tobias on 10/18/26.
+//
+
+#pragma once
+#include <atomic>
+#include <chrono>
+#include <cstdint>
+#include <cstdio>
+#include <memory>
+#include <mutex>
+#include <string>
+#include <thread>
+#include <type_traits>
+#include <vector>
+
+namespace libstp::trace
+{
+    enum class Source : std::uint16_t
+    {
+        Custom = 0,
+        SetSpeedWhile = 1,
+    };
+
+    /**
+     * One iteration of a control loop in a fixed binary layout. The frame is written to disk as is,
+     * the Python decoder in libstp_helpers.trace mirrors this layout and has to be updated together with it.
+     */
+    struct ControlFrame
+    {
+        std::uint64_t timestamp; // nanoseconds since the tracer was started
+        std::uint32_t sequence; // per thread, gaps mean dropped frames
+        std::uint16_t thread;
+        Source source;
+        float dt;
+        float desired[3]; // forward, strafe, angular in percent
+        float absolute[3]; // m/s, m/s, rad/s
+        float ramped[3];
+        float measured[3];
+        float heading;
+        float desiredHeading;
+        float error[4]; // vx, vy, omega, heading
+        float pid[4][3]; // p, i, d terms of the vx, vy, omega and heading controllers
+        float command[3]; // final vx, vy, omega sent to the kinematics model
+        float wheelCommand[4]; // velocity commands in ticks per second, unused wheels are zero
+        float wheelTicks[4]; // measured tick deltas since the last frame
+    };
+
+    static_assert(std::is_trivially_copyable_v<ControlFrame>);
+    static_assert(sizeof(ControlFrame) == 184, "Update libstp_helpers.trace when changing the frame layout");
+
+    struct TraceStatistics
+    {
+        std::uint64_t frames = 0; // frames written to disk
+        std::uint64_t dropped = 0; // frames lost because a ring was full
+        std::size_t threads = 0;
+    };
+
+    /**
+     * Preallocated single producer, single consumer ring of frames owned by one tracing thread.
+     */
+    class TraceRing
+    {
+    public:
+        TraceRing(std::size_t capacity, std::uint16_t thread);
+
+        bool push(ControlFrame& frame, std::uint64_t timestamp) noexcept;
+
+        // Writes all pending frames to the file, only called from the flush thread
+        std::size_t drain(std::FILE* file);
+
+        // Discards all pending frames and resets the drop counter, only called from the consumer side
+        void clear() noexcept;
+
+        [[nodiscard]] std::uint64_t getDropped() const noexcept;
+
+    private:
+        std::unique_ptr<ControlFrame[]> frames_;
+        std::size_t mask_;
+        std::uint16_t thread_;
+        std::uint32_t sequence_ = 0;
+        std::atomic<std::uint64_t> head_ = 0;
+        std::atomic<std::uint64_t> tail_ = 0;
+        std::atomic<std::uint64_t> dropped_ = 0;
+    };
+
+    /**
+     * Records control loop frames without any formatting on the hot path.
+     * Every producing thread gets its own preallocated ring, a background thread appends the rings to a file.
+     */
+    class Tracer
+    {
+    public:
+        static Tracer& instance();
+
+        Tracer(const Tracer&) = delete;
+        Tracer& operator=(const Tracer&) = delete;
+
+        /**
+         * Starts a new trace file, replacing an existing one.
+         * @param capacity Frames per thread ring, rounded up to a power of two. Only applies to threads tracing for the first time.
+         */
+        void start(const std::string& path, std::size_t capacity = 4096,
+                   std::chrono::milliseconds flushInterval = std::chrono::milliseconds(50));
+
+        // Stops tracing and writes all pending frames
+        void stop();
+
+        [[nodiscard]] bool isRunning() const noexcept
+        {
+            return running_.load(std::memory_order_relaxed);
+        }
+
+        void record(ControlFrame& frame, Source source) noexcept;
+
+        [[nodiscard]] TraceStatistics statistics() const;
+
+    private:
+        Tracer() = default;
+
+        TraceRing* ring_();
+
+        void run_(std::chrono::milliseconds flushInterval);
+
+        std::size_t drainAll_();
+
+        std::atomic<bool> running_ = false;
+        // steady_clock time of start() in ns, written by start() while record() reads it on other threads
+        std::atomic<std::int64_t> start_ = 0;
+        std::size_t capacity_ = 4096;
+
+        mutable std::mutex ringsMutex_;
+        std::vector<std::unique_ptr<TraceRing>> rings_;
+
+        std::mutex lifecycleMutex_;
+        std::FILE* file_ = nullptr;
+        std::thread thread_;
+        std::atomic<bool> stop_ = false;
+        std::atomic<std::uint64_t> written_ = 0;
+    };
+
+    /**
+     * The frame of the control loop running on the calling thread.
+     * Instrumented code fills its fields while computing, commitFrame() records it if tracing is running.
+     */
+    ControlFrame& currentFrame() noexcept;
+
+    void commitFrame(Source source) noexcept;
+}
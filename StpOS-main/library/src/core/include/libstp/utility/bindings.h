@@ -6,8 +6,10 @@
 
 #include <pybind11/pybind11.h>
 #include <pybind11/chrono.h>
+#include <pybind11/stl.h>
 
 #include "pid.h"
+#include "spline.h"
 #include "libstp/_config.h"
 
 namespace py = pybind11;
@@ -16,6 +18,31 @@ namespace libstp::utility
 {
     inline void createPidBindings(const py::module& m)
     {
+        py::class_<PidParameters>(m, "PidParameters", R"pbdoc(
+            Gains of a PID controller with feed-forward on its setpoint and anti-windup.
+
+            The feed-forward Ks * sign(setpoint) + Kv * setpoint + Ka * d(setpoint)/dt is added to the correction.
+            The drive speed controllers already command their setpoint, Kv is the share on top of it.
+        )pbdoc")
+            .def(py::init<>())
+            .def(py::init<float, float, float>(), py::arg("kp"), py::arg("ki"), py::arg("kd"))
+            .def_readwrite("kp", &PidParameters::Kp)
+            .def_readwrite("ki", &PidParameters::Ki)
+            .def_readwrite("kd", &PidParameters::Kd)
+            .def_readwrite("ks", &PidParameters::Ks, "Static feed-forward, overcomes friction")
+            .def_readwrite("kv", &PidParameters::Kv, "Velocity feed-forward on top of the setpoint")
+            .def_readwrite("ka", &PidParameters::Ka, "Acceleration feed-forward, leads the lag of the motors")
+            .def_readwrite("integral_limit", &PidParameters::integralLimit,
+                           "Largest magnitude of the integral term, 0 for no limit")
+            .def_readwrite("derivative_time_constant", &PidParameters::derivativeTimeConstant,
+                           "Seconds of the low pass on the derivative, 0 for none")
+            .def("__repr__", [](const PidParameters& self)
+            {
+                return "<PidParameters(kp=" + std::to_string(self.Kp) + ", ki=" + std::to_string(self.Ki) +
+                       ", kd=" + std::to_string(self.Kd) + ", ks=" + std::to_string(self.Ks) +
+                       ", kv=" + std::to_string(self.Kv) + ", ka=" + std::to_string(self.Ka) + ")>";
+            });
+
         py::class_<PIDController>(m, "PIDController", R"pbdoc(
             A PID controller for managing control loops.
 
@@ -33,13 +60,14 @@ namespace libstp::utility
                          Kd (float): Derivative gain.
                  )pbdoc")
             .def("calculate",
-                 &PIDController::calculate,
-                 py::arg("error"),
+                 py::overload_cast<float, float>(&PIDController::calculate),
+                 py::arg("error"), py::arg("setpoint") = 0.0f,
                  R"pbdoc(
                      Calculate the PID output for a given error.
 
                      Args:
                          error (float): The current error in the system.
+                         setpoint (float): The setpoint the feed-forward is computed from.
 
                      Returns:
                          float: The calculated PID output, clamped to the specified range.
@@ -53,6 +81,7 @@ namespace libstp::utility
                      Args:
                          parameters (PidParameters): The new PID parameters to set.
                  )pbdoc")
+            .def_property_readonly("parameters", &PIDController::getParameters)
             .def("reset",
                  &PIDController::reset,
                  R"pbdoc(
@@ -60,6 +89,46 @@ namespace libstp::utility
                  )pbdoc");
     }
 
+    inline void createSplineBindings(const py::module& m)
+    {
+        py::class_<SplinePoint>(m, "SplinePoint")
+            .def(py::init<>())
+            .def(py::init([](const double x, const double y) { return SplinePoint{x, y}; }), py::arg("x"), py::arg("y"))
+            .def_readwrite("x", &SplinePoint::x)
+            .def_readwrite("y", &SplinePoint::y);
+
+        py::class_<SplineSample>(m, "SplineSample", "A point on a spline with its tangent and curvature")
+            .def_readonly("x", &SplineSample::x)
+            .def_readonly("y", &SplineSample::y)
+            .def_readonly("heading", &SplineSample::heading, "Direction of the tangent in rad")
+            .def_readonly("curvature", &SplineSample::curvature, "Inverse of the radius, positive towards +y");
+
+        py::class_<CubicHermiteSpline>(m, "CubicHermiteSpline", R"pbdoc(
+            A cubic Hermite spline through waypoints with Catmull-Rom tangents, sampled by arc length.
+        )pbdoc")
+            .def(py::init([](const std::vector<std::pair<double, double>>& points,
+                             const std::optional<double> startHeading)
+                 {
+                     std::vector<SplinePoint> splinePoints;
+                     for (const auto& [x, y] : points)
+                     {
+                         splinePoints.push_back({x, y});
+                     }
+                     return CubicHermiteSpline(splinePoints, startHeading);
+                 }),
+                 py::arg("points"), py::arg("start_heading") = py::none(),
+                 R"pbdoc(
+                     Args:
+                         points (list[tuple[float, float]]): At least two distinct waypoints.
+                         start_heading (float | None): Direction at the first waypoint in rad.
+                 )pbdoc")
+            .def_property_readonly("length", &CubicHermiteSpline::getLength)
+            .def("sample", &CubicHermiteSpline::sample, py::arg("length"),
+                 "The point at an arc length from the start, clamped to the spline")
+            .def("project", &CubicHermiteSpline::project, py::arg("position"), py::arg("start"), py::arg("window"),
+                 "The arc length of the point closest to a position, searched from start over window");
+    }
+
     inline void createLoggingBindings(py::module_& m)
     {
         m.def("debug", [](const char* message) { spdlog::debug(message); }, R"pbdoc(
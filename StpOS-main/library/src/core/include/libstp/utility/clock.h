@@ -0,0 +1,66 @@
+//
+// Created by tobias on 10/18/26.
+//
+
+#pragma once
+
+#include <atomic>
+#include <chrono>
+
+namespace libstp::utility
+{
+    /**
+     * Monotonic clock of all control loops, conditions and PID controllers.
+     *
+     * It follows std::chrono::steady_clock until a simulation switches it to virtual time.
+     * The virtual time starts at the current steady time and only moves with advance(),
+     * so time points taken before and after the switch stay comparable.
+     */
+    class Clock
+    {
+    public:
+        using duration = std::chrono::steady_clock::duration;
+        using rep = duration::rep;
+        using period = duration::period;
+        using time_point = std::chrono::steady_clock::time_point;
+        static constexpr bool is_steady = true;
+
+        static time_point now() noexcept
+        {
+            if (virtual_.load(std::memory_order_acquire))
+                return time_point(duration(virtualTime_.load(std::memory_order_acquire)));
+            return std::chrono::steady_clock::now();
+        }
+
+        /**
+         * Freezes the clock at the current time, afterwards it only moves with advance().
+         */
+        static void useVirtualTime() noexcept
+        {
+            virtualTime_.store(std::chrono::steady_clock::now().time_since_epoch().count(), std::memory_order_release);
+            virtual_.store(true, std::memory_order_release);
+        }
+
+        /**
+         * Follows the steady clock again. The time jumps to the real time, so this should only happen between runs.
+         */
+        static void useRealTime() noexcept
+        {
+            virtual_.store(false, std::memory_order_release);
+        }
+
+        [[nodiscard]] static bool isVirtual() noexcept
+        {
+            return virtual_.load(std::memory_order_acquire);
+        }
+
+        static void advance(const duration step) noexcept
+        {
+            virtualTime_.fetch_add(step.count(), std::memory_order_acq_rel);
+        }
+
+    private:
+        inline static std::atomic<bool> virtual_ = false;
+        inline static std::atomic<rep> virtualTime_ = 0;
+    };
+}
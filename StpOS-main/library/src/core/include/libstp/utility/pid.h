@@ -4,7 +4,13 @@
 
 #pragma once
 
+#include <algorithm>
+#include <array>
 #include <chrono>
+#include <cmath>
+#include <optional>
+
+#include "libstp/utility/clock.h"
 
 namespace libstp::utility
 {
@@ -14,6 +20,15 @@ namespace libstp::utility
         float Ki;
         float Kd;
 
+        // Feed-forward on the setpoint, added to the correction: Ks * sign(setpoint) + Kv * setpoint
+        // + Ka * d(setpoint)/dt. The drive already commands the setpoint itself, so Kv is the share on top of it.
+        float Ks = 0.0f;
+        float Kv = 0.0f;
+        float Ka = 0.0f;
+
+        float integralLimit = 0.0f; // Largest magnitude of the integral term, 0 for no limit
+        float derivativeTimeConstant = 0.0f; // Seconds of the low pass on the derivative, 0 for none
+
 
         PidParameters() : PidParameters(0.0f, 0.0f, 0.0f)
         {
@@ -41,7 +56,7 @@ namespace libstp::utility
         explicit PIDController(const PidParameters& parameters)
             : parameters(parameters), integral(0.0),
               previous_error(0.0),
-              last_time(std::chrono::steady_clock::now())
+              last_time(Clock::now())
         {
         }
 
@@ -55,27 +70,85 @@ namespace libstp::utility
         {
             integral = 0.0;
             previous_error = 0.0;
-            last_time = std::chrono::steady_clock::now();
+            filtered_derivative = 0.0;
+            previous_setpoint.reset();
+            last_time = Clock::now();
+        }
+
+        [[nodiscard]] const PidParameters& getParameters() const
+        {
+            return parameters;
         }
 
         float calculate(const float error)
         {
-            const auto current_time = std::chrono::steady_clock::now();
+            return calculate(error, 0.0f);
+        }
+
+        /**
+         * @param error Setpoint minus measurement.
+         * @param setpoint The setpoint the feed-forward is computed from.
+         */
+        float calculate(const float error, const float setpoint)
+        {
+            const auto current_time = Clock::now();
             const std::chrono::duration<double> time_diff = current_time - last_time;
             last_time = current_time;
 
             integral += error * time_diff.count();
+            if (parameters.integralLimit > 0.0f && parameters.Ki != 0.0f)
+            {
+                // Anti-windup, the integral stops growing once its term reaches the limit
+                const double limit = parameters.integralLimit / std::abs(parameters.Ki);
+                integral = std::clamp(integral, -limit, limit);
+            }
+
             const double derivative = (error - previous_error) / time_diff.count();
             previous_error = error;
+            if (parameters.derivativeTimeConstant > 0.0f && time_diff.count() > 0.0)
+            {
+                filtered_derivative += (derivative - filtered_derivative)
+                    * time_diff.count() / (parameters.derivativeTimeConstant + time_diff.count());
+            }
+            else
+            {
+                filtered_derivative = derivative;
+            }
+
+            double feedForward = parameters.Kv * setpoint;
+            if (setpoint != 0.0f)
+            {
+                feedForward += std::copysign(parameters.Ks, setpoint);
+            }
+            if (previous_setpoint.has_value() && time_diff.count() > 0.0)
+            {
+                feedForward += parameters.Ka * (setpoint - *previous_setpoint) / time_diff.count();
+            }
+            previous_setpoint = setpoint;
+
+            const double proportional = error * parameters.Kp;
+            const double integralTerm = parameters.Ki * integral;
+            const double derivativeTerm = parameters.Kd * filtered_derivative;
+            lastTerms = {
+                static_cast<float>(proportional), static_cast<float>(integralTerm), static_cast<float>(derivativeTerm)
+            };
+            return static_cast<float>(proportional + integralTerm + derivativeTerm + feedForward);
+        }
 
-            return static_cast<float>(error * parameters.Kp + parameters.Ki * integral + parameters.Kd * derivative);
+        // Proportional, integral and derivative term of the last calculate() call
+        [[nodiscard]] const std::array<float, 3>& getLastTerms() const
+        {
+            return lastTerms;
         }
 
     private:
         PidParameters parameters;
+        std::array<float, 3> lastTerms{};
 
         double integral;
         double previous_error;
-        std::chrono::steady_clock::time_point last_time;
+        double filtered_derivative = 0.0;
+        std::optional<float> previous_setpoint;
+        Clock::time_point last_time;
     };
 }
@@ -7,9 +7,222 @@
 #include <vector>
 #include <cmath>
 #include <algorithm>
+#include <limits>
+#include <optional>
 #include <stdexcept>
+#include <utility>
 
 namespace libstp::utility
 {
-    
-}
\ No newline at end of file
+    struct SplinePoint
+    {
+        double x = 0.0;
+        double y = 0.0;
+    };
+
+    struct SplineSample
+    {
+        double x = 0.0;
+        double y = 0.0;
+        double heading = 0.0; // rad, direction of the tangent
+        double curvature = 0.0; // 1/m, positive when the path bends towards +y
+    };
+
+    /**
+     * Cubic Hermite spline through a list of waypoints, sampled by arc length.
+     *
+     * The tangents follow Catmull-Rom: at a waypoint the path points from its predecessor to its successor, so
+     * it passes every waypoint without a kink. The tangent at the start can be fixed instead, e.g. to the
+     * heading the robot starts with. Every segment is tabulated once at construction, sampling is a binary
+     * search and a cubic evaluation without allocating.
+     */
+    class CubicHermiteSpline
+    {
+    public:
+        CubicHermiteSpline() = default;
+
+        /**
+         * @param points At least two waypoints, consecutive duplicates are dropped.
+         * @param startHeading Direction of the path at the first waypoint in rad, Catmull-Rom if empty.
+         */
+        explicit CubicHermiteSpline(const std::vector<SplinePoint>& points,
+                                    const std::optional<double> startHeading = std::nullopt)
+        {
+            for (const auto& point : points)
+            {
+                if (points_.empty() || std::hypot(point.x - points_.back().x, point.y - points_.back().y) > 1e-9)
+                {
+                    points_.push_back(point);
+                }
+            }
+            if (points_.size() < 2)
+            {
+                throw std::invalid_argument("A spline needs at least two distinct waypoints");
+            }
+
+            const std::size_t count = points_.size();
+            tangents_.resize(count);
+            for (std::size_t i = 0; i < count; ++i)
+            {
+                const auto& previous = points_[i == 0 ? 0 : i - 1];
+                const auto& next = points_[std::min(i + 1, count - 1)];
+                const double scale = i == 0 || i == count - 1 ? 1.0 : 0.5;
+                tangents_[i] = {(next.x - previous.x) * scale, (next.y - previous.y) * scale};
+            }
+            if (startHeading.has_value())
+            {
+                const double chord = std::hypot(points_[1].x - points_[0].x, points_[1].y - points_[0].y);
+                tangents_[0] = {std::cos(*startHeading) * chord, std::sin(*startHeading) * chord};
+            }
+
+            tabulate();
+        }
+
+        /**
+         * @return The length of the path in the unit of the waypoints.
+         */
+        [[nodiscard]] double getLength() const
+        {
+            return table_.empty() ? 0.0 : table_.back().length;
+        }
+
+        [[nodiscard]] const std::vector<SplinePoint>& getWaypoints() const
+        {
+            return points_;
+        }
+
+        /**
+         * @param length Arc length from the start, clamped to the path.
+         */
+        [[nodiscard]] SplineSample sample(const double length) const
+        {
+            const auto [segment, t] = locate(std::clamp(length, 0.0, getLength()));
+            return evaluate(segment, t);
+        }
+
+        /**
+         * Finds the point of the path closest to a position, searching forward from a previous match so a path
+         * crossing itself is followed in order.
+         *
+         * @param from Arc length to start the search at.
+         * @param window How far along the path to search.
+         * @return The arc length of the closest point.
+         */
+        [[nodiscard]] double project(const SplinePoint& position, const double from, const double window) const
+        {
+            auto entry = std::lower_bound(table_.begin(), table_.end(), std::max(from, 0.0),
+                                          [](const Entry& e, const double length) { return e.length < length; });
+            if (entry != table_.begin())
+            {
+                --entry;
+            }
+
+            double bestLength = entry->length;
+            double bestDistance = std::numeric_limits<double>::infinity();
+            for (; entry != table_.end() && entry->length <= from + window; ++entry)
+            {
+                const double distance = std::hypot(entry->x - position.x, entry->y - position.y);
+                if (distance < bestDistance)
+                {
+                    bestDistance = distance;
+                    bestLength = entry->length;
+                }
+            }
+            return bestLength;
+        }
+
+    private:
+        static constexpr int STEPS_PER_SEGMENT = 32;
+
+        struct Entry
+        {
+            double length;
+            double x, y;
+        };
+
+        std::vector<SplinePoint> points_;
+        std::vector<SplinePoint> tangents_;
+        std::vector<Entry> table_; // STEPS_PER_SEGMENT entries per segment plus the end
+
+        void tabulate()
+        {
+            const std::size_t segments = points_.size() - 1;
+            table_.reserve(segments * STEPS_PER_SEGMENT + 1);
+            table_.push_back({0.0, points_[0].x, points_[0].y});
+            for (std::size_t segment = 0; segment < segments; ++segment)
+            {
+                for (int step = 1; step <= STEPS_PER_SEGMENT; ++step)
+                {
+                    const auto [x, y] = position(segment, static_cast<double>(step) / STEPS_PER_SEGMENT);
+                    const auto& last = table_.back();
+                    table_.push_back({last.length + std::hypot(x - last.x, y - last.y), x, y});
+                }
+            }
+        }
+
+        [[nodiscard]] std::pair<std::size_t, double> locate(const double length) const
+        {
+            auto entry = std::lower_bound(table_.begin(), table_.end(), length,
+                                          [](const Entry& e, const double l) { return e.length < l; });
+            if (entry == table_.begin())
+            {
+                return {0, 0.0};
+            }
+            if (entry == table_.end())
+            {
+                return {points_.size() - 2, 1.0};
+            }
+
+            const auto index = static_cast<std::size_t>(entry - table_.begin()) - 1;
+            const auto& before = table_[index];
+            const double span = entry->length - before.length;
+            const double fraction = span > 0.0 ? (length - before.length) / span : 0.0;
+            const std::size_t segment = std::min(index / STEPS_PER_SEGMENT, points_.size() - 2);
+            const double t = (static_cast<double>(index - segment * STEPS_PER_SEGMENT) + fraction) / STEPS_PER_SEGMENT;
+            return {segment, std::clamp(t, 0.0, 1.0)};
+        }
+
+        [[nodiscard]] SplinePoint position(const std::size_t segment, const double t) const
+        {
+            const double t2 = t * t;
+            const double t3 = t2 * t;
+            const double h00 = 2 * t3 - 3 * t2 + 1;
+            const double h10 = t3 - 2 * t2 + t;
+            const double h01 = -2 * t3 + 3 * t2;
+            const double h11 = t3 - t2;
+            const auto& p0 = points_[segment];
+            const auto& p1 = points_[segment + 1];
+            const auto& m0 = tangents_[segment];
+            const auto& m1 = tangents_[segment + 1];
+            return {
+                h00 * p0.x + h10 * m0.x + h01 * p1.x + h11 * m1.x,
+                h00 * p0.y + h10 * m0.y + h01 * p1.y + h11 * m1.y
+            };
+        }
+
+        [[nodiscard]] SplineSample evaluate(const std::size_t segment, const double t) const
+        {
+            const double t2 = t * t;
+            // First and second derivative of the Hermite basis
+            const double d00 = 6 * t2 - 6 * t, d10 = 3 * t2 - 4 * t + 1, d01 = -6 * t2 + 6 * t, d11 = 3 * t2 - 2 * t;
+            const double s00 = 12 * t - 6, s10 = 6 * t - 4, s01 = -12 * t + 6, s11 = 6 * t - 2;
+            const auto& p0 = points_[segment];
+            const auto& p1 = points_[segment + 1];
+            const auto& m0 = tangents_[segment];
+            const auto& m1 = tangents_[segment + 1];
+
+            const double dx = d00 * p0.x + d10 * m0.x + d01 * p1.x + d11 * m1.x;
+            const double dy = d00 * p0.y + d10 * m0.y + d01 * p1.y + d11 * m1.y;
+            const double ddx = s00 * p0.x + s10 * m0.x + s01 * p1.x + s11 * m1.x;
+            const double ddy = s00 * p0.y + s10 * m0.y + s01 * p1.y + s11 * m1.y;
+            const double speed = std::hypot(dx, dy);
+
+            const auto [x, y] = position(segment, t);
+            return {
+                x, y,
+                std::atan2(dy, dx),
+                speed > 1e-9 ? (dx * ddy - dy * ddx) / (speed * speed * speed) : 0.0
+            };
+        }
+    };
+}
@@ -5,21 +5,10 @@
 #include "libstp/ahrs/attitude.h"
 #include "libstp/_config.h"
 
-#include <tuple>
-#include <stdexcept>
-#include <cmath>
-#include <iostream>
-
-#include "kipr/gyro/gyro.h"
-#include "libstp/math/math.h"
 #include "libstp/sensor/imu.h"
 
-
-constexpr float gravity = 9.81f;
-
 namespace libstp::ahrs
 {
-    float yaw = 0.0f;
     // positive velocity: clockwise
     // negative velocity: counter-clockwise
     float AttitudeEstimator::getGyroReading(const sensor::IMU& imu) const
@@ -34,34 +23,82 @@ namespace libstp::ahrs
 
     void AttitudeEstimator::setQuaternion(float w, float x, float y, float z)
     {
-        //quaternion = Eigen::Quaternion(w, x, y, z);
-        yaw = z;
+        // Estimators running in Python only pass the heading as z
+        externalHeading = z;
     }
 
-    AttitudeEstimator::AttitudeEstimator(const datatype::Axis axis) : orientation(axis) {
-        //startEstimation();
+    AttitudeEstimator::AttitudeEstimator(const datatype::Axis axis) : orientation(axis), task(axis)
+    {
     }
 
     float AttitudeEstimator::getCurrentHeading() const
     {
-        return yaw;
-        //return quaternion.toRotationMatrix().eulerAngles(0, 1, 2)[2];
+        if (task.isRunning())
+        {
+            if (const auto attitude = task.getAttitude(); attitude.sequence > 0)
+                return static_cast<float>(attitude.smoothedHeading);
+        }
+        return externalHeading;
+    }
+
+    Attitude AttitudeEstimator::getAttitude() const
+    {
+        return task.getAttitude();
+    }
+
+    bool AttitudeEstimator::isEstimating() const
+    {
+        return task.isRunning();
+    }
+
+    void AttitudeEstimator::setConfig(const AttitudeEstimatorConfig& config)
+    {
+        task.setConfig(config);
+    }
+
+    const AttitudeEstimatorConfig& AttitudeEstimator::getConfig() const
+    {
+        return task.getConfig();
+    }
+
+    std::uint64_t AttitudeEstimator::getOverruns() const
+    {
+        return task.getOverruns();
+    }
+
+    void AttitudeEstimator::calibrate()
+    {
+        task.calibrate();
+    }
+
+    void AttitudeEstimator::resetHeading(const double angle)
+    {
+        task.resetHeading(angle);
+    }
+
+    Eigen::MatrixX4d AttitudeEstimator::replay(const Eigen::MatrixX3d& gyro,
+                                               const Eigen::MatrixX3d& accel,
+                                               const Eigen::MatrixX3d& mag,
+                                               const double dt) const
+    {
+        return task.replay(gyro, accel, mag, dt);
     }
 
     void AttitudeEstimator::startEstimation()
     {
-        // if (task.running)
-        //     return;
-        //
-        // SPDLOG_INFO("Starting attitude estimation");
-        // task.startEstimation();
-        // estimationThread = std::thread(&AttitudeEstimatorTask::estimationLoop, &task);
-        // estimationThread.detach(); // Make it a daemon thread
+        if (task.isRunning())
+            return;
+
+        SPDLOG_INFO("Starting attitude estimation");
+        task.startEstimation();
     }
 
     void AttitudeEstimator::stopEstimation()
     {
-        // SPDLOG_INFO("Stopping attitude estimation");
-        // task.stopEstimation();
+        if (!task.isRunning())
+            return;
+
+        SPDLOG_INFO("Stopping attitude estimation");
+        task.stopEstimation();
     }
 }
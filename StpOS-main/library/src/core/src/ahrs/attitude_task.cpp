@@ -4,58 +4,23 @@
 #include "libstp/ahrs/attitude_task.h"
 
 #include <Eigen/Dense>
+#include <algorithm>
 #include <chrono>
-#include <thread>
-#include <atomic>
-#include <iostream>
+#include <cmath>
+#include <cstring>
+#include <pthread.h>
+#include <stdexcept>
+#include <string>
+#include <vector>
 
 #include "kipr/accel/accel.h"
 #include "kipr/gyro/gyro.h"
 #include "kipr/magneto/magneto.h"
 #include "libstp/_config.h"
-#include "libstp/ahrs/ekf.h"
 #include "libstp/math/math.h"
-#include "libstp/sensor/imu.h"
+#include "libstp/utility/clock.h"
 
 using namespace Eigen;
-using namespace std::chrono;
-
-Matrix3f gyroscopeMisalignment = Matrix3f::Identity();
-Matrix3f accelerometerMisalignment = Matrix3f::Identity();
-Vector3f gyroscopeSensitivity{1.0f, 1.0f, 1.0f};
-Vector3f accelerometerSensitivity{1.0f, 1.0f, 1.0f};
-Vector3f hardIronOffset{-6.961966f, -8.508221f, 19.059037f};
-Matrix3f softIronMatrix = (Matrix3f() <<
-    0.080397f, -0.003086f, -0.008319f,
-    -0.003086f, 0.068542f, -0.002196f,
-    -0.008319f, -0.002196f, 0.048982f).finished();
-
-constexpr int ESTIMATION_FREQUENCY = 100;
-constexpr int CALIBRATION_SAMPLES = 5;
-constexpr int UT2NT = 1000;
-constexpr double GRAVITY = 9.81;
-
-
-void eigenToString2(const std::string& name, const Eigen::MatrixXd& mat)
-{
-    spdlog::info("{} = [", name); // Print matrix name separately
-
-    for (int i = 0; i < mat.rows(); ++i)
-    {
-        std::string rowStr = " ["; // Row start
-        for (int j = 0; j < mat.cols(); ++j)
-        {
-            rowStr += std::to_string(mat(i, j));
-            if (j < mat.cols() - 1)
-                rowStr += ", "; // Comma separator
-        }
-        rowStr += "]"; // Row end
-
-        spdlog::info(rowStr); // Log each row separately
-    }
-
-    spdlog::info("]"); // Close the main bracket
-}
 
 namespace libstp::ahrs
 {
@@ -80,144 +45,304 @@ namespace libstp::ahrs
         return medians;
     }
 
-    double computeVariance(const MatrixXd& samples)
+    double computeMeanVariance(const MatrixXd& samples)
     {
-        const long n = samples.rows();
+        if (samples.rows() < 2)
+            return 0.0;
         const RowVector3d mean = samples.colwise().mean();
-        MatrixXd centered = samples.rowwise() - mean;
-        const Vector3d variance = (centered.array().square().colwise().sum() / (n - 1)).matrix();
-        return variance.mean();
+        const MatrixXd centered = samples.rowwise() - mean;
+        return (centered.array().square().colwise().sum() / static_cast<double>(samples.rows() - 1)).mean();
+    }
+
+    MatrixXd normalizeRows(const MatrixXd& samples)
+    {
+        return samples.rowwise().normalized();
     }
 
-    void AttitudeEstimatorTask::calibrateBiases()
+    Quaterniond updateFilter(const AttitudeEstimatorConfig& config,
+                             ExtendedKalmanFilter& ekf,
+                             const MadgwickFilter& madgwick,
+                             const Quaterniond& q,
+                             const Vector3d& gyro,
+                             const Vector3d& accel,
+                             const Vector3d& mag,
+                             const double dt)
     {
+        if (config.filter == AttitudeFilter::Madgwick)
+            return madgwick.update(q, gyro, accel, mag, dt);
+        return ekf.update(q, gyro, accel, mag, dt);
+    }
+
+    AttitudeEstimatorTask::AttitudeEstimatorTask(const datatype::Axis headingAxis)
+        : headingAxis(headingAxis)
+    {
+    }
+
+    AttitudeEstimatorTask::~AttitudeEstimatorTask()
+    {
+        stopEstimation();
+    }
+
+    void AttitudeEstimatorTask::setConfig(const AttitudeEstimatorConfig& config)
+    {
+        if (running)
+            throw std::logic_error("The attitude estimator can only be configured while it is stopped");
+        if (config.frequency <= 0)
+            throw std::invalid_argument("Frequency must be greater than zero");
+        if (config.calibrationSamples <= 0)
+            throw std::invalid_argument("At least one calibration sample is required");
+        if (config.realtimePriority < 0 || config.realtimePriority > sched_get_priority_max(SCHED_FIFO))
+            throw std::invalid_argument("Real-time priority must be between 0 and "
+                + std::to_string(sched_get_priority_max(SCHED_FIFO)));
+        if (config.headingWindow <= 0)
+            throw std::invalid_argument("Heading window must be greater than zero");
+        if (config.madgwickGain < 0.0)
+            throw std::invalid_argument("Madgwick gain must not be negative");
+
+        this->config = config;
+        calibrated = false;
+    }
+
+    const AttitudeEstimatorConfig& AttitudeEstimatorTask::getConfig() const
+    {
+        return config;
+    }
+
+    void AttitudeEstimatorTask::calibrate()
+    {
+        if (running)
+            throw std::logic_error("The attitude estimator can only be calibrated while it is stopped");
+
         SPDLOG_INFO("Calibrating IMU. Don't touch the robot!");
 
-        MatrixXd gyroSamples(CALIBRATION_SAMPLES, 3);
-        MatrixXd accelSamples(CALIBRATION_SAMPLES, 3);
-        MatrixXd magSamples(CALIBRATION_SAMPLES, 3);
+        const int samples = config.calibrationSamples;
+        MatrixXd gyroSamples(samples, 3);
+        MatrixXd accelSamples(samples, 3);
+        MatrixXd magSamples(config.useMagnetometer ? samples : 0, 3);
 
-        for (int i = 0; i < CALIBRATION_SAMPLES; ++i)
+        const auto period = std::chrono::duration_cast<std::chrono::steady_clock::duration>(
+            std::chrono::seconds(1)) / config.frequency;
+        auto deadline = std::chrono::steady_clock::now();
+        gyroOffset = Vector3d::Zero();
+        for (int i = 0; i < samples; ++i)
         {
-            gyroSamples.row(i) = Vector3d(gyro_x(), gyro_y(), gyro_z()) * DEG_TO_RAD;
-            accelSamples.row(i) = Vector3d(accel_x(), accel_y(), accel_z());
-            magSamples.row(i) = Vector3d(magneto_x(), magneto_y(), magneto_z());
-            std::this_thread::sleep_for(milliseconds(1000 / ESTIMATION_FREQUENCY));
+            Vector3d gyro, accel, mag;
+            getSensorReadings(gyro, accel, mag);
+            gyroSamples.row(i) = gyro;
+            accelSamples.row(i) = accel;
+            if (config.useMagnetometer)
+                magSamples.row(i) = mag;
+
+            deadline += period;
+            std::this_thread::sleep_until(deadline);
         }
-        //
-        // Matrix<double, CALIBRATION_SAMPLES, 3> gyroSamples;
-        // gyroSamples << -0.003193, -0.102166, 0.010642,
-        //     -0.004257, -0.103230, 0.010642,
-        //     -0.004257, -0.102166, 0.012771,
-        //     -0.002128, -0.102166, 0.013835,
-        //     -0.002128, -0.101101, 0.013835;
-        //
-        // Matrix<double, CALIBRATION_SAMPLES, 3> accelSamples;
-        // accelSamples << -0.083797, 0.014365, 9.938332,
-        //     -0.083797, 0.014365, 9.938332,
-        //     -0.107739, 0.047884, 9.931149,
-        //     -0.074220, 0.000000, 9.993398,
-        //     -0.071826, 0.043096, 9.897630;
-        //
-        // Matrix<double, CALIBRATION_SAMPLES, 3> magSamples;
-        // magSamples << 34.050003, 11.550000, -136.950012,
-        //     33.675003, 12.075001, -136.875000,
-        //     33.225002, 11.925000, -136.725006,
-        //     34.050003, 12.150001, -136.950012,
-        //     33.825001, 11.925000, -136.725006;
-
-        gyroSamples *= DEG_TO_RAD;
-        magSamples *= UT2NT;
-
-        Vector3d gyroOffset = computeColumnwiseMedian(gyroSamples);
-        Vector3d accelOffset = computeColumnwiseMedian(accelSamples);
-        accelOffset.z() -= GRAVITY;
 
+        gyroOffset = computeColumnwiseMedian(gyroSamples);
         gyroSamples = gyroSamples.rowwise() - gyroOffset.transpose();
-        accelSamples = accelSamples.rowwise() - accelOffset.transpose();
-        magSamples = applyMagnetoCalibrationMatrix(magSamples);
-
-        const double gyroVariance = computeVariance(gyroSamples);
-        const double accelVariance = computeVariance(accelSamples);
-        const double magVariance = computeVariance(magSamples);
-        std::cout << "Noise Covariance: Gyro: " << gyroVariance << ", Accel: " << accelVariance << ", Mag: " <<
-            magVariance
-            << std::endl;
+
+        double gyroVariance = config.gyroVariance;
+        double accelVariance = config.accelVariance;
+        double magVariance = config.magVariance;
+        if (config.measureVariances)
+        {
+            // The filters compare directions, so the accelerometer and magnetometer noise is measured on those.
+            // A noise free reading (e.g. in a simulation) would make the EKF singular, hence the lower bound.
+            constexpr double minimumVariance = 1e-9;
+            gyroVariance *= std::max(computeMeanVariance(gyroSamples), minimumVariance);
+            accelVariance *= std::max(computeMeanVariance(normalizeRows(accelSamples)), minimumVariance);
+            if (config.useMagnetometer)
+                magVariance *= std::max(computeMeanVariance(normalizeRows(magSamples)), minimumVariance);
+        }
+
+        ekf = ExtendedKalmanFilter(config.frequency);
         ekf.setMeasurementNoiseCovariance(gyroVariance, accelVariance, magVariance);
         ekf.computeInitialAttitude(gyroSamples, accelSamples, magSamples);
+        madgwick = MadgwickFilter(config.madgwickGain);
+        calibrated = true;
+        SPDLOG_INFO("Calibrated attitude estimator with gyro bias: ({}, {}, {}), noise variances: {}, {}, {}",
+                    gyroOffset[0], gyroOffset[1], gyroOffset[2], gyroVariance, accelVariance, magVariance);
     }
 
     void AttitudeEstimatorTask::estimationLoop()
     {
-        auto lastTime = high_resolution_clock::now();
-        SPDLOG_DEBUG("Attitude estimator started");
+        using clock = std::chrono::steady_clock;
+        applyRealtimePriority();
+
+        const auto period = std::chrono::duration_cast<clock::duration>(std::chrono::seconds(1)) / config.frequency;
+        const int axis = headingAxis;
+        // Paced in real time, integrated in the time of the control loops, which is virtual in a simulation
+        auto lastTime = utility::Clock::now();
+        auto deadline = clock::now();
+        Quaterniond q = ekf.Q;
+        reference = q;
+        double heading = 0.0;
+        std::uint64_t sequence = 0;
+        SPDLOG_DEBUG("Attitude estimator started at {} Hz", config.frequency);
 
         while (running)
         {
-            auto currentTime = high_resolution_clock::now();
-            duration<double> cycleTime = currentTime - lastTime;
+            deadline += period;
+            if (const auto now = clock::now(); deadline < now)
+            {
+                // Skip the missed periods instead of bursting, dt below covers the whole gap
+                const auto missed = (now - deadline) / period + 1;
+                overruns += missed;
+                deadline += missed * period;
+            }
+            std::this_thread::sleep_until(deadline);
+
+            const auto currentTime = utility::Clock::now();
+            const double dt = std::chrono::duration<double>(currentTime - lastTime).count();
             lastTime = currentTime;
+            if (dt <= 0.0)
+                continue;
 
             Vector3d gyro, accel, mag;
             getSensorReadings(gyro, accel, mag);
 
-            ekf.Q = ekf.update(ekf.Q, gyro, accel, mag, cycleTime.count());
+            const Quaterniond previous = q;
+            q = updateFilter(config, ekf, madgwick, previous, gyro, accel, mag, dt);
 
-            auto [roll, pitch, yaw] = math::quaternionToEuler(ekf.Q);
-            SPDLOG_TRACE("Roll: {}, Pitch: {}, Yaw: {}", roll, pitch, yaw);
+            // The rotation of this step in the body frame, its component around the heading axis is what
+            // integrating the gyro would have added, without the bias and corrected by gravity and north
+            const Quaterniond delta = previous.conjugate() * q;
+            heading += 2.0 * std::atan2(delta.vec()[axis], delta.w());
 
-            auto leftWait = milliseconds(1000 / ESTIMATION_FREQUENCY) - duration_cast<milliseconds>(cycleTime);
-            if (leftWait.count() > 0)
-            {
-                std::this_thread::sleep_for(leftWait);
-            }
-            else
+            if (resetRequested.exchange(false, std::memory_order_acquire))
             {
-                SPDLOG_WARN("Estimation loop took too long: {} ms", -leftWait.count());
+                reference = q;
+                heading = resetAngle.load(std::memory_order_relaxed);
+                headingCount = 0;
+                headingSum = 0.0;
             }
+
+            publish(q, heading, ++sequence);
+        }
+        SPDLOG_DEBUG("Attitude estimator stopped, {} overruns", overruns.load());
+    }
+
+    void AttitudeEstimatorTask::publish(const Quaterniond& q, const double heading, const std::uint64_t sequence)
+    {
+        // Running sum over the ring of the last headingWindow headings
+        const std::size_t window = headingHistory.size();
+        const std::size_t slot = headingCount % window;
+        if (headingCount >= window)
+            headingSum -= headingHistory[slot];
+        headingHistory[slot] = heading;
+        headingSum += heading;
+        ++headingCount;
+
+        const auto [roll, pitch, yaw] = math::quaternionToEuler(q);
+        const Quaterniond relative = reference.conjugate() * q;
+        Attitude estimate;
+        estimate.w = relative.w();
+        estimate.x = relative.x();
+        estimate.y = relative.y();
+        estimate.z = relative.z();
+        estimate.roll = roll;
+        estimate.pitch = pitch;
+        estimate.yaw = yaw;
+        estimate.heading = heading;
+        estimate.smoothedHeading = headingSum / static_cast<double>(std::min(headingCount, window));
+        estimate.timestamp = std::chrono::duration<double>(utility::Clock::now().time_since_epoch()).count();
+        estimate.sequence = sequence;
+        attitude.store(estimate);
+    }
+
+    void AttitudeEstimatorTask::applyRealtimePriority()
+    {
+        if (config.realtimePriority == 0)
+            return;
+
+        sched_param parameters{};
+        parameters.sched_priority = config.realtimePriority;
+        if (const int error = pthread_setschedparam(pthread_self(), SCHED_FIFO, &parameters); error != 0)
+        {
+            // Usually missing permissions (CAP_SYS_NICE), the loop still runs with the default scheduler
+            SPDLOG_WARN("Could not run the attitude estimator with real-time priority {}: {}",
+                        config.realtimePriority, std::strerror(error));
         }
-        SPDLOG_DEBUG("Attitude estimator stopped");
     }
 
     void AttitudeEstimatorTask::startEstimation()
     {
+        if (running)
+            return;
+
+        if (!calibrated)
+            calibrate();
+        // The next start needs a new calibration, the robot may have been moved in between
+        calibrated = false;
+        headingHistory.assign(config.headingWindow, 0.0);
+        headingSum = 0.0;
+        headingCount = 0;
+        resetRequested = false;
+        attitude.store(Attitude{});
+        overruns = 0;
         running = true;
-        calibrateBiases();
+        thread = std::thread(&AttitudeEstimatorTask::estimationLoop, this);
     }
 
     void AttitudeEstimatorTask::stopEstimation()
     {
         running = false;
+        if (thread.joinable())
+            thread.join();
+    }
+
+    bool AttitudeEstimatorTask::isRunning() const
+    {
+        return running;
     }
 
-    Vector3d AttitudeEstimatorTask::applyMagnetoCalibration(const Vector3d& mag) const
+    Attitude AttitudeEstimatorTask::getAttitude() const
     {
-        return softIronMatrix.cast<double>().inverse() * (mag - hardIronOffset.cast<double>());
+        return attitude.load();
     }
 
-    MatrixXd AttitudeEstimatorTask::applyMagnetoCalibrationMatrix(const MatrixXd& magMatrix) const
+    std::uint64_t AttitudeEstimatorTask::getOverruns() const
     {
-        Eigen::Matrix3d softIronMatrix;
-        softIronMatrix << 8.6835979917983174e-05, 1.8693188866621046e-06, 7.2021832934262233e-06,
-            1.8693188866621044e-06, 6.7465869482354705e-05, -2.7647151757120113e-06,
-            7.2021832934262275e-06, -2.7647151757120113e-06, 5.6744400048492919e-05;
-        Eigen::Vector3d hardIronOffset;
-        hardIronOffset << 35286.544748373242, 1681.6333912084119, -88325.461119161439;
+        return overruns;
+    }
 
-        Eigen::Matrix3d invSoftIron = softIronMatrix.inverse();
-        eigenToString2("magMatrix", magMatrix);
-        Eigen::MatrixXd mag_shifted = magMatrix.rowwise() - hardIronOffset.transpose();
-        eigenToString2("mag_shifted", mag_shifted);
-        Eigen::MatrixXd mag_cal = mag_shifted * invSoftIron.transpose();
-        eigenToString2("mag_cal", mag_cal);
-        return mag_cal;
+    void AttitudeEstimatorTask::resetHeading(const double angle)
+    {
+        resetAngle.store(angle, std::memory_order_relaxed);
+        resetRequested.store(true, std::memory_order_release);
     }
 
+    MatrixX4d AttitudeEstimatorTask::replay(const MatrixX3d& gyro,
+                                            const MatrixX3d& accel,
+                                            const MatrixX3d& mag,
+                                            const double dt) const
+    {
+        const bool useMag = mag.rows() > 0;
+        if (gyro.rows() == 0 || gyro.rows() != accel.rows() || (useMag && gyro.rows() != mag.rows()))
+            throw std::invalid_argument("Replay needs the same number of gyro, accel and magneto samples");
+
+        ExtendedKalmanFilter replayEkf(1.0 / dt);
+        replayEkf.setMeasurementNoiseCovariance(config.gyroVariance, config.accelVariance, config.magVariance);
+        replayEkf.computeInitialAttitude(gyro.topRows(1), accel.topRows(1), useMag ? MatrixXd(mag.topRows(1)) : MatrixXd(0, 3));
+        const MadgwickFilter replayMadgwick(config.madgwickGain);
+
+        MatrixX4d attitudes(gyro.rows(), 4);
+        Quaterniond q = replayEkf.Q;
+        for (Index i = 0; i < gyro.rows(); ++i)
+        {
+            const Vector3d m = useMag ? Vector3d(mag.row(i)) : Vector3d::Zero();
+            q = updateFilter(config, replayEkf, replayMadgwick, q, gyro.row(i), accel.row(i), m, dt);
+            attitudes.row(i) << q.w(), q.x(), q.y(), q.z();
+        }
+        return attitudes;
+    }
 
     void AttitudeEstimatorTask::getSensorReadings(Vector3d& gyro, Vector3d& accel, Vector3d& mag) const
     {
         gyro = Vector3d(gyro_x(), gyro_y(), gyro_z()) * DEG_TO_RAD - gyroOffset;
-        accel = Vector3d(accel_x(), accel_y(), accel_z()) - accelOffset;
-        mag = applyMagnetoCalibration(Vector3d(magneto_x(), magneto_y(), magneto_z())) * UT2NT;
+        accel = Vector3d(accel_x(), accel_y(), accel_z());
+        if (config.useMagnetometer)
+            mag = config.softIronMatrix * (Vector3d(magneto_x(), magneto_y(), magneto_z()) - config.hardIronOffset);
+        else
+            mag = Vector3d::Zero();
     }
 }
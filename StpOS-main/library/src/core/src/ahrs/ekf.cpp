@@ -3,50 +3,19 @@
 //
 #include "libstp/ahrs/ekf.h"
 
-#include <iostream>
-
 #include "libstp/_config.h"
-#include <sstream>
 
 using namespace libstp::ahrs;
 
-void eigenToString(const std::string& name, const Eigen::MatrixXd& mat)
-{
-    spdlog::info("{} = [", name); // Print matrix name separately
-
-    for (int i = 0; i < mat.rows(); ++i)
-    {
-        std::string rowStr = " ["; // Row start
-        for (int j = 0; j < mat.cols(); ++j)
-        {
-            rowStr += std::to_string(mat(i, j));
-            if (j < mat.cols() - 1)
-                rowStr += ", "; // Comma separator
-        }
-        rowStr += "]"; // Row end
-
-        spdlog::info(rowStr); // Log each row separately
-    }
-
-    spdlog::info("]"); // Close the main bracket
-}
-
-Eigen::Matrix3d skew(const Eigen::Vector3d& v)
-{
-    Eigen::Matrix3d S;
-    S << 0, -v(2), v(1),
-        v(2), 0, -v(0),
-        -v(1), v(0), 0;
-    return S;
-}
-
 ExtendedKalmanFilter::ExtendedKalmanFilter(const double frequency)
     : frequency_(frequency), deltaTime(1.0 / frequency)
 {
-    varGyro = 0.0;
-    varAccel = 0.0;
-    varMagneto = 0.0;
+    // Defaults of the reference implementation, the accelerometer also measures the motion of the robot
+    varGyro = 0.3 * 0.3;
+    varAccel = 0.5 * 0.5;
+    varMagneto = 0.8 * 0.8;
 
+    Q = Eigen::Quaterniond::Identity();
     P = Eigen::Matrix4d::Identity();
     R = computeMeasurementNoiseCovariance();
 }
@@ -57,41 +26,43 @@ void ExtendedKalmanFilter::computeInitialAttitude(
     const Eigen::MatrixXd& magSamples)
 {
     SPDLOG_INFO("Computing initial attitude using EKF.");
-    if (gyroSamples.cols() != 3 || accelSamples.cols() != 3 || magSamples.cols() != 3)
+    if (gyroSamples.cols() != 3 || accelSamples.cols() != 3 || (magSamples.size() > 0 && magSamples.cols() != 3))
     {
-        SPDLOG_ERROR("Gyro samples: {}, Accel samples: {}, Mag samples: {}", gyroSamples.cols(), accelSamples.cols(),
-                     magSamples.cols());
-        SPDLOG_ERROR("All input matrices must have 3 columns.");
-        return;
+        throw std::invalid_argument("All input matrices must have 3 columns.");
     }
 
-    if (gyroSamples.rows() != accelSamples.rows() || gyroSamples.rows() != magSamples.rows())
+    if (gyroSamples.rows() != accelSamples.rows() || (magSamples.size() > 0 && gyroSamples.rows() != magSamples.rows()))
     {
         throw std::invalid_argument("All input matrices must have the same number of rows.");
     }
-    eigenToString("gyroSamples", gyroSamples);
-    eigenToString("accelSamples", accelSamples);
-    eigenToString("magSamples", magSamples);
-
-    const auto numSamples = gyroSamples.rows();
-    Eigen::MatrixXd Q(numSamples, 4);
-    Eigen::Quaterniond result = ecompass(accelSamples.row(0), magSamples.row(0));
-    Q.row(0) << result.w(), result.x(), result.y(), result.z();
-    Q.row(0).normalize();
-    SPDLOG_DEBUG("Q[{}]: ({}, {}, {}, {})", 0, Q(0, 0), Q(0, 1), Q(0, 2), Q(0, 3));
-
-    for (int i = 1; i < numSamples; i++)
+
+    if (accelSamples.rows() == 0)
     {
-        const Eigen::Vector3d gyr = gyroSamples.row(i);
-        const Eigen::Vector3d acc = accelSamples.row(i);
-        const Eigen::Vector3d mag = magSamples.row(i);
-
-        Eigen::Quaterniond prevQ(Q(i - 1, 0), Q(i - 1, 1), Q(i - 1, 2), Q(i - 1, 3));
-        SPDLOG_DEBUG("prevQ: ({}, {}, {}, {})", prevQ.w(), prevQ.x(), prevQ.y(), prevQ.z());
-        Eigen::Quaterniond updatedQ = update(prevQ, gyr, acc, mag, deltaTime);
-        Q.row(i) << updatedQ.w(), updatedQ.x(), updatedQ.y(), updatedQ.z();
-        SPDLOG_DEBUG("Q[{}]: ({}, {}, {}, {})", i, Q(i, 0), Q(i, 1), Q(i, 2), Q(i, 3));
+        throw std::invalid_argument("At least one sample is required.");
     }
+
+    const Eigen::Vector3d acc = accelSamples.colwise().mean();
+    Eigen::Vector3d north;
+    if (magSamples.size() > 0)
+    {
+        north = magSamples.colwise().mean();
+    }
+    else
+    {
+        // Without a magnetometer the heading is arbitrary, the x-axis of the sensor defines the zero heading
+        north = acc.normalized().cross(Eigen::Vector3d::UnitX()).norm() > 0.1
+                    ? Eigen::Vector3d::UnitX()
+                    : Eigen::Vector3d::UnitY();
+    }
+
+    Q = ecompass(acc, north);
+    P = Eigen::Matrix4d::Identity();
+    if (magSamples.size() > 0)
+    {
+        // The field as seen from the initial attitude, its east component is zero by construction
+        mRef = (Q * north).normalized();
+    }
+    SPDLOG_DEBUG("Initial attitude: ({}, {}, {}, {})", Q.w(), Q.x(), Q.y(), Q.z());
 }
 
 Eigen::Matrix<double, 6, 6> ExtendedKalmanFilter::computeMeasurementNoiseCovariance() const
@@ -109,13 +80,46 @@ void ExtendedKalmanFilter::setMeasurementNoiseCovariance(double gyroVariance, do
     R = computeMeasurementNoiseCovariance();
 }
 
+template <int N>
+Eigen::Quaterniond ExtendedKalmanFilter::correct(const Eigen::Quaterniond& q_pred,
+                                                 const Eigen::Matrix4d& P_pred,
+                                                 const Eigen::Matrix<double, N, 1>& z,
+                                                 const Eigen::Matrix<double, N, 1>& z_pred,
+                                                 const Eigen::Matrix<double, N, 4>& H,
+                                                 const Eigen::Matrix<double, N, N>& R_n)
+{
+    const Eigen::Matrix<double, N, 1> v = z - z_pred;
+    const Eigen::Matrix<double, N, N> S = H * P_pred * H.transpose() + R_n;
+    const Eigen::Matrix<double, 4, N> K = P_pred * H.transpose() * S.inverse();
+
+    // Additive correction of the quaternion in (w, x, y, z) order like the prediction, renormalized afterwards
+    Eigen::Vector4d dq = K * v;
+    if constexpr (N == 3)
+    {
+        // Gravity does not observe the heading, but the gain still has a component along a rotation around the
+        // gravity reference through the correlations in P. Without a magnetometer that component turned the heading
+        // a little on every sample and the error grew with the rotation.
+        const Eigen::Quaterniond heading = Eigen::Quaterniond(0.0, aRef.x(), aRef.y(), aRef.z()) * q_pred.normalized();
+        const Eigen::Vector4d u(heading.w(), heading.x(), heading.y(), heading.z());
+        dq -= dq.dot(u) * u;
+    }
+    Eigen::Quaterniond q_upd(q_pred.w() + dq(0), q_pred.x() + dq(1), q_pred.y() + dq(2), q_pred.z() + dq(3));
+    q_upd.normalize();
+    P = (Eigen::Matrix4d::Identity() - K * H) * P_pred;
+    return q_upd;
+}
+
 Eigen::Quaterniond ExtendedKalmanFilter::update(const Eigen::Quaterniond& q,
                                                 const Eigen::Vector3d& rawGyro,
                                                 const Eigen::Vector3d& rawAccel,
                                                 const Eigen::Vector3d& rawMagneto,
                                                 double dt)
 {
-    if (dt <= 0.0)
+    if (dt < 0.0)
+    {
+        dt = deltaTime;
+    }
+    if (dt == 0.0)
     {
         throw std::invalid_argument("Time step must be positive.");
     }
@@ -127,33 +131,41 @@ Eigen::Quaterniond ExtendedKalmanFilter::update(const Eigen::Quaterniond& q,
     }
 
     // Prediction step
-    Eigen::Quaterniond q_pred = f(q, rawGyro, dt);
-    SPDLOG_DEBUG("q_pred: ({}, {}, {}, {})", q_pred.w(), q_pred.x(), q_pred.y(), q_pred.z());
-
-    Eigen::Matrix4d F = dfdq(rawGyro, dt);
-
-    const Eigen::Matrix4d Q_t = varGyro * (F * F.transpose());
-
-    Eigen::Matrix4d P_pred = F * P * F.transpose() + Q_t;
-
-    // Measurement step
-    Eigen::VectorXd z_pred = h(q_pred, Eigen::VectorXd::Zero(6));
-
-    Eigen::Matrix<double, 6, 4> H = dhdq(q_pred, Eigen::VectorXd::Zero(6));
-
-    Eigen::Matrix<double, 6, 6> S = H * P_pred * H.transpose() + R;
-
-    Eigen::Matrix<double, 4, 6> K = P_pred * H.transpose() * S.inverse();
-
-    Eigen::Vector4d dq_vec = K * (Eigen::VectorXd::Zero(6) - z_pred);
+    const Eigen::Quaterniond q_pred = f(q, rawGyro, dt);
+    const Eigen::Matrix4d F = dfdq(rawGyro, dt);
+
+    Eigen::Matrix<double, 4, 3> W;
+    W << -q.x(), -q.y(), -q.z(),
+        q.w(), -q.z(), q.y(),
+        q.z(), q.w(), -q.x(),
+        -q.y(), q.x(), q.w();
+    W *= 0.5 * dt;
+    const Eigen::Matrix4d Q_t = varGyro * (W * W.transpose());
+
+    const Eigen::Matrix4d P_pred = F * P * F.transpose() + Q_t;
+
+    // Correction step, with the accelerometer and the magnetometer if there is a reading of it
+    const double accelNorm = rawAccel.norm();
+    if (accelNorm < 1e-9)
+    {
+        P = P_pred;
+        return q_pred;
+    }
 
-    Eigen::Quaterniond dq(1.0, 0.5 * dq_vec(0), 0.5 * dq_vec(1), 0.5 * dq_vec(2));
-    dq.normalize();
+    const double magNorm = rawMagneto.norm();
+    if (magNorm < 1e-9)
+    {
+        return correct<3>(q_pred, P_pred, rawAccel / accelNorm, h(q_pred, aRef), dhdq(q_pred, aRef),
+                          R.topLeftCorner<3, 3>());
+    }
 
-    Eigen::Quaterniond q_upd = q_pred * dq;
-    q_upd.normalize();
-    P = (Eigen::Matrix4d::Identity() - K * H) * P_pred;
-    return q_upd;
+    Eigen::Matrix<double, 6, 1> z;
+    z << rawAccel / accelNorm, rawMagneto / magNorm;
+    Eigen::Matrix<double, 6, 1> z_pred;
+    z_pred << h(q_pred, aRef), h(q_pred, mRef);
+    Eigen::Matrix<double, 6, 4> H;
+    H << dhdq(q_pred, aRef), dhdq(q_pred, mRef);
+    return correct<6>(q_pred, P_pred, z, z_pred, H, R);
 }
 
 void ExtendedKalmanFilter::setMagReference(const Eigen::Vector3d& magneticReference)
@@ -193,46 +205,20 @@ Eigen::Matrix4d ExtendedKalmanFilter::dfdq(const Eigen::Vector3d& omega, const d
     return Eigen::Matrix4d::Identity() + Omega(0.5 * dt * omega);
 }
 
-// Ensure h() returns an Eigen::VectorXd instead of Eigen::Quaterniond
-Eigen::VectorXd ExtendedKalmanFilter::h(const Eigen::Quaterniond q, const Eigen::VectorXd& z) const
+Eigen::Vector3d ExtendedKalmanFilter::h(const Eigen::Quaterniond& q, const Eigen::Vector3d& reference)
 {
-    const Eigen::Vector3d accel_est = q._transformVector(aRef);
-    const Eigen::Vector3d mag_est = q._transformVector(mRef);
-
-    Eigen::VectorXd z_est(6);
-    z_est.head<3>() = accel_est;
-    z_est.tail<3>() = mag_est;
-    return z_est;
+    return q.conjugate()._transformVector(reference);
 }
 
-Eigen::MatrixXd ExtendedKalmanFilter::dhdq(const Eigen::Quaterniond& q, const Eigen::VectorXd& z) const
+Eigen::Matrix<double, 3, 4> ExtendedKalmanFilter::dhdq(const Eigen::Quaterniond& q, const Eigen::Vector3d& reference)
 {
-    // ToDo: Check if refactored mode is better
-    double qw = q.w(), qx = q.x(), qy = q.y(), qz = q.z();
-
-    Eigen::MatrixXd H(3, 4);
-    H << aRef(0) * qw + aRef(1) * qz - aRef(2) * qy, aRef(0) * qx + aRef(1) * qy + aRef(2) * qz, -aRef(0) * qy + aRef(1)
-        * qx - aRef(2) * qw, -aRef(0) * qz + aRef(1) * qw + aRef(2) * qx,
-        -aRef(0) * qz + aRef(1) * qw + aRef(2) * qx, aRef(0) * qy - aRef(1) * qx + aRef(2) * qw, aRef(0) * qx + aRef(1)
-        * qy + aRef(2) * qz, -aRef(0) * qw - aRef(1) * qz + aRef(2) * qy,
-        aRef(0) * qy - aRef(1) * qx + aRef(2) * qw, aRef(0) * qz - aRef(1) * qw - aRef(2) * qx, aRef(0) * qw + aRef(1) *
-        qz - aRef(2) * qy, aRef(0) * qx + aRef(1) * qy + aRef(2) * qz;
-
-    if (z.size() == 6)
-    {
-        Eigen::MatrixXd H_2(3, 4);
-        H_2 << mRef(0) * qw + mRef(1) * qz - mRef(2) * qy, mRef(0) * qx + mRef(1) * qy + mRef(2) * qz, -mRef(0) * qy +
-            mRef(1) * qx - mRef(2) * qw, -mRef(0) * qz + mRef(1) * qw + mRef(2) * qx,
-            -mRef(0) * qz + mRef(1) * qw + mRef(2) * qx, mRef(0) * qy - mRef(1) * qx + mRef(2) * qw, mRef(0) * qx +
-            mRef(1) * qy + mRef(2) * qz, -mRef(0) * qw - mRef(1) * qz + mRef(2) * qy,
-            mRef(0) * qy - mRef(1) * qx + mRef(2) * qw, mRef(0) * qz - mRef(1) * qw - mRef(2) * qx, mRef(0) * qw +
-            mRef(1) * qz - mRef(2) * qy, mRef(0) * qx + mRef(1) * qy + mRef(2) * qz;
-
-        Eigen::MatrixXd H_full(6, 4);
-        H_full << H, H_2;
-        return 2.0 * H_full;
-    }
+    const double qw = q.w(), qx = q.x(), qy = q.y(), qz = q.z();
+    const double r0 = reference(0), r1 = reference(1), r2 = reference(2);
 
+    Eigen::Matrix<double, 3, 4> H;
+    H << r0 * qw + r1 * qz - r2 * qy, r0 * qx + r1 * qy + r2 * qz, -r0 * qy + r1 * qx - r2 * qw, -r0 * qz + r1 * qw + r2 * qx,
+        -r0 * qz + r1 * qw + r2 * qx, r0 * qy - r1 * qx + r2 * qw, r0 * qx + r1 * qy + r2 * qz, -r0 * qw - r1 * qz + r2 * qy,
+        r0 * qy - r1 * qx + r2 * qw, r0 * qz - r1 * qw - r2 * qx, r0 * qw + r1 * qz - r2 * qy, r0 * qx + r1 * qy + r2 * qz;
     return 2.0 * H;
 }
 
@@ -0,0 +1,68 @@
+//
+// Created by tobias on 10/18/26.
+//
+#include "libstp/ahrs/madgwick.h"
+
+#include <cmath>
+#include <stdexcept>
+
+#include "libstp/ahrs/ekf.h"
+
+using namespace libstp::ahrs;
+
+MadgwickFilter::MadgwickFilter(const double gain) : gain(gain)
+{
+    if (gain < 0.0)
+    {
+        throw std::invalid_argument("Gain must not be negative.");
+    }
+}
+
+Eigen::Quaterniond MadgwickFilter::update(const Eigen::Quaterniond& q,
+                                          const Eigen::Vector3d& gyr,
+                                          const Eigen::Vector3d& acc,
+                                          const Eigen::Vector3d& mag,
+                                          const double dt) const
+{
+    if (dt <= 0.0)
+    {
+        throw std::invalid_argument("Time step must be positive.");
+    }
+
+    // Rate of change of the quaternion from the gyroscope, 1/2 q * (0, omega) in (w, x, y, z) order
+    const Eigen::Quaterniond omega(0.0, gyr.x(), gyr.y(), gyr.z());
+    const Eigen::Quaterniond product = q * omega;
+    Eigen::Vector4d qDot(0.5 * product.w(), 0.5 * product.x(), 0.5 * product.y(), 0.5 * product.z());
+
+    if (const double accelNorm = acc.norm(); accelNorm > 1e-9)
+    {
+        // Gradient of the squared error between the expected and the measured directions
+        const Eigen::Vector3d gravity = Eigen::Vector3d::UnitZ();
+        Eigen::Vector4d gradient = ExtendedKalmanFilter::dhdq(q, gravity).transpose()
+            * (ExtendedKalmanFilter::h(q, gravity) - acc / accelNorm);
+
+        if (const double magNorm = mag.norm(); magNorm > 1e-9)
+        {
+            // The field rotated into the earth frame, only its horizontal magnitude and vertical part are kept,
+            // so magnetic disturbances can not tilt the estimate
+            const Eigen::Vector3d field = q._transformVector(mag / magNorm);
+            const Eigen::Vector3d reference(std::hypot(field.x(), field.y()), 0.0, field.z());
+            gradient += ExtendedKalmanFilter::dhdq(q, reference).transpose()
+                * (ExtendedKalmanFilter::h(q, reference) - mag / magNorm);
+        }
+
+        if (const double gradientNorm = gradient.norm(); gradientNorm > 1e-12)
+        {
+            qDot -= gain * gradient / gradientNorm;
+        }
+    }
+
+    Eigen::Quaterniond q_upd(q.w() + qDot(0) * dt, q.x() + qDot(1) * dt, q.y() + qDot(2) * dt, q.z() + qDot(3) * dt);
+    q_upd.normalize();
+    return q_upd;
+}
+
+double MadgwickFilter::getGain() const
+{
+    return gain;
+}
@@ -0,0 +1,205 @@
+//
+// Created by tobias on 10/18/26.
+//
+
+#include "libstp/async/driver.h"
+
+#include <algorithm>
+#include <cmath>
+#include <stdexcept>
+
+#include "libstp/_config.h"
+
+std::recursive_mutex& libstp::async::deviceMutex()
+{
+    static std::recursive_mutex mutex;
+    return mutex;
+}
+
+libstp::async::DriverJob::DriverJob(std::function<bool()> step,
+                                    std::function<void(bool)> onFinished,
+                                    const std::chrono::nanoseconds period)
+    : step_(std::move(step)),
+      onFinished_(std::move(onFinished)),
+      period_(period),
+      deadline_(std::chrono::steady_clock::now())
+{
+}
+
+void libstp::async::DriverJob::cancel() noexcept
+{
+    cancelled_ = true;
+}
+
+bool libstp::async::DriverJob::isCancelled() const noexcept
+{
+    return cancelled_;
+}
+
+libstp::async::AlgorithmDriver& libstp::async::AlgorithmDriver::instance()
+{
+    // Intentionally leaked, the timer thread must not be joined from a static destructor
+    static auto* driver = new AlgorithmDriver();
+    return *driver;
+}
+
+std::shared_ptr<libstp::async::DriverJob> libstp::async::AlgorithmDriver::schedule(std::function<bool()> step,
+    std::function<void(bool)> onFinished,
+    const int frequency)
+{
+    if (frequency <= 0)
+    {
+        throw std::invalid_argument("Frequency must be greater than zero");
+    }
+
+    const auto period = std::chrono::duration_cast<std::chrono::nanoseconds>(std::chrono::seconds(1)) / frequency;
+    auto job = std::make_shared<DriverJob>(std::move(step), std::move(onFinished), period);
+
+    {
+        std::lock_guard lock(mutex_);
+        jobs_.push_back(job);
+        if (!thread_.joinable())
+        {
+            stop_ = false;
+            thread_ = std::thread(&AlgorithmDriver::run_, this);
+            SPDLOG_DEBUG("Started algorithm driver thread");
+        }
+    }
+    wakeUp_.notify_all();
+    return job;
+}
+
+libstp::async::DriverStatistics libstp::async::AlgorithmDriver::statistics() const
+{
+    std::lock_guard lock(statisticsMutex_);
+    DriverStatistics result = statistics_;
+    result.periodStdDev = periodSamples_ > 1 ? std::sqrt(periodM2_ / static_cast<double>(periodSamples_ - 1)) : 0.0;
+    return result;
+}
+
+void libstp::async::AlgorithmDriver::resetStatistics()
+{
+    std::lock_guard lock(statisticsMutex_);
+    statistics_ = DriverStatistics{};
+    periodM2_ = 0.0;
+    periodSamples_ = 0;
+}
+
+void libstp::async::AlgorithmDriver::shutdown()
+{
+    {
+        std::lock_guard lock(mutex_);
+        stop_ = true;
+    }
+    wakeUp_.notify_all();
+    if (thread_.joinable())
+    {
+        thread_.join();
+    }
+
+    std::vector<std::shared_ptr<DriverJob>> remaining;
+    {
+        std::lock_guard lock(mutex_);
+        remaining.swap(jobs_);
+        stop_ = false;
+    }
+
+    for (const auto& job : remaining)
+    {
+        job->cancel();
+        job->onFinished_(true);
+    }
+    SPDLOG_DEBUG("Algorithm driver shut down, cancelled {} pending jobs", remaining.size());
+}
+
+void libstp::async::AlgorithmDriver::run_()
+{
+    std::vector<std::shared_ptr<DriverJob>> due;
+    while (true)
+    {
+        {
+            std::unique_lock lock(mutex_);
+            wakeUp_.wait(lock, [this] { return stop_ || !jobs_.empty(); });
+            if (stop_)
+                return;
+
+            const auto next = std::min_element(jobs_.begin(), jobs_.end(),
+                                               [](const auto& a, const auto& b)
+                                               {
+                                                   return a->deadline_ < b->deadline_;
+                                               });
+            wakeUp_.wait_until(lock, (*next)->deadline_);
+            if (stop_)
+                return;
+
+            const auto now = std::chrono::steady_clock::now();
+            for (const auto& job : jobs_)
+            {
+                if (job->cancelled_ || job->deadline_ <= now)
+                    due.push_back(job);
+            }
+        }
+
+        for (const auto& job : due)
+        {
+            bool finished = job->cancelled_;
+            if (!finished)
+            {
+                const auto now = std::chrono::steady_clock::now();
+                const bool firstTick = !job->hasTicked_;
+                recordTick_(*job, now);
+                if (firstTick)
+                {
+                    // The period counts from the first tick, a late start must not shorten the next one
+                    job->deadline_ = now;
+                }
+                {
+                    std::lock_guard deviceLock(deviceMutex());
+                    finished = !job->step_();
+                }
+
+                job->deadline_ += job->period_;
+                if (const auto afterStep = std::chrono::steady_clock::now(); job->deadline_ < afterStep)
+                {
+                    // Missed at least one deadline, resynchronize instead of bursting
+                    {
+                        std::lock_guard statisticsLock(statisticsMutex_);
+                        statistics_.overruns++;
+                    }
+                    job->deadline_ = afterStep;
+                }
+            }
+
+            if (finished)
+            {
+                {
+                    std::lock_guard lock(mutex_);
+                    std::erase(jobs_, job);
+                }
+                job->onFinished_(job->cancelled_);
+            }
+        }
+        // Released outside the lock, finished jobs may need the GIL to free their resources
+        due.clear();
+    }
+}
+
+void libstp::async::AlgorithmDriver::recordTick_(DriverJob& job, const std::chrono::steady_clock::time_point now)
+{
+    std::lock_guard lock(statisticsMutex_);
+    statistics_.ticks++;
+    const double lateness = std::chrono::duration<double>(now - job.deadline_).count();
+    statistics_.maxLateness = std::max(statistics_.maxLateness, lateness);
+
+    if (job.hasTicked_)
+    {
+        // Welford's online algorithm over the observed tick periods
+        const double period = std::chrono::duration<double>(now - job.lastTick_).count();
+        periodSamples_++;
+        const double delta = period - statistics_.meanPeriod;
+        statistics_.meanPeriod += delta / static_cast<double>(periodSamples_);
+        periodM2_ += delta * (period - statistics_.meanPeriod);
+    }
+    job.lastTick_ = now;
+    job.hasTicked_ = true;
+}
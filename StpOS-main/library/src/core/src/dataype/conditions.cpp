@@ -135,6 +135,297 @@ std::string libstp::datatype::DistanceConditionalResult::to_string() const
     return oss.str();
 }
 
+libstp::datatype::PoseConditionalResult::PoseConditionalResult(const PoseAxis axis, const float target):
+    DefinedConditionalResult(target), axis(axis)
+{
+}
+
+void libstp::datatype::PoseConditionalResult::restart()
+{
+    started = false;
+}
+
+void libstp::datatype::PoseConditionalResult::update(motion::DifferentialDriveState& state)
+{
+    if (!state.odometry)
+    {
+        SPDLOG_ERROR("Pose condition used without the odometry of a device");
+        _is_loop_running = false;
+        return;
+    }
+
+    const auto pose = state.odometry->getPose();
+    switch (axis)
+    {
+    case PoseAxis::X:
+        current = static_cast<float>(pose.x * 100.0);
+        break;
+    case PoseAxis::Y:
+        current = static_cast<float>(pose.y * 100.0);
+        break;
+    case PoseAxis::Heading:
+        current = static_cast<float>(pose.heading * RAD_TO_DEG);
+        break;
+    }
+
+    if (!started)
+    {
+        start = current;
+        started = true;
+    }
+    _is_loop_running = start < target ? current < target : current > target;
+}
+
+float libstp::datatype::PoseConditionalResult::progress() const
+{
+    if (std::abs(target - start) < 1e-6f)
+        return 1.0f;
+    return (current - start) / (target - start);
+}
+
+std::string libstp::datatype::PoseConditionalResult::to_string() const
+{
+    static constexpr const char* names[] = {"x", "y", "heading"};
+    std::ostringstream oss;
+    oss << "PoseConditionalResult: " << names[static_cast<int>(axis)] << " target=" << target
+        << (axis == PoseAxis::Heading ? "deg" : "cm")
+        << ", current=" << current
+        << ", progress=" << std::fixed << std::setprecision(2) << (progress() * 100.0f) << "%"
+        << ", running=" << (_is_loop_running ? "true" : "false");
+    return oss.str();
+}
+
+libstp::datatype::ProfileConditionalResult::ProfileConditionalResult(const ProfileAxis axis, const float target,
+                                                                     const float speedFactor, const float maxJerk,
+                                                                     const float tolerance, const float settleSeconds):
+    PlannedConditionalResult(target), axis(axis), speedFactor(speedFactor), maxJerk(maxJerk), tolerance(tolerance),
+    settleSeconds(settleSeconds)
+{
+    _is_loop_running = true;
+}
+
+void libstp::datatype::ProfileConditionalResult::plan(const std::array<motion::ProfileLimits, 3>& limits)
+{
+    auto axisLimits = limits[static_cast<std::size_t>(axis)];
+    axisLimits.maxVelocity *= speedFactor;
+    axisLimits.maxJerk = maxJerk;
+
+    const double distance = axis == ProfileAxis::Turn ? target * DEG_TO_RAD : target / 100.0;
+    profile = motion::MotionProfile(distance, axisLimits);
+    elapsed = 0.0f;
+    setpoint = 0.0f;
+    current = 0.0f;
+    _is_loop_running = true;
+}
+
+const libstp::motion::MotionProfile& libstp::datatype::ProfileConditionalResult::getProfile() const
+{
+    return profile;
+}
+
+libstp::datatype::AbsoluteSpeed libstp::datatype::ProfileConditionalResult::getSetpoint() const
+{
+    switch (axis)
+    {
+    case ProfileAxis::Forward:
+        return {setpoint, 0.0f, 0.0f};
+    case ProfileAxis::Strafe:
+        return {0.0f, setpoint, 0.0f};
+    default:
+        return {0.0f, 0.0f, setpoint};
+    }
+}
+
+void libstp::datatype::ProfileConditionalResult::update(motion::DifferentialDriveState& state)
+{
+    const auto reference = profile.sample(elapsed);
+    const auto duration = static_cast<float>(profile.getDuration());
+    // Along the profile the speed controllers follow its velocity, the driven distance is only corrected once
+    // it is done. Correcting it on the way makes the robot lead the plan and overshoot by the lag of its motors.
+    const bool settling = elapsed >= duration;
+
+    float remaining;
+    setpoint = static_cast<float>(reference.velocity);
+    if (axis == ProfileAxis::Turn)
+    {
+        // The turn rate controller follows the profile velocity, the heading controller only holds the planned
+        // heading once it is done. Tracking the moving heading leads the plan while braking and overshoots.
+        state.desiredHeading = settling ? static_cast<float>(reference.position) : 0.0f;
+        state.headingFeedForward = 0.0f;
+        current = static_cast<float>(state.currentHeading * RAD_TO_DEG);
+        remaining = std::abs(std::abs(target) - std::abs(current));
+    }
+    else
+    {
+        const auto [forwardDistance, strafeDistance] = state.computeDrivenDistance();
+        const float driven = axis == ProfileAxis::Forward ? forwardDistance : strafeDistance;
+        if (settling)
+        {
+            setpoint += positionGain * (static_cast<float>(reference.position) - driven);
+        }
+        current = driven * 100.0f;
+        remaining = std::abs(target - current);
+    }
+
+    _is_loop_running = !settling || (remaining > tolerance && elapsed < duration + settleSeconds);
+    SPDLOG_TRACE("Profile Conditional Result - Target: {}, Current: {}, Setpoint: {}", target, current, setpoint);
+}
+
+float libstp::datatype::ProfileConditionalResult::progress() const
+{
+    return std::abs(target) < 1e-6f ? 1.0f : current / target;
+}
+
+std::string libstp::datatype::ProfileConditionalResult::to_string() const
+{
+    std::ostringstream oss;
+    oss << "ProfileConditionalResult: target=" << target << (axis == ProfileAxis::Turn ? "deg" : "cm")
+        << ", current=" << current
+        << ", elapsed=" << elapsed << "s of " << profile.getDuration() << "s"
+        << ", progress=" << std::fixed << std::setprecision(2) << (progress() * 100.0f) << "%"
+        << ", running=" << (_is_loop_running ? "true" : "false");
+    return oss.str();
+}
+
+namespace
+{
+    std::vector<libstp::utility::SplinePoint> toPathPoints(const std::vector<libstp::utility::SplinePoint>& waypointsCm)
+    {
+        // The path starts where the robot stands
+        std::vector<libstp::utility::SplinePoint> points{{0.0, 0.0}};
+        for (const auto& [x, y] : waypointsCm)
+        {
+            points.push_back({x / 100.0, y / 100.0});
+        }
+        return points;
+    }
+}
+
+libstp::datatype::PathConditionalResult::PathConditionalResult(const std::vector<utility::SplinePoint>& waypointsCm,
+                                                               const float speedFactor, const float lookaheadCm,
+                                                               const float toleranceCm):
+    PlannedConditionalResult(0.0f), speedFactor(speedFactor), lookahead(lookaheadCm), tolerance(toleranceCm),
+    path(toPathPoints(waypointsCm), 0.0)
+{
+    target = static_cast<float>(path.getLength() * 100.0);
+    current = 0.0f;
+    _is_loop_running = true;
+}
+
+void libstp::datatype::PathConditionalResult::plan(const std::array<motion::ProfileLimits, 3>& limits)
+{
+    forwardLimits = limits[static_cast<std::size_t>(ProfileAxis::Forward)];
+    forwardLimits.maxVelocity *= speedFactor;
+    maxTurnRate = limits[static_cast<std::size_t>(ProfileAxis::Turn)].maxVelocity;
+    started = false;
+    along = 0.0;
+    velocity = 0.0f;
+    turnRate = 0.0f;
+    current = 0.0f;
+    _is_loop_running = true;
+}
+
+libstp::datatype::AbsoluteSpeed libstp::datatype::PathConditionalResult::getSetpoint() const
+{
+    return {velocity, 0.0f, turnRate};
+}
+
+const libstp::utility::CubicHermiteSpline& libstp::datatype::PathConditionalResult::getPath() const
+{
+    return path;
+}
+
+void libstp::datatype::PathConditionalResult::update(motion::DifferentialDriveState& state)
+{
+    if (state.odometry == nullptr)
+    {
+        SPDLOG_ERROR("Path Conditional Result - The drive state has no odometry");
+        _is_loop_running = false;
+        return;
+    }
+
+    const auto pose = state.odometry->getPose();
+    if (!started)
+    {
+        // Continue with the speed of the previous step instead of starting from rest
+        start = pose;
+        started = true;
+        lastTimestamp = pose.timestamp;
+        velocity = std::max(state.rampedForwardMs, 0.0f);
+    }
+    const double dt = std::max(pose.timestamp - lastTimestamp, 0.0);
+    lastTimestamp = pose.timestamp;
+
+    // Pose in the frame of the path
+    const double cosStart = std::cos(start.heading);
+    const double sinStart = std::sin(start.heading);
+    const double dx = pose.x - start.x;
+    const double dy = pose.y - start.y;
+    const utility::SplinePoint position{cosStart * dx + sinStart * dy, -sinStart * dx + cosStart * dy};
+    const double heading = pose.heading - start.heading;
+
+    const double length = path.getLength();
+    const double lookaheadM = lookahead / 100.0;
+    along = path.project(position, along, 2.0 * lookaheadM);
+
+    // Past the end the goal continues along the last tangent, so the robot drives onto the last waypoint
+    const auto end = path.sample(length);
+    const double endRemaining = (end.x - position.x) * std::cos(end.heading) + (end.y - position.y) * std::sin(end.heading);
+    utility::SplinePoint goal;
+    if (along + lookaheadM <= length)
+    {
+        const auto sample = path.sample(along + lookaheadM);
+        goal = {sample.x, sample.y};
+    }
+    else
+    {
+        const double beyond = std::max(lookaheadM - std::max(endRemaining, 0.0), 0.0);
+        goal = {end.x + beyond * std::cos(end.heading), end.y + beyond * std::sin(end.heading)};
+    }
+
+    // Curvature of the arc through the goal, tangent to the heading of the robot
+    const double goalX = std::cos(heading) * (goal.x - position.x) + std::sin(heading) * (goal.y - position.y);
+    const double goalY = -std::sin(heading) * (goal.x - position.x) + std::cos(heading) * (goal.y - position.y);
+    const double goalDistanceSquared = std::max(goalX * goalX + goalY * goalY, 1e-6);
+    const double curvature = 2.0 * goalY / goalDistanceSquared;
+
+    const double remaining = along + lookaheadM <= length ? length - along : endRemaining;
+    _is_loop_running = remaining > tolerance / 100.0;
+    current = static_cast<float>((length - std::max(remaining, 0.0)) * 100.0);
+    if (!_is_loop_running)
+    {
+        velocity = 0.0f;
+        turnRate = 0.0f;
+        return;
+    }
+
+    // Brake to a stop on the last waypoint and slow down for arcs sharper than the turn rate allows
+    double limit = std::min(forwardLimits.maxVelocity,
+                            std::sqrt(2.0 * forwardLimits.maxAcceleration * std::max(remaining, 0.0)));
+    if (std::abs(curvature) > 1e-6 && maxTurnRate > 0.0)
+    {
+        limit = std::min(limit, maxTurnRate / std::abs(curvature));
+    }
+    velocity = static_cast<float>(std::min(limit, velocity + forwardLimits.maxAcceleration * dt));
+    turnRate = static_cast<float>(velocity * curvature);
+
+    // The heading is steered by the turn rate, keep the heading controller on the current heading as feed-forward
+    state.desiredHeading = state.currentHeading;
+    state.headingFeedForward = turnRate;
+    SPDLOG_TRACE("Path Conditional Result - Along: {}, Remaining: {}, Curvature: {}", along, remaining, curvature);
+}
+
+std::string libstp::datatype::PathConditionalResult::to_string() const
+{
+    std::ostringstream oss;
+    oss << "PathConditionalResult: waypoints=" << path.getWaypoints().size() - 1
+        << ", length=" << target << "cm"
+        << ", current=" << current << "cm"
+        << ", progress=" << std::fixed << std::setprecision(2) << (progress() * 100.0f) << "%"
+        << ", running=" << (_is_loop_running ? "true" : "false");
+    return oss.str();
+}
+
 libstp::datatype::RotationConditionalResult::RotationConditionalResult(float target):
     DefinedConditionalResult(target)
 {
@@ -5,34 +5,144 @@
 #include "libstp/datatype/functions.h"
 
 #include <libstp/_config.h>
-#include <optional>
 #include "libstp/math/math.h"
+#include "libstp/sensor/snapshot.h"
 
-libstp::datatype::ConditionalFunction libstp::datatype::forTime(const std::chrono::milliseconds& timeInMs)
+libstp::datatype::Condition::Condition(std::shared_ptr<ConditionalResult> result): result_(std::move(result))
+{
+}
+
+void libstp::datatype::Condition::reset()
+{
+}
+
+const std::shared_ptr<libstp::datatype::ConditionalResult>& libstp::datatype::Condition::result() const
 {
-    std::optional<std::chrono::time_point<std::chrono::high_resolution_clock>> start;
-    return [timeInMs, start](bool typeCheckOnly) mutable
+    return result_;
+}
+
+std::shared_ptr<libstp::datatype::ConditionalResult> libstp::datatype::Condition::operator()(const bool typeCheckOnly)
+{
+    if (!typeCheckOnly)
     {
-        if (typeCheckOnly)
-        {
-            return std::make_shared<TimedConditionalResult>(
-                static_cast<float>(timeInMs.count()),
-                0.0f
-            );
-        }
-        
-        const auto now = std::chrono::high_resolution_clock::now();
-
-        if (!start.has_value())
-        {
-            start = now;
-        }
-
-        return std::make_shared<TimedConditionalResult>(
-            static_cast<float>(timeInMs.count()),
-            static_cast<float>(std::chrono::duration_cast<std::chrono::milliseconds>(now - start.value()).count())
-        );
-    };
+        evaluate();
+    }
+    return result_;
+}
+
+libstp::datatype::ResultCondition::ResultCondition(std::shared_ptr<ConditionalResult> result):
+    Condition(std::move(result))
+{
+}
+
+void libstp::datatype::ResultCondition::evaluate()
+{
+    // The result reads everything it needs from the drive state in update()
+}
+
+libstp::datatype::TimedCondition::TimedCondition(const std::chrono::milliseconds& duration):
+    Condition(std::make_shared<TimedConditionalResult>(static_cast<float>(duration.count()), 0.0f))
+{
+    timedResult_ = static_cast<TimedConditionalResult*>(result_.get());
+}
+
+void libstp::datatype::TimedCondition::reset()
+{
+    start_.reset();
+    timedResult_->current = 0.0f;
+}
+
+void libstp::datatype::TimedCondition::evaluate()
+{
+    const auto now = utility::Clock::now();
+
+    if (!start_.has_value())
+    {
+        start_ = now;
+    }
+
+    timedResult_->current = static_cast<float>(
+        std::chrono::duration_cast<std::chrono::milliseconds>(now - start_.value()).count());
+}
+
+libstp::datatype::PoseCondition::PoseCondition(const PoseAxis axis, const float target):
+    Condition(std::make_shared<PoseConditionalResult>(axis, target))
+{
+    poseResult_ = static_cast<PoseConditionalResult*>(result_.get());
+}
+
+void libstp::datatype::PoseCondition::reset()
+{
+    poseResult_->restart();
+}
+
+void libstp::datatype::PoseCondition::evaluate()
+{
+    // The result reads the pose from the drive state in update()
+}
+
+libstp::datatype::ProfileCondition::ProfileCondition(const ProfileAxis axis, const float target,
+                                                     const float speedFactor, const float maxJerk):
+    Condition(std::make_shared<ProfileConditionalResult>(axis, target, speedFactor, maxJerk,
+                                                         axis == ProfileAxis::Turn ? 1.0f : 0.5f, 0.5f))
+{
+    profileResult_ = static_cast<ProfileConditionalResult*>(result_.get());
+}
+
+void libstp::datatype::ProfileCondition::reset()
+{
+    start_.reset();
+    profileResult_->elapsed = 0.0f;
+}
+
+void libstp::datatype::ProfileCondition::evaluate()
+{
+    const auto now = utility::Clock::now();
+
+    if (!start_.has_value())
+    {
+        start_ = now;
+    }
+
+    profileResult_->elapsed = std::chrono::duration<float>(now - start_.value()).count();
+}
+
+libstp::datatype::PredicateCondition::PredicateCondition(std::function<bool()> predicate, const bool inverted):
+    Condition(std::make_shared<UndefinedConditionalResult>(!inverted)),
+    predicate_(std::move(predicate)), inverted_(inverted)
+{
+    undefinedResult_ = static_cast<UndefinedConditionalResult*>(result_.get());
+}
+
+void libstp::datatype::PredicateCondition::evaluate()
+{
+    undefinedResult_->_conditionMet = predicate_() != inverted_;
+}
+
+libstp::datatype::CallbackCondition::CallbackCondition(ConditionalCallback callback):
+    Condition(nullptr), callback_(std::move(callback))
+{
+}
+
+void libstp::datatype::CallbackCondition::evaluate()
+{
+    result_ = callback_(false);
+}
+
+std::shared_ptr<libstp::datatype::ConditionalResult> libstp::datatype::CallbackCondition::operator()(
+    const bool typeCheckOnly)
+{
+    if (typeCheckOnly)
+    {
+        return callback_(true);
+    }
+    evaluate();
+    return result_;
+}
+
+libstp::datatype::ConditionalFunction libstp::datatype::forTime(const std::chrono::milliseconds& timeInMs)
+{
+    return std::make_shared<TimedCondition>(timeInMs);
 }
 
 libstp::datatype::ConditionalFunction libstp::datatype::forSeconds(const float& seconds)
@@ -44,10 +154,25 @@ libstp::datatype::ConditionalFunction libstp::datatype::forSeconds(const float&
 libstp::datatype::ConditionalFunction libstp::datatype::forDistance(const float& distanceCm)
 {
     SPDLOG_DEBUG("[CallLog] forDistance called with distanceCm: {}", distanceCm);
-    return [distanceCm](bool)
-    {
-        return std::make_shared<DistanceConditionalResult>(distanceCm);
-    };
+    return std::make_shared<ResultCondition>(std::make_shared<DistanceConditionalResult>(distanceCm));
+}
+
+libstp::datatype::ConditionalFunction libstp::datatype::untilX(const float& xCm)
+{
+    SPDLOG_DEBUG("[CallLog] untilX called with xCm: {}", xCm);
+    return std::make_shared<PoseCondition>(PoseAxis::X, xCm);
+}
+
+libstp::datatype::ConditionalFunction libstp::datatype::untilY(const float& yCm)
+{
+    SPDLOG_DEBUG("[CallLog] untilY called with yCm: {}", yCm);
+    return std::make_shared<PoseCondition>(PoseAxis::Y, yCm);
+}
+
+libstp::datatype::ConditionalFunction libstp::datatype::untilHeading(const float& headingDegrees)
+{
+    SPDLOG_DEBUG("[CallLog] untilHeading called with headingDegrees: {}", headingDegrees);
+    return std::make_shared<PoseCondition>(PoseAxis::Heading, headingDegrees);
 }
 
 libstp::datatype::ConditionalFunction libstp::datatype::forCCWRotation(const float& rotationInDegrees)
@@ -59,46 +184,85 @@ libstp::datatype::ConditionalFunction libstp::datatype::forCCWRotation(const flo
 libstp::datatype::ConditionalFunction libstp::datatype::forCWRotation(const float& rotationInDegrees)
 {
     SPDLOG_DEBUG("[CallLog] forCWRotation called with rotationInDegrees: {}", rotationInDegrees);
-    return [rotationInDegrees](bool)
-    {
-        return std::make_shared<RotationConditionalResult>(rotationInDegrees);
-    };
+    return std::make_shared<ResultCondition>(std::make_shared<RotationConditionalResult>(rotationInDegrees));
 }
 
 libstp::datatype::ConditionalFunction libstp::datatype::forTicks(const int& ticks)
 {
     SPDLOG_DEBUG("[CallLog] forTicks called with ticks: {}", ticks);
-    return [ticks](bool)
+    return std::make_shared<ResultCondition>(std::make_shared<MotorTicksConditionalResult>(static_cast<float>(ticks)));
+}
+
+libstp::datatype::ConditionalFunction libstp::datatype::forProfiledDistance(const float& distanceCm,
+                                                                           const float& speedFactor,
+                                                                           const float& maxJerk)
+{
+    SPDLOG_DEBUG("[CallLog] forProfiledDistance called with distanceCm: {}", distanceCm);
+    return std::make_shared<ProfileCondition>(ProfileAxis::Forward, distanceCm, speedFactor, maxJerk);
+}
+
+libstp::datatype::ConditionalFunction libstp::datatype::forProfiledStrafe(const float& distanceCm,
+                                                                         const float& speedFactor,
+                                                                         const float& maxJerk)
+{
+    SPDLOG_DEBUG("[CallLog] forProfiledStrafe called with distanceCm: {}", distanceCm);
+    return std::make_shared<ProfileCondition>(ProfileAxis::Strafe, distanceCm, speedFactor, maxJerk);
+}
+
+libstp::datatype::ConditionalFunction libstp::datatype::forProfiledRotation(const float& rotationInDegrees,
+                                                                           const float& speedFactor,
+                                                                           const float& maxJerk)
+{
+    SPDLOG_DEBUG("[CallLog] forProfiledRotation called with rotationInDegrees: {}", rotationInDegrees);
+    return std::make_shared<ProfileCondition>(ProfileAxis::Turn, rotationInDegrees, speedFactor, maxJerk);
+}
+
+libstp::datatype::ConditionalFunction libstp::datatype::forPath(
+    const std::vector<std::pair<float, float>>& waypointsCm, const float& speedFactor, const float& lookaheadCm)
+{
+    SPDLOG_DEBUG("[CallLog] forPath called with {} waypoints", waypointsCm.size());
+    std::vector<utility::SplinePoint> points;
+    points.reserve(waypointsCm.size());
+    for (const auto& [x, y] : waypointsCm)
     {
-        return std::make_shared<MotorTicksConditionalResult>(static_cast<float>(ticks));
-    };
+        points.push_back({x, y});
+    }
+    return std::make_shared<ResultCondition>(std::make_shared<PathConditionalResult>(points, speedFactor, lookaheadCm, 1.0f));
 }
 
 libstp::datatype::ConditionalFunction libstp::datatype::forAbsoluteTicks(const int& ticks)
 {
     SPDLOG_DEBUG("[CallLog] forAbsoluteTicks called with ticks: {}", ticks);
-    return [ticks](bool)
-    {
-        return std::make_shared<MotorTicksConditionalResult>(static_cast<float>(ticks));
-    };
+    return std::make_shared<ResultCondition>(std::make_shared<MotorTicksConditionalResult>(static_cast<float>(ticks)));
 }
 
 libstp::datatype::ConditionalFunction libstp::datatype::whileTrue(const std::function<bool()>& condition)
 {
     SPDLOG_DEBUG("[CallLog] whileTrue called with condition");
-    return [condition](bool)
-    {
-        return std::make_shared<UndefinedConditionalResult>(condition());
-    };
+    return std::make_shared<PredicateCondition>(condition, false);
 }
 
 libstp::datatype::ConditionalFunction libstp::datatype::whileFalse(const std::function<bool()>& condition)
 {
     SPDLOG_DEBUG("[CallLog] whileFalse called with condition");
-    return [condition](bool)
+    return std::make_shared<PredicateCondition>(condition, true);
+}
+
+libstp::datatype::ConditionalFunction libstp::datatype::whileSnapshot(
+    const std::shared_ptr<sensor::Snapshot>& snapshot,
+    const std::function<bool(const sensor::Snapshot&)>& condition)
+{
+    SPDLOG_DEBUG("[CallLog] whileSnapshot called with condition");
+    return std::make_shared<PredicateCondition>([snapshot, condition]
     {
-        return std::make_shared<UndefinedConditionalResult>(!condition());
-    };
+        snapshot->update();
+        return condition(*snapshot);
+    }, false);
+}
+
+libstp::datatype::ConditionalFunction libstp::datatype::fromCallback(ConditionalCallback callback)
+{
+    return std::make_shared<CallbackCondition>(std::move(callback));
 }
 
 libstp::datatype::SpeedFunction libstp::datatype::generator(const std::function<Speed()>& generator)
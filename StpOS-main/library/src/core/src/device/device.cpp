@@ -2,6 +2,9 @@
 // Created by tobias on 12/26/24.
 //
 
+#include <algorithm>
+#include <stdexcept>
+#include <string>
 #include <utility>
 
 #include "libstp/device/device.h"
@@ -10,9 +13,12 @@
 
 #include "libstp/_config.h"
 
+#include "kipr/core/platform.hpp"
 #include "kipr/motor/motor.h"
 #include "kipr/servo/servo.h"
 #include "libstp/motion/differential_drive.h"
+#include "libstp/trace/trace.h"
+#include "libstp/utility/clock.h"
 #include "libstp/utility/timing.h"
 
 std::unique_ptr<libstp::motion::DifferentialDrive> differentialDrive;
@@ -47,22 +53,70 @@ void libstp::device::Device::shutdown()
 
 void libstp::device::Device::setVxPid(const float kp, const float ki, const float kd)
 {
-    vxPidParameters = utility::PidParameters(kp, ki, kd);
+    vxPidParameters.Kp = kp;
+    vxPidParameters.Ki = ki;
+    vxPidParameters.Kd = kd;
 }
 
 void libstp::device::Device::setVyPid(const float kp, const float ki, const float kd)
 {
-    vyPidParameters = utility::PidParameters(kp, ki, kd);
+    vyPidParameters.Kp = kp;
+    vyPidParameters.Ki = ki;
+    vyPidParameters.Kd = kd;
 }
 
 void libstp::device::Device::setWPid(const float kp, const float ki, const float kd)
 {
-    wPidParameters = utility::PidParameters(kp, ki, kd);
+    wPidParameters.Kp = kp;
+    wPidParameters.Ki = ki;
+    wPidParameters.Kd = kd;
 }
 
 void libstp::device::Device::setHeadingPid(const float kp, const float ki, const float kd)
 {
-    headingPidParameters = utility::PidParameters(kp, ki, kd);
+    headingPidParameters.Kp = kp;
+    headingPidParameters.Ki = ki;
+    headingPidParameters.Kd = kd;
+}
+
+const libstp::utility::PidParameters& libstp::device::Device::getVxPidParameters() const
+{
+    return vxPidParameters;
+}
+
+void libstp::device::Device::setVxPidParameters(const utility::PidParameters& parameters)
+{
+    vxPidParameters = parameters;
+}
+
+const libstp::utility::PidParameters& libstp::device::Device::getVyPidParameters() const
+{
+    return vyPidParameters;
+}
+
+void libstp::device::Device::setVyPidParameters(const utility::PidParameters& parameters)
+{
+    vyPidParameters = parameters;
+}
+
+const libstp::utility::PidParameters& libstp::device::Device::getWPidParameters() const
+{
+    return wPidParameters;
+}
+
+void libstp::device::Device::setWPidParameters(const utility::PidParameters& parameters)
+{
+    wPidParameters = parameters;
+}
+
+const libstp::utility::PidParameters& libstp::device::Device::getHeadingPidParameters() const
+{
+    return headingPidParameters;
+}
+
+void libstp::device::Device::setHeadingPidParameters(const utility::PidParameters& parameters)
+{
+    headingPidParameters = parameters;
 }
 
 void libstp::device::Device::setMaxAccel(const float maxForwardAccel, const float maxStrafeAccel,
@@ -80,6 +134,61 @@ void libstp::device::Device::setMaxSpeeds(float maxForwardSpeed, float maxStrafe
     maxW = maxAngularSpeed;
 }
 
+std::vector<std::shared_ptr<libstp::motor::VelocityEstimator>> libstp::device::Device::estimateWheelVelocities(
+    sensor::Sampler& sampler,
+    const double bandwidth)
+{
+    std::vector<std::shared_ptr<motor::VelocityEstimator>> estimators;
+    for (const auto& motor : getWheelMotors())
+    {
+        auto estimator = std::make_shared<motor::VelocityEstimator>(bandwidth);
+        sampler.addMotorVelocity(motor, estimator);
+        estimators.push_back(std::move(estimator));
+    }
+    setWheelVelocityEstimators(estimators);
+    return estimators;
+}
+
+void libstp::device::Device::setWheelVelocityEstimators(
+    std::vector<std::shared_ptr<motor::VelocityEstimator>> estimators)
+{
+    if (!estimators.empty() && estimators.size() != getWheelMotors().size())
+    {
+        throw std::invalid_argument("Expected " + std::to_string(getWheelMotors().size()) + " estimators, got " +
+                                    std::to_string(estimators.size()));
+    }
+    if (estimators.size() > MAX_WHEELS)
+    {
+        throw std::invalid_argument("At most " + std::to_string(MAX_WHEELS) + " wheel estimators are supported");
+    }
+    if (std::ranges::find(estimators, nullptr) != estimators.end())
+    {
+        throw std::invalid_argument("Estimators must not be None");
+    }
+    wheelVelocityEstimators = std::move(estimators);
+}
+
+std::optional<std::pair<float, float>> libstp::device::Device::getEstimatedVelocities() const
+{
+    if (wheelVelocityEstimators.empty())
+    {
+        return std::nullopt;
+    }
+
+    // Called on every control tick, the wheel speeds stay on the stack
+    std::array<double, MAX_WHEELS> wheelTicksPerSecond{};
+    std::size_t wheels = 0;
+    for (const auto& estimator : wheelVelocityEstimators)
+    {
+        if (!estimator->isFresh(ESTIMATE_MAX_AGE))
+        {
+            return std::nullopt;
+        }
+        wheelTicksPerSecond[wheels++] = estimator->getVelocity();
+    }
+    return toBodyVelocities(std::span<const double>(wheelTicksPerSecond.data(), wheels));
+}
+
 void libstp::device::Device::resetState() const
 {
     const auto previousState = differentialDrive->state;
@@ -90,6 +199,7 @@ void libstp::device::Device::resetState() const
     differentialDrive->state.rampedForwardMs = previousState.rampedForwardMs;
     differentialDrive->state.rampedStrafeMs = previousState.rampedStrafeMs;
     differentialDrive->state.rampedOmegaRad = previousState.rampedOmegaRad;
+    differentialDrive->state.odometry = previousState.odometry;
 }
 
 float libstp::device::Device::getCurrentHeading()
@@ -98,11 +208,14 @@ float libstp::device::Device::getCurrentHeading()
 }
 
 libstp::async::AsyncAlgorithm<int> libstp::device::Device::setSpeedWhile(datatype::ConditionalFunction condition,
-                                                                         const datatype::Speed constantSpeed)
+                                                                         const datatype::Speed constantSpeed,
+                                                                         const bool doCorrection,
+                                                                         const bool autoStopDevice,
+                                                                         const bool resetRamps)
 {
     SPDLOG_DEBUG("Set speed while called with constant speed ({}, {}, {})",
                  constantSpeed.forwardPercent, constantSpeed.strafePercent, constantSpeed.angularPercent);
-    return setSpeedWhile(std::move(condition), constant(constantSpeed));
+    return setSpeedWhile(std::move(condition), constant(constantSpeed), doCorrection, autoStopDevice, resetRamps);
 }
 
 
@@ -129,6 +242,17 @@ libstp::datatype::AbsoluteSpeed libstp::device::Device::toAbsoluteSpeed(datatype
     };
 }
 
+std::array<libstp::motion::ProfileLimits, 3> libstp::device::Device::computeProfileLimits(const bool throttleMaxSpeed)
+{
+    // Limits set with setMaxSpeeds win over the ones of the wheels, the speed controllers need some headroom
+    const auto [forward, strafe, angular] = toAbsoluteSpeed(datatype::Speed(1.0f, 1.0f, 1.0f), throttleMaxSpeed);
+    return {
+        motion::ProfileLimits{maxVx > 0.0f ? maxVx : forward, forwardMaxAccel},
+        motion::ProfileLimits{maxVy > 0.0f ? maxVy : strafe, strafeMaxAccel},
+        motion::ProfileLimits{maxW > 0.0f ? maxW : angular, angularMaxAccel}
+    };
+}
+
 libstp::async::AsyncAlgorithm<int> libstp::device::Device::driveArc(
     datatype::ConditionalFunction condition,
     const float radiusCentiMeters, const float maxForwardPercentage, const datatype::Direction direction)
@@ -160,7 +284,14 @@ libstp::async::AsyncAlgorithm<int> libstp::device::Device::setSpeedWhile(
     const bool resetRamps)
 {
     initializeKinematicDriveController();
-    auto lastTime = std::chrono::steady_clock::now();
+    auto lastTime = utility::Clock::now();
+
+    // Wheel motion since the last step, e.g. the robot coasting to a stop. Read as displacements with a
+    // one second period, the turn in between is not tracked, just like the heading of the drive.
+    {
+        const auto [forwardM, strafeM, turn] = getWheelVelocities(1.0f);
+        odometry.integrate(forwardM, strafeM, 0.0);
+    }
 
     SPDLOG_TRACE("Max Speeds - Vx: {}, Vy: {}, Omega: {}", vWheelMax, strafeMax, omegaMax);
     differentialDrive->setPIDParameters(vxPidParameters, vyPidParameters, wPidParameters, headingPidParameters);
@@ -173,16 +304,39 @@ libstp::async::AsyncAlgorithm<int> libstp::device::Device::setSpeedWhile(
         differentialDrive->state.rampedStrafeMs = 0.0f;
         differentialDrive->state.rampedOmegaRad = 0.0f;
     }
-    while (true)
+    if (!condition)
     {
-        SPDLOG_TRACE("Condition Loop Running");
-        if (!condition)
-        {
-            SPDLOG_ERROR("Condition function is null");
-            break;
-        }
+        SPDLOG_ERROR("Condition function is null");
+    }
+    else if (speedFunction == nullptr)
+    {
+        SPDLOG_ERROR("Speed function is null");
+    }
+    else
+    {
+        condition->reset();
+    }
 
-        const auto conditionResult = condition(false);
+    // A planned move brings its own setpoints, they already respect the accelerations and skip the ramp
+    differentialDrive->state.headingFeedForward = 0.0f;
+    auto* planned = condition
+                        ? dynamic_cast<datatype::PlannedConditionalResult*>(condition->result().get())
+                        : nullptr;
+    if (planned)
+    {
+        planned->plan(computeProfileLimits(doCorrection));
+        SPDLOG_DEBUG("Planned {}", planned->to_string());
+    }
+
+    // While the attitude estimator runs, the heading follows its fused estimate instead of the integrated gyro
+    std::uint64_t lastAttitudeSequence = 0;
+    double lastFusedHeading = 0.0;
+
+    // Conditions update their result in place, the loop neither allocates nor copies a shared_ptr per tick
+    while (condition && speedFunction)
+    {
+        condition->evaluate();
+        const auto& conditionResult = condition->result();
         if (!conditionResult)
         {
             SPDLOG_ERROR("Condition result is null");
@@ -191,48 +345,68 @@ libstp::async::AsyncAlgorithm<int> libstp::device::Device::setSpeedWhile(
 
         conditionResult->update(differentialDrive->state);
 
-        SPDLOG_TRACE("Condition Loop Running: {}", conditionResult->is_loop_running());
         if (!conditionResult->is_loop_running())
         {
             SPDLOG_TRACE("Condition met to exit loop.");
             break;
         }
 
-        SPDLOG_TRACE("Condition Loop Running: {}", conditionResult->is_loop_running());
-        if (speedFunction == nullptr)
-        {
-            SPDLOG_ERROR("Speed function is null");
-            break;
-        }
-
         const auto desiredSpeed = speedFunction(conditionResult);
-        SPDLOG_TRACE("received desired speed");
-        SPDLOG_TRACE("Desired Speed - Vx: {}, Vy: {}, Omega: {}", desiredSpeed.forwardPercent,
-                     desiredSpeed.strafePercent, desiredSpeed.angularPercent);
-
-        const auto absoluteSpeed = toAbsoluteSpeed(desiredSpeed, doCorrection);
-
-        SPDLOG_TRACE("Absolute Speed - Vx: {}, Vy: {}, Omega: {}", absoluteSpeed.forwardMs, absoluteSpeed.strafeMs,
-                     absoluteSpeed.angularRad);
+        const auto absoluteSpeed = planned ? planned->getSetpoint() : toAbsoluteSpeed(desiredSpeed, doCorrection);
 
-        const auto now = std::chrono::steady_clock::now();
+        const auto now = utility::Clock::now();
         const float dtSeconds = std::chrono::duration<float>(now - lastTime).count();
         lastTime = now;
-        SPDLOG_TRACE("Delta Time: {}", dtSeconds);
 
-        auto [vx_meas, vy_meas, omega_meas] = differentialDrive->measureVelocities(dtSeconds);
-        SPDLOG_TRACE("Measured Velocities - Vx: {}, Vy: {}, Omega: {}", vx_meas, vy_meas, omega_meas);
+        if (dtSeconds <= 0.0f)
+        {
+            // No time passed since the last tick, e.g. the first tick on the virtual clock of a simulation.
+            // Refresh the encoder baselines but skip the control step, the velocities would be NaN.
+            const auto [forwardM, strafeM, omega] = differentialDrive->measureVelocities(1.0f);
+            odometry.integrate(forwardM, strafeM, 0.0);
+            co_yield 1;
+            continue;
+        }
+
+        float vx_meas, vy_meas, omega_meas;
+        {
+            // The encoders of all wheels from one register transfer, the frame must not span a co_yield
+            kipr::core::RegisterFrame frame;
+            std::tie(vx_meas, vy_meas, omega_meas) = differentialDrive->measureVelocities(dtSeconds);
+        }
+
+        float headingDelta = omega_meas * dtSeconds;
+        const auto attitude = attitudeEstimator.isEstimating()
+                                  ? attitudeEstimator.getAttitude()
+                                  : ahrs::Attitude{};
+        if (attitude.sequence != 0 && lastAttitudeSequence != 0)
+        {
+            // Otherwise the first estimate of this run, integrate this tick and follow the estimate from the next one on
+            headingDelta = static_cast<float>(attitude.heading - lastFusedHeading);
+        }
+        lastAttitudeSequence = attitude.sequence;
+        lastFusedHeading = attitude.heading;
 
-        // Only update heading with gyro data if doCorrection is true
+        // Only update heading with gyro data if doCorrection is true, the odometry always follows it
         if (doCorrection)
         {
-            differentialDrive->state.currentHeading += omega_meas * dtSeconds;
-            SPDLOG_TRACE("Heading: {}, Desired Heading: {}",
-                         differentialDrive->state.currentHeading,
-                         differentialDrive->state.desiredHeading
-            );
+            differentialDrive->state.currentHeading += headingDelta;
         }
+        odometry.integrate(vx_meas * dtSeconds, vy_meas * dtSeconds, headingDelta);
 
+        // The speed controllers follow the wheel velocity estimators while they run
+        if (const auto estimated = getEstimatedVelocities())
+        {
+            std::tie(vx_meas, vy_meas) = *estimated;
+        }
+
+        if (planned)
+        {
+            differentialDrive->state.rampedForwardMs = absoluteSpeed.forwardMs;
+            differentialDrive->state.rampedStrafeMs = absoluteSpeed.strafeMs;
+            differentialDrive->state.rampedOmegaRad = absoluteSpeed.angularRad;
+        }
+        else
         {
             float forwardDelta = absoluteSpeed.forwardMs - differentialDrive->state.rampedForwardMs;
             float maxForwardDelta = forwardMaxAccel * dtSeconds;
@@ -283,8 +457,6 @@ libstp::async::AsyncAlgorithm<int> libstp::device::Device::setSpeedWhile(
             );
         }
 
-        SPDLOG_TRACE("Final Commands - Vx: {}, Vy: {}, Omega: {}", finalVx, finalVy, finalOmega);
-
         if (maxVx != 0 && maxVy != 0 && maxW != 0)
         {
             // Clamp final speeds to max values
@@ -301,7 +473,28 @@ libstp::async::AsyncAlgorithm<int> libstp::device::Device::setSpeedWhile(
         // -omega => counterclockwise
         applyKinematicsModel(datatype::AbsoluteSpeed(finalVx, finalVy, finalOmega));
 
-        SPDLOG_TRACE("==============================================");
+        // The PID terms, wheel commands and tick deltas were filled in by the drive and the device.
+        // Fetched per iteration, the coroutine may be resumed on a different thread than it started on.
+        auto& frame = trace::currentFrame();
+        frame.dt = dtSeconds;
+        frame.desired[0] = desiredSpeed.forwardPercent;
+        frame.desired[1] = desiredSpeed.strafePercent;
+        frame.desired[2] = desiredSpeed.angularPercent;
+        frame.absolute[0] = absoluteSpeed.forwardMs;
+        frame.absolute[1] = absoluteSpeed.strafeMs;
+        frame.absolute[2] = absoluteSpeed.angularRad;
+        frame.ramped[0] = rampedSpeed.forwardMs;
+        frame.ramped[1] = rampedSpeed.strafeMs;
+        frame.ramped[2] = rampedSpeed.angularRad;
+        frame.measured[0] = vx_meas;
+        frame.measured[1] = vy_meas;
+        frame.measured[2] = omega_meas;
+        frame.heading = differentialDrive->state.currentHeading;
+        frame.desiredHeading = differentialDrive->state.desiredHeading;
+        frame.command[0] = finalVx;
+        frame.command[1] = finalVy;
+        frame.command[2] = finalOmega;
+        trace::commitFrame(trace::Source::SetSpeedWhile);
         co_yield 1;
     }
 
@@ -0,0 +1,139 @@
+//
+// Created by tobias on 10/18/26.
+//
+
+#include "libstp/filter/filter_bank.h"
+
+#include <algorithm>
+#include <cmath>
+#include <stdexcept>
+
+libstp::filter::FilterBank::FilterBank(const std::size_t channels) : channels(channels)
+{
+    if (channels == 0)
+        throw std::invalid_argument("A filter bank needs at least one channel");
+}
+
+std::size_t libstp::filter::FilterBank::getChannels() const
+{
+    return channels;
+}
+
+libstp::filter::SosFilterBank::SosFilterBank(const std::size_t channels, std::vector<SosSection> sections)
+    : FilterBank(channels), sections(std::move(sections))
+{
+    if (this->sections.empty())
+        throw std::invalid_argument("SosFilterBank needs at least one section");
+    z1.resize(this->sections.size() * channels);
+    z2.resize(this->sections.size() * channels);
+}
+
+void libstp::filter::SosFilterBank::process(const double* input, double* output, const std::size_t frames)
+{
+    if (frames == 0)
+        return;
+    if (!initialized)
+        initialize_(input);
+
+    for (std::size_t frame = 0; frame < frames; ++frame)
+    {
+        const double* in = input + frame * channels;
+        double* out = output + frame * channels;
+        if (out != in)
+            std::copy_n(in, channels, out);
+
+        for (std::size_t s = 0; s < sections.size(); ++s)
+        {
+            const auto& [b0, b1, b2, a1, a2] = sections[s];
+            double* s1 = z1.data() + s * channels;
+            double* s2 = z2.data() + s * channels;
+            for (std::size_t c = 0; c < channels; ++c)
+            {
+                const double value = out[c];
+                const double result = b0 * value + s1[c];
+                s1[c] = b1 * value - a1 * result + s2[c];
+                s2[c] = b2 * value - a2 * result;
+                out[c] = result;
+            }
+        }
+    }
+}
+
+void libstp::filter::SosFilterBank::reset()
+{
+    std::fill(z1.begin(), z1.end(), 0.0);
+    std::fill(z2.begin(), z2.end(), 0.0);
+    initialized = false;
+}
+
+const std::vector<libstp::filter::SosSection>& libstp::filter::SosFilterBank::getSections() const
+{
+    return sections;
+}
+
+void libstp::filter::SosFilterBank::initialize_(const double* frame)
+{
+    // Steady state for a constant input per channel, see SosFilter::reset
+    for (std::size_t c = 0; c < channels; ++c)
+    {
+        double value = frame[c];
+        for (std::size_t s = 0; s < sections.size(); ++s)
+        {
+            const auto& [b0, b1, b2, a1, a2] = sections[s];
+            const double denominator = 1.0 + a1 + a2;
+            const double result = std::abs(denominator) > 1e-12 ? value * (b0 + b1 + b2) / denominator : 0.0;
+            z2[s * channels + c] = b2 * value - a2 * result;
+            z1[s * channels + c] = result - b0 * value;
+            value = result;
+        }
+    }
+    initialized = true;
+}
+
+libstp::filter::MedianFilterBank::MedianFilterBank(const std::size_t channels, const std::size_t window)
+    : FilterBank(channels), window(window)
+{
+    if (window == 0)
+        throw std::invalid_argument("The median window must hold at least one sample");
+    history.resize(channels * window);
+    scratch.resize(window);
+}
+
+void libstp::filter::MedianFilterBank::process(const double* input, double* output, const std::size_t frames)
+{
+    for (std::size_t frame = 0; frame < frames; ++frame)
+    {
+        const double* in = input + frame * channels;
+        double* out = output + frame * channels;
+        filled = std::min(filled + 1, window);
+
+        for (std::size_t c = 0; c < channels; ++c)
+        {
+            double* channelHistory = history.data() + c * window;
+            channelHistory[index] = in[c];
+
+            // Only the first `filled` slots are valid while the window is still filling up
+            std::copy_n(channelHistory, filled, scratch.begin());
+            const auto middle = scratch.begin() + static_cast<std::ptrdiff_t>(filled / 2);
+            std::nth_element(scratch.begin(), middle, scratch.begin() + static_cast<std::ptrdiff_t>(filled));
+            double median = *middle;
+            if (filled % 2 == 0)
+            {
+                median = (median + *std::max_element(scratch.begin(), middle)) / 2.0;
+            }
+            out[c] = median;
+        }
+        index = (index + 1) % window;
+    }
+}
+
+void libstp::filter::MedianFilterBank::reset()
+{
+    index = 0;
+    filled = 0;
+}
+
+std::size_t libstp::filter::MedianFilterBank::getWindow() const
+{
+    return window;
+}
@@ -0,0 +1,100 @@
+//
+// Created by tobias on 10/18/26.
+//
+
+#include "libstp/filter/iir.h"
+
+#include <cmath>
+#include <complex>
+#include <numbers>
+#include <stdexcept>
+
+std::vector<libstp::filter::SosSection> libstp::filter::butterworth(const int order,
+                                                                     const double cutoff,
+                                                                     const double sampleRate,
+                                                                     const bool highPass)
+{
+    if (order < 1)
+        throw std::invalid_argument("Filter order must be at least 1");
+    if (cutoff <= 0.0 || cutoff >= sampleRate / 2.0)
+        throw std::invalid_argument("Cutoff must be between 0 and the Nyquist frequency");
+
+    const double fs2 = 2.0 * sampleRate;
+    const double warped = fs2 * std::tan(std::numbers::pi * cutoff / sampleRate);
+    // Zeros at z = -1 for a low-pass and z = 1 for a high-pass, unit gain at DC or Nyquist respectively
+    const double zero = highPass ? 1.0 : -1.0;
+
+    std::vector<SosSection> sections;
+    for (int k = 0; k < order / 2; ++k)
+    {
+        // Left half plane poles of the analog prototype, one of each conjugate pair
+        const std::complex<double> prototype = std::polar(1.0, std::numbers::pi * (2.0 * k + order + 1) / (2.0 * order));
+        const std::complex<double> s = highPass ? warped / prototype : warped * prototype;
+        const std::complex<double> z = (fs2 + s) / (fs2 - s);
+
+        SosSection section{1.0, -2.0 * zero, 1.0, -2.0 * z.real(), std::norm(z)};
+        const double gain = highPass
+                                ? (1.0 - section.a1 + section.a2) / 4.0
+                                : (1.0 + section.a1 + section.a2) / 4.0;
+        section.b0 *= gain;
+        section.b1 *= gain;
+        section.b2 *= gain;
+        sections.push_back(section);
+    }
+
+    if (order % 2 == 1)
+    {
+        // The real pole of the prototype maps to the same digital pole for low- and high-pass
+        const double z = (fs2 - warped) / (fs2 + warped);
+        const double gain = highPass ? (1.0 + z) / 2.0 : (1.0 - z) / 2.0;
+        sections.push_back({gain, -zero * gain, 0.0, -z, 0.0});
+    }
+
+    return sections;
+}
+
+libstp::filter::SosFilter::SosFilter(std::vector<SosSection> sections) : Filter(0),
+                                                                        sections(std::move(sections))
+{
+    if (this->sections.empty())
+        throw std::invalid_argument("SosFilter needs at least one section");
+    state.resize(this->sections.size());
+}
+
+double libstp::filter::SosFilter::filter(const double dataPoint)
+{
+    if (!initialized)
+        reset(dataPoint);
+
+    double value = dataPoint;
+    for (std::size_t i = 0; i < sections.size(); ++i)
+    {
+        const auto& [b0, b1, b2, a1, a2] = sections[i];
+        auto& [z1, z2] = state[i];
+        const double output = b0 * value + z1;
+        z1 = b1 * value - a1 * output + z2;
+        z2 = b2 * value - a2 * output;
+        value = output;
+    }
+    return value;
+}
+
+void libstp::filter::SosFilter::reset(const double value)
+{
+    double input = value;
+    for (std::size_t i = 0; i < sections.size(); ++i)
+    {
+        const auto& [b0, b1, b2, a1, a2] = sections[i];
+        const double denominator = 1.0 + a1 + a2;
+        const double output = std::abs(denominator) > 1e-12 ? input * (b0 + b1 + b2) / denominator : 0.0;
+        state[i].z2 = b2 * input - a2 * output;
+        state[i].z1 = output - b0 * input;
+        input = output;
+    }
+    initialized = true;
+}
+
+const std::vector<libstp::filter::SosSection>& libstp::filter::SosFilter::getSections() const
+{
+    return sections;
+}
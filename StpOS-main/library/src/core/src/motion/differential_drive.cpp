@@ -4,10 +4,13 @@
 
 #include "libstp/motion/differential_drive.h"
 
+#include <algorithm>
+
 #include "../../include/libstp/_config.h"
 #include "libstp/datatype/speed.h"
 #include "libstp/device/device.h"
 #include "libstp/math/math.h"
+#include "libstp/trace/trace.h"
 #include "libstp/utility/constants.h"
 
 float fuseAngularVelocity(const float omega_gyro, const float omega_encoder, const float alpha = 0.98f)
@@ -18,10 +21,7 @@ float fuseAngularVelocity(const float omega_gyro, const float omega_encoder, con
 std::tuple<float, float, float> libstp::motion::DifferentialDrive::measureVelocities(const float dtSeconds) const
 {
     auto [vX, vY, omega] = device->getWheelVelocities(dtSeconds);
-    SPDLOG_TRACE("Measured Wheel Velocities - Vx: {}, Vy: {}, Omega: {}", vX, vY, omega);
-
     auto fusedOmega = fuseMeasuredWheelSpeedWithAttitude(omega);
-    SPDLOG_TRACE("Fused Omega: {}", fusedOmega);
 
     return std::make_tuple(vX, vY, fusedOmega);
 }
@@ -29,7 +29,6 @@ std::tuple<float, float, float> libstp::motion::DifferentialDrive::measureVeloci
 float libstp::motion::DifferentialDrive::fuseMeasuredWheelSpeedWithAttitude(float omegaEncoder) const
 {
     const auto omegaGyro = attitudeEstimator.getGyroReading(device->imu);
-    SPDLOG_TRACE("Gyro Omega: {}, Encoder Omega: {}", omegaGyro, omegaEncoder);
     return omegaGyro;
 }
 
@@ -42,12 +41,11 @@ float libstp::motion::DifferentialDrive::combineToOmega(
     const auto shouldTargetHeading = std::fabs(state.desiredHeading) > utility::EPSILON;
     if (hasRotation && !shouldTargetHeading)
     {
-        SPDLOG_TRACE("Combining to AS + Correction: {} + {}", absoluteSpeed.angularRad, correctionOmega);
         return absoluteSpeed.angularRad + correctionOmega;
     }
 
-    const auto computedFinalOmega = headingCorrection; //math::clampf(headingCorrection, -omega_cmd, omega_cmd);
-    SPDLOG_TRACE("Combining to Heading Correction: {}", computedFinalOmega);
+    const float direction = device->direction == datatype::Direction::Forward ? 1.0f : -1.0f;
+    const auto computedFinalOmega = headingCorrection + direction * state.headingFeedForward; //math::clampf(headingCorrection, -omega_cmd, omega_cmd);
     return computedFinalOmega;
 }
 
@@ -61,20 +59,24 @@ std::tuple<float, float, float> libstp::motion::DifferentialDrive::calculateCont
     const float angleDifference = math::minimalAngleDifference(desiredHeading, state.currentHeading);
     const float headingError = angleDifference * math::signf(desiredHeading - state.currentHeading);
     float headingCorrection = headingPid.calculate(headingError);
-    SPDLOG_TRACE("Heading Correction: {}. Heading Error: {}. Angle Difference: {}, DirectDelta: {}", headingCorrection,
-                 headingError,
-                 angleDifference,
-                 desiredHeading - state.currentHeading);
 
     const float errorVx = absoluteSpeed.forwardMs - vx_meas;
     const float errorVy = absoluteSpeed.strafeMs - vy_meas;
     const float errorOmega = absoluteSpeed.angularRad - omega_meas;
-    SPDLOG_TRACE("Errors - Vx: {}, Vy: {}, Omega: {}", errorVx, errorVy, errorOmega);
 
-    const float correctionVx = vXPid.calculate(errorVx);
-    const float correctionVy = vYPid.calculate(errorVy);
-    const float correctionOmega = wPid.calculate(errorOmega);
-    SPDLOG_TRACE("Corrections - Vx: {}, Vy: {}, Omega: {}", correctionVx, correctionVy, correctionOmega);
+    const float correctionVx = vXPid.calculate(errorVx, absoluteSpeed.forwardMs);
+    const float correctionVy = vYPid.calculate(errorVy, absoluteSpeed.strafeMs);
+    const float correctionOmega = wPid.calculate(errorOmega, absoluteSpeed.angularRad);
+
+    auto& frame = trace::currentFrame();
+    frame.error[0] = errorVx;
+    frame.error[1] = errorVy;
+    frame.error[2] = errorOmega;
+    frame.error[3] = headingError;
+    std::ranges::copy(vXPid.getLastTerms(), frame.pid[0]);
+    std::ranges::copy(vYPid.getLastTerms(), frame.pid[1]);
+    std::ranges::copy(wPid.getLastTerms(), frame.pid[2]);
+    std::ranges::copy(headingPid.getLastTerms(), frame.pid[3]);
 
     float finalVx = absoluteSpeed.forwardMs + correctionVx;
     float finalVy = absoluteSpeed.strafeMs + correctionVy;
@@ -8,7 +8,7 @@
 libstp::async::AsyncAlgorithm<int> libstp::motion::drive_straight(device::Device& device, const datatype::ConditionalFunction& condition,
                                                                    const datatype::SpeedFunction& speedFunction)
 {
-    return device.setSpeedWhile(condition, [speedFunction](std::shared_ptr<datatype::ConditionalResult> result) {
-        return datatype::Speed(speedFunction(std::move(result)).forwardPercent, 0);
+    return device.setSpeedWhile(condition, [speedFunction](const std::shared_ptr<datatype::ConditionalResult>& result) {
+        return datatype::Speed(speedFunction(result).forwardPercent, 0);
     });
 }
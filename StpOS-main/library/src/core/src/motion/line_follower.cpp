@@ -13,7 +13,7 @@ libstp::async::AsyncAlgorithm<int> libstp::motion::follow_line(device::Device& d
                                  datatype::SpeedFunction speedFunction)
 {
     return device.setSpeedWhile(
-        condition, [&leftSensor, &rightSensor, &speedFunction](std::shared_ptr<datatype::ConditionalResult> result)
+        condition, [&leftSensor, &rightSensor, &speedFunction](const std::shared_ptr<datatype::ConditionalResult>& result)
         {
             const auto currentSpeed = speedFunction(result);
             const float direction = math::signf(currentSpeed.forwardPercent);
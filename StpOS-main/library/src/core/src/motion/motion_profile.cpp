@@ -0,0 +1,155 @@
+//
+// Created by tobias on 10/18/26.
+//
+
+#include "libstp/motion/motion_profile.h"
+
+#include <algorithm>
+#include <cmath>
+
+namespace
+{
+    libstp::motion::ProfileState integrate(const libstp::motion::ProfileState& state, const double jerk, const double dt)
+    {
+        return {
+            state.position + state.velocity * dt + state.acceleration * dt * dt / 2.0 + jerk * dt * dt * dt / 6.0,
+            state.velocity + state.acceleration * dt + jerk * dt * dt / 2.0,
+            state.acceleration + jerk * dt
+        };
+    }
+
+    /**
+     * Time an S-curve needs from rest to the velocity.
+     */
+    double sCurveAccelerationTime(const double velocity, const double maxAcceleration, const double maxJerk)
+    {
+        if (velocity * maxJerk >= maxAcceleration * maxAcceleration)
+        {
+            return velocity / maxAcceleration + maxAcceleration / maxJerk;
+        }
+        return 2.0 * std::sqrt(velocity / maxJerk);
+    }
+}
+
+libstp::motion::MotionProfile::MotionProfile(const double distance, const ProfileLimits& limits)
+    : distance_(distance), direction_(distance < 0.0 ? -1.0 : 1.0)
+{
+    const double length = std::abs(distance);
+    double velocity = limits.maxVelocity;
+    const double acceleration = limits.maxAcceleration;
+    const double jerk = limits.maxJerk;
+    if (length <= 0.0 || velocity <= 0.0 || acceleration <= 0.0)
+    {
+        distance_ = 0.0;
+        return;
+    }
+
+    if (jerk <= 0.0)
+    {
+        if (length * acceleration < velocity * velocity)
+        {
+            // Triangle, decelerates as soon as the peak is reached
+            velocity = std::sqrt(length * acceleration);
+        }
+        const double rampTime = velocity / acceleration;
+        peakVelocity_ = velocity;
+        addSegment(rampTime, acceleration, 0.0);
+        addSegment(length / velocity - rampTime, 0.0, 0.0);
+        addSegment(rampTime, -acceleration, 0.0);
+        return;
+    }
+
+    // Accelerating to v and back covers v * t_accel(v), which grows with v. Search the fastest v that fits.
+    if (velocity * sCurveAccelerationTime(velocity, acceleration, jerk) > length)
+    {
+        double low = 0.0;
+        double high = velocity;
+        for (int i = 0; i < 100; ++i)
+        {
+            const double middle = (low + high) / 2.0;
+            if (middle * sCurveAccelerationTime(middle, acceleration, jerk) > length)
+                high = middle;
+            else
+                low = middle;
+        }
+        velocity = low;
+    }
+    peakVelocity_ = velocity;
+
+    double jerkTime, constantTime, peakAcceleration;
+    if (velocity * jerk >= acceleration * acceleration)
+    {
+        jerkTime = acceleration / jerk;
+        constantTime = velocity / acceleration - jerkTime;
+        peakAcceleration = acceleration;
+    }
+    else
+    {
+        jerkTime = std::sqrt(velocity / jerk);
+        constantTime = 0.0;
+        peakAcceleration = jerk * jerkTime;
+    }
+    const double cruiseTime = (length - velocity * sCurveAccelerationTime(velocity, acceleration, jerk)) / velocity;
+
+    addSegment(jerkTime, 0.0, jerk);
+    addSegment(constantTime, peakAcceleration, 0.0);
+    addSegment(jerkTime, peakAcceleration, -jerk);
+    addSegment(cruiseTime, 0.0, 0.0);
+    addSegment(jerkTime, 0.0, -jerk);
+    addSegment(constantTime, -peakAcceleration, 0.0);
+    addSegment(jerkTime, -peakAcceleration, jerk);
+}
+
+void libstp::motion::MotionProfile::addSegment(const double duration, const double acceleration, const double jerk)
+{
+    if (duration <= 0.0)
+        return;
+
+    Segment segment;
+    if (segmentCount_ > 0)
+    {
+        const auto& previous = segments_[segmentCount_ - 1];
+        segment.start = previous.start + previous.duration;
+        segment.state = integrate(previous.state, previous.jerk, previous.duration);
+    }
+    segment.duration = duration;
+    segment.jerk = jerk;
+    segment.state.acceleration = acceleration;
+
+    segments_[segmentCount_++] = segment;
+    duration_ = segment.start + duration;
+}
+
+libstp::motion::ProfileState libstp::motion::MotionProfile::sample(const double t) const
+{
+    if (t >= duration_)
+    {
+        return {distance_, 0.0, 0.0};
+    }
+
+    const double time = std::max(t, 0.0);
+    int index = 0;
+    while (index + 1 < segmentCount_ && segments_[index + 1].start <= time)
+    {
+        ++index;
+    }
+
+    const auto& segment = segments_[index];
+    const auto state = integrate(segment.state, segment.jerk, time - segment.start);
+    return {direction_ * state.position, direction_ * state.velocity, direction_ * state.acceleration};
+}
+
+double libstp::motion::MotionProfile::getDuration() const
+{
+    return duration_;
+}
+
+double libstp::motion::MotionProfile::getDistance() const
+{
+    return distance_;
+}
+
+double libstp::motion::MotionProfile::getPeakVelocity() const
+{
+    return peakVelocity_;
+}
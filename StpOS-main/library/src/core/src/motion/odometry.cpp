@@ -0,0 +1,48 @@
+//
+// Created by tobias on 10/18/26.
+//
+
+#include "libstp/motion/odometry.h"
+
+#include <chrono>
+#include <cmath>
+
+#include "libstp/utility/clock.h"
+
+namespace
+{
+    double nowSeconds()
+    {
+        return std::chrono::duration<double>(libstp::utility::Clock::now().time_since_epoch()).count();
+    }
+}
+
+void libstp::motion::Odometry::integrate(const double forwardM, const double strafeM, const double headingDeltaRad)
+{
+    std::lock_guard lock(writeMutex_);
+
+    const double heading = pose_.heading + headingDeltaRad / 2.0;
+    const double cosHeading = std::cos(heading);
+    const double sinHeading = std::sin(heading);
+    pose_.x += forwardM * cosHeading - strafeM * sinHeading;
+    pose_.y += forwardM * sinHeading + strafeM * cosHeading;
+    pose_.heading += headingDeltaRad;
+    pose_.distance += std::hypot(forwardM, strafeM);
+    pose_.timestamp = nowSeconds();
+    ++pose_.sequence;
+
+    published_.store(pose_);
+}
+
+void libstp::motion::Odometry::reset(const double x, const double y, const double heading)
+{
+    std::lock_guard lock(writeMutex_);
+
+    pose_ = Pose{x, y, heading, 0.0, nowSeconds(), 0};
+    published_.store(pose_);
+}
+
+libstp::motion::Pose libstp::motion::Odometry::getPose() const
+{
+    return published_.load();
+}
@@ -1,10 +1,13 @@
 //
 // Created by tobias on 12/26/24.
 //
+#include "kipr/core/platform.hpp"
 #include "kipr/motor/motor.h"
 #include "libstp/motor/motor.h"
 
+#include <array>
 #include <cassert>
+#include <mutex>
 #include <unordered_map>
 
 #include "libstp/utility/pid.h"
@@ -19,6 +22,37 @@ constexpr int MAX_SAFETY_VELOCITY = 1000;
 // Minimum interval between velocity warning logs (in milliseconds)
 constexpr unsigned long LOG_THROTTLE_MS = 1000;
 
+namespace
+{
+    // Remembers when a warning was last logged per motor port, motors are commanded from several threads
+    class LogThrottle
+    {
+        std::mutex mutex;
+        std::unordered_map<int, unsigned long> lastLogTime;
+
+    public:
+        bool shouldLog(const int port, const unsigned long currentTime)
+        {
+            std::lock_guard lock(mutex);
+            const auto it = lastLogTime.find(port);
+            if (it != lastLogTime.end() && currentTime - it->second <= LOG_THROTTLE_MS)
+                return false;
+            lastLogTime[port] = currentTime;
+            return true;
+        }
+    };
+}
+
+int libstp::motor::Motor::getPort() const
+{
+    return port;
+}
+
+bool libstp::motor::Motor::isReversed() const
+{
+    return reversePolarity < 0;
+}
+
 int libstp::motor::Motor::getCurrentPositionEstimate() const
 {
     return get_motor_position_counter(port) * reversePolarity;
@@ -29,13 +63,13 @@ void libstp::motor::Motor::resetPositionEstimate() const
     clear_motor_position_counter(port);
 }
 
-void libstp::motor::Motor::setVelocity(int velocity) const
+int libstp::motor::Motor::toMotorVelocity(int velocity) const
 {
     SPDLOG_TRACE("[Motor {}] Setting velocity to: {}", port, velocity);
     
     // Static variables to track when we last logged warnings
-    static std::unordered_map<int, unsigned long> lastBoundsLogTime;
-    static std::unordered_map<int, unsigned long> lastSafetyLogTime;
+    static LogThrottle boundsLog;
+    static LogThrottle safetyLog;
     
     // Current time
     const unsigned long currentTime = libstp::utility::get_current_time_millis();
@@ -43,12 +77,10 @@ void libstp::motor::Motor::setVelocity(int velocity) const
     if (velocity < MIN_VELOCITY || velocity > MAX_VELOCITY)
     {
         // Log an error for out-of-bounds velocity, but throttle the logs
-        if (lastBoundsLogTime.find(port) == lastBoundsLogTime.end() || 
-            currentTime - lastBoundsLogTime[port] > LOG_THROTTLE_MS) 
+        if (boundsLog.shouldLog(port, currentTime))
         {
             SPDLOG_ERROR("Velocity out of bounds for motor {}. Setting velocity to nearest bound: {}", 
                          port, velocity);
-            lastBoundsLogTime[port] = currentTime;
         }
         velocity = std::clamp(velocity, MIN_VELOCITY, MAX_VELOCITY);
     }
@@ -56,20 +88,40 @@ void libstp::motor::Motor::setVelocity(int velocity) const
     if (velocity < MIN_SAFETY_VELOCITY || velocity > MAX_SAFETY_VELOCITY)
     {
         // Log a warning for safety bounds, but throttle the logs
-        if (lastSafetyLogTime.find(port) == lastSafetyLogTime.end() || 
-            currentTime - lastSafetyLogTime[port] > LOG_THROTTLE_MS) 
+        if (safetyLog.shouldLog(port, currentTime))
         {
             SPDLOG_WARN("Velocity is out of safety bounds for motor {}. This may cause the tick estimation to be inaccurate: {}", 
                         port, velocity);
-            lastSafetyLogTime[port] = currentTime;
         }
     }
-    mav(port, reversePolarity * velocity);
+    return reversePolarity * velocity;
+}
+
+void libstp::motor::Motor::setVelocity(const int velocity) const
+{
+    mav(port, toMotorVelocity(velocity));
+}
+
+void libstp::motor::Motor::setVelocities(const std::span<const Motor* const> motors, const std::span<const int> velocities)
+{
+    assert(motors.size() == velocities.size());
+    constexpr std::size_t maxMotors = 4;
+    assert(motors.size() <= maxMotors);
+
+    std::array<int, maxMotors> ports{};
+    std::array<int, maxMotors> motorVelocities{};
+    const auto count = std::min(motors.size(), maxMotors);
+    for (std::size_t i = 0; i < count; ++i)
+    {
+        ports[i] = motors[i]->port;
+        motorVelocities[i] = motors[i]->toMotorVelocity(velocities[i]);
+    }
+    move_at_velocities(ports.data(), motorVelocities.data(), static_cast<int>(count));
 }
 
 libstp::async::AsyncAlgorithm<int> libstp::motor::Motor::moveWhile(datatype::ConditionalFunction condition, int velocity) const
 {
-    const auto result = condition(true);
+    const auto result = (*condition)(true);
     if (const auto* mResult = dynamic_cast<datatype::MotorTicksConditionalResult*>(result.get()))
     {
         SPDLOG_INFO("Condition is a MotorTicksConditionalResult");
@@ -77,7 +129,8 @@ libstp::async::AsyncAlgorithm<int> libstp::motor::Motor::moveWhile(datatype::Con
     } else
     {
         SPDLOG_INFO("Condition is not a MotorTicksConditionalResult");
-        while (condition(false)->is_loop_running())
+        condition->reset();
+        while ((*condition)(false)->is_loop_running())
         {
             setVelocity(velocity);
             co_yield 1;
@@ -109,56 +162,48 @@ libstp::async::AsyncAlgorithm<int> libstp::motor::Motor::moveToTicks(const int t
     SPDLOG_DEBUG("Moving motor to ticks: {}", ticks);
     
     // Static variables to track when we last logged warnings
-    static std::unordered_map<int, unsigned long> lastVelocityZeroLogTime;
-    static std::unordered_map<int, unsigned long> lastNegativeVelocityLogTime;
-    static std::unordered_map<int, unsigned long> lastBoundsLogTime;
-    static std::unordered_map<int, unsigned long> lastSafetyLogTime;
+    static LogThrottle velocityZeroLog;
+    static LogThrottle negativeVelocityLog;
+    static LogThrottle boundsLog;
+    static LogThrottle safetyLog;
     
     // Current time
     const unsigned long currentTime = libstp::utility::get_current_time_millis();
     
     if (velocity == 0)
     {
-        if (lastVelocityZeroLogTime.find(port) == lastVelocityZeroLogTime.end() || 
-            currentTime - lastVelocityZeroLogTime[port] > LOG_THROTTLE_MS) 
+        if (velocityZeroLog.shouldLog(port, currentTime))
         {
             SPDLOG_ERROR(
                 "Velocity is 0 for motor {}. Using velocity of 500 instead", port);
-            lastVelocityZeroLogTime[port] = currentTime;
         }
         velocity = 500;
     }
     
     if (velocity < 0)
     {
-        if (lastNegativeVelocityLogTime.find(port) == lastNegativeVelocityLogTime.end() || 
-            currentTime - lastNegativeVelocityLogTime[port] > LOG_THROTTLE_MS) 
+        if (negativeVelocityLog.shouldLog(port, currentTime))
         {
             SPDLOG_WARN(
                 "Negative velocity for motor {} with for_ticks(). Consider using positive values", port);
-            lastNegativeVelocityLogTime[port] = currentTime;
         }
     }
 
     if (velocity < MIN_VELOCITY || velocity > MAX_VELOCITY)
     {
-        if (lastBoundsLogTime.find(port) == lastBoundsLogTime.end() || 
-            currentTime - lastBoundsLogTime[port] > LOG_THROTTLE_MS) 
+        if (boundsLog.shouldLog(port, currentTime))
         {
             SPDLOG_ERROR("Velocity out of bounds for motor {}. Setting velocity to nearest bound", port);
-            lastBoundsLogTime[port] = currentTime;
         }
         velocity = std::clamp(velocity, MIN_VELOCITY, MAX_VELOCITY);
     }
 
     if (velocity < MIN_SAFETY_VELOCITY || velocity > MAX_SAFETY_VELOCITY)
     {
-        if (lastSafetyLogTime.find(port) == lastSafetyLogTime.end() || 
-            currentTime - lastSafetyLogTime[port] > LOG_THROTTLE_MS) 
+        if (safetyLog.shouldLog(port, currentTime))
         {
             SPDLOG_WARN("Velocity is out of safety bounds for motor {}. This may cause the tick estimation to be inaccurate: {}", 
                         port, velocity);
-            lastSafetyLogTime[port] = currentTime;
         }
     }
 
@@ -181,3 +226,26 @@ libstp::motor::Motor::Motor(const int port, const bool reversePolarity): port(po
     this->reversePolarity = reversePolarity ? -1 : 1;
     SPDLOG_TRACE("Port: {}, Reverse Polarity: {}", port, reversePolarity);
 }
+
+libstp::motor::WriteBatch::~WriteBatch()
+{
+    end();
+}
+
+void libstp::motor::WriteBatch::begin()
+{
+    if (active)
+        return;
+
+    kipr::core::Platform::instance()->beginFrame();
+    active = true;
+}
+
+void libstp::motor::WriteBatch::end()
+{
+    if (!active)
+        return;
+
+    active = false;
+    kipr::core::Platform::instance()->endFrame();
+}
@@ -0,0 +1,104 @@
+//
+// Created by tobias on 10/18/26.
+//
+
+#include "libstp/motor/velocity_estimator.h"
+
+#include <chrono>
+#include <cmath>
+#include <stdexcept>
+
+#include "libstp/utility/clock.h"
+
+libstp::motor::VelocityEstimator::VelocityEstimator(const double bandwidth)
+    : bandwidth_(bandwidth)
+{
+    if (bandwidth <= 0.0)
+        throw std::invalid_argument("Bandwidth must be greater than zero");
+}
+
+double libstp::motor::VelocityEstimator::now()
+{
+    return std::chrono::duration<double>(utility::Clock::now().time_since_epoch()).count();
+}
+
+void libstp::motor::VelocityEstimator::update(const double ticks)
+{
+    update(ticks, now());
+}
+
+void libstp::motor::VelocityEstimator::update(const double ticks, const double timeSeconds)
+{
+    const double dt = timeSeconds - lastTime_;
+    if (resetRequested_.exchange(false) || dt > MAX_UPDATE_GAP || dt < 0.0)
+    {
+        position_ = ticks;
+        velocity_ = 0.0;
+        acceleration_ = 0.0;
+    }
+    else if (dt > 0.0)
+    {
+        // Critically damped alpha-beta-gamma gains, all poles at exp(-bandwidth * dt)
+        const double pole = std::exp(-bandwidth_.load(std::memory_order_relaxed) * dt);
+        const double alpha = 1.0 - pole * pole * pole;
+        const double beta = 1.5 * (1.0 - pole) * (1.0 - pole) * (1.0 + pole);
+        const double gamma = 0.5 * (1.0 - pole) * (1.0 - pole) * (1.0 - pole);
+
+        const double predictedPosition = position_ + velocity_ * dt + 0.5 * acceleration_ * dt * dt;
+        const double predictedVelocity = velocity_ + acceleration_ * dt;
+        const double error = ticks - predictedPosition;
+
+        position_ = predictedPosition + alpha * error;
+        velocity_ = predictedVelocity + beta * error / dt;
+        acceleration_ += 2.0 * gamma * error / (dt * dt);
+    }
+    lastTime_ = timeSeconds;
+
+    publishedPosition_.store(position_, std::memory_order_relaxed);
+    publishedVelocity_.store(velocity_, std::memory_order_relaxed);
+    publishedAcceleration_.store(acceleration_, std::memory_order_relaxed);
+    publishedTime_.store(timeSeconds, std::memory_order_release);
+}
+
+void libstp::motor::VelocityEstimator::reset()
+{
+    resetRequested_ = true;
+}
+
+double libstp::motor::VelocityEstimator::getPosition() const
+{
+    return publishedPosition_.load(std::memory_order_relaxed);
+}
+
+double libstp::motor::VelocityEstimator::getVelocity() const
+{
+    return publishedVelocity_.load(std::memory_order_relaxed);
+}
+
+double libstp::motor::VelocityEstimator::getAcceleration() const
+{
+    return publishedAcceleration_.load(std::memory_order_relaxed);
+}
+
+double libstp::motor::VelocityEstimator::getLastUpdate() const
+{
+    return publishedTime_.load(std::memory_order_acquire);
+}
+
+bool libstp::motor::VelocityEstimator::isFresh(const double maxAge) const
+{
+    const double lastUpdate = getLastUpdate();
+    return lastUpdate > 0.0 && now() - lastUpdate <= maxAge;
+}
+
+double libstp::motor::VelocityEstimator::getBandwidth() const
+{
+    return bandwidth_.load(std::memory_order_relaxed);
+}
+
+void libstp::motor::VelocityEstimator::setBandwidth(const double bandwidth)
+{
+    if (bandwidth <= 0.0)
+        throw std::invalid_argument("Bandwidth must be greater than zero");
+    bandwidth_ = bandwidth;
+}
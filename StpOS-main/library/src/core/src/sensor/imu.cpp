@@ -57,11 +57,21 @@ std::shared_ptr<Eigen::Vector3d> libstp::sensor::GyroSensor::getVariance()
     return variance;
 }
 
-std::shared_ptr<Eigen::Vector3d> libstp::sensor::GyroSensor::getBias()
+std::shared_ptr<Eigen::Vector3d> libstp::sensor::GyroSensor::getBias() const
 {
     return offset;
 }
 
+void libstp::sensor::GyroSensor::setBias(const std::shared_ptr<Vector3d>& bias)
+{
+    offset = bias;
+}
+
+void libstp::sensor::GyroSensor::setVariance(const std::shared_ptr<Vector3d>& newVariance)
+{
+    variance = newVariance;
+}
+
 std::shared_ptr<Eigen::Vector3d> libstp::sensor::GyroSensor::applyCalibration(const std::shared_ptr<Vector3d>& sample) const
 {
     return std::make_shared<Vector3d>(*sample - *offset);
@@ -117,7 +127,7 @@ std::shared_ptr<Eigen::Vector3d> libstp::sensor::AccelSensor::getVariance()
     return variance;
 }
 
-std::shared_ptr<Eigen::Vector3d> libstp::sensor::AccelSensor::getBias()
+std::shared_ptr<Eigen::Vector3d> libstp::sensor::AccelSensor::getBias() const
 {
     return offset;
 }
@@ -127,6 +137,21 @@ std::shared_ptr<Eigen::Vector3d> libstp::sensor::AccelSensor::getGravity()
     return gravity;
 }
 
+void libstp::sensor::AccelSensor::setBias(const std::shared_ptr<Vector3d>& bias)
+{
+    offset = bias;
+}
+
+void libstp::sensor::AccelSensor::setVariance(const std::shared_ptr<Vector3d>& newVariance)
+{
+    variance = newVariance;
+}
+
+void libstp::sensor::AccelSensor::setGravity(const std::shared_ptr<Vector3d>& newGravity)
+{
+    gravity = newGravity;
+}
+
 std::shared_ptr<Eigen::Vector3d> libstp::sensor::AccelSensor::applyCalibration(const std::shared_ptr<Vector3d>& sample) const
 {
     return std::make_shared<Vector3d>(*sample - *offset);
@@ -173,6 +198,9 @@ libstp::async::AsyncAlgorithm<int> libstp::sensor::IMU::calibrate(const int samp
     auto samples_mag = std::make_shared<MatrixX3d>(sampleCount, 3);
 
     SPDLOG_INFO("[IMU] Calibrating IMU... Please keep the device still.");
+    // The samples are bias corrected, a restored bias would end up in the new one
+    gyro.setBias(std::make_shared<Vector3d>(Vector3d::Zero()));
+    accel.setBias(std::make_shared<Vector3d>(Vector3d::Zero()));
     for (int i = 0; i < sampleCount; ++i)
     {
         samples_gyro->row(i) = *gyro.getValue();
@@ -188,6 +216,34 @@ libstp::async::AsyncAlgorithm<int> libstp::sensor::IMU::calibrate(const int samp
     SPDLOG_INFO("[IMU] Calibration complete.");
 }
 
+libstp::async::AsyncAlgorithm<int> libstp::sensor::IMU::validateCalibration(const int sampleCount,
+                                                                          const double gyroTolerance,
+                                                                          const double accelTolerance)
+{
+    // Exceptions thrown inside the coroutine terminate, so too few samples count as one
+    const int samples = std::max(1, sampleCount);
+    Vector3d gyroSum = Vector3d::Zero();
+    Vector3d accelSum = Vector3d::Zero();
+    for (int i = 0; i < samples; ++i)
+    {
+        gyroSum += *gyro.getValue();
+        accelSum += *accel.getValue();
+        co_yield 1;
+    }
+
+    const Vector3d gyroMean = gyroSum / samples;
+    const Vector3d accelError = accelSum / samples - *accel.getGravity();
+    if (gyroMean.cwiseAbs().maxCoeff() > gyroTolerance || accelError.norm() > accelTolerance)
+    {
+        SPDLOG_INFO("[IMU] Stored calibration is off by {} rad/s (gyro) and {} m/s^2 (accel)",
+                    gyroMean.cwiseAbs().maxCoeff(), accelError.norm());
+        co_return 0;
+    }
+
+    SPDLOG_INFO("[IMU] Stored calibration is still valid.");
+    co_return 1;
+}
+
 std::tuple<std::shared_ptr<Eigen::Vector3d>, std::shared_ptr<Eigen::Vector3d>, std::shared_ptr<Eigen::Vector3d>> libstp::sensor::IMU::getReading() const
 {
     return std::make_tuple(
@@ -0,0 +1,267 @@
+//
+// Created by tobias on 10/18/26.
+//
+
+#include "libstp/sensor/sampler.h"
+
+#include <algorithm>
+#include <chrono>
+#include <stdexcept>
+
+#include "kipr/accel/accel.h"
+#include "kipr/analog/analog.h"
+#include "kipr/core/platform.hpp"
+#include "kipr/digital/digital.h"
+#include "kipr/gyro/gyro.h"
+#include "kipr/magneto/magneto.h"
+#include "libstp/_config.h"
+#include "libstp/math/math.h"
+
+libstp::sensor::SampleRing::SampleRing(const std::size_t capacity)
+    : capacity_(capacity),
+      buffer_(new double[2 * capacity]())
+{
+    if (capacity == 0)
+        throw std::invalid_argument("Ring capacity must be greater than zero");
+}
+
+void libstp::sensor::SampleRing::push(const double value) noexcept
+{
+    const std::uint64_t count = written_.load(std::memory_order_relaxed);
+    const std::size_t index = count % capacity_;
+    buffer_[index] = value;
+    buffer_[index + capacity_] = value;
+    written_.store(count + 1, std::memory_order_release);
+}
+
+double libstp::sensor::SampleRing::latest() const noexcept
+{
+    const std::uint64_t count = written_.load(std::memory_order_acquire);
+    if (count == 0)
+        return 0.0;
+    return buffer_[(count - 1) % capacity_];
+}
+
+const double* libstp::sensor::SampleRing::window(std::size_t& n) const noexcept
+{
+    const std::uint64_t count = written_.load(std::memory_order_acquire);
+    n = std::min<std::size_t>(n, std::min<std::uint64_t>(count, capacity_));
+    return buffer_.get() + count % capacity_ + capacity_ - n;
+}
+
+std::size_t libstp::sensor::SampleRing::size() const noexcept
+{
+    return std::min<std::uint64_t>(written_.load(std::memory_order_acquire), capacity_);
+}
+
+std::size_t libstp::sensor::SampleRing::capacity() const noexcept
+{
+    return capacity_;
+}
+
+std::uint64_t libstp::sensor::SampleRing::written() const noexcept
+{
+    return written_.load(std::memory_order_acquire);
+}
+
+libstp::sensor::Sampler::Sampler(const int frequency, const std::size_t capacity)
+    : frequency_(frequency),
+      capacity_(capacity),
+      timestamps_(std::make_unique<SampleRing>(capacity))
+{
+    if (frequency <= 0)
+        throw std::invalid_argument("Frequency must be greater than zero");
+}
+
+libstp::sensor::Sampler::~Sampler()
+{
+    stop();
+}
+
+int libstp::sensor::Sampler::addChannel(const std::string& name, std::function<double()> source)
+{
+    requireStopped_();
+    if (std::ranges::find(names_, name) != names_.end())
+        throw std::invalid_argument("Sampler already has a channel named " + name);
+
+    names_.push_back(name);
+    sources_.push_back(std::move(source));
+    rings_.push_back(std::make_unique<SampleRing>(capacity_));
+    return static_cast<int>(names_.size()) - 1;
+}
+
+int libstp::sensor::Sampler::addAnalog(const int port)
+{
+    return addChannel("analog" + std::to_string(port), [port] { return static_cast<double>(analog(port)); });
+}
+
+int libstp::sensor::Sampler::addDigital(const int port)
+{
+    return addChannel("digital" + std::to_string(port), [port] { return static_cast<double>(digital(port)); });
+}
+
+std::vector<int> libstp::sensor::Sampler::addGyro(const IMU* imu)
+{
+    // Same units and bias correction as GyroSensor::getValue
+    const auto bias = [imu](const int axis) { return imu ? (*imu->gyro.getBias())[axis] : 0.0; };
+    return {
+        addChannel("gyro_x", [bias] { return gyro_x() * DEG_TO_RAD - bias(0); }),
+        addChannel("gyro_y", [bias] { return gyro_y() * DEG_TO_RAD - bias(1); }),
+        addChannel("gyro_z", [bias] { return gyro_z() * DEG_TO_RAD - bias(2); }),
+    };
+}
+
+std::vector<int> libstp::sensor::Sampler::addAccel(const IMU* imu)
+{
+    const auto bias = [imu](const int axis) { return imu ? (*imu->accel.getBias())[axis] : 0.0; };
+    return {
+        addChannel("accel_x", [bias] { return accel_x() - bias(0); }),
+        addChannel("accel_y", [bias] { return accel_y() - bias(1); }),
+        addChannel("accel_z", [bias] { return accel_z() - bias(2); }),
+    };
+}
+
+std::vector<int> libstp::sensor::Sampler::addMagneto(const IMU* imu)
+{
+    if (!imu)
+    {
+        return {
+            addChannel("magneto_x", [] { return static_cast<double>(magneto_x()); }),
+            addChannel("magneto_y", [] { return static_cast<double>(magneto_y()); }),
+            addChannel("magneto_z", [] { return static_cast<double>(magneto_z()); }),
+        };
+    }
+
+    // Hard and soft iron correction mixes the axes, so all three are read by the x channel and cached
+    auto corrected = std::make_shared<Eigen::Vector3d>(Eigen::Vector3d::Zero());
+    return {
+        addChannel("magneto_x", [imu, corrected]
+        {
+            const auto raw = std::make_shared<Eigen::Vector3d>(magneto_x(), magneto_y(), magneto_z());
+            *corrected = *imu->magneto.applyCalibration(raw);
+            return (*corrected)[0];
+        }),
+        addChannel("magneto_y", [corrected] { return (*corrected)[1]; }),
+        addChannel("magneto_z", [corrected] { return (*corrected)[2]; }),
+    };
+}
+
+int libstp::sensor::Sampler::addMotor(const std::shared_ptr<motor::Motor>& motor)
+{
+    if (!motor)
+        throw std::invalid_argument("Motor must not be None");
+
+    motors_.push_back(motor);
+    const motor::Motor* raw = motor.get();
+    return addChannel("motor" + std::to_string(motor->getPort()),
+                      [raw] { return static_cast<double>(raw->getCurrentPositionEstimate()); });
+}
+
+int libstp::sensor::Sampler::addMotorVelocity(const motor::Motor& motor,
+                                               const std::shared_ptr<motor::VelocityEstimator>& estimator)
+{
+    if (!estimator)
+        throw std::invalid_argument("Estimator must not be None");
+
+    return addChannel("motor" + std::to_string(motor.getPort()) + "_velocity", [motor, estimator]
+    {
+        estimator->update(motor.getCurrentPositionEstimate());
+        return estimator->getVelocity();
+    });
+}
+
+void libstp::sensor::Sampler::start()
+{
+    if (running_.exchange(true))
+        return;
+
+    thread_ = std::thread(&Sampler::run_, this);
+    SPDLOG_DEBUG("[Sampler] Started sampling {} channels at {} Hz", names_.size(), frequency_);
+}
+
+void libstp::sensor::Sampler::stop()
+{
+    running_ = false;
+    if (thread_.joinable())
+    {
+        thread_.join();
+        SPDLOG_DEBUG("[Sampler] Stopped, {} overruns", overruns_.load());
+    }
+}
+
+bool libstp::sensor::Sampler::isRunning() const
+{
+    return running_;
+}
+
+const libstp::sensor::SampleRing& libstp::sensor::Sampler::channel(const int index) const
+{
+    if (index < 0 || index >= static_cast<int>(rings_.size()))
+        throw std::out_of_range("Sampler has no channel " + std::to_string(index));
+    return *rings_[index];
+}
+
+const libstp::sensor::SampleRing& libstp::sensor::Sampler::timestamps() const
+{
+    return *timestamps_;
+}
+
+int libstp::sensor::Sampler::channelIndex(const std::string& name) const
+{
+    const auto it = std::ranges::find(names_, name);
+    if (it == names_.end())
+        throw std::out_of_range("Sampler has no channel named " + name);
+    return static_cast<int>(std::distance(names_.begin(), it));
+}
+
+const std::vector<std::string>& libstp::sensor::Sampler::channelNames() const
+{
+    return names_;
+}
+
+int libstp::sensor::Sampler::getFrequency() const
+{
+    return frequency_;
+}
+
+std::uint64_t libstp::sensor::Sampler::getOverruns() const
+{
+    return overruns_;
+}
+
+void libstp::sensor::Sampler::run_()
+{
+    using clock = std::chrono::steady_clock;
+    const auto period = std::chrono::duration_cast<clock::duration>(std::chrono::seconds(1)) / frequency_;
+    auto deadline = clock::now();
+
+    while (running_)
+    {
+        {
+            // All channels of a sample come from one register transfer
+            kipr::core::RegisterFrame frame;
+            for (std::size_t i = 0; i < sources_.size(); ++i)
+            {
+                rings_[i]->push(sources_[i]());
+            }
+        }
+        // Published last, a reader that sees a timestamp also sees all channels of that sample
+        timestamps_->push(std::chrono::duration<double>(clock::now().time_since_epoch()).count());
+
+        deadline += period;
+        if (const auto now = clock::now(); deadline < now)
+        {
+            // Skip the missed samples instead of bursting, the data stays evenly spaced
+            const auto missed = (now - deadline) / period + 1;
+            overruns_ += missed;
+            deadline += missed * period;
+        }
+        std::this_thread::sleep_until(deadline);
+    }
+}
+
+void libstp::sensor::Sampler::requireStopped_() const
+{
+    if (running_)
+        throw std::logic_error("Channels can only be added while the sampler is stopped");
+}
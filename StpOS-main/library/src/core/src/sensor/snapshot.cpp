@@ -0,0 +1,171 @@
+//
+// Created by tobias on 10/18/26.
+//
+
+#include "libstp/sensor/snapshot.h"
+
+#include <algorithm>
+#include <chrono>
+#include <stdexcept>
+#include <string>
+
+#include "kipr/accel/accel.h"
+#include "kipr/analog/analog.h"
+#include "kipr/core/platform.hpp"
+#include "kipr/digital/digital.h"
+#include "kipr/gyro/gyro.h"
+#include "kipr/magneto/magneto.h"
+#include "libstp/math/math.h"
+#include "libstp/utility/clock.h"
+
+constexpr std::size_t IMU_VALUE_COUNT = 9;
+
+libstp::sensor::Snapshot::Snapshot(std::vector<int> analogPorts,
+                                   std::vector<int> digitalPorts,
+                                   std::vector<std::shared_ptr<motor::Motor>> motors,
+                                   const IMU* imu)
+    : analogPorts(std::move(analogPorts)),
+      digitalPorts(std::move(digitalPorts)),
+      motors(std::move(motors)),
+      imu(imu)
+{
+    for (const auto& motor : this->motors)
+    {
+        if (!motor)
+            throw std::invalid_argument("Snapshot motors must not be None");
+        motorPorts.push_back(motor->getPort());
+    }
+
+    values.assign(encoderOffset() + this->motors.size(), 0.0);
+}
+
+void libstp::sensor::Snapshot::update()
+{
+    // One register transfer for the whole snapshot
+    kipr::core::RegisterFrame frame;
+    double* out = values.data();
+    for (const int port : analogPorts)
+        *out++ = analog(port);
+    for (const int port : digitalPorts)
+        *out++ = digital(port);
+
+    if (imu)
+    {
+        const Eigen::Vector3d rawGyro(gyro_x() * DEG_TO_RAD, gyro_y() * DEG_TO_RAD, gyro_z() * DEG_TO_RAD);
+        const Eigen::Vector3d rawAccel(accel_x(), accel_y(), accel_z());
+        const Eigen::Vector3d rawMagneto(magneto_x(), magneto_y(), magneto_z());
+
+        const Eigen::Vector3d gyroValue = rawGyro - *imu->gyro.getBias();
+        const Eigen::Vector3d accelValue = rawAccel - *imu->accel.getBias();
+        const Eigen::Vector3d magnetoValue = *imu->magneto.applyCalibration(std::make_shared<Eigen::Vector3d>(rawMagneto));
+        for (const auto* vector : {&gyroValue, &accelValue, &magnetoValue})
+        {
+            out = std::copy(vector->data(), vector->data() + 3, out);
+        }
+    }
+
+    for (const auto& motor : motors)
+        *out++ = motor->getCurrentPositionEstimate();
+
+    timestamp = std::chrono::duration<double>(utility::Clock::now().time_since_epoch()).count();
+    sequence++;
+}
+
+double libstp::sensor::Snapshot::getTimestamp() const
+{
+    return timestamp;
+}
+
+std::uint64_t libstp::sensor::Snapshot::getSequence() const
+{
+    return sequence;
+}
+
+int libstp::sensor::Snapshot::getAnalog(const int port) const
+{
+    return static_cast<int>(values[analogOffset() + indexOf(analogPorts, port, "analog")]);
+}
+
+bool libstp::sensor::Snapshot::getDigital(const int port) const
+{
+    return values[digitalOffset() + indexOf(digitalPorts, port, "digital")] != 0.0;
+}
+
+int libstp::sensor::Snapshot::getEncoder(const int port) const
+{
+    return static_cast<int>(values[encoderOffset() + indexOf(motorPorts, port, "motor")]);
+}
+
+Eigen::Vector3d libstp::sensor::Snapshot::getGyro() const
+{
+    if (!imu)
+        throw std::runtime_error("Snapshot was created without an IMU");
+    return Eigen::Vector3d(values.data() + imuOffset());
+}
+
+Eigen::Vector3d libstp::sensor::Snapshot::getAccel() const
+{
+    if (!imu)
+        throw std::runtime_error("Snapshot was created without an IMU");
+    return Eigen::Vector3d(values.data() + imuOffset() + 3);
+}
+
+Eigen::Vector3d libstp::sensor::Snapshot::getMagneto() const
+{
+    if (!imu)
+        throw std::runtime_error("Snapshot was created without an IMU");
+    return Eigen::Vector3d(values.data() + imuOffset() + 6);
+}
+
+const double* libstp::sensor::Snapshot::data() const
+{
+    return values.data();
+}
+
+std::size_t libstp::sensor::Snapshot::size() const
+{
+    return values.size();
+}
+
+std::size_t libstp::sensor::Snapshot::analogOffset() const
+{
+    return 0;
+}
+
+std::size_t libstp::sensor::Snapshot::digitalOffset() const
+{
+    return analogPorts.size();
+}
+
+std::size_t libstp::sensor::Snapshot::imuOffset() const
+{
+    return digitalOffset() + digitalPorts.size();
+}
+
+std::size_t libstp::sensor::Snapshot::encoderOffset() const
+{
+    return imuOffset() + (imu ? IMU_VALUE_COUNT : 0);
+}
+
+const std::vector<int>& libstp::sensor::Snapshot::getAnalogPorts() const
+{
+    return analogPorts;
+}
+
+const std::vector<int>& libstp::sensor::Snapshot::getDigitalPorts() const
+{
+    return digitalPorts;
+}
+
+const std::vector<int>& libstp::sensor::Snapshot::getMotorPorts() const
+{
+    return motorPorts;
+}
+
+std::size_t libstp::sensor::Snapshot::indexOf(const std::vector<int>& ports, const int port, const char* kind)
+{
+    const auto it = std::ranges::find(ports, port);
+    if (it == ports.end())
+        throw std::out_of_range(std::string("Snapshot does not contain ") + kind + " port " + std::to_string(port));
+    return std::distance(ports.begin(), it);
+}
@@ -4,11 +4,14 @@
 #include "kipr/servo/servo.h"
 #include "libstp/servo/servo.h"
 
+#include <cassert>
 #include <cmath>
 
+#include "libstp/utility/clock.h"
 #include "libstp/utility/timing.h"
 #include "libstp/_config.h"
 #include "libstp/async/algorithm.h"
+#include "libstp/motor/motor.h"
 
 constexpr int MIN_POSITION = 0;
 constexpr int MAX_POSITION = 2047;
@@ -40,7 +43,7 @@ libstp::async::AsyncAlgorithm<int> libstp::servo::Servo::slowlySetPosition(const
     
     const int clampedTarget = math::clampInt(targetPosition, MIN_POSITION, MAX_POSITION);
     
-    using clock = std::chrono::steady_clock;
+    using clock = utility::Clock;
     const auto startTime = clock::now();
     const auto endTime = startTime + duration;
     
@@ -112,13 +115,14 @@ void libstp::servo::Servo::shake(const int centerPosition,
         return;
     }
 
-    using clock = std::chrono::steady_clock;
+    using clock = utility::Clock;
     const auto startTime = clock::now();
 
     constexpr auto twoPi = static_cast<float>(2.0 * M_PI);
     const float angularFrequency = twoPi * speedHz;
 
-    while (conditional(false)->is_loop_running())
+    conditional->reset();
+    while ((*conditional)(false)->is_loop_running())
     {
         const auto now = clock::now();
         std::chrono::duration<float> elapsed = now - startTime;
@@ -154,3 +158,14 @@ void libstp::servo::Servo::disableAllServos()
 {
     disable_servos();
 }
+
+void libstp::servo::Servo::setPositions(const std::span<Servo* const> servos, const std::span<const int> positions)
+{
+    assert(servos.size() == positions.size());
+    motor::WriteBatch batch;
+    batch.begin();
+    for (std::size_t i = 0; i < std::min(servos.size(), positions.size()); ++i)
+    {
+        servos[i]->setPosition(positions[i]);
+    }
+}
@@ -0,0 +1,96 @@
+//
+// Created by tobias on 10/18/26.
+//
+
+#include "libstp/sim/kinematics.h"
+
+#include <cmath>
+#include <stdexcept>
+
+libstp::sim::Kinematics::Kinematics(std::vector<motor::Motor> wheels, const double wheelRadius,
+                                    const double ticksPerRevolution)
+    : wheels(std::move(wheels)), wheelRadius(wheelRadius), ticksPerRevolution(ticksPerRevolution)
+{
+    if (wheelRadius <= 0.0 || ticksPerRevolution <= 0.0)
+    {
+        throw std::invalid_argument("Wheel radius and ticks per revolution must be greater than zero");
+    }
+}
+
+const std::vector<libstp::motor::Motor>& libstp::sim::Kinematics::getWheels() const
+{
+    return wheels;
+}
+
+double libstp::sim::Kinematics::wheelSpeed(const double ticksPerSecond) const
+{
+    // Surface speed of the wheel in m/s
+    return ticksPerSecond / ticksPerRevolution * 2.0 * M_PI * wheelRadius;
+}
+
+libstp::sim::DifferentialKinematics::DifferentialKinematics(const motor::Motor& leftMotor,
+                                                            const motor::Motor& rightMotor,
+                                                            const double wheelRadius,
+                                                            const double wheelBase,
+                                                            const double ticksPerRevolution)
+    : Kinematics({leftMotor, rightMotor}, wheelRadius, ticksPerRevolution), wheelBase(wheelBase)
+{
+    if (wheelBase <= 0.0)
+    {
+        throw std::invalid_argument("Wheel base must be greater than zero");
+    }
+}
+
+libstp::datatype::AbsoluteSpeed libstp::sim::DifferentialKinematics::toBodyVelocity(
+    const std::vector<double>& wheelTicksPerSecond) const
+{
+    const double left = wheelSpeed(wheelTicksPerSecond[0]);
+    const double right = wheelSpeed(wheelTicksPerSecond[1]);
+    return {
+        static_cast<float>((left + right) / 2.0),
+        0.0f,
+        static_cast<float>((right - left) / wheelBase)
+    };
+}
+
+bool libstp::sim::DifferentialKinematics::isClockwise() const
+{
+    return false;
+}
+
+libstp::sim::MecanumKinematics::MecanumKinematics(const motor::Motor& frontLeftMotor,
+                                                  const motor::Motor& frontRightMotor,
+                                                  const motor::Motor& rearLeftMotor,
+                                                  const motor::Motor& rearRightMotor,
+                                                  const double wheelRadius,
+                                                  const double wheelDistanceFromCenter,
+                                                  const double ticksPerRevolution)
+    : Kinematics({frontLeftMotor, frontRightMotor, rearLeftMotor, rearRightMotor}, wheelRadius, ticksPerRevolution),
+      wheelDistanceFromCenter(wheelDistanceFromCenter)
+{
+    if (wheelDistanceFromCenter <= 0.0)
+    {
+        throw std::invalid_argument("Wheel distance from center must be greater than zero");
+    }
+}
+
+libstp::datatype::AbsoluteSpeed libstp::sim::MecanumKinematics::toBodyVelocity(
+    const std::vector<double>& wheelTicksPerSecond) const
+{
+    const double frontLeft = wheelSpeed(wheelTicksPerSecond[0]);
+    const double frontRight = wheelSpeed(wheelTicksPerSecond[1]);
+    const double rearLeft = wheelSpeed(wheelTicksPerSecond[2]);
+    const double rearRight = wheelSpeed(wheelTicksPerSecond[3]);
+
+    // Pseudo inverse of the inverse kinematics matrix used by OmniWheeledDevice
+    return {
+        static_cast<float>((frontRight + frontLeft + rearLeft + rearRight) / 4.0),
+        static_cast<float>((frontRight - frontLeft + rearLeft - rearRight) / 4.0),
+        static_cast<float>((-frontRight + frontLeft + rearLeft - rearRight) / (4.0 * wheelDistanceFromCenter))
+    };
+}
+
+bool libstp::sim::MecanumKinematics::isClockwise() const
+{
+    return true;
+}
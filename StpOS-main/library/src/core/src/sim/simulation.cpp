@@ -0,0 +1,172 @@
+//
+// Created by tobias on 10/18/26.
+//
+
+#include "libstp/sim/simulation.h"
+
+#include <algorithm>
+#include <atomic>
+#include <chrono>
+#include <cmath>
+#include <stdexcept>
+#include <string>
+
+#include "kipr/core/device.hpp"
+#include "kipr/core/platform.hpp"
+#include "libstp/_config.h"
+#include "libstp/utility/clock.h"
+
+namespace
+{
+    std::atomic<libstp::sim::Simulation*> active = nullptr;
+
+    /**
+     * Register interface of libwallaby backed by a simulated world.
+     */
+    class SimulatedDevice final : public kipr::core::Device
+    {
+    public:
+        explicit SimulatedDevice(std::shared_ptr<libstp::sim::World> world)
+            : world_(std::move(world))
+        {
+        }
+
+        [[nodiscard]] const std::string& getName() const override
+        {
+            return name_;
+        }
+
+        [[nodiscard]] std::uint64_t getAccesses() const
+        {
+            return accesses_.load(std::memory_order_relaxed);
+        }
+
+        std::uint8_t r8(const std::uint8_t address) override
+        {
+            accesses_.fetch_add(1, std::memory_order_relaxed);
+            return static_cast<std::uint8_t>(world_->readRegister(address, 1));
+        }
+
+        std::uint16_t r16(const std::uint8_t address) override
+        {
+            accesses_.fetch_add(1, std::memory_order_relaxed);
+            return static_cast<std::uint16_t>(world_->readRegister(address, 2));
+        }
+
+        std::uint32_t r32(const std::uint8_t address) override
+        {
+            accesses_.fetch_add(1, std::memory_order_relaxed);
+            return world_->readRegister(address, 4);
+        }
+
+        void w8(const std::uint8_t address, const std::uint8_t value) override
+        {
+            accesses_.fetch_add(1, std::memory_order_relaxed);
+            world_->writeRegister(address, value, 1);
+        }
+
+        void w16(const std::uint8_t address, const std::uint16_t value) override
+        {
+            accesses_.fetch_add(1, std::memory_order_relaxed);
+            world_->writeRegister(address, value, 2);
+        }
+
+        void w32(const std::uint8_t address, const std::uint32_t value) override
+        {
+            accesses_.fetch_add(1, std::memory_order_relaxed);
+            world_->writeRegister(address, value, 4);
+        }
+
+    private:
+        std::shared_ptr<libstp::sim::World> world_;
+        std::string name_ = "Simulation";
+        // Each access is one SPI transfer on the wombat
+        std::atomic<std::uint64_t> accesses_ = 0;
+    };
+}
+
+libstp::sim::Simulation::Simulation(std::shared_ptr<World> world, const double stepSeconds)
+    : world_(std::move(world)), stepSeconds_(stepSeconds)
+{
+    if (!world_)
+    {
+        throw std::invalid_argument("The simulation needs a world");
+    }
+    if (stepSeconds_ <= 0.0)
+    {
+        throw std::invalid_argument("The step size must be greater than zero");
+    }
+    device_ = std::make_unique<SimulatedDevice>(world_);
+}
+
+libstp::sim::Simulation::~Simulation()
+{
+    stop();
+}
+
+void libstp::sim::Simulation::start()
+{
+    Simulation* expected = nullptr;
+    if (!active.compare_exchange_strong(expected, this))
+    {
+        if (expected == this)
+            return;
+        throw std::logic_error("Another simulation is already running");
+    }
+
+    kipr::core::Platform::setDevice(device_.get());
+    utility::Clock::useVirtualTime();
+    SPDLOG_INFO("Simulation started, the clock runs on virtual time");
+}
+
+void libstp::sim::Simulation::stop()
+{
+    Simulation* expected = this;
+    if (!active.compare_exchange_strong(expected, nullptr))
+        return;
+
+    kipr::core::Platform::setDevice(nullptr);
+    utility::Clock::useRealTime();
+    SPDLOG_INFO("Simulation stopped after {:.3f} simulated seconds", world_->getTime());
+}
+
+std::uint64_t libstp::sim::Simulation::getRegisterAccesses() const
+{
+    return static_cast<const SimulatedDevice*>(device_.get())->getAccesses();
+}
+
+bool libstp::sim::Simulation::isRunning() const
+{
+    return active.load() == this;
+}
+
+void libstp::sim::Simulation::advance(const double seconds)
+{
+    if (seconds <= 0.0)
+        return;
+
+    // Whole nanoseconds keep the world and the clock from drifting apart
+    const auto total = static_cast<std::int64_t>(std::ceil(seconds * 1e9));
+    const auto step = std::max<std::int64_t>(1, static_cast<std::int64_t>(stepSeconds_ * 1e9));
+    for (std::int64_t elapsed = 0; elapsed < total; elapsed += step)
+    {
+        const std::int64_t dt = std::min(step, total - elapsed);
+        world_->step(static_cast<double>(dt) / 1e9);
+        utility::Clock::advance(std::chrono::nanoseconds(dt));
+    }
+}
+
+double libstp::sim::Simulation::getTime() const
+{
+    return world_->getTime();
+}
+
+std::shared_ptr<libstp::sim::World> libstp::sim::Simulation::getWorld() const
+{
+    return world_;
+}
+
+libstp::sim::Simulation* libstp::sim::Simulation::getActive()
+{
+    return active.load();
+}
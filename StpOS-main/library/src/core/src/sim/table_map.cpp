@@ -0,0 +1,120 @@
+//
+// Created by tobias on 10/18/26.
+//
+
+#include "libstp/sim/table_map.h"
+
+#include <algorithm>
+#include <cmath>
+#include <stdexcept>
+#include <string>
+
+libstp::sim::TableMap::TableMap(const int background)
+    : background_(background)
+{
+}
+
+libstp::sim::TableMap::TableMap(const double width, const double height, const double resolution,
+                                const int background)
+    : background_(background), resolution_(resolution)
+{
+    if (width <= 0.0 || height <= 0.0 || resolution <= 0.0)
+    {
+        throw std::invalid_argument("Table width, height and resolution must be greater than zero");
+    }
+
+    columns_ = static_cast<int>(std::ceil(width / resolution));
+    rows_ = static_cast<int>(std::ceil(height / resolution));
+    cells_.assign(static_cast<std::size_t>(columns_) * rows_, static_cast<std::uint16_t>(background));
+}
+
+void libstp::sim::TableMap::fillRectangle(const double x, const double y, const double width, const double height,
+                                          const int value)
+{
+    const int firstColumn = std::max(0, static_cast<int>(std::floor(x / resolution_)));
+    const int lastColumn = std::min(columns_, static_cast<int>(std::ceil((x + width) / resolution_)));
+    const int firstRow = std::max(0, static_cast<int>(std::floor(y / resolution_)));
+    const int lastRow = std::min(rows_, static_cast<int>(std::ceil((y + height) / resolution_)));
+
+    for (int row = firstRow; row < lastRow; ++row)
+    {
+        std::fill(cells_.begin() + row * columns_ + firstColumn, cells_.begin() + row * columns_ + lastColumn,
+                  static_cast<std::uint16_t>(value));
+    }
+}
+
+void libstp::sim::TableMap::drawLine(const double x0, const double y0, const double x1, const double y1,
+                                     const double thickness, const int value)
+{
+    const double dx = x1 - x0;
+    const double dy = y1 - y0;
+    const double lengthSquared = dx * dx + dy * dy;
+    const double halfThickness = thickness / 2.0;
+
+    const int firstColumn = std::max(0, static_cast<int>(std::floor((std::min(x0, x1) - halfThickness) / resolution_)));
+    const int lastColumn = std::min(columns_, static_cast<int>(std::ceil((std::max(x0, x1) + halfThickness) / resolution_)));
+    const int firstRow = std::max(0, static_cast<int>(std::floor((std::min(y0, y1) - halfThickness) / resolution_)));
+    const int lastRow = std::min(rows_, static_cast<int>(std::ceil((std::max(y0, y1) + halfThickness) / resolution_)));
+
+    for (int row = firstRow; row < lastRow; ++row)
+    {
+        for (int column = firstColumn; column < lastColumn; ++column)
+        {
+            // Distance of the cell center to the segment
+            const double px = (column + 0.5) * resolution_ - x0;
+            const double py = (row + 0.5) * resolution_ - y0;
+            const double t = lengthSquared > 0.0 ? std::clamp((px * dx + py * dy) / lengthSquared, 0.0, 1.0) : 0.0;
+            if (std::hypot(px - t * dx, py - t * dy) <= halfThickness)
+            {
+                cells_[row * columns_ + column] = static_cast<std::uint16_t>(value);
+            }
+        }
+    }
+}
+
+void libstp::sim::TableMap::setValues(const std::vector<std::uint16_t>& values)
+{
+    if (values.size() != cells_.size())
+    {
+        throw std::invalid_argument("Expected " + std::to_string(cells_.size()) + " values for a table of "
+            + std::to_string(rows_) + "x" + std::to_string(columns_) + " cells, got "
+            + std::to_string(values.size()));
+    }
+    cells_ = values;
+}
+
+int libstp::sim::TableMap::valueAt(const double x, const double y) const
+{
+    const auto column = static_cast<int>(std::floor(x / resolution_));
+    const auto row = static_cast<int>(std::floor(y / resolution_));
+    if (column < 0 || row < 0 || column >= columns_ || row >= rows_)
+    {
+        return background_;
+    }
+    return cells_[row * columns_ + column];
+}
+
+double libstp::sim::TableMap::getWidth() const
+{
+    return columns_ * resolution_;
+}
+
+double libstp::sim::TableMap::getHeight() const
+{
+    return rows_ * resolution_;
+}
+
+double libstp::sim::TableMap::getResolution() const
+{
+    return resolution_;
+}
+
+int libstp::sim::TableMap::getColumns() const
+{
+    return columns_;
+}
+
+int libstp::sim::TableMap::getRows() const
+{
+    return rows_;
+}
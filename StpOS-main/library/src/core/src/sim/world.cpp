@@ -0,0 +1,409 @@
+//
+// Created by tobias on 10/18/26.
+//
+
+#include "libstp/sim/world.h"
+
+#include <algorithm>
+#include <cmath>
+#include <cstring>
+#include <stdexcept>
+#include <string>
+
+#include "kipr/core/registers.hpp"
+#include "libstp/math/math.h"
+
+namespace
+{
+    constexpr double GRAVITY = 9.81;
+    constexpr double MAGNETIC_FIELD = 0.4; // gauss, pointing along the x axis of the table
+    // Position registers hold the ticks scaled by the update rate of the co-processor, see kipr::motor
+    constexpr double POSITION_SCALE = 250.0;
+    constexpr int ANALOG_MAX = 4095;
+
+    enum MotorMode { Inactive = 0, Speed = 1, Position = 2, SpeedPosition = 3 };
+
+    enum MotorDirection { PassiveStop = 0, Forward = 1, Reverse = 2, ActiveStop = 3 };
+
+    struct RegisterAxis
+    {
+        std::uint8_t offset;
+        float sign;
+    };
+
+    // Register and sign behind each axis of gyro_x/y/z() and accel_x/y/z(), they convert the chip axes to NED
+    constexpr RegisterAxis INERTIAL_AXES[3] = {{4, -1.0f}, {0, 1.0f}, {8, 1.0f}};
+    // magneto_x/y/z() only flip the z axis
+    constexpr RegisterAxis MAGNETIC_AXES[3] = {{0, 1.0f}, {4, 1.0f}, {8, -1.0f}};
+
+    // The co-processor swaps the channels of motor 2 and 3, see fix_port in kipr::motor
+    int motorChannel(const int port)
+    {
+        if (port == 2)
+            return 3;
+        if (port == 3)
+            return 2;
+        return port;
+    }
+
+    double servoMicroseconds(const double position)
+    {
+        return 600.0 + position * 1800.0 / 2047.0;
+    }
+}
+
+libstp::sim::World::World(std::shared_ptr<Kinematics> kinematics, TableMap table, const std::uint32_t seed)
+    : kinematics_(std::move(kinematics)), table_(std::move(table)), random_(seed)
+{
+    if (!kinematics_)
+    {
+        throw std::invalid_argument("The world needs the kinematics of the robot");
+    }
+
+    for (const auto& wheel : kinematics_->getWheels())
+    {
+        if (wheel.getPort() < 0 || wheel.getPort() >= MOTOR_COUNT)
+        {
+            throw std::invalid_argument("Motor port " + std::to_string(wheel.getPort()) + " does not exist");
+        }
+    }
+
+    for (int port = 0; port < SERVO_COUNT; ++port)
+    {
+        servoPositions_[port] = servoMicroseconds(1024.0);
+        writeRegister_(REG_RW_SERVO_0_H + 2 * port, static_cast<std::uint32_t>(servoPositions_[port]), 2);
+    }
+    // Nothing moves yet, all position goals are reached
+    registers_[REG_RW_MOT_DONE] = 0x0F;
+    updateSensors_(velocity_, 0.0);
+}
+
+void libstp::sim::World::step(const double dtSeconds)
+{
+    if (dtSeconds <= 0.0)
+        return;
+
+    std::lock_guard lock(mutex_);
+    const auto previousVelocity = velocity_;
+    stepMotors_(dtSeconds);
+
+    const auto& wheels = kinematics_->getWheels();
+    wheelSpeeds_.resize(wheels.size());
+    for (std::size_t i = 0; i < wheels.size(); ++i)
+    {
+        const double speed = motors_[motorChannel(wheels[i].getPort())].velocity;
+        wheelSpeeds_[i] = wheels[i].isReversed() ? -speed : speed;
+    }
+    velocity_ = kinematics_->toBodyVelocity(wheelSpeeds_);
+
+    // Clockwise devices use x forward and y to the right, the table uses y to the left
+    const double sign = kinematics_->isClockwise() ? -1.0 : 1.0;
+    const double omega = sign * velocity_.angularRad;
+    const double vLeft = sign * velocity_.strafeMs;
+    const double heading = pose_.heading + omega * dtSeconds / 2.0;
+    pose_.x += (velocity_.forwardMs * std::cos(heading) - vLeft * std::sin(heading)) * dtSeconds;
+    pose_.y += (velocity_.forwardMs * std::sin(heading) + vLeft * std::cos(heading)) * dtSeconds;
+    pose_.heading += omega * dtSeconds;
+
+    time_ += dtSeconds;
+    updateSensors_(previousVelocity, dtSeconds);
+}
+
+void libstp::sim::World::stepMotors_(const double dtSeconds)
+{
+    const std::uint8_t modes = registers_[REG_RW_MOT_MODES];
+    const std::uint8_t directions = registers_[REG_RW_MOT_DIRS];
+    const double lag = 1.0 - std::exp(-dtSeconds / motorModel_.timeConstant);
+    std::uint8_t done = 0;
+
+    for (int channel = 0; channel < MOTOR_COUNT; ++channel)
+    {
+        auto& motor = motors_[channel];
+        const int mode = (modes >> (2 * channel)) & 0x3;
+        const int direction = (directions >> (2 * channel)) & 0x3;
+        const auto goalVelocity = static_cast<std::int16_t>(readRegister_(REG_RW_MOT_0_SP_H + 2 * channel, 2));
+        const double pwm = readRegister_(REG_RW_MOT_0_PWM_H + 2 * channel, 2) / 400.0;
+
+        double target = 0.0;
+        bool brake = false;
+        bool reached = true;
+        switch (mode)
+        {
+        case Speed:
+            target = goalVelocity;
+            break;
+        case Position:
+        case SpeedPosition:
+            {
+                const double error = motor.goalPosition - motor.position;
+                if (std::abs(error) <= motorModel_.positionTolerance)
+                {
+                    brake = true;
+                    break;
+                }
+                reached = false;
+                const double speed = mode == Position ? motorModel_.maxTicksPerSecond : std::abs(goalVelocity);
+                // Slow down on the last ticks instead of overshooting the goal
+                target = std::copysign(std::min(speed, std::abs(error) / motorModel_.timeConstant), error);
+                break;
+            }
+        default:
+            if (direction == Forward)
+                target = pwm * motorModel_.maxTicksPerSecond;
+            else if (direction == Reverse)
+                target = -pwm * motorModel_.maxTicksPerSecond;
+            else
+                brake = direction == ActiveStop;
+            break;
+        }
+
+        motor.velocity += (target - motor.velocity) * (brake ? 1.0 : lag);
+        motor.velocity = std::clamp(motor.velocity, -motorModel_.maxTicksPerSecond, motorModel_.maxTicksPerSecond);
+        motor.position += motor.velocity * dtSeconds;
+        writeRegister_(REG_RW_MOT_0_B3 + 4 * channel,
+                       static_cast<std::uint32_t>(static_cast<std::int32_t>(std::lround(motor.position * POSITION_SCALE))),
+                       4);
+        if (reached)
+            done |= 1 << channel;
+    }
+    registers_[REG_RW_MOT_DONE] = done;
+}
+
+void libstp::sim::World::updateSensors_(const datatype::AbsoluteSpeed& previousVelocity, const double dtSeconds)
+{
+    const int yawAxis = imuModel_.yawAxis;
+    const int forwardAxis = (yawAxis + 1) % 3;
+    const int lateralAxis = (yawAxis + 2) % 3;
+
+    // The gyro reports the angular velocity in the convention of the device, so its heading controller closes the loop
+    const double omegaDegrees = velocity_.angularRad * RAD_TO_DEG;
+    for (int axis = 0; axis < 3; ++axis)
+    {
+        const double rate = axis == yawAxis ? omegaDegrees + imuModel_.gyroBias : 0.0;
+        setImuRegister_(REG_RW_GYRO_X_0, axis, static_cast<float>(rate + noise_(imuModel_.gyroNoise)));
+    }
+
+    double acceleration[3] = {};
+    acceleration[yawAxis] = GRAVITY;
+    if (dtSeconds > 0.0)
+    {
+        acceleration[forwardAxis] = (velocity_.forwardMs - previousVelocity.forwardMs) / dtSeconds;
+        acceleration[lateralAxis] = (velocity_.strafeMs - previousVelocity.strafeMs) / dtSeconds
+            + velocity_.forwardMs * velocity_.angularRad;
+    }
+    for (int axis = 0; axis < 3; ++axis)
+    {
+        setImuRegister_(REG_RW_ACCEL_X_0, axis, static_cast<float>(acceleration[axis] + noise_(imuModel_.accelNoise)));
+    }
+
+    double field[3] = {};
+    field[forwardAxis] = MAGNETIC_FIELD * std::cos(pose_.heading);
+    field[lateralAxis] = -MAGNETIC_FIELD * std::sin(pose_.heading);
+    for (int axis = 0; axis < 3; ++axis)
+    {
+        const auto [offset, sign] = MAGNETIC_AXES[axis];
+        float value = sign * static_cast<float>(field[axis]);
+        std::uint32_t raw;
+        std::memcpy(&raw, &value, sizeof(raw));
+        writeRegister_(REG_RW_MAG_X_0 + offset, raw, 4);
+    }
+
+    const double cosHeading = std::cos(pose_.heading);
+    const double sinHeading = std::sin(pose_.heading);
+    for (int port = 0; port < ANALOG_COUNT; ++port)
+    {
+        int value = analogValues_[port];
+        if (const auto mount = lightSensors_.find(port); mount != lightSensors_.end())
+        {
+            const auto [x, y] = mount->second;
+            value = table_.valueAt(pose_.x + x * cosHeading - y * sinHeading,
+                                   pose_.y + x * sinHeading + y * cosHeading);
+        }
+        writeRegister_(REG_RW_ADC_0_H + 2 * port, std::clamp(value, 0, ANALOG_MAX), 2);
+    }
+
+    const std::uint8_t allStop = registers_[REG_RW_MOT_SRV_ALLSTOP];
+    const double maxStep = servoSpeed_ * 10.0 * dtSeconds; // 10 us per degree
+    for (int port = 0; port < SERVO_COUNT; ++port)
+    {
+        if (allStop & (1 << (port + 4)))
+            continue; // disabled servos hold still
+
+        const double goal = readRegister_(REG_RW_SERVO_0_H + 2 * port, 2);
+        servoPositions_[port] += std::clamp(goal - servoPositions_[port], -maxStep, maxStep);
+    }
+}
+
+void libstp::sim::World::setImuRegister_(const std::uint8_t base, const int axis, const float value)
+{
+    const auto [offset, sign] = INERTIAL_AXES[axis];
+    const float registerValue = sign * value;
+    std::uint32_t raw;
+    std::memcpy(&raw, &registerValue, sizeof(raw));
+    writeRegister_(base + offset, raw, 4);
+}
+
+double libstp::sim::World::noise_(const double standardDeviation)
+{
+    if (standardDeviation <= 0.0)
+        return 0.0;
+    return std::normal_distribution(0.0, standardDeviation)(random_);
+}
+
+double libstp::sim::World::getTime() const
+{
+    std::lock_guard lock(mutex_);
+    return time_;
+}
+
+libstp::sim::Pose libstp::sim::World::getPose() const
+{
+    std::lock_guard lock(mutex_);
+    return pose_;
+}
+
+void libstp::sim::World::setPose(const Pose& pose)
+{
+    std::lock_guard lock(mutex_);
+    pose_ = pose;
+    updateSensors_(velocity_, 0.0);
+}
+
+libstp::datatype::AbsoluteSpeed libstp::sim::World::getVelocity() const
+{
+    std::lock_guard lock(mutex_);
+    return velocity_;
+}
+
+void libstp::sim::World::addLightSensor(const int port, const double x, const double y)
+{
+    if (port < 0 || port >= ANALOG_COUNT)
+    {
+        throw std::invalid_argument("Analog port " + std::to_string(port) + " does not exist");
+    }
+    std::lock_guard lock(mutex_);
+    lightSensors_[port] = {x, y};
+    updateSensors_(velocity_, 0.0);
+}
+
+void libstp::sim::World::setAnalogValue(const int port, const int value)
+{
+    if (port < 0 || port >= ANALOG_COUNT)
+    {
+        throw std::invalid_argument("Analog port " + std::to_string(port) + " does not exist");
+    }
+    std::lock_guard lock(mutex_);
+    analogValues_[port] = value;
+    updateSensors_(velocity_, 0.0);
+}
+
+void libstp::sim::World::setDigitalValue(const int port, const bool value)
+{
+    if (port < 0 || port >= 16)
+    {
+        throw std::invalid_argument("Digital port " + std::to_string(port) + " does not exist");
+    }
+    std::lock_guard lock(mutex_);
+    auto inputs = static_cast<std::uint16_t>(readRegister_(REG_RW_DIG_IN_H, 2));
+    inputs = value ? inputs | (1 << port) : inputs & ~(1 << port);
+    writeRegister_(REG_RW_DIG_IN_H, inputs, 2);
+}
+
+void libstp::sim::World::setImuModel(const ImuModel& model)
+{
+    std::lock_guard lock(mutex_);
+    imuModel_ = model;
+    updateSensors_(velocity_, 0.0);
+}
+
+void libstp::sim::World::setMotorModel(const MotorModel& model)
+{
+    if (model.maxTicksPerSecond <= 0.0 || model.timeConstant <= 0.0)
+    {
+        throw std::invalid_argument("The maximum motor speed and time constant must be greater than zero");
+    }
+    std::lock_guard lock(mutex_);
+    motorModel_ = model;
+}
+
+void libstp::sim::World::setServoSpeed(const double degreesPerSecond)
+{
+    if (degreesPerSecond <= 0.0)
+    {
+        throw std::invalid_argument("Servo speed must be greater than zero");
+    }
+    std::lock_guard lock(mutex_);
+    servoSpeed_ = degreesPerSecond;
+}
+
+double libstp::sim::World::getServoPosition(const int port) const
+{
+    if (port < 0 || port >= SERVO_COUNT)
+    {
+        throw std::invalid_argument("Servo port " + std::to_string(port) + " does not exist");
+    }
+    std::lock_guard lock(mutex_);
+    return (servoPositions_[port] - 600.0) * 2047.0 / 1800.0;
+}
+
+double libstp::sim::World::getMotorPosition(const int port) const
+{
+    if (port < 0 || port >= MOTOR_COUNT)
+    {
+        throw std::invalid_argument("Motor port " + std::to_string(port) + " does not exist");
+    }
+    std::lock_guard lock(mutex_);
+    return motors_[motorChannel(port)].position;
+}
+
+void libstp::sim::World::setTable(TableMap table)
+{
+    std::lock_guard lock(mutex_);
+    table_ = std::move(table);
+    updateSensors_(velocity_, 0.0);
+}
+
+std::uint32_t libstp::sim::World::readRegister(const std::uint8_t address, const int size)
+{
+    std::lock_guard lock(mutex_);
+    return readRegister_(address, size);
+}
+
+void libstp::sim::World::writeRegister(const std::uint8_t address, const std::uint32_t value, const int size)
+{
+    std::lock_guard lock(mutex_);
+    writeRegister_(address, value, size);
+
+    // Writes which command the co-processor instead of only setting a value
+    for (int channel = 0; channel < MOTOR_COUNT; ++channel)
+    {
+        if (address == REG_RW_MOT_0_B3 + 4 * channel && size == 4)
+        {
+            motors_[channel].position = static_cast<std::int32_t>(value) / POSITION_SCALE;
+        }
+        else if (address == REG_W_MOT_0_GOAL_B3 + 4 * channel && size == 4)
+        {
+            motors_[channel].goalPosition = static_cast<std::int32_t>(value) / POSITION_SCALE;
+            registers_[REG_RW_MOT_DONE] &= ~(1 << channel);
+        }
+    }
+}
+
+std::uint32_t libstp::sim::World::readRegister_(const std::uint8_t address, const int size) const
+{
+    // Multi byte registers are big endian, like on the wombat
+    std::uint32_t value = 0;
+    for (int i = 0; i < size && address + i < static_cast<int>(registers_.size()); ++i)
+    {
+        value = value << 8 | registers_[address + i];
+    }
+    return value;
+}
+
+void libstp::sim::World::writeRegister_(const std::uint8_t address, const std::uint32_t value, const int size)
+{
+    for (int i = 0; i < size && address + i < static_cast<int>(registers_.size()); ++i)
+    {
+        registers_[address + i] = static_cast<std::uint8_t>(value >> (8 * (size - 1 - i)));
+    }
+}
@@ -0,0 +1,223 @@
+//
+// Created by tobias on 10/18/26.
+//
+
+#include "libstp/trace/trace.h"
+
+#include <algorithm>
+#include <bit>
+#include <cstring>
+#include <stdexcept>
+
+#include "libstp/_config.h"
+
+namespace
+{
+    // Header of a trace file, followed by ControlFrames until the end of the file
+    struct FileHeader
+    {
+        char magic[8];
+        std::uint16_t version;
+        std::uint16_t frameSize;
+        std::uint32_t reserved;
+        std::int64_t startUnixNs;
+    };
+
+    static_assert(sizeof(FileHeader) == 24);
+
+    constexpr std::uint16_t TRACE_VERSION = 1;
+
+    thread_local libstp::trace::ControlFrame frame{};
+    thread_local libstp::trace::TraceRing* threadRing = nullptr;
+}
+
+libstp::trace::TraceRing::TraceRing(const std::size_t capacity, const std::uint16_t thread)
+    : frames_(std::make_unique<ControlFrame[]>(std::bit_ceil(std::max<std::size_t>(capacity, 2)))),
+      mask_(std::bit_ceil(std::max<std::size_t>(capacity, 2)) - 1),
+      thread_(thread)
+{
+}
+
+bool libstp::trace::TraceRing::push(ControlFrame& frame, const std::uint64_t timestamp) noexcept
+{
+    frame.timestamp = timestamp;
+    frame.thread = thread_;
+    frame.sequence = sequence_++;
+
+    const auto head = head_.load(std::memory_order_relaxed);
+    if (head - tail_.load(std::memory_order_acquire) > mask_)
+    {
+        dropped_.fetch_add(1, std::memory_order_relaxed);
+        return false;
+    }
+    frames_[head & mask_] = frame;
+    head_.store(head + 1, std::memory_order_release);
+    return true;
+}
+
+std::size_t libstp::trace::TraceRing::drain(std::FILE* file)
+{
+    const auto tail = tail_.load(std::memory_order_relaxed);
+    const auto head = head_.load(std::memory_order_acquire);
+    const auto pending = static_cast<std::size_t>(head - tail);
+    if (pending == 0)
+        return 0;
+
+    // At most two contiguous chunks, before and after the wrap around
+    const std::size_t begin = tail & mask_;
+    const std::size_t first = std::min(pending, mask_ + 1 - begin);
+    std::fwrite(&frames_[begin], sizeof(ControlFrame), first, file);
+    if (first < pending)
+        std::fwrite(&frames_[0], sizeof(ControlFrame), pending - first, file);
+
+    tail_.store(head, std::memory_order_release);
+    return pending;
+}
+
+void libstp::trace::TraceRing::clear() noexcept
+{
+    tail_.store(head_.load(std::memory_order_acquire), std::memory_order_release);
+    dropped_.store(0, std::memory_order_relaxed);
+}
+
+std::uint64_t libstp::trace::TraceRing::getDropped() const noexcept
+{
+    return dropped_.load(std::memory_order_relaxed);
+}
+
+libstp::trace::Tracer& libstp::trace::Tracer::instance()
+{
+    // Intentionally leaked, the rings are referenced by thread locals which may outlive static destructors
+    static auto* tracer = new Tracer();
+    return *tracer;
+}
+
+void libstp::trace::Tracer::start(const std::string& path, const std::size_t capacity,
+                                  const std::chrono::milliseconds flushInterval)
+{
+    stop();
+
+    std::lock_guard lock(lifecycleMutex_);
+    file_ = std::fopen(path.c_str(), "wb");
+    if (file_ == nullptr)
+        throw std::runtime_error("Could not open trace file " + path + ": " + std::strerror(errno));
+
+    FileHeader header{};
+    std::memcpy(header.magic, "STPTRACE", sizeof(header.magic));
+    header.version = TRACE_VERSION;
+    header.frameSize = sizeof(ControlFrame);
+    header.startUnixNs = std::chrono::duration_cast<std::chrono::nanoseconds>(
+        std::chrono::system_clock::now().time_since_epoch()).count();
+    std::fwrite(&header, sizeof(header), 1, file_);
+
+    // Frames that raced with the previous stop do not belong to this file
+    {
+        std::lock_guard ringsLock(ringsMutex_);
+        capacity_ = capacity;
+        for (const auto& ring : rings_)
+            ring->clear();
+    }
+
+    start_.store(std::chrono::duration_cast<std::chrono::nanoseconds>(
+                     std::chrono::steady_clock::now().time_since_epoch()).count(),
+                 std::memory_order_relaxed);
+    written_ = 0;
+    stop_ = false;
+    thread_ = std::thread(&Tracer::run_, this, flushInterval);
+    running_.store(true, std::memory_order_release);
+    SPDLOG_DEBUG("Tracing control loops to {}", path);
+}
+
+void libstp::trace::Tracer::stop()
+{
+    std::lock_guard lock(lifecycleMutex_);
+    if (file_ == nullptr)
+        return;
+
+    running_.store(false, std::memory_order_release);
+    stop_ = true;
+    if (thread_.joinable())
+        thread_.join();
+
+    drainAll_();
+    std::fclose(file_);
+    file_ = nullptr;
+    SPDLOG_DEBUG("Stopped tracing after {} frames", written_.load());
+}
+
+void libstp::trace::Tracer::record(ControlFrame& frame, const Source source) noexcept
+{
+    if (!isRunning())
+        return;
+
+    TraceRing* ring = ring_();
+    if (ring == nullptr)
+        return;
+
+    frame.source = source;
+    const auto timestamp = std::chrono::duration_cast<std::chrono::nanoseconds>(
+        std::chrono::steady_clock::now().time_since_epoch()).count() - start_.load(std::memory_order_relaxed);
+    ring->push(frame, static_cast<std::uint64_t>(timestamp));
+}
+
+libstp::trace::TraceStatistics libstp::trace::Tracer::statistics() const
+{
+    TraceStatistics result;
+    result.frames = written_.load();
+    std::lock_guard lock(ringsMutex_);
+    result.threads = rings_.size();
+    for (const auto& ring : rings_)
+        result.dropped += ring->getDropped();
+    return result;
+}
+
+libstp::trace::TraceRing* libstp::trace::Tracer::ring_()
+{
+    if (threadRing != nullptr)
+        return threadRing;
+
+    // First frame of this thread, the only allocation a tracing thread ever does
+    try
+    {
+        std::lock_guard lock(ringsMutex_);
+        rings_.push_back(std::make_unique<TraceRing>(capacity_, static_cast<std::uint16_t>(rings_.size())));
+        threadRing = rings_.back().get();
+    }
+    catch (const std::exception& e)
+    {
+        SPDLOG_WARN("Could not allocate a trace ring: {}", e.what());
+    }
+    return threadRing;
+}
+
+void libstp::trace::Tracer::run_(const std::chrono::milliseconds flushInterval)
+{
+    while (!stop_.load())
+    {
+        std::this_thread::sleep_for(flushInterval);
+        if (drainAll_() > 0)
+            std::fflush(file_);
+    }
+}
+
+std::size_t libstp::trace::Tracer::drainAll_()
+{
+    std::size_t drained = 0;
+    {
+        std::lock_guard lock(ringsMutex_);
+        for (const auto& ring : rings_)
+            drained += ring->drain(file_);
+    }
+    written_ += drained;
+    return drained;
+}
+
+libstp::trace::ControlFrame& libstp::trace::currentFrame() noexcept
+{
+    return frame;
+}
+
+void libstp::trace::commitFrame(const Source source) noexcept
+{
+    Tracer::instance().record(frame, source);
+}
@@ -84,6 +84,10 @@ namespace libstp::device::omni_wheeled
             .def("speed_by_wheels", &OmniWheeledDevice::speedByWheels, R"pbdoc(
             Calculates the speed of the robot based on the speed of the individual wheels.
         )pbdoc", py::arg("wheel_speeds"))
+            .def_readonly("front_left_motor", &OmniWheeledDevice::frontLeftMotor)
+            .def_readonly("front_right_motor", &OmniWheeledDevice::frontRightMotor)
+            .def_readonly("rear_left_motor", &OmniWheeledDevice::rearLeftMotor)
+            .def_readonly("rear_right_motor", &OmniWheeledDevice::rearRightMotor)
             .def_readwrite("ticks_per_revolution", &OmniWheeledDevice::ticksPerRevolution, R"pbdoc(
                 The number of ticks per wheel revolution (must be calibrated).
             )pbdoc")
@@ -102,6 +106,9 @@ namespace libstp::device::omni_wheeled
                 device (OmniWheeledDevice): The omni-wheeled device to calibrate.
                 covered_distance (float): The distance covered in meters.
                 max_retries (int): The maximum number of retries.
+
+            Returns:
+                bool: Whether an attempt succeeded, ticks_per_revolution is only changed then.
         )pbdoc");
     }
 }
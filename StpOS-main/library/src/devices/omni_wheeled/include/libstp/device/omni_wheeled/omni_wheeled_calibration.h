@@ -14,6 +14,8 @@ namespace libstp::device::omni_wheeled
      * This version lets the robot drive forward a known distance. 
      * We average across all four wheels, but you might measure each 
      * wheel individually if they differ.
+     *
+     * @return Whether an attempt succeeded, device.ticksPerRevolution is only changed then
      */
-    void calibrateTicksPerRevolution(const OmniWheeledDevice& device, float coveredDistance, int maxRetries);
+    bool calibrateTicksPerRevolution(const OmniWheeledDevice& device, float coveredDistance, int maxRetries);
 }
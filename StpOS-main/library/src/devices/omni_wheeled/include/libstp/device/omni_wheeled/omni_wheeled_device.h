@@ -4,9 +4,13 @@
 
 #pragma once
 
+#include <array>
 #include <cmath>
 #include <tuple>
 #include <utility>
+#include <vector>
+
+#include <Eigen/Core>
 
 #include "libstp/datatype/axis.h"
 #include "libstp/device/device.h"
@@ -31,17 +35,10 @@ namespace libstp::device::omni_wheeled
         motor::Motor rearLeftMotor;
         motor::Motor rearRightMotor;
 
-        int lastFrontLeftTicks = 0;
-        int initialFrontLeftTicks = 0;
-
-        int lastFrontRightTicks = 0;
-        int initialFrontRightTicks = 0;
-
-        int lastRearLeftTicks = 0;
-        int initialRearLeftTicks = 0;
-
-        int lastRearRightTicks = 0;
-        int initialRearRightTicks = 0;
+        // Encoder ticks of the wheels in the order of the kinematics matrices:
+        // front right, front left, rear left, rear right
+        Eigen::Vector4i lastTicks = Eigen::Vector4i::Zero();
+        Eigen::Vector4i initialTicks = Eigen::Vector4i::Zero();
 
         // Robot geometry and encoder calibration
         // If your wheels are angled, each wheel might have a rotation offset or local transform.
@@ -63,6 +60,12 @@ namespace libstp::device::omni_wheeled
         {
         }
 
+        /**
+         * @return The wheel motors in the order of the kinematics matrices: front right, front left, rear left,
+         *         rear right.
+         */
+        [[nodiscard]] std::vector<motor::Motor> getWheelMotors() const override;
+
          async::AsyncAlgorithm<int> strafe(datatype::ConditionalFunction condition, datatype::Speed speed)
         {
             return setSpeedWhile(std::move(condition), [speed](const std::shared_ptr<datatype::ConditionalResult>& result)
@@ -111,9 +114,25 @@ namespace libstp::device::omni_wheeled
     protected:
         void applyKinematicsModel(const datatype::AbsoluteSpeed& speed) override;
         std::tuple<float, float, float> getWheelVelocities(float dtSeconds) override;
+        [[nodiscard]] std::pair<float, float> toBodyVelocities(std::span<const double> wheelTicksPerSecond) const override;
         void stopDevice() override;
         std::tuple<float, float, float> computeMaxSpeeds() override;
         void initializeKinematicDriveController() override;
         [[nodiscard]] std::pair<float, float> computeDrivenDistance() const override;
+
+    private:
+        // Wheel ticks/s per body velocity (m/s, m/s, rad/s) and body displacement per wheel ticks, rebuilt only
+        // when the geometry or the ticks per revolution change
+        mutable Eigen::Matrix<double, 4, 3> inverseKinematics;
+        mutable Eigen::Matrix<double, 3, 4> forwardKinematics;
+        mutable std::array<float, 3> kinematicsGeometry{};
+
+        // Encoders read once per control tick, by the distance conditions or else by the velocity measurement
+        mutable Eigen::Vector4i tickSnapshot = Eigen::Vector4i::Zero();
+        mutable bool tickSnapshotFresh = false;
+
+        void updateKinematics() const;
+        [[nodiscard]] Eigen::Vector4i readTicks() const;
+        [[nodiscard]] Eigen::Vector3d drivenDisplacement(const Eigen::Vector4i& ticks) const;
     };
 }
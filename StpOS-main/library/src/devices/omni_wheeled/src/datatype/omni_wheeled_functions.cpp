@@ -9,16 +9,12 @@
 libstp::datatype::ConditionalFunction libstp::device::omni_wheeled::datatype::forForwardDistance(
     const float& distanceCm)
 {
-    return [distanceCm](bool)
-    {
-        return std::make_shared<ForwardDistanceConditionalResult>(distanceCm);
-    };
+    return std::make_shared<libstp::datatype::ResultCondition>(
+        std::make_shared<ForwardDistanceConditionalResult>(distanceCm));
 }
 
 libstp::datatype::ConditionalFunction libstp::device::omni_wheeled::datatype::forSideDistance(const float& distanceCm)
 {
-    return [distanceCm](bool)
-    {
-        return std::make_shared<SideDistanceConditionalResult>(distanceCm);
-    };
+    return std::make_shared<libstp::datatype::ResultCondition>(
+        std::make_shared<SideDistanceConditionalResult>(distanceCm));
 }
@@ -9,12 +9,12 @@
 
 namespace libstp::device::omni_wheeled
 {
-    void calibrateTicksPerRevolution(const OmniWheeledDevice& device, float coveredDistance, int maxRetries)
+    bool calibrateTicksPerRevolution(const OmniWheeledDevice& device, float coveredDistance, int maxRetries)
     {
         if (coveredDistance <= 0.0f)
         {
             SPDLOG_ERROR("Covered distance must be > 0. Provided: {}", coveredDistance);
-            return;
+            return false;
         }
 
         SPDLOG_INFO("Starting advanced calibration of ticks per revolution (omni).");
@@ -29,6 +29,7 @@ namespace libstp::device::omni_wheeled
             device.frontRightMotor.resetPositionEstimate();
             device.rearLeftMotor.resetPositionEstimate();
             device.rearRightMotor.resetPositionEstimate();
+            device.forgetWheelTicks();
 
             SPDLOG_INFO("Attempt {}/{}. Move the robot forward exactly {:.2f} m. Then press the button.", 
                         attempt, maxRetries, coveredDistance);
@@ -78,5 +79,6 @@ namespace libstp::device::omni_wheeled
         {
             SPDLOG_ERROR("Failed to calibrate ticks per revolution after {} attempts.", maxRetries);
         }
+        return success;
     }
 }
\ No newline at end of file
@@ -4,29 +4,53 @@
 
 #include "libstp/device/omni_wheeled/omni_wheeled_device.h"
 #include "libstp/_config.h"
+#include "libstp/trace/trace.h"
 
 #include <Eigen/Dense>
 
 
-constexpr float radToRev = 1.0 / (2.0 * M_PI);
 constexpr int maxMotorTicksPerSecond = 1500;
 
 
-auto calculateWheelSpeeds(const double Vx, const double Vy, const double omega, const double R,
-                          const double L)
+void libstp::device::omni_wheeled::OmniWheeledDevice::updateKinematics() const
 {
-    Eigen::MatrixXd inv_kinematics_matrix(4, 3);
-    inv_kinematics_matrix << 1, 1, -L, // Front-right wheel (w1)
+    const std::array geometry{ticksPerRevolution, wheelRadius, wheelDistanceFromCenter};
+    if (geometry == kinematicsGeometry)
+    {
+        return;
+    }
+    kinematicsGeometry = geometry;
+
+    const double L = wheelDistanceFromCenter;
+    const double ticksPerMeter = ticksPerRevolution / (2.0 * M_PI * wheelRadius);
+
+    inverseKinematics << 1, 1, -L, // Front-right wheel (w1)
         1, -1, L, // Front-left wheel (w2)
         1, 1, L, // Back-left wheel (w3)
         1, -1, -L; // Back-right wheel (w4)
+    inverseKinematics *= ticksPerMeter;
+
+    // Pseudo-inverse of the inverse kinematics
+    forwardKinematics << 1, 1, 1, 1, // Vx
+        1, -1, 1, -1, // Vy
+        -1 / L, 1 / L, 1 / L, -1 / L; // Omega
+    forwardKinematics /= 4.0 * ticksPerMeter;
+}
 
-    Eigen::Vector3d velocities;
-    velocities << Vx, Vy, omega;
+Eigen::Vector4i libstp::device::omni_wheeled::OmniWheeledDevice::readTicks() const
+{
+    return {
+        frontRightMotor.getCurrentPositionEstimate(),
+        frontLeftMotor.getCurrentPositionEstimate(),
+        rearLeftMotor.getCurrentPositionEstimate(),
+        rearRightMotor.getCurrentPositionEstimate()
+    };
+}
 
-    Eigen::Vector4d wheel_speeds = 1.0 / R * inv_kinematics_matrix * velocities;
-    std::vector wheel_speeds_std(wheel_speeds.data(), wheel_speeds.data() + wheel_speeds.size());
-    return wheel_speeds_std;
+Eigen::Vector3d libstp::device::omni_wheeled::OmniWheeledDevice::drivenDisplacement(const Eigen::Vector4i& ticks) const
+{
+    updateKinematics();
+    return forwardKinematics * (ticks - initialTicks).cast<double>();
 }
 
 
@@ -57,103 +81,76 @@ libstp::datatype::Speed libstp::device::omni_wheeled::OmniWheeledDevice::speedBy
 
 float libstp::device::omni_wheeled::OmniWheeledDevice::getDrivenDistanceForward() const
 {
-    const double radPerTick = 2.0 * M_PI / ticksPerRevolution;
-
-    const double deltaFrontRightTicks = frontRightMotor.getCurrentPositionEstimate() - initialFrontRightTicks;
-    const double deltaFrontLeftTicks = frontLeftMotor.getCurrentPositionEstimate() - initialFrontLeftTicks;
-    const double deltaRearLeftTicks = rearLeftMotor.getCurrentPositionEstimate() - initialRearLeftTicks;
-    const double deltaRearRightTicks = rearRightMotor.getCurrentPositionEstimate() - initialRearRightTicks;
-
-    const double theta1 = deltaFrontRightTicks * radPerTick; // Front-right
-    const double theta2 = deltaFrontLeftTicks * radPerTick; // Front-left
-    const double theta3 = deltaRearLeftTicks * radPerTick; // Rear-left
-    const double theta4 = deltaRearRightTicks * radPerTick; // Rear-right
-
-    const double Vx = (theta1 + theta2 + theta3 + theta4) * (wheelRadius / 4.0);
-    return static_cast<float>(Vx);
+    return static_cast<float>(drivenDisplacement(readTicks())[0]);
 }
 
 float libstp::device::omni_wheeled::OmniWheeledDevice::getDrivenDistanceStrafe() const
 {
-    const double radPerTick = 2.0 * M_PI / ticksPerRevolution;
-
-    const double deltaFrontRightTicks = frontRightMotor.getCurrentPositionEstimate() - initialFrontRightTicks;
-    const double deltaFrontLeftTicks = frontLeftMotor.getCurrentPositionEstimate() - initialFrontLeftTicks;
-    const double deltaRearLeftTicks = rearLeftMotor.getCurrentPositionEstimate() - initialRearLeftTicks;
-    const double deltaRearRightTicks = rearRightMotor.getCurrentPositionEstimate() - initialRearRightTicks;
-
-    const double theta1 = deltaFrontRightTicks * radPerTick; // Front-right
-    const double theta2 = deltaFrontLeftTicks * radPerTick; // Front-left
-    const double theta3 = deltaRearLeftTicks * radPerTick; // Rear-left
-    const double theta4 = deltaRearRightTicks * radPerTick; // Rear-right
-
-    const double Vy = (theta1 - theta2 + theta3 - theta4) * (wheelRadius / 4.0);
-    return static_cast<float>(Vy);
+    return static_cast<float>(drivenDisplacement(readTicks())[1]);
 }
 
 void libstp::device::omni_wheeled::OmniWheeledDevice::applyKinematicsModel(const datatype::AbsoluteSpeed& speed)
 {
-    const auto wheelSpeeds = calculateWheelSpeeds(
-        speed.forwardMs,
-        speed.strafeMs,
-        speed.angularRad,
-        wheelRadius,
-        wheelDistanceFromCenter
-    );
-
-    frontRightMotor.setVelocity(static_cast<int>(std::round(wheelSpeeds[0] * radToRev * ticksPerRevolution)));
-    frontLeftMotor.setVelocity(static_cast<int>(std::round(wheelSpeeds[1] * radToRev * ticksPerRevolution)));
-    rearLeftMotor.setVelocity(static_cast<int>(std::round(wheelSpeeds[2] * radToRev * ticksPerRevolution)));
-    rearRightMotor.setVelocity(static_cast<int>(std::round(wheelSpeeds[3] * radToRev * ticksPerRevolution)));
+    updateKinematics();
+    const Eigen::Vector4d wheelTicks = inverseKinematics * Eigen::Vector3d(speed.forwardMs,
+                                                                           speed.strafeMs,
+                                                                           speed.angularRad);
+
+    // Front right, front left, rear left, rear right like the kinematics matrix
+    const std::array<const motor::Motor*, 4> motors{&frontRightMotor, &frontLeftMotor, &rearLeftMotor, &rearRightMotor};
+    std::array<int, 4> velocities{};
+    auto& frame = libstp::trace::currentFrame();
+    for (int i = 0; i < 4; ++i)
+    {
+        velocities[i] = static_cast<int>(std::round(wheelTicks[i]));
+        frame.wheelCommand[i] = static_cast<float>(wheelTicks[i]);
+    }
+
+    // All four goals in one write instead of one mode and one goal write per wheel
+    motor::Motor::setVelocities(motors, velocities);
 }
 
 std::tuple<float, float, float> libstp::device::omni_wheeled::OmniWheeledDevice::getWheelVelocities(
     const float dtSeconds)
 {
-    const auto radPerTick = 2.0 * M_PI / ticksPerRevolution;
-    Eigen::Vector4d angularDisplacements;
-
-    const auto currentFrontRightTicks = frontRightMotor.getCurrentPositionEstimate();
-    const auto deltaFrontRightTicks = currentFrontRightTicks - lastFrontRightTicks;
-    angularDisplacements[0] = deltaFrontRightTicks * radPerTick;
-    lastFrontRightTicks = currentFrontRightTicks;
-
-    const auto currentFrontLeftTicks = frontLeftMotor.getCurrentPositionEstimate();
-    const auto deltaFrontLeftTicks = currentFrontLeftTicks - lastFrontLeftTicks;
-    angularDisplacements[1] = deltaFrontLeftTicks * radPerTick;
-    lastFrontLeftTicks = currentFrontLeftTicks;
-
-    const auto currentRearLeftTicks = rearLeftMotor.getCurrentPositionEstimate();
-    const auto deltaRearLeftTicks = currentRearLeftTicks - lastRearLeftTicks;
-    angularDisplacements[2] = deltaRearLeftTicks * radPerTick;
-    lastRearLeftTicks = currentRearLeftTicks;
-
-    const auto currentRearRightTicks = rearRightMotor.getCurrentPositionEstimate();
-    const auto deltaRearRightTicks = currentRearRightTicks - lastRearRightTicks;
-    angularDisplacements[3] = deltaRearRightTicks * radPerTick;
-    lastRearRightTicks = currentRearRightTicks;
-
-    const Eigen::Vector4d angularVelocities = angularDisplacements / dtSeconds;
-
-    Eigen::MatrixXd forwardKinematicsMatrix(3, 4);
-
-    forwardKinematicsMatrix << 1, 1, 1, 1, // Vx
-        1, -1, 1, -1, // Vy
-        -wheelDistanceFromCenter, wheelDistanceFromCenter, wheelDistanceFromCenter, -wheelDistanceFromCenter; // Omega
-
-    Eigen::Vector3d velocities = (wheelRadius / 4.0) * forwardKinematicsMatrix * angularVelocities;
-
-    SPDLOG_TRACE("Velocities: Vx: {}, Vy: {}, Omega: {}", velocities[0], velocities[1], velocities[2]);
-    SPDLOG_TRACE("FL: {}, FR: {}, RL: {}, RR: {}", deltaFrontLeftTicks, deltaFrontRightTicks, deltaRearLeftTicks,
-                 deltaRearRightTicks);
-    SPDLOG_TRACE("FL: {}, FR: {}, RL: {}, RR: {}", lastFrontLeftTicks, lastFrontRightTicks, lastRearLeftTicks,
-                 lastRearRightTicks);
+    // Reuse the encoders read by the conditions of this tick
+    if (!tickSnapshotFresh)
+    {
+        tickSnapshot = readTicks();
+    }
+    tickSnapshotFresh = false;
+
+    const Eigen::Vector4i deltaTicks = tickSnapshot - lastTicks;
+    lastTicks = tickSnapshot;
+
+    updateKinematics();
+    const Eigen::Vector3d velocities = forwardKinematics * deltaTicks.cast<double>() / dtSeconds;
+
+    auto& frame = libstp::trace::currentFrame();
+    for (int i = 0; i < 4; ++i)
+        frame.wheelTicks[i] = static_cast<float>(deltaTicks[i]);
     return std::make_tuple(static_cast<float>(velocities[0]),
                            static_cast<float>(velocities[1]),
                            static_cast<float>(velocities[2])
     );
 }
 
+std::vector<libstp::motor::Motor> libstp::device::omni_wheeled::OmniWheeledDevice::getWheelMotors() const
+{
+    return {frontRightMotor, frontLeftMotor, rearLeftMotor, rearRightMotor};
+}
+
+std::pair<float, float> libstp::device::omni_wheeled::OmniWheeledDevice::toBodyVelocities(
+    const std::span<const double> wheelTicksPerSecond) const
+{
+    updateKinematics();
+    const Eigen::Vector3d velocities = forwardKinematics * Eigen::Vector4d(wheelTicksPerSecond[0],
+                                                                           wheelTicksPerSecond[1],
+                                                                           wheelTicksPerSecond[2],
+                                                                           wheelTicksPerSecond[3]);
+    return std::make_pair(static_cast<float>(velocities[0]), static_cast<float>(velocities[1]));
+}
+
 void libstp::device::omni_wheeled::OmniWheeledDevice::stopDevice()
 {
     frontLeftMotor.stop();
@@ -177,35 +174,22 @@ void libstp::device::omni_wheeled::OmniWheeledDevice::initializeKinematicDriveCo
 {
     Device::initializeKinematicDriveController();
 
-    lastFrontLeftTicks = frontLeftMotor.getCurrentPositionEstimate();
-    initialFrontLeftTicks = lastFrontLeftTicks;
-
-    lastFrontRightTicks = frontRightMotor.getCurrentPositionEstimate();
-    initialFrontRightTicks = lastFrontRightTicks;
+    initialTicks = readTicks();
+    tickSnapshotFresh = false;
 
-    lastRearLeftTicks = rearLeftMotor.getCurrentPositionEstimate();
-    initialRearLeftTicks = lastRearLeftTicks;
-
-    lastRearRightTicks = rearRightMotor.getCurrentPositionEstimate();
-    initialRearRightTicks = lastRearRightTicks;
+    // The last ticks carry over from the previous step, the odometry gets the motion in between
+    if (!wheelTicksTracked)
+    {
+        lastTicks = initialTicks;
+        wheelTicksTracked = true;
+    }
 }
 
 std::pair<float, float> libstp::device::omni_wheeled::OmniWheeledDevice::computeDrivenDistance() const
 {
-    const double radPerTick = 2.0 * M_PI / ticksPerRevolution;
-
-    const double deltaFrontRightTicks = frontRightMotor.getCurrentPositionEstimate() - initialFrontRightTicks;
-    const double deltaFrontLeftTicks = frontLeftMotor.getCurrentPositionEstimate() - initialFrontLeftTicks;
-    const double deltaRearLeftTicks = rearLeftMotor.getCurrentPositionEstimate() - initialRearLeftTicks;
-    const double deltaRearRightTicks = rearRightMotor.getCurrentPositionEstimate() - initialRearRightTicks;
-
-    const double theta1 = deltaFrontRightTicks * radPerTick; // Front-right
-    const double theta2 = deltaFrontLeftTicks * radPerTick; // Front-left
-    const double theta3 = deltaRearLeftTicks * radPerTick; // Rear-left
-    const double theta4 = deltaRearRightTicks * radPerTick; // Rear-right
-
-    const double Vx = (theta1 + theta2 + theta3 + theta4) * (wheelRadius / 4.0);
-    const double Vy = (theta1 - theta2 + theta3 - theta4) * (wheelRadius / 4.0);
+    tickSnapshot = readTicks();
+    tickSnapshotFresh = true;
 
-    return std::make_pair(static_cast<float>(Vx), static_cast<float>(Vy));
+    const Eigen::Vector3d displacement = drivenDisplacement(tickSnapshot);
+    return std::make_pair(static_cast<float>(displacement[0]), static_cast<float>(displacement[1]));
 }
@@ -30,6 +30,13 @@ namespace libstp::device::two_wheeled
                     right_motor (Motor): The motor for the right wheel.
             )pbdoc")
 
+            .def_readonly("left_motor", &TwoWheeledDevice::leftMotor, R"pbdoc(
+                The motor of the left wheel.
+            )pbdoc")
+            .def_readonly("right_motor", &TwoWheeledDevice::rightMotor, R"pbdoc(
+                The motor of the right wheel.
+            )pbdoc")
+
             .def_readwrite("ticks_per_revolution", &TwoWheeledDevice::ticksPerRevolution, R"pbdoc(
                 The number of ticks per wheel revolution. This must be calibrated.
             )pbdoc")
@@ -49,6 +56,9 @@ namespace libstp::device::two_wheeled
                 device (TwoWheeledDevice): The two-wheeled device to calibrate.
                 covered_distance (float): The distance covered in meters.
                 max_retries (int): The maximum number of retries.
+
+            Returns:
+                bool: Whether an attempt succeeded, ticks_per_revolution is only changed then.
         )pbdoc");
 
         m.def("calibrate_wheel_base", &calibrateWheelBase, py::arg("device"), py::arg("max_retries") = 5, R"pbdoc(
@@ -12,8 +12,9 @@ namespace libstp::device::two_wheeled
      * @param device The two-wheeled device
      * @param coveredDistance The distance the robot has covered in meters
      * @param maxRetries The maximum number of retries
+     * @return Whether an attempt succeeded, device.ticksPerRevolution is only changed then
      */
-    void calibrateTicksPerRevolution(const TwoWheeledDevice& device, float coveredDistance, int maxRetries);
+    bool calibrateTicksPerRevolution(const TwoWheeledDevice& device, float coveredDistance, int maxRetries);
 
     /**
      * Calibrate the wheelbase of the robot.
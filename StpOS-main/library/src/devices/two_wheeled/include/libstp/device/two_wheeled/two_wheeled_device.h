@@ -4,6 +4,7 @@
 
 #pragma once
 #include <tuple>
+#include <vector>
 
 #include "libstp/datatype/axis.h"
 #include "libstp/device/device.h"
@@ -37,11 +38,14 @@ namespace libstp::device::two_wheeled
               rightMotor(right_motor)
         {
         }
+
+        [[nodiscard]] std::vector<motor::Motor> getWheelMotors() const override;
     protected:
         void initializeKinematicDriveController() override;
         std::tuple<float, float, float> computeMaxSpeeds() override;
         void applyKinematicsModel(const datatype::AbsoluteSpeed& speed) override;
         std::tuple<float, float, float> getWheelVelocities(float dtSeconds) override;
+        [[nodiscard]] std::pair<float, float> toBodyVelocities(std::span<const double> wheelTicksPerSecond) const override;
         void stopDevice() override;
         [[nodiscard]] std::pair<float, float> computeDrivenDistance() const override;
     };
@@ -8,13 +8,13 @@
 #include "libstp/sensor/sensor.h"
 #include "libstp/math/math.h"
 
-void libstp::device::two_wheeled::calibrateTicksPerRevolution(const TwoWheeledDevice& device, float coveredDistance,
+bool libstp::device::two_wheeled::calibrateTicksPerRevolution(const TwoWheeledDevice& device, float coveredDistance,
                                                               int maxRetries)
 {
     if (coveredDistance <= 0.0f)
     {
         SPDLOG_ERROR("Covered distance must be greater than zero. Provided: {}", coveredDistance);
-        return;
+        return false;
     }
 
     if (device.ticksPerRevolution > 0.0f)
@@ -28,6 +28,7 @@ void libstp::device::two_wheeled::calibrateTicksPerRevolution(const TwoWheeledDe
     {
         device.leftMotor.resetPositionEstimate();
         device.rightMotor.resetPositionEstimate();
+        device.forgetWheelTicks();
 
         SPDLOG_INFO("Calibration Attempt {}/{}", attempt, maxRetries);
         SPDLOG_INFO("Please move the robot forward for {:.2f} meters.", coveredDistance);
@@ -69,10 +70,11 @@ void libstp::device::two_wheeled::calibrateTicksPerRevolution(const TwoWheeledDe
 
         device.ticksPerRevolution = (left_ticks_per_revolution + right_ticks_per_revolution) / 2.0f;
         SPDLOG_INFO("Calibration Successful. Final Ticks per Revolution: {:.2f}", device.ticksPerRevolution);
-        return;
+        return true;
     }
 
     SPDLOG_ERROR("Calibration failed after {} attempts. Please check the robot's hardware and try again.", maxRetries);
+    return false;
 }
 
 void libstp::device::two_wheeled::calibrateWheelBase(const TwoWheeledDevice& device, int maxRetries)
@@ -90,6 +92,7 @@ void libstp::device::two_wheeled::calibrateWheelBase(const TwoWheeledDevice& dev
     {
         device.leftMotor.resetPositionEstimate();
         device.rightMotor.resetPositionEstimate();
+        device.forgetWheelTicks();
 
         SPDLOG_INFO("Calibration Attempt {}/{}", attempt + 1, maxRetries);
         SPDLOG_INFO("Please lock the right wheel so it does not move.");
@@ -4,6 +4,7 @@
 
 #include "libstp/device/two_wheeled/two_wheeled_device.h"
 
+#include <array>
 #include <cmath>
 #include <chrono>
 #include <memory>
@@ -11,6 +12,7 @@
 #include "libstp/math/math.h"
 #include "libstp/_config.h"
 #include "libstp/motion/differential_drive.h"
+#include "libstp/trace/trace.h"
 #include "libstp/utility/constants.h"
 
 namespace libstp::device::two_wheeled
@@ -19,11 +21,16 @@ namespace libstp::device::two_wheeled
     {
         Device::initializeKinematicDriveController();
 
-        lastLeftTicks = leftMotor.getCurrentPositionEstimate();
-        initialLeftTicks = lastLeftTicks;
+        initialLeftTicks = leftMotor.getCurrentPositionEstimate();
+        initialRightTicks = rightMotor.getCurrentPositionEstimate();
 
-        lastRightTicks = rightMotor.getCurrentPositionEstimate();
-        initialRightTicks = lastRightTicks;
+        // The last ticks carry over from the previous step, the odometry gets the motion in between
+        if (!wheelTicksTracked)
+        {
+            lastLeftTicks = initialLeftTicks;
+            lastRightTicks = initialRightTicks;
+            wheelTicksTracked = true;
+        }
     }
 
     std::tuple<float, float, float> TwoWheeledDevice::computeMaxSpeeds()
@@ -42,14 +49,18 @@ namespace libstp::device::two_wheeled
         const float leftMotorSpeed_mps = vCMd - omegaCmd * wheelBase / 2.0f;
         const float rightMotorSpeed_mps = vCMd + omegaCmd * wheelBase / 2.0f;
 
-        
-        SPDLOG_TRACE("Left Motor Speed: {}, Right Motor Speed: {}", leftMotorSpeed_mps, rightMotorSpeed_mps);
 
         const float leftMotorCmdTicks = leftMotorSpeed_mps / (2.0f * M_PIf * wheelRadius) * ticksPerRevolution;
         const float rightMotorCmdTicks = rightMotorSpeed_mps / (2.0f * M_PIf * wheelRadius) * ticksPerRevolution;
 
-        leftMotor.setVelocity(static_cast<int>(leftMotorCmdTicks));
-        rightMotor.setVelocity(static_cast<int>(rightMotorCmdTicks));
+        auto& frame = trace::currentFrame();
+        frame.wheelCommand[0] = leftMotorCmdTicks;
+        frame.wheelCommand[1] = rightMotorCmdTicks;
+        frame.wheelCommand[2] = frame.wheelCommand[3] = 0.0f;
+
+        const std::array<const motor::Motor*, 2> motors{&leftMotor, &rightMotor};
+        const std::array velocities{static_cast<int>(leftMotorCmdTicks), static_cast<int>(rightMotorCmdTicks)};
+        motor::Motor::setVelocities(motors, velocities);
     }
 
     std::tuple<float, float, float> TwoWheeledDevice::getWheelVelocities(const float dtSeconds)
@@ -62,21 +73,35 @@ namespace libstp::device::two_wheeled
         const auto deltaLeftTicks = currentLeftTicks - lastLeftTicks;
         lastLeftTicks = currentLeftTicks;
 
-        SPDLOG_TRACE("Delta Left Ticks: {}, Delta Right Ticks: {}", deltaLeftTicks, deltaRightTicks);
+        auto& frame = trace::currentFrame();
+        frame.wheelTicks[0] = static_cast<float>(deltaLeftTicks);
+        frame.wheelTicks[1] = static_cast<float>(deltaRightTicks);
+        frame.wheelTicks[2] = frame.wheelTicks[3] = 0.0f;
+
         const float leftRot = static_cast<float>(deltaLeftTicks) / ticksPerRevolution;
         const float rightRot = static_cast<float>(deltaRightTicks) / ticksPerRevolution;
-        SPDLOG_TRACE("Left Rot: {}, Right Rot: {}", leftRot, rightRot);
 
         const float vLeft = 2.0f * M_PIf * wheelRadius * leftRot / dtSeconds;
         const float vRight = 2.0f * M_PIf * wheelRadius * rightRot / dtSeconds;
-        SPDLOG_TRACE("VLeft: {}, VRight: {}", vLeft, vRight);
-        
+
         const float vx = (vLeft + vRight) / 2.0f;
         const float omega = (vRight - vLeft) / wheelBase;
-        SPDLOG_TRACE("Vx: {}, Omega: {}", vx, omega);
         return std::make_tuple(vx, 0, omega);
     }
 
+    std::vector<motor::Motor> TwoWheeledDevice::getWheelMotors() const
+    {
+        return {leftMotor, rightMotor};
+    }
+
+    std::pair<float, float> TwoWheeledDevice::toBodyVelocities(const std::span<const double> wheelTicksPerSecond) const
+    {
+        const float metersPerTick = 2.0f * M_PIf * wheelRadius / ticksPerRevolution;
+        const float vLeft = static_cast<float>(wheelTicksPerSecond[0]) * metersPerTick;
+        const float vRight = static_cast<float>(wheelTicksPerSecond[1]) * metersPerTick;
+        return std::make_pair((vLeft + vRight) / 2.0f, 0.0f);
+    }
+
     void TwoWheeledDevice::stopDevice()
     {
         leftMotor.stop();
@@ -28,15 +28,34 @@ def index_args():
     return local_args
 
 
-arguments = index_args()
+_arguments = None
+
+
+def get_arguments() -> dict:
+    """
+    Returns:
+        dict: The --name[=value] arguments passed to the script, parsed on first use.
+    """
+    global _arguments
+    if _arguments is None:
+        _arguments = index_args()
+    return _arguments
+
+
+def __getattr__(name: str):
+    # The arguments used to be parsed on import, libstp_helpers.arguments parses them on first access instead
+    if name == "arguments":
+        return get_arguments()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_table() -> TableSide:
-    return TableSide(arguments.get("table", "DEFAULT"))
+    return TableSide(get_arguments().get("table", "DEFAULT"))
 
 
 def get_bool_argument(name: str, default: bool = False) -> bool:
     debug(f"Checking boolean argument '{name}' with default value {default}")
+    arguments = get_arguments()
     arg = arguments.get(name)
     negative_arg = arguments.get(f"no-{name}")
     if arg is not None and negative_arg is not None:
@@ -64,7 +83,7 @@ def get_bool_argument(name: str, default: bool = False) -> bool:
 
 
 def run_as_module(name: str, callback, *args, **kwargs):
-    if arguments.get(f"no-{name}") is not None:
+    if get_arguments().get(f"no-{name}") is not None:
         info(f"Skipping {name} module")
         return
 
@@ -1,21 +1,71 @@
-from typing import List
+import time
+from typing import List, Optional
 
 from libstp import initialize_timer
 from libstp.device import NativeDevice
 from libstp_helpers.api.steps.sequential import Sequential
 
+from libstp_helpers import get_bool_argument, telemetry
+from libstp_helpers.api import ClassNameLogger
 from libstp_helpers.api.missions import Mission
 from libstp_helpers.api.steps import seq
+from libstp_helpers.api.steps.plan import Plan, compile_plan
 
 
-# todo: Track mission lead time in csv file for later analysis of how much variance each mission has and how it changed over time
-class MissionController:
-    def __init__(self, device: NativeDevice, definitions):
+class MissionController(ClassNameLogger):
+    def __init__(self, device: NativeDevice, definitions, run_log: Optional[telemetry.RunLog] = None):
+        """
+        Args:
+            device: The device to run the missions on.
+            definitions: The robot definitions passed to every step.
+            run_log: Where the step timings of each run are appended to, see libstp_helpers.telemetry.
+                Recording is disabled with --no-telemetry.
+        """
         self.device = device
         self.definitions = definitions
+        self.run_log = run_log or telemetry.RunLog()
 
-    async def execute_missions(self, missions: List[Mission]):
+    def compile(self, missions: List[Mission]) -> Plan:
+        """
+        Validate the missions and compile them into a single plan, see libstp_helpers.api.steps.plan.
+
+        Args:
+            missions: The missions to run one after another.
+
+        Returns:
+            Plan: The plan passed to run_plan.
+
+        Raises:
+            TypeError, ValueError, RuntimeError: If a mission contains an invalid step or reference.
+        """
+        start = time.perf_counter()
+        sequences = []
+        for mission in missions:
+            sequence = mission.sequence()
+            sequence.telemetry_name = mission.__class__.__name__
+            sequences.append(sequence)
+        sequence: Sequential = seq(sequences)
+        sequence.telemetry_name = "Missions"
+
+        plan = compile_plan(sequence, self.definitions)
+        self.debug(f"Compiled {len(missions)} missions into {len(plan)} nodes with {plan.step_count} steps "
+                   f"in {(time.perf_counter() - start) * 1000:.2f}ms")
+        return plan
+
+    async def run_plan(self, plan: Plan):
         initialize_timer()
-        sequence: Sequential = seq([mission.sequence() for mission in missions])
-        await sequence.run_step(self.device, self.definitions)
-        sequence.call_on_exit(None)
\ No newline at end of file
+        record_timings = get_bool_argument("telemetry", True)
+        if record_timings:
+            telemetry.start_run(self.run_log)
+        try:
+            await plan.run(self.device)
+        finally:
+            if record_timings:
+                try:
+                    run_id = telemetry.finish_run()
+                    self.debug(f"Appended step timings of run {run_id} to {self.run_log.path}")
+                except OSError as e:
+                    self.warn(f"Could not write step timings to {self.run_log.path}: {e}")
+
+    async def execute_missions(self, missions: List[Mission]):
+        await self.run_plan(self.compile(missions))
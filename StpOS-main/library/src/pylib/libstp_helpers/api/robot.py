@@ -5,11 +5,13 @@ from asyncio import CancelledError
 
 from libstp.sensor import wait_for_button_click
 
-from libstp_helpers import get_bool_argument
+from libstp_helpers import get_arguments, get_bool_argument, sim
 from libstp_helpers.api import ClassNameLogger
 from libstp_helpers.api.missions import Mission
 from libstp_helpers.api.missions.mission_controller import MissionController
-from libstp_helpers.utility import to_task
+from libstp_helpers.calibration import DEFAULT_TICKS_DISTANCE, CalibrationStore, calibrate_imu, \
+    calibrate_ticks_per_revolution, restore_drive_gains, restore_ticks_per_revolution
+from libstp_helpers.drive_tuning import tune_drive
 
 
 # todo: Setup proper exception handling:
@@ -48,6 +50,7 @@ class Robot(ClassNameLogger):
         self._auto_shutdown_time = None
         self._light_sensor = None
         self._has_shutdown_missions_been_called = False
+        self._simulation = None
 
     def use_missions(self, *missions):
         self._missions.extend(missions)
@@ -69,6 +72,24 @@ class Robot(ClassNameLogger):
         self._auto_shutdown_time = seconds
         return self
 
+    def simulate(self, world=None, step_seconds: float = 0.001):
+        """
+        Runs the robot against a simulated world instead of the wombat, see libstp_helpers.sim.
+        The missions run on the simulated clock and the start signals are skipped.
+
+        Args:
+            world: A libstp.sim.World, a callable creating one from the device, or None for an empty table.
+            step_seconds: The largest time step the world is integrated with.
+        """
+        if world is None:
+            world = sim.world_for(self.device)
+        elif callable(world):
+            world = world(self.device)
+
+        self._simulation = sim.Simulation(world, step_seconds)
+        self.info("Running in simulation.")
+        return self
+
     def set_light_sensor(self, light_sensor):
         """Set the light sensor to be used for wait_for_light."""
         self._light_sensor = light_sensor
@@ -89,9 +110,9 @@ class Robot(ClassNameLogger):
         if elapsed_time > 20:
             self.warn(f"Shutdown mission execution took {elapsed_time:.2f}ms, exceeding the 20ms limit.")
 
-    async def __execute_missions__(self):
+    async def __execute_missions__(self, plan):
         mission_controller = MissionController(self.device, self.definitions)
-        await mission_controller.execute_missions(self._missions)
+        await mission_controller.run_plan(plan)
 
     async def __stop_after__(self, main_task, start_time):
         if self._auto_shutdown_time is None:
@@ -104,7 +125,7 @@ class Robot(ClassNameLogger):
         await self.__call_on_shutdown__()
 
     def wait_for_button_click(self):
-        if not get_bool_argument("wait-for-button", True):
+        if not get_bool_argument("wait-for-button", True) or self._simulation is not None:
             return
 
         self.info("Waiting for button click to continue...")
@@ -112,7 +133,7 @@ class Robot(ClassNameLogger):
         self.info("Button clicked!")
 
     def wait_for_light(self):
-        if not get_bool_argument("wait-for-light", True):
+        if not get_bool_argument("wait-for-light", True) or self._simulation is not None:
             return
 
         if self._light_sensor is None:
@@ -124,13 +145,31 @@ class Robot(ClassNameLogger):
         self.info("Light turned on!")
 
     def start(self):
+        if self._simulation is None and get_bool_argument("simulate", False):
+            self.simulate()
+
+        # Fail on broken missions before calibrating and waiting for the start signal
+        plan = MissionController(self.device, self.definitions).compile(self._missions)
+
         async def _run():
             self.device.set_w_pid(0.5, 0.0, 0.0)
             self.device.set_vx_pid(1.0, 0.0, 0.0)
             self.device.set_vy_pid(1.0, 0.0, 0.0)
             self.device.set_heading_pid(5.0, 0.1, 0.0)
             self.device.set_max_accel(5, 5, 10)
-            await to_task(self.device.imu.calibrate(100))
+            # The simulated IMU has no bias worth storing and must not replace the one of the real robot
+            store = CalibrationStore() if self._simulation is None else None
+            if store is not None:
+                restore_ticks_per_revolution(self.device, store)
+                restore_drive_gains(self.device, store)
+            ticks_distance = get_arguments().get("calibrate-ticks")
+            if ticks_distance is not None:
+                # --calibrate-ticks=METERS, the distance the robot is pushed
+                distance = DEFAULT_TICKS_DISTANCE if ticks_distance is True else float(ticks_distance)
+                calibrate_ticks_per_revolution(self.device, store, distance)
+            await calibrate_imu(self.device.imu, store, force=get_bool_argument("calibrate-imu", False))
+            if get_bool_argument("tune-drive", False):
+                await tune_drive(self.device, store)
 
             if self._setup_mission:
                 mission_controller = MissionController(self.device, self.definitions)
@@ -139,7 +178,7 @@ class Robot(ClassNameLogger):
             self.wait_for_button_click()
             self.wait_for_light()
             start_time = asyncio.get_event_loop().time()
-            task = asyncio.create_task(self.__execute_missions__())
+            task = asyncio.create_task(self.__execute_missions__(plan))
             timer = asyncio.create_task(self.__stop_after__(task, start_time))
             try:
                 # Try to wait for mission execution to complete
@@ -154,5 +193,11 @@ class Robot(ClassNameLogger):
                 await self.__call_on_shutdown__()
                 self.device.stop()
 
-        with self.device:
-            asyncio.run(_run())
+        if self._simulation is None:
+            with self.device:
+                asyncio.run(_run())
+            return
+
+        with self._simulation, self.device:
+            sim.run(self._simulation, _run())
+        self.info(f"Simulation finished after {self._simulation.time:.2f} simulated seconds.")
@@ -1,9 +1,12 @@
+import importlib
 from abc import abstractmethod
-from typing import Any, runtime_checkable, Protocol, Optional, TypeVar, Union, cast
+from typing import Any, AsyncIterator, Callable, runtime_checkable, Protocol, Optional, TypeVar, Union, cast
 
 from libstp.device import NativeDevice
 
 from libstp_helpers.api import ClassNameLogger
+from libstp_helpers.scheduler import RATE_100HZ, TickCallback, get_tick_scheduler
+from libstp_helpers.telemetry import timed
 
 
 @runtime_checkable
@@ -17,10 +20,27 @@ class StepProtocol(Protocol):
 
 T = TypeVar('T')
 
+
+def resolve_step_definitions(step: StepProtocol, definitions: Any) -> None:
+    """
+    Resolve the definitions of a step, steps only implementing StepProtocol have nothing to resolve.
+    """
+    resolve = getattr(step, "resolve_definitions", None)
+    if resolve is not None:
+        resolve(definitions)
+
+
 class Step(ClassNameLogger):
     def __init__(self) -> None:
         pass
 
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        # Record the timing of every step implementation while a mission run is active
+        run_step = cls.__dict__.get("run_step")
+        if run_step is not None and not getattr(run_step, "__timed__", False):
+            cls.run_step = timed(run_step)
+
     def call_on_exit(self, next_step: Optional[StepProtocol] = None) -> None:
         """
         Call the on_exit callback if it exists.
@@ -39,6 +59,33 @@ class Step(ClassNameLogger):
         """
         return False  # Default behavior is to stop
 
+    def ticks(self, rate: float = RATE_100HZ, duration: Optional[float] = None) -> AsyncIterator[float]:
+        """
+        Iterate over the ticks of the shared tick scheduler instead of sleeping in a loop.
+
+        Args:
+            rate: The rate group in Hz.
+            duration: Stop after this many seconds, or never if None.
+
+        Returns:
+            An async iterator yielding the time of each tick.
+        """
+        return get_tick_scheduler().ticks(rate, duration, self.__class__.__name__)
+
+    def register_periodic(self, callback: Callable[[float], None], rate: float = RATE_100HZ) -> TickCallback:
+        """
+        Register a callback with the shared tick scheduler. The caller has to cancel it once the step is done.
+
+        Args:
+            callback: A synchronous function receiving the tick time.
+            rate: The rate group in Hz.
+
+        Returns:
+            TickCallback: The handle used to cancel the callback.
+        """
+        name = f"{self.__class__.__name__}.{getattr(callback, '__name__', 'callback')}"
+        return get_tick_scheduler().register(callback, rate, name)
+
     def get_property_from_definitions(self, prop: Union[str, T], definitions: Any, prop_type: T) -> T:
         """
         Extract a property from definitions when given either a string attribute name
@@ -68,6 +115,20 @@ class Step(ClassNameLogger):
 
         return cast(T, obj)
 
+    def resolve_definitions(self, definitions: Any) -> None:
+        """
+        Resolve and validate the references of this step into the definitions ahead of time.
+        Called once by compile_plan before the missions start, so a missing servo fails at startup
+        instead of in the middle of a run. Steps wrapping other steps resolve them as well.
+
+        Args:
+            definitions: The definitions object the step will run with
+
+        Raises:
+            RuntimeError: If a reference does not exist or is None
+        """
+        pass  # nothing to resolve by default
+
     @abstractmethod
     async def run_step(self, device: NativeDevice, definitions: Any) -> None:
         """
@@ -90,6 +151,10 @@ from libstp_helpers.api.steps.drive import (
     strafe_right,
     turn_cw,
     turn_ccw,
+    drive_distance,
+    strafe_distance,
+    turn_degrees,
+    follow_path,
 )
 from libstp_helpers.api.steps.sequential import seq
 from libstp_helpers.api.steps.parallel import parallel
@@ -97,16 +162,30 @@ from libstp_helpers.api.steps.timeout import timeout
 from libstp_helpers.api.steps.wait_for_seconds import wait
 from libstp_helpers.api.steps.wait_for_checkpoint import wait_for_checkpoint
 from libstp_helpers.api.steps.servo import servo, slow_servo
-from libstp_helpers.api.steps.motion.lineup import (
-    lineup,
-    forward_lineup_on_black,
-    forward_lineup_on_white,
-    backward_lineup_on_black,
-    backward_lineup_on_white
-)
-from libstp_helpers.api.steps.motion.drive_until import (
-    drive_until_black,
-    drive_until_white,
-)
-from libstp_helpers.api.steps.motion.line_follow import follow_line
-from libstp_helpers.api.steps.motion.single_line_follower import follow_line_single
+
+# The line sensor steps are imported on first use, they pull in the sensor helpers
+_LAZY_EXPORTS = {
+    "lineup": "motion.lineup",
+    "forward_lineup_on_black": "motion.lineup",
+    "forward_lineup_on_white": "motion.lineup",
+    "backward_lineup_on_black": "motion.lineup",
+    "backward_lineup_on_white": "motion.lineup",
+    "drive_until_black": "motion.drive_until",
+    "drive_until_white": "motion.drive_until",
+    "follow_line": "motion.line_follow",
+    "follow_line_single": "motion.single_line_follower",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
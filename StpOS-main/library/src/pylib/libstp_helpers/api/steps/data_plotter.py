@@ -1,13 +1,10 @@
 import asyncio
-import time
 from typing import Any, Callable, Union, Dict, Tuple
 
-import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
 from libstp.device import NativeDevice
 
 from libstp_helpers.api.steps import Step
+from libstp_helpers.scheduler import RATE_100HZ
 from libstp_helpers.utility.logging import log
 
 
@@ -41,15 +38,17 @@ class DataPlotterStep(Step):
         await super().run_step(device, definitions)
 
         data = []
-        start_time = time.time()
-
-        while time.time() - start_time < self.duration_s:
+        async for _ in self.ticks(RATE_100HZ, self.duration_s):
             if asyncio.iscoroutinefunction(self.data_func):
                 result = await self.data_func(device, definitions)
             else:
                 result = self.data_func(device, definitions)
             data.append(result)
-            await asyncio.sleep(0.01)  # Small delay to prevent busy-waiting
+
+        # Plotting is rarely used on the robot, only load it here
+        import matplotlib.pyplot as plt
+        import pandas as pd
+        import seaborn as sns
 
         df = pd.DataFrame(data)
         
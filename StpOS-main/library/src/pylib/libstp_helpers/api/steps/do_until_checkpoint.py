@@ -1,8 +1,8 @@
-from typing import Any
+from typing import Any, Union
 
 from libstp.device import NativeDevice
 
-from libstp_helpers.api.steps import Step
+from libstp_helpers.api.steps import Step, resolve_step_definitions
 from libstp_helpers.synchronizer import Synchroniser
 
 
@@ -12,14 +12,19 @@ class DoUntilCheckpoint(Step):
         super().__init__()
         self.checkpoint = checkpoint
         self.step = step
+        self.synchronizer: Union[str, Synchroniser] = "synchronizer"
 
     async def _job_while_wait(self, device: NativeDevice, definitions: Any):
         await self.step.run_step(device, definitions)
 
+    def resolve_definitions(self, definitions: Any) -> None:
+        self.synchronizer = self.get_property_from_definitions(self.synchronizer, definitions, Synchroniser)
+        resolve_step_definitions(self.step, definitions)
+
     async def run_step(self, device: NativeDevice, definitions: Any) -> None:
         await super().run_step(device, definitions)
 
-        synchronizer = self.get_property_from_definitions("synchronizer", definitions, Synchroniser)
+        synchronizer = self.get_property_from_definitions(self.synchronizer, definitions, Synchroniser)
         await synchronizer.do_until_checkpoint(self.checkpoint, self._job_while_wait, device, definitions)
 
 
@@ -1,8 +1,9 @@
-from typing import Any, Callable, Union, Optional
+from typing import Any, Callable, Sequence, Tuple, Union, Optional
 
-from libstp.datatypes import ConditionalResult, Speed
+from libstp.datatypes import Condition, ConditionalResult, Speed
 from libstp.datatypes import for_ccw_rotation as for_ccw_condition
 from libstp.datatypes import for_cw_rotation as for_cw_condition
+from libstp.datatypes import for_path, for_profiled_distance, for_profiled_rotation, for_profiled_strafe
 from libstp.datatypes import for_seconds as for_seconds_condition
 from libstp.device import NativeDevice
 
@@ -12,7 +13,7 @@ from libstp_helpers.utility import to_task
 
 class Drive(Step):
     def __init__(self,
-                 condition: Callable[[bool], ConditionalResult],
+                 condition: Union[Condition, Callable[[bool], ConditionalResult]],
                  speed: Union[Speed, Callable[[ConditionalResult], Speed]],
                  do_correction: bool = True,
                  ):
@@ -20,7 +21,7 @@ class Drive(Step):
         Initialize the Drive step.
 
         Args:
-            condition: A callable that returns a ConditionalResult.
+            condition: A Condition such as for_seconds(), or a callable that returns a ConditionalResult.
             speed: The speed at which to drive, or a callable that takes a ConditionalResult and returns a Speed.
             do_correction: Whether to apply correction during driving.
         """
@@ -36,11 +37,8 @@ class Drive(Step):
         super().__init__()
         self.condition = condition
 
-        # If speed is a constant, convert it to a callable
-        if isinstance(speed, Speed):
-            self._speed_callable = lambda _: speed
-        else:
-            self._speed_callable = speed
+        # A constant Speed is passed on as is, the native loop then never calls back into Python for it
+        self.speed = speed
 
         self.do_correction = do_correction
         self.device = None
@@ -64,7 +62,7 @@ class Drive(Step):
         await super().run_step(device, definitions)
         self.device = device  # Store device for on_exit usage
         await to_task(device.set_speed_while(self.condition,
-                                             self._speed_callable,
+                                             self.speed,
                                              do_correction=self.do_correction,
                                              auto_stop_device=False,
                                              reset_ramps=False))
@@ -107,4 +105,31 @@ def turn_cw(degrees: float, speed: float, do_correction=True) -> Drive:
 
 def turn_ccw(degrees: float, speed: float, do_correction=True) -> Drive:
     """Turn counter-clockwise by specified degrees at a given speed"""
-    return Drive(for_ccw_condition(degrees), Speed(0, 0, speed), do_correction)
\ No newline at end of file
+    return Drive(for_ccw_condition(degrees), Speed(0, 0, speed), do_correction)
+
+
+def drive_distance(centimeters: float, speed: float = 1.0, max_jerk: float = 0.0) -> Drive:
+    """Drive a distance along a planned profile that brakes to a stop on it, negative distances drive backward"""
+    return Drive(for_profiled_distance(centimeters, speed, max_jerk), Speed(0, 0, 0))
+
+
+def strafe_distance(centimeters: float, speed: float = 1.0, max_jerk: float = 0.0) -> Drive:
+    """Strafe a distance along a planned profile, positive distances strafe like strafe_left"""
+    return Drive(for_profiled_strafe(centimeters, speed, max_jerk), Speed(0, 0, 0))
+
+
+def turn_degrees(degrees: float, speed: float = 1.0, max_jerk: float = 0.0) -> Drive:
+    """Turn along a planned profile, positive degrees turn clockwise like turn_cw"""
+    return Drive(for_profiled_rotation(degrees, speed, max_jerk), Speed(0, 0, 0))
+
+
+def follow_path(waypoints: Sequence[Tuple[float, float]], speed: float = 1.0, lookahead: float = 15.0) -> Drive:
+    """
+    Drive through waypoints in one step, blending the speed through them instead of stopping at each.
+
+    Args:
+        waypoints: (x, y) in cm relative to where the step starts, x ahead and y to the side strafe_left moves to.
+        speed: Fraction of the maximum forward speed.
+        lookahead: Distance along the path in cm the robot steers towards, a longer one cuts corners more.
+    """
+    return Drive(for_path(list(waypoints), speed, lookahead), Speed(0, 0, 0))
@@ -4,7 +4,7 @@ from typing import Any
 
 from libstp.device import NativeDevice
 
-from libstp_helpers.api.steps import Step
+from libstp_helpers.api.steps import Step, resolve_step_definitions
 
 
 class DoWhileActive(Step):
@@ -14,6 +14,10 @@ class DoWhileActive(Step):
         self.reference_step = reference_step
         self.task = task
 
+    def resolve_definitions(self, definitions: Any) -> None:
+        resolve_step_definitions(self.reference_step, definitions)
+        resolve_step_definitions(self.task, definitions)
+
     async def run_step(self, device: NativeDevice, definitions: Any) -> None:
         reference_step = asyncio.create_task(self.reference_step.run_step(device, definitions))
         task = asyncio.create_task(self.task.run_step(device, definitions))
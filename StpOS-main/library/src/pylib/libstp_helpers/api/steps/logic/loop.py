@@ -2,7 +2,7 @@ from typing import Any
 
 from libstp.device import NativeDevice
 
-from libstp_helpers.api.steps import Step, StepProtocol
+from libstp_helpers.api.steps import Step, StepProtocol, resolve_step_definitions
 
 
 class LoopForeverStep(Step):
@@ -23,6 +23,9 @@ class LoopForeverStep(Step):
 
         self.step = step
 
+    def resolve_definitions(self, definitions: Any) -> None:
+        resolve_step_definitions(self.step, definitions)
+
     async def run_step(self, device: NativeDevice, definitions: Any) -> None:
         """
         Run the step indefinitely.
@@ -60,6 +63,9 @@ class LoopForStep(Step):
         self.step = step
         self.iterations = iterations
 
+    def resolve_definitions(self, definitions: Any) -> None:
+        resolve_step_definitions(self.step, definitions)
+
     async def run_step(self, device: NativeDevice, definitions: Any) -> None:
         """
         Run the step for the specified number of iterations.
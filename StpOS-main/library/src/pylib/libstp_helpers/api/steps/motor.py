@@ -50,6 +50,10 @@ class SetMotorVelocity(Step):
         self.duration = float(duration) if duration is not None else None
         self.speed_value = percent_to_speed(self.velocity_pct)
 
+    def resolve_definitions(self, definitions: Any) -> None:
+        """Resolve the motor reference once before the run."""
+        self.motor = self.get_property_from_definitions(self.motor, definitions, Motor)
+
     async def run_step(self, device: NativeDevice, definitions: Any) -> None:
         await super().run_step(device, definitions)
 
@@ -83,6 +87,10 @@ class StopMotor(Step):
         super().__init__()
         self.motor: Union[str, Motor] = motor
 
+    def resolve_definitions(self, definitions: Any) -> None:
+        """Resolve the motor reference once before the run."""
+        self.motor = self.get_property_from_definitions(self.motor, definitions, Motor)
+
     async def run_step(self, device: NativeDevice, definitions: Any) -> None:
         await super().run_step(device, definitions)
 
@@ -3,7 +3,7 @@ from typing import List, Any, Optional
 
 from libstp.device import NativeDevice
 
-from libstp_helpers.api.steps import Step, StepProtocol
+from libstp_helpers.api.steps import Step, StepProtocol, resolve_step_definitions
 from libstp_helpers.api.steps.sequential import seq, Sequential
 from libstp_helpers.utility.logging import log
 
@@ -47,6 +47,10 @@ class Parallel(Step):
         """
         return any(step.should_continue_moving() for step in self.steps) if self.steps else False
 
+    def resolve_definitions(self, definitions: Any) -> None:
+        for step in self.steps:
+            resolve_step_definitions(step, definitions)
+
     async def run_step(self, device: NativeDevice, definitions: Any) -> None:
         """
         Execute all steps in parallel, waiting for all to complete.
@@ -0,0 +1,256 @@
+"""
+Compiled step plans.
+
+compile_plan() turns a tree of seq() and parallel() steps into a flat list of nodes once, before the
+missions start: every step is type checked, the references into the definitions are resolved and the
+call_on_exit chain is worked out ahead of time. A Plan then runs the nodes with a single loop instead of
+a coroutine per Sequential and Parallel, only the branches of a fork get a task of their own.
+
+    plan = compile_plan(seq([mission.sequence() for mission in missions]), definitions)
+    await plan.run(device)
+"""
+import asyncio
+from typing import Any, List, Optional
+
+from libstp.device import NativeDevice
+
+from libstp_helpers import telemetry
+from libstp_helpers.api.steps import Step, StepProtocol, resolve_step_definitions
+from libstp_helpers.api.steps.parallel import Parallel
+from libstp_helpers.api.steps.sequential import Sequential
+
+OP_RUN = 0  # run a step which is not flattened
+OP_FORK = 1  # start the branches of a parallel step
+OP_JOIN = 2  # wait for the branches of the fork, passes the pending call_on_exit on
+OP_END = 3  # end of a branch or of the plan
+OP_ENTER = 4  # start the telemetry record of a flattened step
+OP_EXIT = 5  # finish the telemetry record of a flattened step
+
+_OP_NAMES = {OP_RUN: "run", OP_FORK: "fork", OP_JOIN: "join", OP_END: "end", OP_ENTER: "enter", OP_EXIT: "exit"}
+
+
+class _Deferred:
+    """
+    Marks a call_on_exit which only the enclosing join can make, it depends on which branch finishes last.
+    """
+
+    def __repr__(self) -> str:
+        return "<deferred>"
+
+
+DEFERRED = _Deferred()
+
+
+class PlanNode:
+    """
+    A single instruction of a plan.
+
+    RUN nodes call step.call_on_exit(next_step) once the step finished, unless next_step is DEFERRED.
+    A FORK lists the first node of every branch and the index of its JOIN, a JOIN calls the pending
+    call_on_exit of the branch that finished last with its next_step.
+    """
+    __slots__ = ("op", "step", "next_step", "branches", "join")
+
+    def __init__(self, op: int, step: Optional[StepProtocol] = None, next_step: Any = None,
+                 branches: Optional[List[int]] = None, join: int = -1):
+        self.op = op
+        self.step = step
+        self.next_step = next_step
+        self.branches = branches
+        self.join = join
+
+    def __repr__(self) -> str:
+        name = type(self.step).__name__ if self.step is not None else ""
+        if self.op == OP_FORK:
+            return f"fork {self.branches} -> {self.join}"
+        return f"{_OP_NAMES[self.op]} {name}".strip()
+
+
+class Plan:
+    """
+    A compiled mission tree, see compile_plan.
+    """
+
+    def __init__(self, nodes: List[PlanNode], definitions: Any, step_count: int):
+        self.nodes = nodes
+        self.definitions = definitions
+        self.step_count = step_count
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __repr__(self) -> str:
+        return "\n".join(f"{index:>4} {node!r}" for index, node in enumerate(self.nodes))
+
+    async def run(self, device: NativeDevice) -> None:
+        """
+        Run the plan to completion.
+
+        Args:
+            device: The device to run on
+        """
+        pending = await self._run_branch(0, device)
+        if pending is not None:
+            pending.call_on_exit(None)
+
+    async def _run_branch(self, pc: int, device: NativeDevice) -> Optional[StepProtocol]:
+        """
+        Run the nodes from pc up to the END of the branch.
+
+        Returns:
+            The step whose call_on_exit was deferred to the caller, if any.
+        """
+        nodes = self.nodes
+        definitions = self.definitions
+        scopes = []
+        pending = None
+        try:
+            while True:
+                node = nodes[pc]
+                op = node.op
+                if op == OP_RUN:
+                    step = node.step
+                    await step.run_step(device, definitions)
+                    if node.next_step is DEFERRED:
+                        pending = step
+                    else:
+                        step.call_on_exit(node.next_step)
+                    pc += 1
+                elif op == OP_ENTER:
+                    scopes.append(telemetry.enter_step(node.step))
+                    pc += 1
+                elif op == OP_EXIT:
+                    telemetry.exit_step(scopes.pop())
+                    pc += 1
+                elif op == OP_FORK:
+                    pending = await self._fork(node, device)
+                    join = nodes[node.join]
+                    if pending is not None and join.next_step is not DEFERRED:
+                        pending.call_on_exit(join.next_step)
+                        pending = None
+                    pc = node.join + 1
+                else:
+                    return pending
+        except BaseException as e:
+            status = telemetry.STATUS_CANCELLED if isinstance(e, asyncio.CancelledError) else telemetry.STATUS_ERROR
+            while scopes:
+                telemetry.exit_step(scopes.pop(), status)
+            raise
+
+    async def _fork(self, node: PlanNode, device: NativeDevice) -> Optional[StepProtocol]:
+        remaining = len(node.branches)
+        last_pending = None
+
+        async def branch(pc: int) -> None:
+            nonlocal remaining, last_pending
+            pending = await self._run_branch(pc, device)
+            remaining -= 1
+            if remaining > 0:
+                # Like Parallel, every branch but the last one to finish is told that nothing follows
+                if pending is not None:
+                    pending.call_on_exit(None)
+            else:
+                last_pending = pending
+
+        # The first branch runs in the current task, only the others need one
+        tasks = [asyncio.ensure_future(branch(pc)) for pc in node.branches[1:]]
+        try:
+            await branch(node.branches[0])
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            # Let the other branches unwind before the error leaves the fork
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        return last_pending
+
+
+class _Compiler:
+    def __init__(self, definitions: Any):
+        self.definitions = definitions
+        self.nodes: List[PlanNode] = []
+        self.step_count = 0
+        self._path: List[str] = []
+        self._active = set()
+
+    def emit(self, node: PlanNode) -> int:
+        self.nodes.append(node)
+        return len(self.nodes) - 1
+
+    def compile(self, step: StepProtocol, next_step: Any) -> None:
+        # The protocol check is slow, most steps derive from Step anyway
+        if not isinstance(step, Step) and not isinstance(step, StepProtocol):
+            raise TypeError(f"{self.location()} is not a Step instance: {type(step)}")
+        if id(step) in self._active:
+            raise ValueError(f"{self.location()} contains itself")
+
+        self._active.add(id(step))
+        try:
+            if type(step) is Sequential:
+                self.compile_sequential(step, next_step)
+            elif type(step) is Parallel:
+                self.compile_parallel(step, next_step)
+            else:
+                self.compile_step(step, next_step)
+        finally:
+            self._active.discard(id(step))
+
+    def compile_sequential(self, sequence: Sequential, next_step: Any) -> None:
+        self.emit(PlanNode(OP_ENTER, sequence))
+        for index, step in enumerate(sequence.steps):
+            # The last step hands over to whatever follows the whole sequence
+            following = sequence.steps[index + 1] if index + 1 < len(sequence.steps) else next_step
+            self._path.append(f"{index}:{type(step).__name__}")
+            self.compile(step, following)
+            self._path.pop()
+        self.emit(PlanNode(OP_EXIT, sequence))
+
+    def compile_parallel(self, parallel: Parallel, next_step: Any) -> None:
+        self.emit(PlanNode(OP_ENTER, parallel))
+        if parallel.steps:
+            fork = self.nodes[self.emit(PlanNode(OP_FORK, parallel, branches=[]))]
+            for index, step in enumerate(parallel.steps):
+                fork.branches.append(len(self.nodes))
+                self._path.append(f"{index}:{type(step).__name__}")
+                self.compile(step, DEFERRED)
+                self._path.pop()
+                self.emit(PlanNode(OP_END))
+            fork.join = self.emit(PlanNode(OP_JOIN, parallel, next_step))
+        self.emit(PlanNode(OP_EXIT, parallel))
+
+    def compile_step(self, step: StepProtocol, next_step: Any) -> None:
+        try:
+            resolve_step_definitions(step, self.definitions)
+        except RuntimeError as e:
+            raise RuntimeError(f"{self.location()}: {e}") from e
+        self.emit(PlanNode(OP_RUN, step, next_step))
+        self.step_count += 1
+
+    def location(self) -> str:
+        return "/".join(self._path) or "The root step"
+
+
+def compile_plan(step: StepProtocol, definitions: Any) -> Plan:
+    """
+    Validate a step tree and flatten it into a plan.
+
+    Sequential and Parallel steps are flattened, all other steps (including their subclasses and wrappers
+    such as timeout()) run as a single node after their definitions have been resolved.
+
+    Args:
+        step: The root step, e.g. the seq() of all missions
+        definitions: The definitions object the steps will run with
+
+    Returns:
+        Plan: The plan, ready to run
+
+    Raises:
+        TypeError: If the tree contains an object which is not a step
+        ValueError: If a step contains itself
+        RuntimeError: If a step references something which is missing in the definitions
+    """
+    compiler = _Compiler(definitions)
+    compiler.compile(step, None)
+    compiler.emit(PlanNode(OP_END))
+    return Plan(compiler.nodes, definitions, compiler.step_count)
@@ -1,7 +1,7 @@
 from typing import List, Any, Optional
 
 from libstp.device import NativeDevice
-from libstp_helpers.api.steps import Step, StepProtocol
+from libstp_helpers.api.steps import Step, StepProtocol, resolve_step_definitions
 from libstp_helpers.utility.logging import log
 
 class Sequential(Step):
@@ -44,6 +44,10 @@ class Sequential(Step):
             return False
         return self.steps[0].should_continue_moving()
 
+    def resolve_definitions(self, definitions: Any) -> None:
+        for step in self.steps:
+            resolve_step_definitions(step, definitions)
+
     async def run_step(self, device: NativeDevice, definitions: Any) -> None:
         """
         Execute each step in sequence, passing device and definitions to each step.
@@ -6,6 +6,7 @@ from libstp.device import NativeDevice
 from libstp.servo import Servo
 
 from libstp_helpers.api.steps import Step
+from libstp_helpers.scheduler import RATE_50HZ
 from libstp_helpers.utility import to_task
 
 from libstp_helpers.utility.math import ease_in_ease_out
@@ -91,6 +92,10 @@ class SetServoPosition(Step):
         self.time = float(time) if time is not None else None
         self.target_position = angle_to_position(self.target_angle)
 
+    def resolve_definitions(self, definitions: Any) -> None:
+        """Resolve the servo reference once before the run."""
+        self.servo = self.get_property_from_definitions(self.servo, definitions, Servo)
+
     async def run_step(self, device: NativeDevice, definitions: Any) -> None:
         """
         Set the servo position.
@@ -191,6 +196,10 @@ class ShakeServo(Step):
         self.angle_a = float(angle_a)
         self.angle_b = float(angle_b)
 
+    def resolve_definitions(self, definitions: Any) -> None:
+        """Resolve the servo reference once before the run."""
+        self.servo = self.get_property_from_definitions(self.servo, definitions, Servo)
+
     async def run_step(self, device: NativeDevice, definitions: Any) -> None:
         """
         Shake the servo for a given duration.
@@ -207,20 +216,19 @@ class ShakeServo(Step):
         servo_obj = self.get_property_from_definitions(self.servo, definitions, Servo)
         servo_obj.enable()
 
-        end_time = asyncio.get_event_loop().time() + self.duration
-        
         pos_a = angle_to_position(self.angle_a)
         pos_b = angle_to_position(self.angle_b)
-        
+
         move_time = estimate_servo_move_time(self.angle_a, self.angle_b)
 
-        while asyncio.get_event_loop().time() < end_time:
-            servo_obj.set_position(pos_a)
-            await asyncio.sleep(move_time)
-            if asyncio.get_event_loop().time() >= end_time:
-                break
-            servo_obj.set_position(pos_b)
-            await asyncio.sleep(move_time)
+        # Toggle on the 50 Hz grid instead of sleeping, so parallel steps stay in phase
+        ticks_per_move = max(1, round(move_time * RATE_50HZ))
+        servo_obj.set_position(pos_a)
+        tick_count = 0
+        async for _ in self.ticks(RATE_50HZ, self.duration):
+            tick_count += 1
+            if tick_count % ticks_per_move == 0:
+                servo_obj.set_position(pos_b if (tick_count // ticks_per_move) % 2 else pos_a)
 
 
 def shake_servo(servo: Union[str, Servo], duration: float, angle_a: float, angle_b: float) -> ShakeServo:
@@ -91,6 +91,10 @@ class SetServoPosition(Step):
         self.time = float(time) if time is not None else None
         self.target_position = angle_to_position(self.target_angle)
 
+    def resolve_definitions(self, definitions: Any) -> None:
+        """Resolve the servo reference once before the run."""
+        self.servo = self.get_property_from_definitions(self.servo, definitions, Servo)
+
     async def run_step(self, device: NativeDevice, definitions: Any) -> None:
         """
         Set the servo position.
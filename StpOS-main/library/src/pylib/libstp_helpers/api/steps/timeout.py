@@ -2,7 +2,7 @@ import asyncio
 from typing import Any, Union
 
 from libstp.device import NativeDevice
-from libstp_helpers.api.steps import Step, StepProtocol
+from libstp_helpers.api.steps import Step, StepProtocol, resolve_step_definitions
 from libstp_helpers.utility.logging import log
 
 class Timeout(Step):
@@ -37,6 +37,9 @@ class Timeout(Step):
         self.timeout_seconds = float(timeout_seconds)
         self.result = None
 
+    def resolve_definitions(self, definitions: Any) -> None:
+        resolve_step_definitions(self.step, definitions)
+
     async def run_step(self, device: NativeDevice, definitions: Any) -> None:
         """
         Execute the wrapped step with a timeout.
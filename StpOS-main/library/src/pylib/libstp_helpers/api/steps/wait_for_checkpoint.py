@@ -23,6 +23,11 @@ class WaitForCheckpoint(Step):
             raise ValueError(f"Checkpoint duration cannot be negative: {checkpoint_seconds}")
 
         self.checkpoint_seconds = float(checkpoint_seconds)
+        self.synchronizer: Union[str, Synchroniser] = "synchronizer"
+
+    def resolve_definitions(self, definitions: Any) -> None:
+        """Resolve the synchronizer once before the run."""
+        self.synchronizer = self.get_property_from_definitions(self.synchronizer, definitions, Synchroniser)
 
     async def run_step(self, device: NativeDevice, definitions: Any) -> None:
         """
@@ -34,7 +39,7 @@ class WaitForCheckpoint(Step):
         """
         await super().run_step(device, definitions)
 
-        synchronizer = self.get_property_from_definitions("synchronizer", definitions, Synchroniser)
+        synchronizer = self.get_property_from_definitions(self.synchronizer, definitions, Synchroniser)
 
         await synchronizer.wait_until_checkpoint(self.checkpoint_seconds)
 
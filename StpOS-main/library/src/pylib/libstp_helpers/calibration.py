@@ -0,0 +1,327 @@
+"""
+Calibration store.
+
+Keeps the calibration of every robot in one versioned JSON file, keyed by the robot and by the kind
+and port of the calibrated hardware:
+
+    {"version": 1, "robots": {"<robot>": {"imu": {...}, "light/3": {...}, "drive": {...}}}}
+
+The robot defaults to the host name, every wombat has its own, and can be overridden with the
+--robot=NAME argument. The file is replaced atomically on save, so a crash while saving leaves the
+previous calibration intact.
+
+Stored calibrations are restored at startup and checked against a few samples instead of calibrating
+again, see calibrate_imu and libstp_helpers.sensors.lazy_calibrate_light_sensors.
+"""
+import json
+import os
+import socket
+import tempfile
+import time
+from typing import Any, Dict, Optional
+
+from libstp_helpers import get_arguments
+from libstp_helpers.api import ClassNameLogger
+from libstp_helpers.utility import to_task
+
+STORE_VERSION = 1
+
+DEFAULT_STORE_PATH = os.path.join(os.path.expanduser("~"), ".libstp", "calibration.json")
+
+# Written by lazy_calibrate_light_sensors before the store existed, imported once
+_LEGACY_PROPERTIES = os.path.join(os.path.dirname(__file__), "utility", "properties", "calibration.properties")
+_LEGACY_LIGHT_FIELDS = {
+    "white": "white_threshold",
+    "white-mean": "white_mean",
+    "white-std": "white_std_dev",
+    "black": "black_threshold",
+    "black-mean": "black_mean",
+    "black-std": "black_std_dev",
+}
+
+
+def robot_id() -> str:
+    """
+    Returns:
+        str: The name the calibration of this robot is stored under, --robot=NAME or the host name.
+    """
+    return str(get_arguments().get("robot") or socket.gethostname())
+
+
+class CalibrationStore(ClassNameLogger):
+    """
+    The calibrations of one robot, read from and saved to the shared store file.
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH, robot: Optional[str] = None):
+        """
+        Args:
+            path: The store file, created on the first save.
+            robot: The robot whose calibration is accessed, defaults to robot_id().
+        """
+        self.path = path
+        self.robot = robot or robot_id()
+        self._robots: Dict[str, Dict[str, Dict[str, Any]]] = self._load()
+
+    @staticmethod
+    def key(kind: str, port: Optional[int] = None) -> str:
+        return kind if port is None else f"{kind}/{port}"
+
+    @property
+    def entries(self) -> Dict[str, Dict[str, Any]]:
+        return self._robots.setdefault(self.robot, {})
+
+    def get(self, kind: str, port: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Args:
+            kind: What is calibrated, e.g. "imu" or "light".
+            port: The port of the calibrated hardware, None for hardware without one.
+
+        Returns:
+            Optional[Dict[str, Any]]: The stored values, None if nothing is stored.
+        """
+        return self.entries.get(self.key(kind, port))
+
+    def put(self, kind: str, values: Dict[str, Any], port: Optional[int] = None) -> None:
+        """
+        Replace the stored values of the hardware. Only written to the file by save().
+        """
+        self.entries[self.key(kind, port)] = {**values, "updated": time.time()}
+
+    def delete(self, kind: str, port: Optional[int] = None) -> None:
+        self.entries.pop(self.key(kind, port), None)
+
+    def save(self) -> None:
+        """
+        Write the store to its file, replacing it atomically.
+        """
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(prefix=".calibration-", suffix=".json", dir=directory)
+        try:
+            with os.fdopen(descriptor, "w") as file:
+                json.dump({"version": STORE_VERSION, "robots": self._robots}, file, indent=2, sort_keys=True)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temporary, self.path)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+
+    def _load(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        if not os.path.exists(self.path):
+            return self._import_properties()
+
+        try:
+            with open(self.path) as file:
+                data = json.load(file)
+        except (OSError, ValueError) as e:
+            self.warn(f"Ignoring unreadable calibration store {self.path}: {e}")
+            return {}
+
+        if not isinstance(data, dict) or data.get("version") != STORE_VERSION:
+            self.warn(f"Ignoring calibration store {self.path}, it is not version {STORE_VERSION}")
+            return {}
+        return data.get("robots", {})
+
+    def _import_properties(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        if not os.path.exists(_LEGACY_PROPERTIES):
+            return {}
+
+        entries: Dict[str, Dict[str, Any]] = {}
+        with open(_LEGACY_PROPERTIES) as file:
+            for line in file:
+                if line.startswith("#") or "=" not in line:
+                    continue
+                name, value = line.strip().split("=", 1)
+                parts = name.split(".")
+                if len(parts) != 3 or parts[2] not in _LEGACY_LIGHT_FIELDS:
+                    continue
+                entry = entries.setdefault(self.key("light", int(parts[1])), {})
+                entry[_LEGACY_LIGHT_FIELDS[parts[2]]] = float(value)
+
+        self.info(f"Imported the light sensor calibration of {len(entries)} port(s) from {_LEGACY_PROPERTIES}")
+        return {self.robot: entries}
+
+
+def restore_imu(imu, store: CalibrationStore) -> bool:
+    """
+    Apply the stored gyro and accelerometer calibration to the IMU.
+
+    Returns:
+        bool: False if nothing is stored.
+    """
+    values = store.get("imu")
+    if values is None:
+        return False
+
+    imu.gyro.set_bias(tuple(values["gyro_bias"]))
+    imu.gyro.set_variance(tuple(values["gyro_variance"]))
+    imu.accel.set_bias(tuple(values["accel_bias"]))
+    imu.accel.set_variance(tuple(values["accel_variance"]))
+    imu.accel.set_gravity(tuple(values["gravity"]))
+    return True
+
+
+def store_imu(imu, store: CalibrationStore) -> None:
+    store.put("imu", {
+        "gyro_bias": list(imu.gyro.get_bias()),
+        "gyro_variance": list(imu.gyro.get_variance()),
+        "accel_bias": list(imu.accel.get_bias()),
+        "accel_variance": list(imu.accel.get_variance()),
+        "gravity": list(imu.accel.get_gravity()),
+    })
+
+
+async def calibrate_imu(imu, store: Optional[CalibrationStore] = None, sample_count: int = 100,
+                        validate_samples: int = 10, force: bool = False) -> None:
+    """
+    Calibrate the IMU, or reuse the stored calibration if a few samples show that it still holds.
+    The robot has to stand still either way.
+
+    Args:
+        imu: The IMU of the device, e.g. device.imu.
+        store: Where the calibration is restored from and saved to, None to always calibrate.
+        sample_count: Samples taken for a full calibration.
+        validate_samples: Samples taken to check the stored calibration.
+        force: Calibrate even if the stored calibration is still valid.
+    """
+    if store is not None and not force and restore_imu(imu, store):
+        if await to_task(imu.validate_calibration(validate_samples)):
+            return
+
+    await to_task(imu.calibrate(sample_count))
+    if store is not None:
+        store_imu(imu, store)
+        store.save()
+
+
+def restore_light_sensor(sensor, store: CalibrationStore) -> bool:
+    """
+    Apply the stored white and black statistics to the light sensor.
+
+    Returns:
+        bool: False if nothing is stored for the port of the sensor.
+    """
+    values = store.get("light", sensor.get_port())
+    if values is None or any(field not in values for field in _LEGACY_LIGHT_FIELDS.values()):
+        return False
+
+    sensor.white_threshold = int(values["white_threshold"])
+    sensor.white_mean = float(values["white_mean"])
+    sensor.white_std_dev = float(values["white_std_dev"])
+    sensor.black_threshold = int(values["black_threshold"])
+    sensor.black_mean = float(values["black_mean"])
+    sensor.black_std_dev = float(values["black_std_dev"])
+    return True
+
+
+def store_light_sensor(sensor, store: CalibrationStore) -> None:
+    store.put("light", {
+        "white_threshold": sensor.white_threshold,
+        "white_mean": sensor.white_mean,
+        "white_std_dev": sensor.white_std_dev,
+        "black_threshold": sensor.black_threshold,
+        "black_mean": sensor.black_mean,
+        "black_std_dev": sensor.black_std_dev,
+    }, sensor.get_port())
+
+
+def validate_light_sensor(sensor, sample_count: int = 5, deviations: float = 6.0) -> bool:
+    """
+    Check that the sensor reads inside its restored range, from the white mean to the black mean widened by
+    the given number of standard deviations. A reading outside of it means that the sensor, its mounting or
+    the lighting changed.
+
+    Returns:
+        bool: True if all samples are inside the range.
+    """
+    low = sensor.white_mean - deviations * sensor.white_std_dev
+    high = sensor.black_mean + deviations * sensor.black_std_dev
+    return all(low <= sensor.get_value() <= high for _ in range(sample_count))
+
+
+def restore_ticks_per_revolution(device, store: CalibrationStore) -> bool:
+    """
+    Apply the stored encoder ticks per wheel revolution to the device.
+
+    Returns:
+        bool: False if nothing is stored or the device has no ticks_per_revolution.
+    """
+    values = store.get("drive")
+    if values is None or not hasattr(device, "ticks_per_revolution"):
+        return False
+
+    device.ticks_per_revolution = float(values["ticks_per_revolution"])
+    return True
+
+
+def store_ticks_per_revolution(device, store: CalibrationStore) -> None:
+    store.put("drive", {"ticks_per_revolution": device.ticks_per_revolution})
+
+
+DEFAULT_TICKS_DISTANCE = 1.0  # m
+
+
+def calibrate_ticks_per_revolution(device, store: Optional[CalibrationStore],
+                                   covered_distance: float = DEFAULT_TICKS_DISTANCE, max_retries: int = 5) -> bool:
+    """
+    Measure the encoder ticks per wheel revolution and save them. The robot is pushed straight forward by hand
+    over the covered distance, a button click ends every attempt.
+
+    Args:
+        device: A TwoWheeledNativeDevice or OmniWheeledNativeDevice.
+        store: Where the result is saved to, None to only apply it to the device.
+        covered_distance: How far the robot is pushed in m.
+        max_retries: Attempts before giving up.
+
+    Returns:
+        bool: False if no attempt succeeded, the device and the store are left unchanged then.
+    """
+    from libstp.device import omni_wheeled, two_wheeled
+
+    if isinstance(device, two_wheeled.TwoWheeledNativeDevice):
+        calibrated = two_wheeled.calibrate_ticks_per_revolution(device, covered_distance, max_retries)
+    elif isinstance(device, omni_wheeled.OmniWheeledNativeDevice):
+        calibrated = omni_wheeled.calibrate_ticks_per_revolution(device, covered_distance, max_retries)
+    else:
+        raise TypeError(f"Cannot calibrate the ticks per revolution of a {type(device).__name__}")
+
+    if calibrated and store is not None:
+        store_ticks_per_revolution(device, store)
+        store.save()
+    return calibrated
+
+
+_DRIVE_CONTROLLERS = ("vx", "vy", "w", "heading")
+_PID_FIELDS = ("kp", "ki", "kd", "ks", "kv", "ka", "integral_limit", "derivative_time_constant")
+
+
+def restore_drive_gains(device, store: CalibrationStore) -> bool:
+    """
+    Apply the stored gains, feed-forward and anti-windup limits of the drive controllers, see
+    libstp_helpers.drive_tuning.
+
+    Returns:
+        bool: False if nothing is stored.
+    """
+    values = store.get("drive_gains")
+    if values is None:
+        return False
+
+    for controller in _DRIVE_CONTROLLERS:
+        if controller not in values:
+            continue
+        parameters = getattr(device, f"{controller}_pid_parameters")
+        for field in _PID_FIELDS:
+            setattr(parameters, field, float(values[controller].get(field, getattr(parameters, field))))
+        setattr(device, f"{controller}_pid_parameters", parameters)
+    return True
+
+
+def store_drive_gains(device, store: CalibrationStore) -> None:
+    store.put("drive_gains", {
+        controller: {field: getattr(getattr(device, f"{controller}_pid_parameters"), field) for field in _PID_FIELDS}
+        for controller in _DRIVE_CONTROLLERS
+    })
@@ -1,69 +1,99 @@
+import math
 from collections import deque
-from typing import Optional
+from typing import Optional, Tuple
 
 import numpy as np
 from libstp.datatypes import while_false
-from scipy.signal import butter, filtfilt
+from libstp.filter import SosFilter, butterworth
+
+# For each dominant gravity axis, the two horizontal axes used for the magnitude and the correction angle
+_HORIZONTAL_AXES = {0: (1, 2), 1: (0, 2), 2: (0, 1)}
+
+# A causal filter delays the impact by its group delay, unlike filtfilt, so it needs a lower order and a higher
+# cutoff to report impacts as early and as reliably at the same threshold (see benchmarks/collision_detection.py)
+_STREAMING_ORDER, _STREAMING_CUTOFF = 2, 20.0
+_FILTFILT_ORDER, _FILTFILT_CUTOFF = 4, 5.0
 
 
 class CollisionDetector:
+    """
+    Detects collisions from spikes in the horizontal, gravity compensated acceleration.
+
+    By default every axis runs through a causal 2nd order Butterworth low-pass filter at 20 Hz, so each sample
+    costs O(1) and only the current sample is filtered. With streaming=False the detector falls back to the
+    zero-phase 4th order filtfilt at 5 Hz over the last buffer_size samples, which requires scipy.
+    """
+
     def __init__(self,
                  device,
                  sample_rate=100.0,
-                 cutoff_freq=5.0,
+                 cutoff_freq: Optional[float] = None,
                  threshold=2.5,
                  min_consecutive_samples=3,
                  buffer_size=100,
-                 gravity_vector=(0, 9.81, 0)):
-        self.imu = device.imu
+                 gravity_vector=(0, 9.81, 0),
+                 streaming=True):
+        self.imu = device.imu if device is not None else None
         self.sample_rate = sample_rate
+        if cutoff_freq is None:
+            cutoff_freq = _STREAMING_CUTOFF if streaming else _FILTFILT_CUTOFF
         self.cutoff_freq = cutoff_freq
         self.threshold = threshold
         self.min_consecutive_samples = min_consecutive_samples
         self.gravity_vector = np.array(gravity_vector)
+        self.streaming = streaming
+
+        dominant_axis = int(np.argmax(np.abs(self.gravity_vector)))
+        self._horizontal_axes = _HORIZONTAL_AXES[dominant_axis]
+        self._gravity = tuple(float(g) for g in gravity_vector)
+
+        if streaming:
+            sos = butterworth(_STREAMING_ORDER, cutoff_freq, sample_rate)
+            self.filters = [SosFilter(sos) for _ in range(3)]
+        else:
+            from scipy.signal import butter
 
-        nyq = 0.5 * sample_rate
-        normal_cutoff = cutoff_freq / nyq
-        self.b, self.a = butter(4, normal_cutoff, btype='low', analog=False)
+            nyq = 0.5 * sample_rate
+            normal_cutoff = cutoff_freq / nyq
+            self.b, self.a = butter(_FILTFILT_ORDER, normal_cutoff, btype='low', analog=False)
 
-        self.buffer_x = deque(maxlen=buffer_size)
-        self.buffer_y = deque(maxlen=buffer_size)
-        self.buffer_z = deque(maxlen=buffer_size)
+            self.buffers = [deque(maxlen=buffer_size) for _ in range(3)]
 
         self.consecutive_count = 0
 
-    def update(self):
+    def update(self) -> Tuple[bool, Optional[float]]:
+        """
+        Reads the accelerometer and processes the sample.
+
+        Returns:
+            Tuple[bool, Optional[float]]: Whether a collision was detected and the correction angle in radians.
+        """
         ax, ay, az = self.imu.accel.get_value()
-        self.buffer_x.append(ax)
-        self.buffer_y.append(ay)
-        self.buffer_z.append(az)
-
-        if len(self.buffer_x) <= 15:
-            return False, None
-        raw_x = np.array(self.buffer_x)
-        raw_y = np.array(self.buffer_y)
-        raw_z = np.array(self.buffer_z)
-
-        dominant_axis = np.argmax(np.abs(self.gravity_vector))
-
-        comp_x = raw_x - self.gravity_vector[0]
-        comp_y = raw_y - self.gravity_vector[1]
-        comp_z = raw_z - self.gravity_vector[2]
-
-        fx = filtfilt(self.b, self.a, comp_x)
-        fy = filtfilt(self.b, self.a, comp_y)
-        fz = filtfilt(self.b, self.a, comp_z)
-
-        # Dynamically determine which two axes to use for horizontal magnitude
-        if dominant_axis == 0:  # Gravity is along X, use Y and Z
-            horizontal_mag = np.sqrt(fy[-1] ** 2 + fz[-1] ** 2)
-            correction_angle = np.arctan2(fy[-1], fz[-1])
-        elif dominant_axis == 1:  # Gravity is along Y, use X and Z
-            horizontal_mag = np.sqrt(fx[-1] ** 2 + fz[-1] ** 2)
-            correction_angle = np.arctan2(fx[-1], fz[-1])
-        else:  # Gravity is along Z, use X and Y
-            horizontal_mag = np.sqrt(fx[-1] ** 2 + fy[-1] ** 2)
-            correction_angle = np.arctan2(fx[-1], fy[-1])
+        return self.process(ax, ay, az)
+
+    def process(self, ax: float, ay: float, az: float) -> Tuple[bool, Optional[float]]:
+        """
+        Processes one accelerometer sample, e.g. from a recorded trace.
+
+        Args:
+            ax: Acceleration along x in m/s^2.
+            ay: Acceleration along y in m/s^2.
+            az: Acceleration along z in m/s^2.
+
+        Returns:
+            Tuple[bool, Optional[float]]: Whether a collision was detected and the correction angle in radians.
+        """
+        compensated = (ax - self._gravity[0], ay - self._gravity[1], az - self._gravity[2])
+        if self.streaming:
+            filtered = [f.filter(value) for f, value in zip(self.filters, compensated)]
+        else:
+            filtered = self._filtfilt(compensated)
+            if filtered is None:
+                return False, None
+
+        first, second = self._horizontal_axes
+        horizontal_mag = math.hypot(filtered[first], filtered[second])
+        correction_angle = math.atan2(filtered[first], filtered[second])
 
         if horizontal_mag > self.threshold:
             self.consecutive_count += 1
@@ -76,6 +106,17 @@ class CollisionDetector:
 
         return False, None
 
+    def _filtfilt(self, compensated):
+        from scipy.signal import filtfilt
+
+        for buffer, value in zip(self.buffers, compensated):
+            buffer.append(value)
+
+        # filtfilt needs more samples than its padding length
+        if len(self.buffers[0]) <= 15:
+            return None
+        return [filtfilt(self.b, self.a, np.array(buffer))[-1] for buffer in self.buffers]
+
 
 def until_collision(device = None, detector: Optional[CollisionDetector] = None):
     if device is None and detector is None:
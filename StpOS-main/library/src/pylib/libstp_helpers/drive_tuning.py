@@ -0,0 +1,244 @@
+"""
+Autotuning of the drive controllers.
+
+The speed of every axis is modelled as a first order lag with friction,
+
+    tau * dv/dt = K * u + s * sign(u) - v
+
+where u is the command the drive sends and v the measured speed. The model is fitted by least squares to
+control loop traces of excitation moves, speed steps driven with the feedback switched off, or to traces
+recorded earlier. From the model:
+
+    feed-forward   kv = 1/K - 1, ks = -s/K, ka = tau/K    the drive already commands the setpoint itself
+    speed PI       kp = tau/(K * lambda), ki = 1/(K * lambda)    internal model control, lambda is the
+                   closed loop time constant
+    heading PI     kp = 1/(lambda_h + lambda), ki = kp / (4 * (lambda_h + lambda))    SIMC for the heading,
+                   which integrates the angular speed
+
+A step of every axis is driven before and after the tuning and its tracking error and settling time
+reported. The gains are saved to the calibration store and restored by Robot.start:
+
+    report = await tune_drive(robot.device, CalibrationStore())
+
+Run it from the command line of a robot with --tune-drive.
+"""
+import math
+import os
+import tempfile
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from libstp import PidParameters
+from libstp.datatypes import Speed, for_seconds
+from libstp.logging import info, warn
+from libstp_helpers import trace
+from libstp_helpers.calibration import CalibrationStore, store_drive_gains
+from libstp_helpers.utility import to_task
+
+AXES = ("vx", "vy", "omega")
+
+# Fractions of the maximum speed, every level is driven from rest
+EXCITATION_LEVELS = (0.25, 0.5, -0.25, -0.5)
+
+# Share of the step that the speed has to stay within to count as settled
+SETTLING_BAND = 0.05
+
+
+class AxisModel(NamedTuple):
+    gain: float  # K, speed per command
+    time_constant: float  # tau in s
+    static: float  # s, speed offset against the direction of motion, e.g. friction
+    samples: int
+
+
+class StepResponse(NamedTuple):
+    rms_error: float  # Between the ramped setpoint and the measured speed, m/s or rad/s
+    settling_time: Optional[float]  # s until the speed stays within the settling band, None if it never does
+
+
+class AxisReport(NamedTuple):
+    axis: str
+    model: AxisModel
+    parameters: PidParameters
+    before: StepResponse
+    after: StepResponse
+
+
+def fit_axis(frames: Iterable[np.ndarray], axis: str) -> AxisModel:
+    """
+    Fit the speed model of an axis to control loop traces.
+
+    Args:
+        frames: Frames of trace.load, one array per drive step. Motion that the drive did not command, e.g.
+            the robot stopping between two steps, must not be inside an array.
+        axis: "vx", "vy" or "omega".
+
+    Raises:
+        ValueError: If the traces do not excite the axis.
+    """
+    index = AXES.index(axis)
+    rows, targets = [], []
+    for step in frames:
+        if len(step) < 3:
+            continue
+        command = step["command"][:, index].astype(np.float64)
+        measured = step["measured"][:, index].astype(np.float64)
+        dt = step["dt"].astype(np.float64)
+        # The command of a frame drives the change of the speed until the next one
+        valid = dt[1:] > 0
+        acceleration = np.diff(measured)[valid] / dt[1:][valid]
+        u = command[:-1][valid]
+        rows.append(np.column_stack([u, np.sign(u), -measured[:-1][valid]]))
+        targets.append(acceleration)
+
+    if not rows:
+        raise ValueError(f"No frames to fit the {axis} axis to")
+    design = np.concatenate(rows)
+    target = np.concatenate(targets)
+    (alpha, beta, gamma), *_ = np.linalg.lstsq(design, target, rcond=None)
+    if gamma <= 0 or alpha <= 0:
+        raise ValueError(f"The traces do not excite the {axis} axis")
+    return AxisModel(float(alpha / gamma), float(1.0 / gamma), float(beta / gamma), len(target))
+
+
+def speed_parameters(model: AxisModel, closed_loop_time_constant: float, integral_limit: float) -> PidParameters:
+    """
+    Args:
+        closed_loop_time_constant: lambda, how fast the feedback removes an error, in s.
+        integral_limit: Largest magnitude of the integral term in m/s or rad/s.
+    """
+    parameters = PidParameters(model.time_constant / (model.gain * closed_loop_time_constant),
+                               1.0 / (model.gain * closed_loop_time_constant), 0.0)
+    parameters.kv = 1.0 / model.gain - 1.0
+    parameters.ks = -model.static / model.gain
+    parameters.ka = model.time_constant / model.gain
+    parameters.integral_limit = integral_limit
+    parameters.derivative_time_constant = closed_loop_time_constant / 2.0
+    return parameters
+
+
+def heading_parameters(angular_time_constant: float, integral_limit: float) -> PidParameters:
+    """
+    Args:
+        angular_time_constant: lambda of the tuned angular speed controller in s.
+        integral_limit: Largest angular speed the integral term adds in rad/s.
+    """
+    # The inner loop acts like a delay of its time constant, the heading should settle twice as slow
+    total = 3.0 * angular_time_constant
+    parameters = PidParameters(1.0 / total, 1.0 / (4.0 * total * total), 0.0)
+    parameters.integral_limit = integral_limit
+    return parameters
+
+
+def step_response(frames: np.ndarray, axis: str) -> StepResponse:
+    """
+    Tracking error and settling time of a step from rest, recorded with trace.recording.
+    """
+    index = AXES.index(axis)
+    setpoint = frames["ramped"][:, index].astype(np.float64)
+    measured = frames["measured"][:, index].astype(np.float64)
+    time = np.cumsum(frames["dt"].astype(np.float64))
+    error = setpoint - measured
+    rms = float(np.sqrt(np.mean(error ** 2))) if len(error) else math.nan
+
+    band = SETTLING_BAND * abs(setpoint[-1]) if len(setpoint) else 0.0
+    outside = np.flatnonzero(np.abs(error) > band)
+    if len(outside) == 0:
+        return StepResponse(rms, 0.0)
+    if outside[-1] == len(error) - 1:
+        return StepResponse(rms, None)
+    return StepResponse(rms, float(time[outside[-1] + 1] - time[0]))
+
+
+async def _record_step(device, speed: Speed, seconds: float, path: str) -> np.ndarray:
+    with trace.recording(path):
+        await to_task(device.set_speed_while(for_seconds(seconds), speed))
+    frames = trace.load(path)
+    return frames[frames["source"] == 1]
+
+
+def _speed(axis: str, value: float) -> Speed:
+    return Speed(*(value if name == axis else 0.0 for name in AXES))
+
+
+def _set_parameters(device, axis: str, parameters: PidParameters) -> None:
+    setattr(device, {"vx": "vx_pid_parameters", "vy": "vy_pid_parameters", "omega": "w_pid_parameters"}[axis],
+            parameters)
+
+
+def _get_parameters(device, axis: str) -> PidParameters:
+    return getattr(device, {"vx": "vx_pid_parameters", "vy": "vy_pid_parameters", "omega": "w_pid_parameters"}[axis])
+
+
+async def tune_drive(device, store: Optional[CalibrationStore] = None, axes: Sequence[str] = ("vx", "omega"),
+                     closed_loop_time_constant: Optional[float] = None, step_seconds: float = 0.8,
+                     step_speed: float = 0.5, frames: Optional[Dict[str, List[np.ndarray]]] = None
+                     ) -> List[AxisReport]:
+    """
+    Fit the drive, set the gains of the speed and heading controllers and report the improvement. The robot
+    drives back and forth and turns on the spot, it needs about half a meter of free space.
+
+    Args:
+        device: The device to tune.
+        store: Where the gains are saved, None to only apply them.
+        axes: The axes to tune, add "vy" for an omni wheeled robot.
+        closed_loop_time_constant: lambda of the speed controllers in s, the fitted motor time constant but
+            at least four control loop periods by default.
+        step_seconds: Duration of every excitation and validation step.
+        step_speed: Fraction of the maximum speed of the validation steps.
+        frames: Traces to fit instead of driving excitation moves, the frames of one step per array by axis.
+
+    Returns:
+        List[AxisReport]: The model, gains and step responses of every axis.
+    """
+    reports = []
+    with tempfile.TemporaryDirectory(prefix="drive-tuning-") as directory:
+        path = os.path.join(directory, "step.trace")
+        for axis in axes:
+            original = _get_parameters(device, axis)
+            before = step_response(await _record_step(device, _speed(axis, step_speed), step_seconds, path), axis)
+
+            if frames is not None and axis in frames:
+                excitation = frames[axis]
+            else:
+                # Without feedback the command is the setpoint, the model sees the bare motors
+                _set_parameters(device, axis, PidParameters())
+                try:
+                    excitation = [await _record_step(device, _speed(axis, level), step_seconds, path)
+                                  for level in EXCITATION_LEVELS]
+                finally:
+                    _set_parameters(device, axis, original)
+
+            try:
+                model = fit_axis(excitation, axis)
+            except ValueError as e:
+                warn(f"Keeping the {axis} gains: {e}")
+                continue
+
+            period = float(np.median(np.concatenate([step["dt"] for step in excitation])))
+            time_constant = closed_loop_time_constant or max(model.time_constant, 4.0 * period)
+            top_speed = max(float(np.max(np.abs(step["measured"][:, AXES.index(axis)]))) for step in excitation)
+            parameters = speed_parameters(model, time_constant, 0.25 * top_speed)
+            _set_parameters(device, axis, parameters)
+            if axis == "omega":
+                device.heading_pid_parameters = heading_parameters(time_constant, 0.1 * top_speed)
+
+            after = step_response(await _record_step(device, _speed(axis, step_speed), step_seconds, path), axis)
+            reports.append(AxisReport(axis, model, parameters, before, after))
+
+    for report in reports:
+        info(f"{report.axis}: K={report.model.gain:.3f} tau={report.model.time_constant * 1000:.0f} ms "
+             f"s={report.model.static:.3f}, kp={report.parameters.kp:.3f} ki={report.parameters.ki:.3f} "
+             f"kv={report.parameters.kv:.3f} ks={report.parameters.ks:.3f} ka={report.parameters.ka:.3f}")
+        info(f"{report.axis}: rms error {report.before.rms_error:.4f} -> {report.after.rms_error:.4f}, "
+             f"settling time {_seconds(report.before.settling_time)} -> {_seconds(report.after.settling_time)}")
+
+    if store is not None and reports:
+        store_drive_gains(device, store)
+        store.save()
+    return reports
+
+
+def _seconds(value: Optional[float]) -> str:
+    return "never" if value is None else f"{value:.2f} s"
@@ -1,9 +1,6 @@
 from math import degrees
 
 import numpy as np
-from ahrs.common.orientation import q2euler
-from ahrs.filters import EKF
-from ahrs.utils import WMM
 
 from libstp_helpers.orientation.fusion import SensorFusion
 
@@ -17,6 +14,10 @@ class EkfFusion(SensorFusion):
                  accel_variance,
                  magneto_variance,
                  delta_t):
+        # ahrs loads its magnetic model on import, only pay for it when the Python EKF is used
+        from ahrs.filters import EKF
+        from ahrs.utils import WMM
+
         super().__init__(samples_gyro,
                          samples_accel,
                          samples_magneto,
@@ -55,6 +56,8 @@ class EkfFusion(SensorFusion):
 
 
     def get_euler(self):
+        from ahrs.common.orientation import q2euler
+
         roll, pitch, yaw = q2euler(self.ekf_instance.q)
         #roll, pitch, yaw = degrees(roll), degrees(pitch), degrees(yaw)
         return roll, pitch, yaw
@@ -1,8 +1,9 @@
 import math
+from typing import Optional, Sequence, Tuple
 
-from libstp_helpers.orientation.fusion.ekf import EkfFusion
-# from orientation.fusion.madgwick import MadgwickFusion
-from libstp_helpers.orientation.imu import IMU
+from libstp.ahrs import AttitudeEstimator, AttitudeEstimatorConfig, AttitudeFilter
+
+from libstp_helpers.api import ClassNameLogger
 
 
 def euler_to_quaternion(roll, pitch, yaw):
@@ -47,12 +48,15 @@ def quaternion_conjugate(q):
     return (w, -x, -y, -z)
 
 
-import threading
-import time
-from collections import deque
+class ImuFusionService(ClassNameLogger):
+    """
+    Fuses the IMU into the attitude and heading of a robot on a native thread.
 
+    The filter, the moving average of the heading and the reference reset all run in
+    libstp.ahrs.AttitudeEstimator, so no Python code and no GIL is involved per sample. With a device,
+    the device's own estimator is used and set_speed_while follows the fused heading while it runs.
+    """
 
-class ImuFusionService:
     def __init__(self,
                  frequency=100,
                  use_madgwick=False,
@@ -61,132 +65,91 @@ class ImuFusionService:
                  calibration_samples=500,
                  g_var_scale=0.5,
                  a_var_scale=1,
-                 m_var_scale=1
+                 m_var_scale=1,
+                 use_magnetometer=False,
+                 hard_iron_offset: Optional[Sequence[float]] = None,
+                 soft_iron_matrix: Optional[Sequence[Sequence[float]]] = None
                  ):
         """
-        frequency: Data read frequency from IMU in Hz
-        use_madgwick: Whether to use MadgwickFusion or EkfFusion
-        device: Some device/robot class that expects set_quaternion(w, x, y, z)
-        moving_average_window: Number of recent yaw samples to average for smoothing
+        Configures the estimator and calibrates it, the robot has to stand still.
+
+        Args:
+            frequency: Data read frequency from IMU in Hz
+            use_madgwick: Whether to use the Madgwick filter or the EKF
+            device: Some device/robot class whose attitude_estimator is used, or None for a standalone one
+            moving_average_window: Number of recent heading samples to average for smoothing
+            calibration_samples: Samples taken for the gyro bias, the noise and the initial attitude
+            g_var_scale: Factor for the gyro variance measured during the calibration
+            a_var_scale: Factor for the accelerometer variance measured during the calibration
+            m_var_scale: Factor for the magnetometer variance measured during the calibration
+            use_magnetometer: Correct the heading with the magnetometer, needs the hard and soft iron calibration
+            hard_iron_offset: Subtracted from the raw magnetometer reading
+            soft_iron_matrix: 3x3 matrix applied to the magnetometer reading after the hard iron offset
         """
         self.frequency = frequency
         self.delta_t = 1.0 / frequency
-        self.stop_event = threading.Event()
         self.device = device
         self.moving_average_window = moving_average_window
-
-        # Moving average buffer for yaw smoothing
-        self.yaw_history = deque(maxlen=self.moving_average_window)
-
-        # IMU initialization and calibration
-        self.imu = IMU()
-        self.samples_gyro, self.samples_acc, self.samples_mag = self.imu.calibrate()
-        self.gyro_var = self.imu.gyro.get_variance() * g_var_scale
-        self.accel_var = self.imu.accel.get_variance() * a_var_scale
-        self.mag_var = self.imu.magneto.get_variance() * m_var_scale
-
-        print(f"Gyro Variance: {self.gyro_var}")
-        print(f"Accel Variance: {self.accel_var}")
-        print(f"Mag Variance: {self.mag_var}")
-
-        if use_madgwick:
-            from orientation.fusion.madgwick import MadgwickFusion
-            self.fusion = MadgwickFusion(
-                samples_gyro=self.samples_gyro,
-                samples_accel=self.samples_acc,
-                samples_magneto=self.samples_mag,
-                gyro_variance=self.gyro_var,
-                accel_variance=self.accel_var,
-                magneto_variance=self.mag_var,
-                delta_t=self.delta_t
-            )
-        else:
-            self.fusion = EkfFusion(
-                samples_gyro=self.samples_gyro,
-                samples_accel=self.samples_acc,
-                samples_magneto=self.samples_mag,
-                gyro_variance=self.gyro_var,
-                accel_variance=self.accel_var,
-                magneto_variance=self.mag_var,
-                delta_t=self.delta_t
-            )
-
-        self.reference_quat = None
-        self.offset_angle = None
-        self.thread = None
+        self.estimator = device.attitude_estimator if device is not None else AttitudeEstimator()
+
+        config = AttitudeEstimatorConfig()
+        config.filter = AttitudeFilter.Madgwick if use_madgwick else AttitudeFilter.Ekf
+        config.frequency = frequency
+        config.calibration_samples = calibration_samples
+        config.heading_window = moving_average_window
+        config.measure_variances = True
+        config.gyro_variance = g_var_scale
+        config.accel_variance = a_var_scale
+        config.mag_variance = m_var_scale
+        config.use_magnetometer = use_magnetometer
+        if hard_iron_offset is not None:
+            config.hard_iron_offset = hard_iron_offset
+        if soft_iron_matrix is not None:
+            config.soft_iron_matrix = soft_iron_matrix
+        self.estimator.set_config(config)
+        self.estimator.calibrate()
 
     def reset_state(self, angle=0.0):
-        roll, pitch, current_yaw = self.fusion.get_euler()
-        self.offset_angle = (current_yaw - (self.offset_angle or current_yaw)) - angle
-        print(f"[reset_state] offset_angle set to: {self.offset_angle:.2f} rad")
-
-    def set_quaternion(self, quaternion, raw_yaw):
         """
-        Send the smoothed quaternion to your device.
+        Make the current attitude the reference and set the heading to angle.
+
+        Args:
+            angle: The new heading in rad
         """
-        # Update moving average buffer
-        self.yaw_history.append(raw_yaw - (self.offset_angle or 0.0))
+        self.estimator.reset_heading(angle)
+        self.info(f"Heading reset to {angle:.2f} rad")
 
-        # Compute moving average of yaw
-        smoothed_yaw = sum(self.yaw_history) / len(self.yaw_history)
+    def get_euler(self) -> Tuple[float, float, float]:
+        """
+        Returns:
+            The absolute roll, pitch and yaw of the latest estimate in rad.
+        """
+        attitude = self.estimator.get_attitude()
+        return attitude.roll, attitude.pitch, attitude.yaw
 
-        if self.device:
-            self.device.set_quaternion(0, 0, 0, smoothed_yaw)
-        else:
-            print(f"[set_quaternion] Smoothed Yaw={smoothed_yaw:.3f} rad")
+    def get_heading(self) -> float:
+        """
+        Returns:
+            The smoothed heading in rad since the start or the last reset_state.
+        """
+        return self.estimator.get_attitude().smoothed_heading
 
     def start_daemon(self):
-        if self.thread and self.thread.is_alive():
-            print("[start_daemon] Thread is already running.")
+        if self.estimator.is_running():
+            self.info("Estimator is already running.")
             return
 
-        self.stop_event.clear()
-        self.thread = threading.Thread(target=self._run_loop, daemon=True)
-        self.thread.start()
-        print("[start_daemon] Daemon thread started.")
+        self.estimator.start()
+        self.info("Estimator started.")
 
     def stop(self):
-        self.stop_event.set()
-        if self.thread:
-            self.thread.join()
-        print("[stop] Daemon thread stopped.")
-
-    def _run_loop(self):
-        start_time, counter, print_interval = time.perf_counter(), 0.0, 0.5
-
-        time.sleep(0.5)
-        while not self.stop_event.is_set():
-            loop_start = time.perf_counter()
-            dt = loop_start - start_time
-            start_time = loop_start
-            counter += dt
-
-            gyro_data, acc_data, mag_data = self.imu.get_reading()
-            self.fusion.update(gyro_data, acc_data, mag_data, dt)
-
-            roll, pitch, yaw = self.fusion.get_euler()
-            raw_quat = euler_to_quaternion(roll, pitch, yaw)
-
-            if self.reference_quat is None:
-                self.reference_quat = raw_quat
-            if self.offset_angle is None:
-                self.offset_angle = yaw
-
-            ref_conjugate = quaternion_conjugate(self.reference_quat)
-            relative_quat = quaternion_multiply(ref_conjugate, raw_quat)
-
-            self.set_quaternion(relative_quat, yaw)
-
-            if counter >= print_interval:
-                smoothed_yaw = sum(self.yaw_history) / len(self.yaw_history) if self.yaw_history else yaw
-                print(f"[ImuFusionService] RPY raw=({roll:.2f}, {pitch:.2f}, {yaw:.2f}), "
-                      f"smoothed_yaw={smoothed_yaw:.2f}")
-                counter -= print_interval
-
-            # time.sleep(max(0.0, self.delta_t - (time.perf_counter() - loop_start)))
+        self.estimator.stop()
+        self.info(f"Estimator stopped, {self.estimator.overruns} overruns.")
 
 
 if __name__ == "__main__":
+    import time
+
     service = ImuFusionService(frequency=100, use_madgwick=False)
     service.start_daemon()
 
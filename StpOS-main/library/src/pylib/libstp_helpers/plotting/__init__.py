@@ -4,8 +4,6 @@ import threading
 import time
 from typing import Callable, Optional
 
-import matplotlib.pyplot as plt
-
 
 class DataPlotter:
     def __init__(self, data_func: Callable[[], float], interval: float = 1.0, duration: Optional[float] = None,
@@ -85,6 +83,8 @@ class DataPlotter:
             print("No data available to plot.")
             return
 
+        import matplotlib.pyplot as plt
+
         times, values = zip(*self.data)
         plt.figure(figsize=(10, 5))
         plt.plot(times, values, marker='o', linestyle='-')
@@ -0,0 +1,287 @@
+import asyncio
+import math
+import time
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+from libstp_helpers import telemetry
+from libstp_helpers.api import ClassNameLogger
+
+RATE_200HZ = 200.0
+RATE_100HZ = 100.0
+RATE_50HZ = 50.0
+RATE_10HZ = 10.0
+
+
+class TickStatistics:
+    """
+    Call and overrun counters of periodic work on the TickScheduler.
+    """
+
+    def __init__(self, name: str, rate: float):
+        self.name = name
+        self.rate = rate
+        self.calls = 0
+        self.overruns = 0
+        self.max_duration = 0.0
+
+    def __repr__(self) -> str:
+        return (f"{type(self).__name__}({self.name!r}, rate={self.rate}, calls={self.calls}, "
+                f"overruns={self.overruns}, max_duration={self.max_duration:.6f})")
+
+
+class TickIterator(TickStatistics):
+    """
+    The counters of one ticks() loop. A tick counts as an overrun if the loop did not wait for it, because its
+    body took too long or the scheduler itself was late. max_duration is the longest time spent in the body.
+    """
+
+
+class TickCallback(TickStatistics):
+    """
+    A periodic callback registered with the TickScheduler.
+    """
+
+    def __init__(self, name: str, callback: Callable[[float], None], rate: float):
+        super().__init__(name, rate)
+        self.callback = callback
+        self.cancelled = False
+        # Ticks are attributed to the step that registered the callback
+        self.step_record = telemetry.current_step()
+
+    def cancel(self) -> None:
+        """
+        Stop calling this callback. It is removed from its rate group at the next tick.
+        """
+        self.cancelled = True
+
+
+class _RateGroup:
+    def __init__(self, rate: float, deadline: float):
+        self.rate = rate
+        self.period = 1.0 / rate
+        self.deadline = deadline
+        self.callbacks: List[TickCallback] = []
+        self.waiters: List[asyncio.Future] = []
+
+    def is_idle(self) -> bool:
+        return not self.callbacks and not self.waiters
+
+
+class TickScheduler(ClassNameLogger):
+    """
+    Runs periodic work of all steps on one shared, fixed-rate clock.
+
+    Every rate group ticks on an absolute grid derived from a common epoch, so groups with
+    related rates (e.g. 100 Hz and 50 Hz) tick together and do not drift. A late tick runs as
+    soon as possible, deadlines that were missed completely are skipped and counted as overruns
+    for every callback and ticks() loop of the group.
+    """
+
+    def __init__(self):
+        self._groups: Dict[float, _RateGroup] = {}
+        self._iterators: List[TickIterator] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wake_up: Optional[asyncio.Event] = None
+        self._woken_early = False
+        # The deadline _run sleeps until, only a new group with an earlier one has to wake it up
+        self._next_deadline = math.inf
+        self._epoch = 0.0
+
+    def register(self, callback: Callable[[float], None], rate: float = RATE_100HZ,
+                 name: Optional[str] = None) -> TickCallback:
+        """
+        Call a function on every tick of a rate group.
+
+        Args:
+            callback: A synchronous function receiving the tick time (event loop time in seconds).
+            rate: The rate group in Hz.
+            name: Name used in the statistics, defaults to the callback name.
+
+        Returns:
+            TickCallback: A handle to cancel the callback and read its overrun counters.
+
+        Raises:
+            TypeError: If the callback is a coroutine function.
+        """
+        if asyncio.iscoroutinefunction(callback):
+            raise TypeError("Tick callbacks must be synchronous, use ticks() for asynchronous work")
+
+        handle = TickCallback(name or getattr(callback, "__qualname__", repr(callback)), callback, rate)
+        self._group(rate).callbacks.append(handle)
+        return handle
+
+    async def tick(self, rate: float = RATE_100HZ) -> float:
+        """
+        Wait for the next tick of a rate group.
+
+        Args:
+            rate: The rate group in Hz.
+
+        Returns:
+            float: The time of the tick (event loop time in seconds).
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._group(rate).waiters.append(future)
+        now = await future
+        telemetry.count_ticks()
+        return now
+
+    async def ticks(self, rate: float = RATE_100HZ, duration: Optional[float] = None,
+                    name: Optional[str] = None) -> AsyncIterator[float]:
+        """
+        Iterate over the ticks of a rate group.
+
+        Args:
+            rate: The rate group in Hz.
+            duration: Stop after this many seconds, or never if None.
+            name: Name used in the statistics, defaults to "ticks".
+
+        Yields:
+            float: The time of each tick (event loop time in seconds).
+        """
+        end_time = None if duration is None else asyncio.get_running_loop().time() + duration
+        iterator = TickIterator(name or "ticks", rate)
+        self._iterators.append(iterator)
+        previous = None
+        try:
+            while True:
+                now = await self.tick(rate)
+                slot = self._slot(rate, now)
+                if previous is not None:
+                    # Every tick between the previous one and this one went by without the loop waiting for it
+                    iterator.overruns += max(0, slot - previous - 1)
+                previous = slot
+                if end_time is not None and now >= end_time:
+                    return
+
+                iterator.calls += 1
+                start = time.perf_counter()
+                yield now
+                iterator.max_duration = max(iterator.max_duration, time.perf_counter() - start)
+        finally:
+            self._iterators.remove(iterator)
+
+    def statistics(self) -> List[TickStatistics]:
+        """
+        Returns:
+            List[TickStatistics]: All active callbacks and ticks() loops including their call and overrun counters.
+        """
+        callbacks = [callback for group in self._groups.values() for callback in group.callbacks]
+        return callbacks + self._iterators
+
+    def _slot(self, rate: float, now: float) -> int:
+        # A tick runs at or after its deadline and before the next one, so its index on the grid is exact
+        return math.floor((now - self._epoch) * rate + 1e-9)
+
+    def _group(self, rate: float) -> _RateGroup:
+        if rate <= 0:
+            raise ValueError(f"Rate must be greater than zero, got {rate}")
+
+        self._ensure_running()
+        group = self._groups.get(rate)
+        if group is None:
+            # Align the new group to the shared grid so related rates tick at the same instant
+            period = 1.0 / rate
+            now = self._loop.time()
+            deadline = self._epoch + math.ceil((now - self._epoch) / period) * period
+            group = self._groups[rate] = _RateGroup(rate, deadline)
+            if deadline < self._next_deadline:
+                self._woken_early = True
+                self._wake_up.set()
+        return group
+
+    def _ensure_running(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._task is not None and not self._task.done():
+            return
+
+        # First use or a new event loop (e.g. a second asyncio.run), start from scratch
+        self._groups.clear()
+        self._loop = loop
+        self._epoch = loop.time()
+        self._wake_up = asyncio.Event()
+        self._next_deadline = math.inf
+        self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            for rate in [rate for rate, group in self._groups.items() if group.is_idle()]:
+                del self._groups[rate]
+
+            if not self._groups:
+                await self._sleep_until(math.inf)
+                continue
+
+            deadline = min(group.deadline for group in self._groups.values())
+            if deadline > self._loop.time() and await self._sleep_until(deadline):
+                continue
+
+            # Timers may fire up to the clock resolution early
+            now = max(self._loop.time(), deadline)
+            for group in list(self._groups.values()):
+                if group.deadline <= now:
+                    self._tick(group, now)
+
+            # Always hand control back to the event loop, even when the next deadline is already due
+            await asyncio.sleep(0)
+
+    async def _sleep_until(self, deadline: float) -> bool:
+        """
+        Returns:
+            bool: True if a group with an earlier deadline woke the scheduler up before the deadline.
+        """
+        self._next_deadline = deadline
+        self._woken_early = False
+        self._wake_up.clear()
+        timer = None if deadline == math.inf else self._loop.call_at(deadline, self._wake_up.set)
+        try:
+            await self._wake_up.wait()
+        finally:
+            if timer is not None:
+                timer.cancel()
+            self._next_deadline = math.inf
+        return self._woken_early
+
+    def _tick(self, group: _RateGroup, now: float) -> None:
+        missed = int((now - group.deadline) / group.period)
+        group.deadline += (missed + 1) * group.period
+
+        waiters, group.waiters = group.waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(now)
+
+        for callback in list(group.callbacks):
+            if callback.cancelled:
+                group.callbacks.remove(callback)
+                continue
+
+            start = time.perf_counter()
+            try:
+                callback.callback(now)
+            except Exception as e:
+                self.error(f"Tick callback {callback.name} raised {e!r}, removing it")
+                callback.cancel()
+                group.callbacks.remove(callback)
+                continue
+            duration = time.perf_counter() - start
+
+            callback.calls += 1
+            if callback.step_record is not None:
+                callback.step_record.ticks += 1
+            callback.max_duration = max(callback.max_duration, duration)
+            callback.overruns += missed
+            if duration > group.period:
+                callback.overruns += 1
+
+
+_scheduler = TickScheduler()
+
+
+def get_tick_scheduler() -> TickScheduler:
+    """
+    Returns:
+        TickScheduler: The scheduler shared by all steps.
+    """
+    return _scheduler
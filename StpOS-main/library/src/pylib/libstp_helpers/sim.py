@@ -0,0 +1,198 @@
+"""
+Runs missions against the simulated robot of libstp.sim instead of the wombat.
+
+The event loop of a simulation runs on the virtual clock of libstp: whenever it would sleep,
+the world is advanced by exactly that time instead. A mission of several minutes finishes
+within milliseconds and every run with the same world is reproducible.
+
+    from libstp.sim import TableMap
+    from libstp_helpers import sim
+
+    table = TableMap(2.4, 1.2)
+    table.draw_line(0.0, 0.6, 2.4, 0.6)
+    world = sim.world_for(robot.device, table)
+    world.add_light_sensor(0, 0.08, 0.0)
+
+    robot.simulate(world).start()
+"""
+import asyncio
+import selectors
+from typing import Callable, Optional
+
+import libstp.sim
+from libstp.device.omni_wheeled import OmniWheeledNativeDevice
+from libstp.device.two_wheeled import TwoWheeledNativeDevice
+from libstp.sim import DifferentialKinematics, ImuModel, MecanumKinematics, Simulation, TableMap, World
+
+
+class _VirtualTimeSelector(selectors.BaseSelector):
+    """
+    Selector which advances the simulation instead of sleeping.
+
+    Real file descriptors (e.g. the self pipe of call_soon_threadsafe) are still polled,
+    so futures resolved from other threads keep working.
+    """
+
+    def __init__(self, simulation: Simulation):
+        self._simulation = simulation
+        self._selector = selectors.DefaultSelector()
+
+    def register(self, fileobj, events, data=None):
+        return self._selector.register(fileobj, events, data)
+
+    def unregister(self, fileobj):
+        return self._selector.unregister(fileobj)
+
+    def modify(self, fileobj, events, data=None):
+        return self._selector.modify(fileobj, events, data)
+
+    def select(self, timeout=None):
+        ready = self._selector.select(0)
+        if ready:
+            return ready
+        if timeout is None:
+            # Nothing is scheduled, only another thread can wake the loop up
+            return self._selector.select(None)
+        self._simulation.advance(timeout)
+        return []
+
+    def close(self):
+        self._selector.close()
+
+    def get_map(self):
+        return self._selector.get_map()
+
+
+class SimulationEventLoop(asyncio.SelectorEventLoop):
+    """
+    Event loop on the virtual clock of a running simulation, asyncio.sleep and call_later wait simulated time.
+    """
+
+    def __init__(self, simulation: Simulation):
+        super().__init__(_VirtualTimeSelector(simulation))
+        self.simulation = simulation
+
+    def time(self) -> float:
+        return libstp.sim.now()
+
+
+def is_active() -> bool:
+    """
+    Returns:
+        bool: Whether a simulation is running in this process.
+    """
+    return libstp.sim.active() is not None
+
+
+def drive(algorithm, frequency: int = 100, on_ticks: Optional[Callable[[int], None]] = None) -> asyncio.Future:
+    """
+    Steps an algorithm on the event loop of the simulation, the counterpart of libstp.asynchronous.drive.
+
+    The native driver thread runs on real time and would let the world stand still between two ticks,
+    so the algorithm is advanced by the loop in lock step with the simulated clock instead.
+
+    Args:
+        algorithm: The algorithm returned by a libstp function, e.g. device.set_speed_while(...).
+        frequency: How often the algorithm is advanced per simulated second.
+        on_ticks: Called with the number of ticks once the algorithm finished or was cancelled.
+
+    Returns:
+        asyncio.Future: Resolves with the last value of the algorithm.
+    """
+    loop = asyncio.get_event_loop()
+    future = loop.create_future()
+    period = 1.0 / frequency
+    ticks = 0
+
+    def finish():
+        if on_ticks is not None:
+            on_ticks(ticks)
+
+    def tick(deadline: float):
+        nonlocal ticks
+        if future.done():
+            finish()
+            return
+
+        ticks += 1
+        try:
+            running = algorithm.advance()
+        except Exception as e:
+            future.set_exception(e)
+            finish()
+            return
+
+        if running:
+            loop.call_at(deadline + period, tick, deadline + period)
+            return
+
+        future.set_result(algorithm.current())
+        finish()
+
+    loop.call_soon(tick, loop.time())
+    return future
+
+
+def world_for(device, table: Optional[TableMap] = None, seed: int = 0) -> World:
+    """
+    Creates a world with the drive geometry and motors of a device.
+
+    Args:
+        device: A TwoWheeledNativeDevice or OmniWheeledNativeDevice.
+        table: Light sensor readings of the table, an endless white table by default.
+        seed: Seed of the sensor noise.
+
+    Returns:
+        World: The world, light sensors still have to be mounted with add_light_sensor.
+    """
+    if isinstance(device, TwoWheeledNativeDevice):
+        kinematics = DifferentialKinematics(device.left_motor, device.right_motor,
+                                            device.wheel_radius, device.wheel_base,
+                                            device.ticks_per_revolution)
+    elif isinstance(device, OmniWheeledNativeDevice):
+        kinematics = MecanumKinematics(device.front_left_motor, device.front_right_motor,
+                                       device.rear_left_motor, device.rear_right_motor,
+                                       device.wheel_radius, device.wheel_distance_from_center,
+                                       device.ticks_per_revolution)
+    else:
+        raise TypeError(f"Cannot simulate a device of type {type(device).__name__}")
+
+    world = World(kinematics, table if table is not None else TableMap(), seed)
+    imu = ImuModel()
+    imu.yaw_axis = device.orientation
+    world.set_imu_model(imu)
+    return world
+
+
+def run(simulation: Simulation, main):
+    """
+    Runs a coroutine to completion on the simulated clock, like asyncio.run.
+
+    Args:
+        simulation: The simulation to run. If it is not running yet, it is started and stopped around the coroutine.
+        main: The coroutine, e.g. the missions of a robot.
+
+    Returns:
+        The result of the coroutine.
+    """
+    started = not simulation.running
+    if started:
+        simulation.start()
+
+    loop = SimulationEventLoop(simulation)
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(main)
+    finally:
+        try:
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+            if started:
+                simulation.stop()
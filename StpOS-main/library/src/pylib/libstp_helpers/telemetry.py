@@ -0,0 +1,334 @@
+"""
+Step timing telemetry.
+
+While a run is active (see MissionController), every Step.run_step records its start and end
+time, its outcome and the number of control loop ticks it consumed. Finished runs are appended
+to a binary run log, which can be aggregated across runs with:
+
+    python -m libstp_helpers.telemetry [--log PATH] [--last N] [--sort p95]
+"""
+import argparse
+import asyncio
+import functools
+import math
+import os
+import statistics
+import struct
+import time
+import uuid
+from contextvars import ContextVar, Token
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+STATUS_OK = 0
+STATUS_CANCELLED = 1
+STATUS_ERROR = 2
+
+DEFAULT_LOG_PATH = os.path.join(os.path.expanduser("~"), ".libstp", "step_timings.bin")
+
+_MAGIC = b"STPT"
+_VERSION = 1
+_HEADER = struct.Struct("<4sH")
+# run id, run start (unix time), step start (seconds since run start), duration, ticks, status, path length
+_RECORD = struct.Struct("<16sdddQBH")
+
+
+class StepTiming(NamedTuple):
+    run_id: str
+    run_started: float
+    path: str
+    start: float
+    duration: float
+    ticks: int
+    status: int
+
+
+class StepRecord:
+    """
+    Timing of one running step. The path identifies the step across runs, e.g.
+    "Missions/0:DriveToTray/2:Drive" for the third step of the first mission.
+    """
+    __slots__ = ("step", "path", "start", "end", "ticks", "status", "children")
+
+    def __init__(self, step: Any, path: str, start: float):
+        self.step = step
+        self.path = path
+        self.start = start
+        self.end = start
+        self.ticks = 0
+        self.status = STATUS_OK
+        self.children = 0
+
+    def add_ticks(self, ticks: int) -> None:
+        self.ticks += ticks
+
+
+class RunLog:
+    """
+    Append-only binary log of step timings. Every run is appended in a single write.
+    """
+
+    def __init__(self, path: str = DEFAULT_LOG_PATH):
+        self.path = path
+
+    def append(self, run_id: bytes, run_started: float, records: List[StepRecord]) -> None:
+        chunks = []
+        for record in records:
+            path = record.path.encode("utf-8")[:0xFFFF]
+            chunks.append(_RECORD.pack(run_id, run_started, record.start, record.end - record.start,
+                                       record.ticks, record.status, len(path)))
+            chunks.append(path)
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "ab") as file:
+            if file.tell() == 0:
+                file.write(_HEADER.pack(_MAGIC, _VERSION))
+            file.write(b"".join(chunks))
+
+    def read(self) -> Iterator[StepTiming]:
+        """
+        Yields:
+            StepTiming: All records in the log in the order they were written.
+
+        Raises:
+            ValueError: If the file is not a step timing log.
+        """
+        with open(self.path, "rb") as file:
+            data = file.read()
+
+        if len(data) < _HEADER.size:
+            return
+        magic, version = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"{self.path} is not a step timing log (version {_VERSION})")
+
+        offset = _HEADER.size
+        while offset + _RECORD.size <= len(data):
+            run_id, run_started, start, duration, ticks, status, length = _RECORD.unpack_from(data, offset)
+            offset += _RECORD.size
+            if offset + length > len(data):
+                break  # Truncated by a crash while writing
+            path = data[offset:offset + length].decode("utf-8")
+            offset += length
+            yield StepTiming(uuid.UUID(bytes=run_id).hex, run_started, path, start, duration, ticks, status)
+
+
+class _Run:
+    def __init__(self, log: RunLog):
+        self.log = log
+        self.id = uuid.uuid4().bytes
+        self.wall_start = time.time()
+        self.start = time.perf_counter()
+        self.records: List[StepRecord] = []
+
+    def begin(self, step: Any, parent: Optional[StepRecord]) -> StepRecord:
+        name = getattr(step, "telemetry_name", None) or type(step).__name__
+        if parent is None:
+            path = name
+        else:
+            path = f"{parent.path}/{parent.children}:{name}"
+            parent.children += 1
+        return StepRecord(step, path, time.perf_counter() - self.start)
+
+    def end(self, record: StepRecord) -> None:
+        record.end = time.perf_counter() - self.start
+        self.records.append(record)
+
+
+_run: Optional[_Run] = None
+_current: ContextVar[Optional[StepRecord]] = ContextVar("libstp_step_record", default=None)
+
+
+def start_run(log: Optional[RunLog] = None) -> None:
+    """
+    Start recording step timings. Steps run outside of a run are not recorded.
+
+    Args:
+        log: The log the run is appended to, defaults to DEFAULT_LOG_PATH.
+    """
+    global _run
+    _run = _Run(log or RunLog())
+
+
+def finish_run() -> Optional[str]:
+    """
+    Stop recording and append the recorded steps to the run log.
+
+    Returns:
+        Optional[str]: The id of the finished run, None if no run was active.
+    """
+    global _run
+    run, _run = _run, None
+    if run is None:
+        return None
+    run.log.append(run.id, run.wall_start, run.records)
+    return uuid.UUID(bytes=run.id).hex
+
+
+def current_step() -> Optional[StepRecord]:
+    """
+    Returns:
+        Optional[StepRecord]: The record of the innermost step running in the current task.
+    """
+    return _current.get()
+
+
+def count_ticks(ticks: int = 1) -> None:
+    """
+    Attribute control loop ticks to the innermost step running in the current task.
+    """
+    record = _current.get()
+    if record is not None:
+        record.ticks += ticks
+
+
+class StepScope(NamedTuple):
+    run: "_Run"
+    record: StepRecord
+    token: Token
+
+
+def enter_step(step: Any) -> Optional[StepScope]:
+    """
+    Start recording a step and make it the parent of the steps started in the current task.
+    For executors which run steps without calling their run_step, e.g. compiled plans.
+
+    Returns:
+        Optional[StepScope]: The scope to pass to exit_step, None if nothing is recorded.
+    """
+    parent = _current.get()
+    run = _run
+    # A subclass calling super().run_step() is still the same step
+    if run is None or (parent is not None and parent.step is step):
+        return None
+
+    record = run.begin(step, parent)
+    return StepScope(run, record, _current.set(record))
+
+
+def exit_step(scope: Optional[StepScope], status: int = STATUS_OK) -> None:
+    """
+    Finish a step started with enter_step.
+    """
+    if scope is None:
+        return
+    scope.record.status = status
+    _current.reset(scope.token)
+    scope.run.end(scope.record)
+
+
+def timed(run_step):
+    """
+    Wraps a run_step implementation so it is recorded while a run is active.
+    Step applies this to every subclass, steps do not have to use it themselves.
+    """
+
+    @functools.wraps(run_step)
+    async def wrapper(self, device, definitions):
+        scope = enter_step(self)
+        if scope is None:
+            return await run_step(self, device, definitions)
+
+        status = STATUS_OK
+        try:
+            return await run_step(self, device, definitions)
+        except asyncio.CancelledError:
+            status = STATUS_CANCELLED
+            raise
+        except BaseException:
+            status = STATUS_ERROR
+            raise
+        finally:
+            exit_step(scope, status)
+
+    wrapper.__timed__ = True
+    return wrapper
+
+
+def _percentile(values: List[float], q: float) -> float:
+    # Linear interpolation between the closest ranks, values must be sorted
+    position = (len(values) - 1) * q
+    lower = math.floor(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def aggregate(timings: List[StepTiming], last: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Aggregate step timings per step path over runs.
+
+    Args:
+        timings: Records read from a RunLog.
+        last: Only use the last N runs.
+
+    Returns:
+        List[Dict[str, Any]]: One row per step path in the order the steps first ran, with the number of runs,
+            p50, p95, max, mean, variance of the duration, mean ticks, error count and the share of the run time.
+    """
+    runs: Dict[str, List[StepTiming]] = {}
+    for timing in timings:
+        runs.setdefault(timing.run_id, []).append(timing)
+    selected = list(runs.values())[-last:] if last else list(runs.values())
+
+    run_durations = [max(t.start + t.duration for t in run) for run in selected if run]
+    mean_run = statistics.mean(run_durations) if run_durations else 0.0
+
+    per_path: Dict[str, List[StepTiming]] = {}
+    for run in selected:
+        for timing in sorted(run, key=lambda t: t.start):
+            per_path.setdefault(timing.path, []).append(timing)
+
+    rows = []
+    for path, entries in per_path.items():
+        durations = sorted(t.duration for t in entries)
+        mean = statistics.mean(durations)
+        rows.append({
+            "path": path,
+            "runs": len(entries),
+            "p50": _percentile(durations, 0.5),
+            "p95": _percentile(durations, 0.95),
+            "max": durations[-1],
+            "mean": mean,
+            "variance": statistics.variance(durations) if len(durations) > 1 else 0.0,
+            "ticks": statistics.mean(t.ticks for t in entries),
+            "failures": sum(1 for t in entries if t.status != STATUS_OK),
+            "share": mean / mean_run if mean_run > 0 else 0.0,
+        })
+    return rows
+
+
+def _format_table(rows: List[Dict[str, Any]]) -> str:
+    width = max([len("step")] + [len(row["path"]) for row in rows])
+    lines = [f"{'step':<{width}} {'runs':>5} {'p50 [s]':>9} {'p95 [s]':>9} {'max [s]':>9} "
+             f"{'var [s2]':>10} {'ticks':>8} {'fail':>5} {'run %':>6}"]
+    for row in rows:
+        lines.append(f"{row['path']:<{width}} {row['runs']:>5} {row['p50']:>9.3f} {row['p95']:>9.3f} "
+                     f"{row['max']:>9.3f} {row['variance']:>10.5f} {row['ticks']:>8.1f} {row['failures']:>5} "
+                     f"{row['share'] * 100:>6.1f}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Aggregate step timings over mission runs.")
+    parser.add_argument("--log", default=DEFAULT_LOG_PATH, help="The run log to read.")
+    parser.add_argument("--last", type=int, default=None, help="Only use the last N runs.")
+    parser.add_argument("--sort", choices=["path", "p50", "p95", "max", "variance", "share"], default="path",
+                        help="Sort the steps by this column, the default keeps the execution order.")
+    parser.add_argument("--depth", type=int, default=None, help="Only show steps up to this nesting depth.")
+    args = parser.parse_args(argv)
+
+    timings = list(RunLog(args.log).read())
+    rows = aggregate(timings, args.last)
+    if args.depth is not None:
+        rows = [row for row in rows if row["path"].count("/") < args.depth]
+    if args.sort != "path":
+        rows.sort(key=lambda row: row[args.sort], reverse=True)
+
+    run_count = len({t.run_id for t in timings})
+    print(f"{min(run_count, args.last or run_count)} of {run_count} runs from {args.log}")
+    print(_format_table(rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Decoder for the binary control loop traces written by libstp.trace.
+
+    import libstp.trace
+    from libstp_helpers import trace
+
+    libstp.trace.start("run.trace")
+    ...  # drive around
+    libstp.trace.stop()
+
+    frames = trace.load("run.trace")      # numpy structured array
+    df = trace.to_dataframe(frames)        # one column per value, e.g. "command_vx" or "pid_heading_p"
+"""
+from contextlib import contextmanager
+from typing import Iterator, NamedTuple
+
+import numpy as np
+
+SOURCES = {0: "custom", 1: "set_speed_while"}
+
+_AXES = ("vx", "vy", "omega")
+_CONTROLLERS = ("vx", "vy", "omega", "heading")
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("version", "<u2"),
+    ("frame_size", "<u2"),
+    ("reserved", "<u4"),
+    ("start_unix_ns", "<i8"),
+])
+
+# Mirrors libstp::trace::ControlFrame, both have to be changed together
+FRAME_DTYPE = np.dtype([
+    ("timestamp", "<u8"),
+    ("sequence", "<u4"),
+    ("thread", "<u2"),
+    ("source", "<u2"),
+    ("dt", "<f4"),
+    ("desired", "<f4", (3,)),
+    ("absolute", "<f4", (3,)),
+    ("ramped", "<f4", (3,)),
+    ("measured", "<f4", (3,)),
+    ("heading", "<f4"),
+    ("desired_heading", "<f4"),
+    ("error", "<f4", (4,)),
+    ("pid", "<f4", (4, 3)),
+    ("command", "<f4", (3,)),
+    ("wheel_command", "<f4", (4,)),
+    ("wheel_ticks", "<f4", (4,)),
+])
+
+assert HEADER_DTYPE.itemsize == 24 and FRAME_DTYPE.itemsize == 184
+
+
+class TraceHeader(NamedTuple):
+    version: int
+    frame_size: int
+    start_unix_ns: int
+
+
+def read_header(path: str) -> TraceHeader:
+    """
+    Raises:
+        ValueError: If the file is not a trace of a supported version.
+    """
+    header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+    if len(header) == 0 or header["magic"][0] != b"STPTRACE":
+        raise ValueError(f"{path} is not a libstp trace")
+    version, frame_size = int(header["version"][0]), int(header["frame_size"][0])
+    if version != 1 or frame_size != FRAME_DTYPE.itemsize:
+        raise ValueError(f"Unsupported trace version {version} with a frame size of {frame_size} bytes")
+    return TraceHeader(version, frame_size, int(header["start_unix_ns"][0]))
+
+
+def load(path: str, mmap: bool = False) -> np.ndarray:
+    """
+    Load all frames of a trace, ordered by time.
+
+    Args:
+        path: The trace file.
+        mmap: Memory map the file instead of reading it. The frames are then in the order they were flushed,
+            which is only grouped by thread.
+
+    Returns:
+        numpy.ndarray: A structured array with FRAME_DTYPE. The timestamp is in nanoseconds since the start.
+    """
+    read_header(path)
+    if mmap:
+        size = (np.memmap(path, dtype=np.uint8, mode="r").size - HEADER_DTYPE.itemsize) // FRAME_DTYPE.itemsize
+        return np.memmap(path, dtype=FRAME_DTYPE, mode="r", offset=HEADER_DTYPE.itemsize, shape=(size,))
+
+    with open(path, "rb") as file:
+        file.seek(HEADER_DTYPE.itemsize)
+        data = file.read()
+    # A trailing partial frame is cut off, e.g. when the robot lost power while flushing
+    usable = len(data) - len(data) % FRAME_DTYPE.itemsize
+    frames = np.frombuffer(data[:usable], dtype=FRAME_DTYPE)
+    return frames[np.argsort(frames["timestamp"], kind="stable")]
+
+
+def dropped_frames(frames: np.ndarray) -> int:
+    """
+    Returns:
+        int: Number of frames missing from the per thread sequence numbers.
+    """
+    dropped = 0
+    for thread in np.unique(frames["thread"]):
+        sequence = np.sort(frames["sequence"][frames["thread"] == thread].astype(np.int64))
+        dropped += int(sequence[-1] - sequence[0] + 1 - len(sequence))
+    return dropped
+
+
+def to_dataframe(frames: np.ndarray):
+    """
+    Flatten frames into a pandas DataFrame indexed by the time in seconds since the start of the trace.
+
+    Returns:
+        pandas.DataFrame: One column per scalar, e.g. "measured_vx", "pid_heading_i" or "wheel_command_2".
+    """
+    import pandas as pd
+
+    columns = {
+        "thread": frames["thread"],
+        "sequence": frames["sequence"],
+        "source": pd.Series(frames["source"]).map(SOURCES).to_numpy(),
+        "dt": frames["dt"],
+        "heading": frames["heading"],
+        "desired_heading": frames["desired_heading"],
+    }
+    for field in ("desired", "absolute", "ramped", "measured", "command"):
+        for i, axis in enumerate(_AXES):
+            columns[f"{field}_{axis}"] = frames[field][:, i]
+    for i, controller in enumerate(_CONTROLLERS):
+        columns[f"error_{controller}"] = frames["error"][:, i]
+        for j, term in enumerate("pid"):
+            columns[f"pid_{controller}_{term}"] = frames["pid"][:, i, j]
+    for field in ("wheel_command", "wheel_ticks"):
+        for i in range(4):
+            columns[f"{field}_{i}"] = frames[field][:, i]
+
+    index = pd.Index(frames["timestamp"] / 1e9, name="time")
+    return pd.DataFrame(columns, index=index)
+
+
+@contextmanager
+def recording(path: str, capacity: int = 4096) -> Iterator[None]:
+    """
+    Trace all control loops while the context is active.
+
+    Args:
+        path: The trace file, an existing file is replaced.
+        capacity: Frames buffered per thread before frames are dropped.
+    """
+    from libstp import trace as native_trace
+
+    native_trace.start(path, capacity)
+    try:
+        yield
+    finally:
+        native_trace.stop()
@@ -1,17 +1,14 @@
 import asyncio
 import multiprocessing
-import os
 import subprocess
 import threading
-import time
 from queue import Queue
-from typing import Dict, Union, Callable
+from typing import Callable
 import inspect
 
+from libstp.asynchronous import drive
 from libstp.logging import warn, info, error, debug
-from libstp_helpers import get_bool_argument
-
-properties_dir = f"{os.path.dirname(__file__)}/properties"
+from libstp_helpers import get_bool_argument, sim, telemetry
 
 calibrated_velocity = 14.3 # cm/s, used for the robot's calibrated velocity
 
@@ -31,38 +28,6 @@ def run_command(command):
         return str(e), None, -1
 
 
-def delete_properties(properties_file: str):
-    file = f"{properties_dir}/{properties_file}.properties"
-    if os.path.exists(file):
-        os.remove(file)
-    return True
-
-
-def get_properties(properties_file: str) -> Union[Dict[str, str], None]:
-    file = f"{properties_dir}/{properties_file}.properties"
-    if not os.path.exists(file):
-        return None
-
-    properties = {}
-    with open(file) as f:
-        for line in f:
-            if line.startswith("#"):
-                continue
-            key, value = line.strip().split("=")
-            properties[key] = value
-    return properties
-
-
-def set_properties(properties_file: str, properties: Dict[str, str]):
-    if not os.path.exists(properties_dir):
-        os.mkdir(properties_dir)
-
-    with open(f"{properties_dir}/{properties_file}.properties", "w") as f:
-        for key, value in properties.items():
-            f.write(f"{key}={value}\n")
-    return True
-
-
 def print_timestamp(msg: str = ""):
     frame = inspect.currentframe()
     caller_frame = frame.f_back
@@ -71,24 +36,19 @@ def print_timestamp(msg: str = ""):
     info(f"{formatted_caller_function_name} reached. {msg}".strip())
 
 
-# ToDo: Natively implement this in the libstp library
-async def to_task(algorithm, frequency=100):
-    period = 1 / frequency
-    while True:
-        start_time = time.time()
-        more = algorithm.advance()
-        if not more:
-            break
-        elapsed_time = time.time() - start_time
-        sleep_time = max(0.0, period - elapsed_time)
-        await asyncio.sleep(sleep_time)  # let other tasks run
-    # async def execute():
-    #     process = multiprocessing.Process(target=block)
-    #     process.start()
-    #     while process.is_alive():
-    #         await asyncio.sleep(0)
-    #     process.join()
-    # return asyncio.create_task(execute())
+def to_task(algorithm, frequency=100) -> asyncio.Future:
+    """
+    Runs a native algorithm on the libstp driver thread, or in lock step with the clock while a simulation runs.
+
+    :param algorithm: The algorithm returned by a libstp function, e.g. device.set_speed_while(...).
+    :param frequency: How often the algorithm is advanced per second.
+    :return: A future which resolves once the algorithm has finished.
+    """
+    record = telemetry.current_step()
+    on_ticks = record.add_ticks if record is not None else None
+    if sim.is_active():
+        return sim.drive(algorithm, frequency, on_ticks)
+    return drive(algorithm, frequency, on_ticks)
 
 
 # ToDo: Natively implement this in the libstp library
@@ -1,9 +1,10 @@
 import asyncio
-import time
+from typing import Optional
 
 import numpy as np
 
 from libstp_helpers.collision_detection import CollisionDetector
+from libstp_helpers.scheduler import get_tick_scheduler
 
 
 class WallAligner:
@@ -16,7 +17,7 @@ class WallAligner:
     - Automatic alignment after collision using gyroscope feedback.
     """
 
-    def __init__(self, device, detector: CollisionDetector, 
+    def __init__(self, device, detector: Optional[CollisionDetector] = None,
                  tolerance=0.3, 
                  stable_required=0.3, 
                  sample_interval=0.01, 
@@ -27,7 +28,7 @@ class WallAligner:
 
         Parameters:
             device: The robot device (e.g., OmniWheeledDevice).
-            detector: The CollisionDetector object.
+            detector: The CollisionDetector object, defaults to a streaming CollisionDetector on the device.
             tolerance (float): Angular velocity threshold for stable alignment.
             stable_required (float): Duration for which stability must be maintained before alignment completes.
             sample_interval (float): Delay between gyro samples.
@@ -40,6 +41,8 @@ class WallAligner:
         self.sample_interval = sample_interval
         self.initial_duration = initial_duration
         self.window_duration = window_duration
+        if detector is None:
+            detector = CollisionDetector(device)
         self.imu = detector.imu
         self.detector = detector
 
@@ -51,13 +54,13 @@ class WallAligner:
             int: Rotation direction (+1 for clockwise, -1 for counterclockwise).
         """
         # --- Phase 1: Determine Rotation Direction ---
+        scheduler = get_tick_scheduler()
+        rate = 1.0 / self.sample_interval
         integrated_heading = 0.0
-        start_time = time.time()
         self.device.__apply_kinematics_model__(forward_speed, strafe_speed, 0.0)
-        while time.time() - start_time < self.initial_duration:
+        async for _ in scheduler.ticks(rate, self.initial_duration, "WallAligner.align"):
             _, gy, _ = self.imu.gyro.get_value()
             integrated_heading += -gy * self.sample_interval
-            await asyncio.sleep(self.sample_interval)
         rotation_sign = 1 if integrated_heading > 0 else -1
 
         # --- Phase 2: Gyro-based Alignment ---
@@ -65,11 +68,9 @@ class WallAligner:
         self.device.__apply_kinematics_model__(forward_speed, strafe_speed, rotation_sign)
         while True:
             sample_window = []
-            window_start = time.time()
-            while time.time() - window_start < self.window_duration:
+            async for _ in scheduler.ticks(rate, self.window_duration, "WallAligner.align"):
                 _, gy, _ = self.imu.gyro.get_value()
                 sample_window.append(abs(gy))
-                await asyncio.sleep(self.sample_interval)
             avg_angular_velocity = np.mean(sample_window)
 
             print(f"Avg gyro ω: {avg_angular_velocity:.3f}, stable time: {stable_time:.2f}s, Rotation: {rotation_sign}")
@@ -90,27 +91,16 @@ class WallAligner:
     async def _run(self, forward_speed, strafe_speed):
         """
         Continuously monitors for collisions and aligns the robot upon detection.
-        Ensures that the sample rate remains consistent.
+        The detector is sampled on the shared tick scheduler at its sample rate.
         """
-        dt = 1.0 / self.detector.sample_rate
-        next_loop_time = time.time()
-
         self.device.__apply_kinematics_model__(forward_speed, strafe_speed, 0)
-        while True:
+        async for _ in get_tick_scheduler().ticks(self.detector.sample_rate, name="WallAligner.run"):
             collision, correction_angle = self.detector.update()
 
             if collision:
                 print(f"Collision detected! Correcting with angle: {correction_angle:.2f} rad")
                 break
 
-            next_loop_time += dt
-            sleep_time = next_loop_time - time.time()
-            if sleep_time > 0:
-                await asyncio.sleep(sleep_time)
-            else:
-                print("Warning: Loop falling behind, resynchronizing...")
-                next_loop_time = time.time()
-
         await self.align(forward_speed, strafe_speed)
 
     async def backward(self):